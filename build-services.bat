@@ -28,6 +28,8 @@ for %%s in (%services%) do (
   REM Create temporary Dockerfile for this service
   echo FROM ehealth-base > Dockerfile.!service!
   echo WORKDIR /app >> Dockerfile.!service!
+  echo COPY ./shared /opt/ehealth-shared >> Dockerfile.!service!
+  echo RUN pip install --no-cache-dir /opt/ehealth-shared >> Dockerfile.!service!
   echo COPY ./services/!service!/requirements.txt /app/ >> Dockerfile.!service!
   echo RUN pip install --no-cache-dir -r /app/requirements.txt >> Dockerfile.!service!
   echo COPY ./services/!service! /app/ >> Dockerfile.!service!
@@ -24,6 +24,10 @@ FROM ehealth-base
 
 WORKDIR /app
 
+# Install code shared between services before the requirements that list it
+COPY ./shared /opt/ehealth-shared
+RUN pip install --no-cache-dir /opt/ehealth-shared
+
 # Install service-specific dependencies
 COPY ./services/$service/requirements.txt /app/
 RUN pip install --no-cache-dir -r /app/requirements.txt
@@ -194,8 +194,9 @@ class AuthService {
   async uploadFile(file, fileType = 'profile_photo') {
     try {
       const formData = new FormData();
-      formData.append('file', file);
+      // Fields before the file: large uploads are stored as they stream in
       formData.append('file_type', fileType);
+      formData.append('file', file);
       
       // Using simplified endpoint without authentication
       const response = await axios.post(
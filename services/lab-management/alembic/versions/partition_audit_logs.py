@@ -0,0 +1,86 @@
+"""Partition audit logs by month on timestamp
+
+Revision ID: partition_audit_logs
+Revises: add_file_attachments
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'partition_audit_logs'
+down_revision = 'add_file_attachments'
+branch_labels = None
+depends_on = None
+
+# Matches AUDIT_LOG_PARTITION_PREMAKE_MONTHS at this revision
+PREMAKE_MONTHS = 3
+
+INDEXES = {
+    'ix_audit_logs_record_id': 'record_id',
+    'ix_audit_logs_table_name': 'table_name',
+    'ix_audit_logs_user_id': 'user_id',
+}
+
+def _create_indexes() -> None:
+    for name, column in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON audit_logs ({column})")
+
+def _drop_indexes() -> None:
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+def upgrade() -> None:
+    # Index and constraint names move with the table, so free them first
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER TABLE audit_logs_unpartitioned DROP CONSTRAINT audit_logs_pkey")
+    _drop_indexes()
+
+    op.execute(
+        "CREATE TABLE audit_logs (LIKE audit_logs_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (timestamp)"
+    )
+
+    # One partition per month from the oldest row through the pre-create
+    # horizon; app.db.partitions maintains them from here on
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST(
+                        COALESCE((SELECT min(timestamp) FROM audit_logs_unpartitioned), now()),
+                        now()
+                    ))::date,
+                    (date_trunc('month', now()) + interval '{PREMAKE_MONTHS} months')::date,
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE audit_logs_p%s PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_unpartitioned")
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id, timestamp)")
+    _create_indexes()
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned DROP CONSTRAINT audit_logs_pkey")
+    _drop_indexes()
+
+    op.execute("CREATE TABLE audit_logs (LIKE audit_logs_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned")
+
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id)")
+    _create_indexes()
@@ -45,6 +45,11 @@ class Settings(BaseSettings):
     # Caching
     CACHE_ENABLED: bool = True
     DEFAULT_CACHE_TTL: int = 300  # 5 minutes
+    
+    # Audit Log Partitioning
+    AUDIT_LOG_RETENTION_DAYS: int = 2555  # 7 years
+    AUDIT_LOG_PARTITION_PREMAKE_MONTHS: int = 3
+    AUDIT_LOG_ARCHIVE_DIR: str = "./archive"
 
     # --- THIS IS THE FIX ---
     # Replace the inner Config class with model_config
@@ -0,0 +1,20 @@
+"""
+Audit log partitioning, on the shared monthly partition manager
+"""
+
+from ehealth_shared.db.partitions import (  # noqa: F401 - re-exported
+    MonthlyPartitionManager, PartitionInfo, add_months, create_default_partition, month_start,
+    parse_partition_bound
+)
+
+
+def audit_log_partitions() -> MonthlyPartitionManager:
+    """Partition manager for the audit log."""
+    from app.core.config import settings
+
+    return MonthlyPartitionManager(
+        table="audit_logs",
+        retention_days=settings.AUDIT_LOG_RETENTION_DAYS,
+        premake_months=settings.AUDIT_LOG_PARTITION_PREMAKE_MONTHS,
+        archive_dir=settings.AUDIT_LOG_ARCHIVE_DIR
+    )
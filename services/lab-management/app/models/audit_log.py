@@ -1,10 +1,11 @@
 import enum
-from sqlalchemy import Column, String, DateTime, Enum, Text
+from sqlalchemy import Column, String, DateTime, Enum, Text, PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base import Base # Note: We are not using BaseModel here
+from app.db.partitions import create_default_partition
 
 class AuditActionEnum(enum.Enum):
     CREATE = "CREATE"
@@ -17,8 +18,14 @@ class AuditLog(Base):
     This table stores the history of all significant changes in the system.
     """
     __tablename__ = "audit_logs"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    __table_args__ = (
+        # Partitioned tables need the partition key in the primary key.
+        PrimaryKeyConstraint("id", "timestamp", name="audit_logs_pkey"),
+        # Monthly partitions are created and archived by app.db.partitions.
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False)
     timestamp = Column(DateTime, default=func.now(), nullable=False)
 
     # The user who performed the action.
@@ -40,4 +47,8 @@ class AuditLog(Base):
     new_values = Column(JSONB, nullable=True)
 
     # A free-text field for any extra context or reason for the change.
-    change_reason = Column(Text, nullable=True)
\ No newline at end of file
+    change_reason = Column(Text, nullable=True)
+
+
+# Tables built by create_all get a catch-all partition until the monthly ones exist
+create_default_partition(AuditLog.__table__)
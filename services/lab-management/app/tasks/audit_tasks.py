@@ -0,0 +1,21 @@
+import asyncio
+
+from app.tasks.celery_app import celery_app
+from app.db.partitions import audit_log_partitions
+from app.db.session import engine
+
+@celery_app.task(bind=True)
+def maintain_audit_log_partitions(self):
+    """Pre-create upcoming audit log partitions and archive expired ones."""
+    try:
+        async def _rotate():
+            try:
+                return await audit_log_partitions().rotate(engine)
+            finally:
+                # Pooled connections are bound to this task's event loop
+                await engine.dispose()
+
+        result = asyncio.run(_rotate())
+        return {"status": "completed", **result}
+    except Exception as exc:
+        raise self.retry(exc=exc, countdown=300, max_retries=3)
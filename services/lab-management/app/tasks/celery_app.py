@@ -9,7 +9,8 @@ celery_app = Celery(
     include=[
         "app.tasks.appointment_tasks",
         "app.tasks.notification_tasks",
-        "app.tasks.report_tasks"
+        "app.tasks.report_tasks",
+        "app.tasks.audit_tasks"
     ]
 )
 
@@ -32,4 +33,13 @@ celery_app.conf.task_routes = {
     "app.tasks.notification_tasks.*": {"queue": "notifications"},
     "app.tasks.report_tasks.*": {"queue": "reports"},
     "app.tasks.appointment_tasks.*": {"queue": "appointments"},
+    "app.tasks.audit_tasks.*": {"queue": "maintenance"},
+}
+
+# Periodic tasks
+celery_app.conf.beat_schedule = {
+    "maintain-audit-log-partitions": {
+        "task": "app.tasks.audit_tasks.maintain_audit_log_partitions",
+        "schedule": 86400.0,  # Daily
+    },
 }
\ No newline at end of file
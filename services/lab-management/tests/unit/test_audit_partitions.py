@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import date
+
+from app.db.partitions import MonthlyPartitionManager, PartitionInfo
+
+
+class TestMonthlyPartitionManager:
+    """Unit tests for audit log partition rotation."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.manager = MonthlyPartitionManager("audit_logs", retention_days=30, premake_months=1)
+
+    def test_months_to_create(self):
+        """Test that only missing months up to the horizon are created."""
+        existing = [PartitionInfo("audit_logs_p2025_12", date(2025, 12, 1), date(2026, 1, 1))]
+
+        months = self.manager.months_to_create(existing, today=date(2025, 12, 20))
+
+        assert months == [date(2026, 1, 1)]
+        assert self.manager.partition_name(months[0]) == "audit_logs_p2026_01"
+
+    def test_expired(self):
+        """Test that partitions still inside the retention window are kept."""
+        partitions = [
+            PartitionInfo("audit_logs_p2025_10", date(2025, 10, 1), date(2025, 11, 1)),
+            PartitionInfo("audit_logs_p2025_11", date(2025, 11, 1), date(2025, 12, 1)),
+        ]
+
+        expired = self.manager.expired(partitions, today=date(2025, 12, 20))
+
+        assert [p.name for p in expired] == ["audit_logs_p2025_10"]
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_skips_unpartitioned_table(self):
+        """Test that nothing is created before the partitioning migration has run."""
+        conn = AsyncMock()
+        result = MagicMock()
+        result.scalar.return_value = False
+        conn.execute.return_value = result
+
+        created = await self.manager.ensure_partitions(conn, today=date(2025, 12, 20))
+
+        assert created == []
+        assert conn.execute.await_count == 1
@@ -14,8 +14,9 @@ from app.models.base import BaseModel
 # this is the Alembic Config object
 config = context.config
 
-# Interpret the config file for Python logging
-if config.config_file_name is not None:
+# Interpret the config file for Python logging, unless the app is driving
+# Alembic on its own connection and has configured logging already
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # Set target metadata
@@ -59,6 +60,11 @@ async def run_async_migrations() -> None:
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # Called from app.db.migrations with a connection it already holds
+        do_run_migrations(connection)
+        return
     asyncio.run(run_async_migrations())
 
 
@@ -0,0 +1,35 @@
+"""Availability lookup indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Covering index used by basket availability lookups
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_inventory_items_medicine_pharmacy_stock "
+        "ON inventory_items (medicine_id, pharmacy_id) "
+        "INCLUDE (current_stock, reserved_stock) "
+        "WHERE is_active"
+    )
+
+    # Bounding-box prefilter for radius searches
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_pharmacies_latitude_longitude "
+        "ON pharmacies (latitude, longitude)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_pharmacies_latitude_longitude")
+    op.execute("DROP INDEX IF EXISTS ix_inventory_items_medicine_pharmacy_stock")
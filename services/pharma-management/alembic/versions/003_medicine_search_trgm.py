@@ -0,0 +1,36 @@
+"""Medicine trigram search column and index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Normalized haystack kept in sync by Postgres
+    op.execute(
+        "ALTER TABLE medicines ADD COLUMN IF NOT EXISTS search_text text "
+        "GENERATED ALWAYS AS ("
+        "lower(name || ' ' || generic_name || ' ' || coalesce(brand_name, '') || ' ' || manufacturer)"
+        ") STORED"
+    )
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_medicines_search_text_trgm "
+        "ON medicines USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_medicines_search_text_trgm")
+    op.execute("ALTER TABLE medicines DROP COLUMN IF EXISTS search_text")
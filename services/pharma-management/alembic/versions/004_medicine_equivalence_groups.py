@@ -0,0 +1,110 @@
+"""Medicine equivalence groups
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 5000
+
+# Frozen copy of medicine_repository.equivalence_key as of this revision, so
+# later changes to the application code do not change what this migration does
+DOSAGE_FORM_SYNONYMS = {
+    "tab": "tablet", "tabs": "tablet", "tablets": "tablet",
+    "cap": "capsule", "caps": "capsule", "capsules": "capsule",
+    "inj": "injection", "injections": "injection",
+    "syp": "syrup", "susp": "suspension",
+}
+
+
+def _equivalence_key(active_ingredients, strength, dosage_form):
+    if isinstance(active_ingredients, str):
+        active_ingredients = [active_ingredients]
+    salts = sorted({
+        " ".join(str(ingredient.get("name", "") if isinstance(ingredient, dict) else ingredient).lower().split())
+        for ingredient in (active_ingredients or [])
+    } - {""})
+    form = " ".join((dosage_form or "").lower().split())
+    return (
+        "+".join(salts),
+        "".join((strength or "").lower().split()),
+        DOSAGE_FORM_SYNONYMS.get(form, form),
+    )
+
+
+def upgrade() -> None:
+    op.create_table('medicine_equivalence_groups',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('salt_composition', sa.String(length=1000), nullable=False),
+        sa.Column('strength', sa.String(length=100), nullable=False),
+        sa.Column('dosage_form', sa.String(length=100), nullable=False),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('updated_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('salt_composition', 'strength', 'dosage_form', name='uq_medicine_equivalence_key')
+    )
+
+    op.add_column('medicines', sa.Column('equivalence_group_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_medicines_equivalence_group_id', 'medicines', 'medicine_equivalence_groups',
+        ['equivalence_group_id'], ['id']
+    )
+    op.create_index('ix_medicines_equivalence_group_id', 'medicines', ['equivalence_group_id'])
+
+    # Backfill groups for the existing catalogue in keyset batches, so the
+    # migration never holds more than BACKFILL_BATCH medicines in memory
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        after = "" if last_id is None else "WHERE id > :last_id "
+        params = {"batch": BACKFILL_BATCH} if last_id is None else {"batch": BACKFILL_BATCH, "last_id": last_id}
+        medicines = bind.execute(
+            sa.text(
+                "SELECT id, active_ingredients, strength, dosage_form FROM medicines "
+                f"{after}ORDER BY id LIMIT :batch"
+            ),
+            params
+        ).all()
+        if not medicines:
+            break
+
+        keys = {row.id: _equivalence_key(row.active_ingredients, row.strength, row.dosage_form) for row in medicines}
+        bind.execute(
+            sa.text(
+                "INSERT INTO medicine_equivalence_groups (salt_composition, strength, dosage_form) "
+                "VALUES (:salt, :strength, :form) ON CONFLICT DO NOTHING"
+            ),
+            [{"salt": salt, "strength": strength, "form": form} for salt, strength, form in set(keys.values())]
+        )
+        bind.execute(
+            sa.text(
+                "UPDATE medicines SET equivalence_group_id = g.id FROM medicine_equivalence_groups g "
+                "WHERE medicines.id = :id AND g.salt_composition = :salt "
+                "AND g.strength = :strength AND g.dosage_form = :form"
+            ),
+            [
+                {"id": medicine_id, "salt": salt, "strength": strength, "form": form}
+                for medicine_id, (salt, strength, form) in keys.items()
+            ]
+        )
+        last_id = medicines[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index('ix_medicines_equivalence_group_id', table_name='medicines')
+    op.drop_constraint('fk_medicines_equivalence_group_id', 'medicines', type_='foreignkey')
+    op.drop_column('medicines', 'equivalence_group_id')
+    op.drop_table('medicine_equivalence_groups')
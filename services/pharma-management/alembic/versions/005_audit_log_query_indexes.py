@@ -0,0 +1,46 @@
+"""Audit log query index and resource type constraint
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# AuditResourceTypeEnum values at this revision
+RESOURCE_TYPES = ", ".join(f"'{value}'" for value in (
+    "pharmacy", "staff", "medicine", "inventory", "prescription", "prescription_item",
+    "order", "invoice", "purchase_order", "goods_receipt_note", "clinical", "controlled_substance",
+))
+
+
+def upgrade() -> None:
+    # Per-pharmacy date range scans for audit queries and compliance reports
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_pharmacy_id_created_at "
+        "ON audit_logs (pharmacy_id, created_at)"
+    )
+
+    # Normalize casing/whitespace left by older writers
+    op.execute(
+        "UPDATE audit_logs SET resource_type = lower(trim(resource_type)) "
+        "WHERE resource_type <> lower(trim(resource_type))"
+    )
+
+    # NOT VALID enforces the enum for new rows without scanning history;
+    # run VALIDATE CONSTRAINT once legacy values have been reviewed.
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT ck_audit_logs_resource_type "
+        f"CHECK (resource_type IN ({RESOURCE_TYPES})) NOT VALID"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_logs DROP CONSTRAINT IF EXISTS ck_audit_logs_resource_type")
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_pharmacy_id_created_at")
@@ -0,0 +1,143 @@
+"""Partition audit logs by month on created_at
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+# Matches AUDIT_LOG_PARTITION_PREMAKE_MONTHS at this revision
+PREMAKE_MONTHS = 3
+
+# AuditResourceTypeEnum values at this revision
+RESOURCE_TYPES = ", ".join(f"'{value}'" for value in (
+    "pharmacy", "staff", "medicine", "inventory", "prescription", "prescription_item",
+    "order", "invoice", "purchase_order", "goods_receipt_note", "clinical", "controlled_substance",
+))
+
+INDEXES = {
+    "ix_audit_logs_id": "id",
+    "ix_audit_logs_created_by": "created_by",
+    "ix_audit_logs_updated_by": "updated_by",
+    "ix_audit_logs_is_active": "is_active",
+    "ix_audit_logs_user_id": "user_id",
+    "ix_audit_logs_pharmacy_id": "pharmacy_id",
+    "ix_audit_logs_session_id": "session_id",
+    "ix_audit_logs_action": "action",
+    "ix_audit_logs_resource_type": "resource_type",
+    "ix_audit_logs_resource_id": "resource_id",
+    "ix_audit_logs_pharmacy_id_created_at": "pharmacy_id, created_at",
+}
+
+
+def _is_partitioned() -> bool:
+    result = op.get_bind().exec_driver_sql(
+        "SELECT relkind = 'p' FROM pg_class WHERE relname = 'audit_logs'"
+    )
+    return bool(result.scalar())
+
+
+def _create_indexes() -> None:
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON audit_logs ({columns})")
+
+
+def upgrade() -> None:
+    # Fresh databases get the partitioned table from the model metadata
+    if _is_partitioned():
+        return
+
+    # Index and constraint names move with the table, so free them first
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER TABLE audit_logs_unpartitioned DROP CONSTRAINT audit_logs_pkey")
+    op.execute("ALTER TABLE audit_logs_unpartitioned DROP CONSTRAINT IF EXISTS ck_audit_logs_resource_type")
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute(
+        "CREATE TABLE audit_logs (LIKE audit_logs_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+
+    # One partition per month from the oldest row through the pre-create
+    # horizon; app.db.partitions maintains them from here on
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST(
+                        COALESCE((SELECT min(created_at) FROM audit_logs_unpartitioned), now()),
+                        now()
+                    ))::date,
+                    (date_trunc('month', now()) + interval '{PREMAKE_MONTHS} months')::date,
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE audit_logs_p%s PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_unpartitioned")
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pharmacy_id_fkey "
+        "FOREIGN KEY (pharmacy_id) REFERENCES pharmacies (id)"
+    )
+    _create_indexes()
+
+    # Partitioned tables cannot take NOT VALID constraints; keep legacy rows
+    # loadable by skipping the constraint if any of them still violate it
+    op.execute(f"""
+        DO $$
+        BEGIN
+            ALTER TABLE audit_logs ADD CONSTRAINT ck_audit_logs_resource_type
+                CHECK (resource_type IN ({RESOURCE_TYPES}));
+        EXCEPTION WHEN check_violation THEN
+            RAISE WARNING 'audit_logs has unknown resource types; ck_audit_logs_resource_type not added';
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    if not _is_partitioned():
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned DROP CONSTRAINT audit_logs_pkey")
+    op.execute("ALTER TABLE audit_logs_partitioned DROP CONSTRAINT IF EXISTS ck_audit_logs_resource_type")
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute(
+        "CREATE TABLE audit_logs (LIKE audit_logs_partitioned INCLUDING DEFAULTS)"
+    )
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned")
+
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pharmacy_id_fkey "
+        "FOREIGN KEY (pharmacy_id) REFERENCES pharmacies (id)"
+    )
+    _create_indexes()
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT ck_audit_logs_resource_type "
+        f"CHECK (resource_type IN ({RESOURCE_TYPES})) NOT VALID"
+    )
@@ -0,0 +1,28 @@
+"""Partial index for the prescription expiry sweep
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset walk over prescriptions that can still expire
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_prescriptions_open_id_expiry "
+        "ON prescriptions (id) "
+        "INCLUDE (expiry_date) "
+        "WHERE status IN ('uploaded', 'processing', 'validated')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_prescriptions_open_id_expiry")
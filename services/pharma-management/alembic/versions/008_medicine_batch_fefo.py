@@ -0,0 +1,82 @@
+"""Pharmacy-scoped medicine batches with FEFO index
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE medicine_batches ADD COLUMN IF NOT EXISTS pharmacy_id UUID "
+        "REFERENCES pharmacies (id)"
+    )
+
+    # Existing batches get the pharmacy of the inventory item they moved
+    # through; batches with no transactions fall back to their goods
+    # receipt, then to the only pharmacy stocking the medicine. Batches
+    # still unassigned stay out of FEFO allocation.
+    op.execute(
+        """
+        UPDATE medicine_batches AS b
+        SET pharmacy_id = src.pharmacy_id
+        FROM (
+            SELECT DISTINCT ON (t.batch_id) t.batch_id, i.pharmacy_id
+            FROM inventory_transactions AS t
+            JOIN inventory_items AS i ON i.id = t.inventory_item_id
+            WHERE t.batch_id IS NOT NULL
+            ORDER BY t.batch_id, t.created_at
+        ) AS src
+        WHERE b.id = src.batch_id AND b.pharmacy_id IS NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE medicine_batches AS b
+        SET pharmacy_id = src.pharmacy_id
+        FROM (
+            SELECT gi.medicine_id, gi.batch_number, min(g.pharmacy_id::text)::uuid AS pharmacy_id
+            FROM goods_receipt_note_items AS gi
+            JOIN goods_receipt_notes AS g ON g.id = gi.grn_id
+            GROUP BY gi.medicine_id, gi.batch_number
+            HAVING count(DISTINCT g.pharmacy_id) = 1
+        ) AS src
+        WHERE b.medicine_id = src.medicine_id
+          AND b.batch_number = src.batch_number
+          AND b.pharmacy_id IS NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE medicine_batches AS b
+        SET pharmacy_id = src.pharmacy_id
+        FROM (
+            SELECT medicine_id, min(pharmacy_id::text)::uuid AS pharmacy_id
+            FROM inventory_items
+            WHERE is_active
+            GROUP BY medicine_id
+            HAVING count(DISTINCT pharmacy_id) = 1
+        ) AS src
+        WHERE b.medicine_id = src.medicine_id AND b.pharmacy_id IS NULL
+        """
+    )
+
+    # First-expiry-first-out batch picking per pharmacy
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_medicine_batches_fefo "
+        "ON medicine_batches (medicine_id, pharmacy_id, expiry_date) "
+        "WHERE current_quantity > 0"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_medicine_batches_fefo")
+    op.execute("ALTER TABLE medicine_batches DROP COLUMN IF EXISTS pharmacy_id")
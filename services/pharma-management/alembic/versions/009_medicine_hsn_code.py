@@ -0,0 +1,22 @@
+"""HSN code on medicines for GST rate lookup
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE medicines ADD COLUMN IF NOT EXISTS hsn_code VARCHAR(20)")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE medicines DROP COLUMN IF EXISTS hsn_code")
@@ -1,11 +1,6 @@
 import uuid
 from datetime import datetime
-from app.grpc_client import NotificationClient
-
-async def send_notification(notification_data):
-    """Send a notification to the notification service"""
-    client = NotificationClient()
-    return client.send_notification(notification_data)
+from app.grpc_client import send_notification
 
 # Example: Prescription ready notification
 async def send_prescription_ready_notification(patient_id, medication_name, pharmacy_name):
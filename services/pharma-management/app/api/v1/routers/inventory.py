@@ -10,10 +10,11 @@ import logging
 
 from app.db.session import get_async_session
 from app.schemas.inventory import (
-    InventoryItemResponse, InventoryUpdate, InventoryAvailability,
+    InventoryItemResponse, InventoryUpdate, InventoryAvailability, PharmacyBasketAvailability,
     PurchaseOrderCreate, PurchaseOrderResponse, GRNCreate, GRNResponse
 )
 from app.services.inventory_service import InventoryService
+from app.services.availability_service import AvailabilityService
 from app.services.purchase_service import PurchaseService
 from app.core.exceptions import MedicineNotFoundException, InsufficientStockException
 
@@ -95,6 +96,27 @@ async def check_medicine_availability(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/availability/nearby", response_model=List[PharmacyBasketAvailability])
+async def find_nearby_pharmacies(
+    medicine_ids: str = Query(..., description="Comma-separated medicine IDs"),
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10.0, ge=1, le=50),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Find pharmacies within a radius ranked by basket coverage and distance."""
+    try:
+        medicine_id_list = [UUID(id.strip()) for id in medicine_ids.split(",")]
+        availability_service = AvailabilityService(db)
+        return await availability_service.find_nearby_pharmacies(
+            medicine_id_list, latitude, longitude, radius_km, limit
+        )
+    except Exception as e:
+        logger.error(f"Error finding nearby pharmacies: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/purchases", response_model=PurchaseOrderResponse)
 async def create_purchase_order(
     purchase_data: PurchaseOrderCreate,
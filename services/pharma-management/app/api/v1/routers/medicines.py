@@ -9,10 +9,12 @@ from typing import List, Optional
 from uuid import UUID
 import logging
 
+from app.core.exceptions import MedicineNotFoundException
 from app.db.session import get_async_session
 from app.models.medicine import Medicine
-from app.schemas.medicine import MedicineResponse, MedicineAlternatives
+from app.schemas.medicine import MedicineResponse, MedicineAlternatives, MedicineSuggestion
 from app.services.medicine_service import MedicineService
+from app.services.medicine_search_service import MedicineSearchService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -43,6 +45,21 @@ async def search_medicines(
         raise HTTPException(status_code=500, detail="Medicine search failed")
 
 
+@router.get("/suggest", response_model=List[MedicineSuggestion])
+async def suggest_medicines(
+    q: str = Query(..., min_length=1, description="Name prefix"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Type-ahead suggestions by name, generic or brand prefix."""
+    try:
+        search_service = MedicineSearchService(db)
+        return await search_service.suggest(q, limit)
+    except Exception as e:
+        logger.error(f"Unexpected error suggesting medicines: {e}")
+        raise HTTPException(status_code=500, detail="Medicine suggestions failed")
+
+
 @router.get("/{medicine_id}", response_model=MedicineResponse)
 async def get_medicine(
     medicine_id: UUID,
@@ -80,18 +97,41 @@ async def create_medicine(
         raise HTTPException(status_code=500, detail="Failed to create medicine")
 
 
+@router.put("/{medicine_id}", response_model=MedicineResponse)
+async def update_medicine(
+    medicine_id: UUID,
+    medicine_data: dict,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Update a medicine."""
+    try:
+        medicine_service = MedicineService(db)
+        medicine = await medicine_service.update_medicine(medicine_id, medicine_data)
+        logger.info(f"Updated medicine: {medicine.name}")
+        return medicine
+    except MedicineNotFoundException:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+    except ValueError as e:
+        logger.error(f"Validation error updating medicine: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error updating medicine {medicine_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update medicine")
+
+
 @router.get("/{medicine_id}/alternatives", response_model=MedicineAlternatives)
 async def get_medicine_alternatives(
     medicine_id: UUID,
     include_generic: bool = Query(True),
     include_brand: bool = Query(True),
+    pharmacy_id: Optional[UUID] = Query(None, description="Limit stock to one pharmacy"),
     db: AsyncSession = Depends(get_async_session)
 ):
     """Get alternative medicines (generic/brand substitutes)."""
     try:
         medicine_service = MedicineService(db)
         alternatives = await medicine_service.get_alternatives(
-            medicine_id, include_generic, include_brand
+            medicine_id, include_generic, include_brand, pharmacy_id
         )
         return alternatives
     except ValueError as e:
@@ -2,135 +2,308 @@
 Dynamic table creation for pharmacy-specific data isolation
 """
 
-from sqlalchemy import MetaData, Table, Column, String, Integer, Numeric, DateTime, Boolean, ForeignKey, JSON, Text, create_engine
+from sqlalchemy import (
+    MetaData, Table, Column, String, Integer, Numeric, DateTime, Boolean,
+    bindparam, delete, func, insert, select, text, update
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.schema import CreateIndex, CreateSchema, CreateTable
+from sqlalchemy.sql.expression import Delete, Insert, Select, Update
+from typing import Dict, Iterable, List, NamedTuple, Optional
 from uuid import UUID as UUIDType
 import logging
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import PharmacyNotFoundException
+
 logger = logging.getLogger(__name__)
 
 
+def _inventory_columns() -> List[Column]:
+    return [
+        Column('id', UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid()),
+        Column('medicine_id', UUID(as_uuid=True), nullable=False, index=True),
+        Column('current_stock', Integer, nullable=False, server_default=text("0")),
+        Column('reserved_stock', Integer, nullable=False, server_default=text("0")),
+        Column('minimum_stock', Integer, nullable=False, server_default=text("10")),
+        Column('reorder_point', Integer, nullable=False, server_default=text("20")),
+        Column('cost_price', Numeric(10, 2), nullable=False),
+        Column('selling_price', Numeric(10, 2), nullable=False),
+        Column('mrp', Numeric(10, 2), nullable=False),
+        Column('storage_location', String(100), nullable=True),
+        Column('status', String(50), server_default="active"),
+        Column('created_at', DateTime, nullable=False, server_default=func.now()),
+        Column('updated_at', DateTime, nullable=False, server_default=func.now()),
+        Column('is_active', Boolean, server_default=text("true"))
+    ]
+
+
+def _orders_columns() -> List[Column]:
+    return [
+        Column('id', UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid()),
+        Column('order_number', String(100), nullable=False, unique=True),
+        Column('patient_id', UUID(as_uuid=True), nullable=False),
+        Column('prescription_id', UUID(as_uuid=True), nullable=True),
+        Column('status', String(50), nullable=False, server_default="pending"),
+        Column('total_amount', Numeric(10, 2), nullable=False),
+        Column('payment_status', String(50), server_default="pending"),
+        Column('delivery_type', String(50), server_default="pickup"),
+        Column('created_at', DateTime, nullable=False, server_default=func.now()),
+        Column('updated_at', DateTime, nullable=False, server_default=func.now()),
+        Column('is_active', Boolean, server_default=text("true"))
+    ]
+
+
+def _prescriptions_columns() -> List[Column]:
+    return [
+        Column('id', UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid()),
+        Column('prescription_number', String(100), nullable=False, unique=True),
+        Column('patient_id', UUID(as_uuid=True), nullable=False),
+        Column('doctor_id', UUID(as_uuid=True), nullable=False),
+        Column('patient_name', String(255), nullable=False),
+        Column('doctor_name', String(255), nullable=False),
+        Column('issue_date', DateTime, nullable=False),
+        Column('expiry_date', DateTime, nullable=False),
+        Column('status', String(50), server_default="uploaded"),
+        Column('validation_status', String(50), server_default="pending"),
+        Column('created_at', DateTime, nullable=False, server_default=func.now()),
+        Column('updated_at', DateTime, nullable=False, server_default=func.now()),
+        Column('is_active', Boolean, server_default=text("true"))
+    ]
+
+
+# Routing key -> (base table name, column factory)
+PHARMACY_TABLES = {
+    "inventory": ("inventory_items", _inventory_columns),
+    "orders": ("orders", _orders_columns),
+    "prescriptions": ("prescriptions", _prescriptions_columns),
+}
+
+
+def pharmacy_short_id(pharmacy_id: UUIDType) -> str:
+    """First eight hex digits of a pharmacy id."""
+    return str(pharmacy_id).replace('-', '')[:8]
+
+
+def pharmacy_schema_name(pharmacy_id: UUIDType) -> str:
+    """Schema holding a pharmacy's tables."""
+    return f"pharma_{pharmacy_short_id(pharmacy_id)}"
+
+
+def pharmacy_table_name(pharmacy_id: UUIDType, base_table: str) -> str:
+    """Generate pharmacy-specific table name."""
+    return f"{base_table}_pharma_{pharmacy_short_id(pharmacy_id)}"
+
+
+def build_pharmacy_tables(pharmacy_id: UUIDType, metadata: Optional[MetaData] = None) -> Dict[str, Table]:
+    """Declared Table objects for one pharmacy, keyed like PHARMACY_TABLES."""
+    metadata = metadata if metadata is not None else MetaData()
+    schema = pharmacy_schema_name(pharmacy_id)
+    return {
+        key: Table(pharmacy_table_name(pharmacy_id, base_table), metadata, *columns(), schema=schema)
+        for key, (base_table, columns) in PHARMACY_TABLES.items()
+    }
+
+
+class TableStatements(NamedTuple):
+    """Statement templates for one routed table.
+
+    Built once per table, so repeat executions skip statement construction
+    and hit the engine's compiled cache. Row ids bind as ``row_id``; update
+    and insert take column values as execution parameters.
+    """
+    get_by_id: Select
+    list_active: Select
+    insert: Insert
+    update_by_id: Update
+    delete_by_id: Delete
+
+
+def compile_statements(table: Table) -> TableStatements:
+    """Build the statement templates for a table."""
+    return TableStatements(
+        get_by_id=select(table).where(table.c.id == bindparam("row_id")),
+        list_active=(
+            select(table)
+            .where(table.c.is_active.is_(True))
+            .order_by(table.c.created_at.desc())
+            .limit(bindparam("limit"))
+            .offset(bindparam("offset"))
+        ),
+        insert=insert(table).returning(table.c.id),
+        update_by_id=update(table).where(table.c.id == bindparam("row_id")),
+        delete_by_id=delete(table).where(table.c.id == bindparam("row_id")),
+    )
+
+
+class PharmacyTables:
+    """One pharmacy's routed tables and their statement templates."""
+
+    __slots__ = ("pharmacy_id", "schema", "tables", "statements")
+
+    def __init__(self, pharmacy_id: UUIDType, tables: Dict[str, Table]):
+        self.pharmacy_id = pharmacy_id
+        self.schema = pharmacy_schema_name(pharmacy_id)
+        self.tables = tables
+        self.statements = {key: compile_statements(table) for key, table in tables.items()}
+
+    def __getitem__(self, key: str) -> TableStatements:
+        return self.statements[key]
+
+
+class PharmacyTableRouter:
+    """Routes pharmacy ids to their tables.
+
+    Tables are reflected once per pharmacy and kept in a bounded LRU, so a
+    hot pharmacy costs a dictionary lookup and only a cold one pays for
+    reflection. The TTL makes long-lived workers pick up column changes
+    eventually.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        chunk_size: Optional[int] = None
+    ):
+        self._cache = TTLCache(
+            maxsize=maxsize or settings.PHARMACY_TABLE_CACHE_SIZE,
+            ttl=ttl_seconds or settings.PHARMACY_TABLE_CACHE_TTL_SECONDS
+        )
+        self.chunk_size = chunk_size or settings.PHARMACY_TABLE_PROVISION_CHUNK
+
+    async def route(self, conn: AsyncConnection, pharmacy_id: UUIDType) -> PharmacyTables:
+        """Tables and statements for a pharmacy, reflecting them on a cache miss."""
+        routed = self._cache.get(pharmacy_id)
+        if routed is None:
+            # Concurrent misses may both reflect; the second result simply wins
+            tables = await conn.run_sync(self._reflect, pharmacy_id)
+            routed = PharmacyTables(pharmacy_id, tables)
+            self._cache.set(pharmacy_id, routed)
+        return routed
+
+    @staticmethod
+    def _reflect(sync_conn, pharmacy_id: UUIDType) -> Dict[str, Table]:
+        metadata = MetaData()
+        schema = pharmacy_schema_name(pharmacy_id)
+        names = {
+            key: pharmacy_table_name(pharmacy_id, base_table)
+            for key, (base_table, _) in PHARMACY_TABLES.items()
+        }
+        try:
+            metadata.reflect(sync_conn, schema=schema, only=list(names.values()))
+        except InvalidRequestError:
+            logger.error(f"Pharmacy tables for {pharmacy_id} are not provisioned")
+            raise PharmacyNotFoundException(str(pharmacy_id))
+        return {key: metadata.tables[f"{schema}.{name}"] for key, name in names.items()}
+
+    def provision_sql(self, pharmacy_ids: Iterable[UUIDType], dialect) -> List[str]:
+        """DDL for many pharmacies, as one DO block per chunk of pharmacies."""
+        blocks, statements = [], []
+        for count, pharmacy_id in enumerate(pharmacy_ids, start=1):
+            statements.append(CreateSchema(pharmacy_schema_name(pharmacy_id), if_not_exists=True))
+            for table in build_pharmacy_tables(pharmacy_id).values():
+                statements.append(CreateTable(table, if_not_exists=True))
+                statements.extend(CreateIndex(index, if_not_exists=True) for index in table.indexes)
+            if count % self.chunk_size == 0:
+                blocks.append(self._do_block(statements, dialect))
+                statements = []
+        if statements:
+            blocks.append(self._do_block(statements, dialect))
+        return blocks
+
+    @staticmethod
+    def _do_block(statements, dialect) -> str:
+        body = ";\n".join(str(statement.compile(dialect=dialect)).strip() for statement in statements)
+        return f"DO $$ BEGIN\n{body};\nEND $$"
+
+    async def provision(self, conn: AsyncConnection, pharmacy_ids: Iterable[UUIDType]) -> Dict[UUIDType, Dict[str, str]]:
+        """Create many pharmacies' tables inside the caller's transaction.
+
+        Each chunk of pharmacies is one round trip; nothing is visible to
+        other sessions until the caller commits. Every new relation stays
+        locked until then (about fifteen per pharmacy), so batches of more
+        than a few hundred pharmacies need max_locks_per_transaction headroom.
+        """
+        pharmacy_ids = list(pharmacy_ids)
+        for block in self.provision_sql(pharmacy_ids, conn.dialect):
+            await conn.exec_driver_sql(block)
+
+        created = {}
+        for pharmacy_id in pharmacy_ids:
+            tables = build_pharmacy_tables(pharmacy_id)
+            created[pharmacy_id] = {key: table.name for key, table in tables.items()}
+        logger.info(f"Provisioned pharmacy tables for {len(pharmacy_ids)} pharmacies")
+        return created
+
+    def evict(self, pharmacy_id: UUIDType) -> bool:
+        """Forget a pharmacy's routed tables."""
+        return self._cache.invalidate(pharmacy_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+pharmacy_table_router = PharmacyTableRouter()
+
+
 class PharmacyTableManager:
     """Manages pharmacy-specific table creation and operations."""
-    
-    def __init__(self, db: AsyncSession):
+
+    def __init__(self, db: AsyncSession, router: Optional[PharmacyTableRouter] = None):
         self.db = db
-        self.metadata = MetaData()
-    
+        self.router = router or pharmacy_table_router
+
     def get_pharmacy_table_name(self, pharmacy_id: UUIDType, base_table: str) -> str:
         """Generate pharmacy-specific table name."""
-        pharmacy_short_id = str(pharmacy_id).replace('-', '')[:8]
-        return f"{base_table}_pharma_{pharmacy_short_id}"
-    
+        return pharmacy_table_name(pharmacy_id, base_table)
+
     async def create_pharmacy_tables(self, pharmacy_id: UUIDType) -> dict:
         """Create all necessary tables for a pharmacy."""
         try:
-            tables_created = {}
-            
-            # Inventory table
-            inventory_table_name = self.get_pharmacy_table_name(pharmacy_id, "inventory_items")
-            inventory_table = Table(
-                inventory_table_name,
-                self.metadata,
-                Column('id', UUID(as_uuid=True), primary_key=True),
-                Column('medicine_id', UUID(as_uuid=True), nullable=False, index=True),
-                Column('current_stock', Integer, nullable=False, default=0),
-                Column('reserved_stock', Integer, nullable=False, default=0),
-                Column('minimum_stock', Integer, nullable=False, default=10),
-                Column('reorder_point', Integer, nullable=False, default=20),
-                Column('cost_price', Numeric(10, 2), nullable=False),
-                Column('selling_price', Numeric(10, 2), nullable=False),
-                Column('mrp', Numeric(10, 2), nullable=False),
-                Column('storage_location', String(100), nullable=True),
-                Column('status', String(50), default="active"),
-                Column('created_at', DateTime, nullable=False),
-                Column('updated_at', DateTime, nullable=False),
-                Column('is_active', Boolean, default=True)
-            )
-            tables_created['inventory'] = inventory_table_name
-            
-            # Orders table
-            orders_table_name = self.get_pharmacy_table_name(pharmacy_id, "orders")
-            orders_table = Table(
-                orders_table_name,
-                self.metadata,
-                Column('id', UUID(as_uuid=True), primary_key=True),
-                Column('order_number', String(100), nullable=False, unique=True),
-                Column('patient_id', UUID(as_uuid=True), nullable=False),
-                Column('prescription_id', UUID(as_uuid=True), nullable=True),
-                Column('status', String(50), nullable=False, default="pending"),
-                Column('total_amount', Numeric(10, 2), nullable=False),
-                Column('payment_status', String(50), default="pending"),
-                Column('delivery_type', String(50), default="pickup"),
-                Column('created_at', DateTime, nullable=False),
-                Column('updated_at', DateTime, nullable=False),
-                Column('is_active', Boolean, default=True)
-            )
-            tables_created['orders'] = orders_table_name
-            
-            # Prescriptions table
-            prescriptions_table_name = self.get_pharmacy_table_name(pharmacy_id, "prescriptions")
-            prescriptions_table = Table(
-                prescriptions_table_name,
-                self.metadata,
-                Column('id', UUID(as_uuid=True), primary_key=True),
-                Column('prescription_number', String(100), nullable=False, unique=True),
-                Column('patient_id', UUID(as_uuid=True), nullable=False),
-                Column('doctor_id', UUID(as_uuid=True), nullable=False),
-                Column('patient_name', String(255), nullable=False),
-                Column('doctor_name', String(255), nullable=False),
-                Column('issue_date', DateTime, nullable=False),
-                Column('expiry_date', DateTime, nullable=False),
-                Column('status', String(50), default="uploaded"),
-                Column('validation_status', String(50), default="pending"),
-                Column('created_at', DateTime, nullable=False),
-                Column('updated_at', DateTime, nullable=False),
-                Column('is_active', Boolean, default=True)
-            )
-            tables_created['prescriptions'] = prescriptions_table_name
-            
-            # Create tables in database
-            await self.db.execute(f"CREATE SCHEMA IF NOT EXISTS pharma_{str(pharmacy_id).replace('-', '')[:8]}")
-            
-            # Use raw SQL to create tables
-            for table in [inventory_table, orders_table, prescriptions_table]:
-                create_sql = str(table.create_statement().compile(dialect=self.db.bind.dialect))
-                await self.db.execute(create_sql)
-            
+            conn = await self.db.connection()
+            tables_created = (await self.router.provision(conn, [pharmacy_id]))[pharmacy_id]
             await self.db.commit()
-            
+
             logger.info(f"Created pharmacy-specific tables for {pharmacy_id}: {tables_created}")
             return tables_created
-            
+
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating pharmacy tables for {pharmacy_id}: {e}")
             raise
-    
+
+    async def route(self, pharmacy_id: UUIDType) -> PharmacyTables:
+        """Routed tables and statement templates for a pharmacy."""
+        conn = await self.db.connection()
+        return await self.router.route(conn, pharmacy_id)
+
     async def drop_pharmacy_tables(self, pharmacy_id: UUIDType) -> bool:
         """Drop all tables for a pharmacy."""
         try:
-            schema_name = f"pharma_{str(pharmacy_id).replace('-', '')[:8]}"
-            await self.db.execute(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE")
+            await self.db.execute(text(f"DROP SCHEMA IF EXISTS {pharmacy_schema_name(pharmacy_id)} CASCADE"))
             await self.db.commit()
-            
+            self.router.evict(pharmacy_id)
+
             logger.info(f"Dropped pharmacy tables for {pharmacy_id}")
             return True
-            
+
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error dropping pharmacy tables for {pharmacy_id}: {e}")
             raise
-    
+
     def get_pharmacy_inventory_table(self, pharmacy_id: UUIDType) -> str:
         """Get pharmacy-specific inventory table name."""
         return self.get_pharmacy_table_name(pharmacy_id, "inventory_items")
-    
+
     def get_pharmacy_orders_table(self, pharmacy_id: UUIDType) -> str:
         """Get pharmacy-specific orders table name."""
         return self.get_pharmacy_table_name(pharmacy_id, "orders")
-    
+
     def get_pharmacy_prescriptions_table(self, pharmacy_id: UUIDType) -> str:
         """Get pharmacy-specific prescriptions table name."""
-        return self.get_pharmacy_table_name(pharmacy_id, "prescriptions")
\ No newline at end of file
+        return self.get_pharmacy_table_name(pharmacy_id, "prescriptions")
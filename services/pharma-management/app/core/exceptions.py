@@ -142,6 +142,15 @@ class InvalidPrescriptionImageException(PharmaException):
         )
 
 
+class OCRQueueFullException(PharmaException):
+    def __init__(self, depth: int):
+        super().__init__(
+            status_code=503,
+            detail=f"OCR queue is full ({depth} jobs pending), please retry shortly",
+            error_code="OCR_QUEUE_FULL"
+        )
+
+
 # Pharmacy-related exceptions
 class PharmacyNotFoundException(PharmaException):
     def __init__(self, pharmacy_id: str):
@@ -0,0 +1,60 @@
+"""
+Geospatial helpers for distance and radius queries
+"""
+
+import math
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    radius_km: float
+) -> Tuple[float, float, float, float]:
+    """Expand a lat/lon rectangle by a radius, returning (min_lat, min_lon, max_lat, max_lon).
+
+    The result is a superset of every point within ``radius_km`` of the
+    rectangle, which makes it a safe index-friendly prefilter for an exact
+    haversine check.
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    widest_lat = min(89.9, max(abs(min_lat), abs(max_lat)) + d_lat)
+    d_lon = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(widest_lat)))
+
+    return (
+        max(-90.0, min_lat - d_lat),
+        max(-180.0, min_lon - d_lon),
+        min(90.0, max_lat + d_lat),
+        min(180.0, max_lon + d_lon),
+    )
+
+
+def geo_cell(latitude: float, longitude: float, cell_degrees: float) -> Tuple[int, int]:
+    """Snap a point to the integer index of its grid cell."""
+    return (math.floor(latitude / cell_degrees), math.floor(longitude / cell_degrees))
+
+
+def cell_bounds(cell: Tuple[int, int], cell_degrees: float) -> Tuple[float, float, float, float]:
+    """Return (min_lat, min_lon, max_lat, max_lon) of a grid cell."""
+    lat_index, lon_index = cell
+    return (
+        lat_index * cell_degrees,
+        lon_index * cell_degrees,
+        (lat_index + 1) * cell_degrees,
+        (lon_index + 1) * cell_degrees,
+    )
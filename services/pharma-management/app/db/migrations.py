@@ -0,0 +1,155 @@
+"""
+Startup schema migration under a Postgres advisory lock
+"""
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from typing import Optional
+from pathlib import Path
+import enum
+import logging
+
+from app.core.config import settings
+from app.db.partitions import audit_log_partitions
+from app.models.base import BaseModel
+import app.models  # noqa: F401  (registers every table on the metadata)
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = Path(__file__).resolve().parents[2]
+
+
+# Schema the models built before migrations ran on startup
+BASELINE_REVISION = "001"
+
+
+class SchemaStateEnum(enum.Enum):
+    CURRENT = "current"  # Already at head; nothing was touched
+    CREATED = "created"  # Empty database built from the models and stamped at head
+    MIGRATED = "migrated"  # Upgraded from an older or unstamped baseline revision
+    BEHIND = "behind"  # Not at head and migrating on startup is disabled
+
+
+def alembic_config(connection=None) -> Config:
+    """Alembic config for this service, optionally bound to an open connection."""
+    config = Config(str(SERVICE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(SERVICE_DIR / "alembic"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+class MigrationController:
+    """Brings the schema to the Alembic head once, however many replicas start.
+
+    The fast path is a single query for the stamped revision; when it
+    matches the head of the migration scripts, startup touches nothing
+    else. Otherwise the replica takes a session advisory lock, re-reads
+    the revision (another replica may have finished while it waited) and
+    only then migrates, so concurrent replicas never race on DDL.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        lock_key: Optional[int] = None,
+        migrate: Optional[bool] = None,
+        head: Optional[str] = None
+    ):
+        self.engine = engine
+        self.lock_key = lock_key if lock_key is not None else settings.MIGRATION_LOCK_KEY
+        self.migrate = settings.MIGRATE_ON_STARTUP if migrate is None else migrate
+        self._head = head
+
+    @property
+    def head(self) -> str:
+        """Head revision of the migration scripts, read once."""
+        if self._head is None:
+            self._head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+        return self._head
+
+    async def current_revision(self, conn: Optional[AsyncConnection] = None) -> Optional[str]:
+        """Stamped revision, or None when the database was never stamped."""
+        if conn is None:
+            async with self.engine.connect() as conn:
+                return await self.current_revision(conn)
+        try:
+            return await conn.scalar(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            # No alembic_version table yet
+            await conn.rollback()
+            return None
+
+    async def ensure_schema(self) -> SchemaStateEnum:
+        """Fast-path revision check, migrating under the lock when behind."""
+        if await self.current_revision() == self.head:
+            return SchemaStateEnum.CURRENT
+
+        if not self.migrate:
+            logger.warning(f"Database schema is not at revision {self.head}; run alembic upgrade head")
+            return SchemaStateEnum.BEHIND
+
+        return await self._migrate_locked()
+
+    async def _migrate_locked(self) -> SchemaStateEnum:
+        async with self.engine.connect() as conn:
+            await conn.execute(select(func.pg_advisory_lock(self.lock_key)))
+            await conn.commit()
+            try:
+                current = await self.current_revision(conn)
+                if current == self.head:
+                    logger.info("Schema was migrated by another replica")
+                    return SchemaStateEnum.CURRENT
+
+                if current is None and not await self.has_tables(conn):
+                    state = SchemaStateEnum.CREATED
+                    await self._create(conn)
+                else:
+                    state = SchemaStateEnum.MIGRATED
+                    if current is None:
+                        # Built by create_all before migrations ran on startup
+                        await conn.run_sync(
+                            lambda sync_conn: command.stamp(alembic_config(sync_conn), BASELINE_REVISION)
+                        )
+                    await conn.run_sync(lambda sync_conn: command.upgrade(alembic_config(sync_conn), "head"))
+                    # Tables that have no migration of their own
+                    await conn.run_sync(BaseModel.metadata.create_all)
+                # Inserts need a partition for the current month to exist
+                await audit_log_partitions().ensure_partitions(conn)
+                await conn.commit()
+
+                logger.info(f"Schema {state.value} at revision {self.head} (was {current})")
+                return state
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error migrating schema to {self.head}: {e}")
+                raise
+            finally:
+                await conn.execute(select(func.pg_advisory_unlock(self.lock_key)))
+                await conn.commit()
+
+    async def has_tables(self, conn: AsyncConnection) -> bool:
+        """Whether any of the service's tables exist, stamped or not."""
+        count = await conn.scalar(
+            text(
+                "SELECT count(*) FROM information_schema.tables "
+                "WHERE table_schema = current_schema() AND table_name = ANY(:names)"
+            ),
+            {"names": list(BaseModel.metadata.tables)}
+        )
+        return bool(count)
+
+    async def _create(self, conn: AsyncConnection) -> None:
+        """Empty, unstamped database: build it from the models and stamp the head.
+
+        Only safe when no table exists yet; a schema left behind by an older
+        create_all is upgraded from the baseline revision instead.
+        """
+        # Trigram operator class used by the medicine search index
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(BaseModel.metadata.create_all)
+        await conn.run_sync(lambda sync_conn: command.stamp(alembic_config(sync_conn), "head"))
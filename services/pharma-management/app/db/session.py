@@ -9,7 +9,8 @@ from app.core.config import settings
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE
 )
 
 # Create session factory
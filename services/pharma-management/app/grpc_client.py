@@ -1,69 +1,211 @@
+import asyncio
 import grpc
+import logging
 import uuid
 from datetime import datetime
+from typing import List, Optional, Set, Tuple
 from google.protobuf.timestamp_pb2 import Timestamp
 
-# Import generated protobuf code
-# Note: You'll need to generate these files from the proto definition
+from app.core.config import settings
 from app.protos.notification_pb2 import (
-    NotificationRequest, NotificationType, ServiceType
+    NotificationRequest, NotificationResponse, NotificationType, ServiceType
 )
 from app.protos.notification_pb2_grpc import NotificationServiceStub
 
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_TYPES = {
+    'info': NotificationType.INFO,
+    'success': NotificationType.SUCCESS,
+    'warning': NotificationType.WARNING,
+    'error': NotificationType.ERROR
+}
+
+
+def build_notification_request(notification_data: dict) -> NotificationRequest:
+    """Notification dict to a NotificationRequest from this service."""
+    created_at = Timestamp()
+    created_at.FromDatetime(datetime.now())
+
+    request = NotificationRequest(
+        id=str(uuid.uuid4()),
+        service=ServiceType.PHARMA_MANAGEMENT,
+        type=NOTIFICATION_TYPES.get(notification_data.get('type', 'info').lower(), NotificationType.INFO),
+        title=notification_data.get('title', ''),
+        message=notification_data.get('message', ''),
+        user_id=str(notification_data.get('user_id', '')),
+        created_at=created_at
+    )
+
+    if notification_data.get('expires_at'):
+        request.expires_at.FromDatetime(notification_data['expires_at'])
+
+    for k, v in (notification_data.get('data') or {}).items():
+        request.data[k] = str(v)
+    return request
+
+
+def _response_dict(response: NotificationResponse) -> dict:
+    return {
+        'notification_id': response.notification_id,
+        'success': response.success,
+        'error_message': response.error_message
+    }
+
+
+class NotificationChannel:
+    """Process-wide grpc.aio channel to the notification service.
+
+    The channel is opened lazily on first use and kept open with HTTP/2
+    keepalive pings, so calls share one connection instead of paying TCP
+    and HTTP/2 setup each time. A semaphore bounds the RPCs in flight,
+    and a micro-batcher collects notifications issued within
+    NOTIFICATION_BATCH_WINDOW_MS and sends them as one burst on that
+    connection.
+
+    grpc.aio channels belong to an event loop. Celery tasks run each job
+    in a fresh loop, so the channel and its batch are rebuilt whenever
+    the running loop changes.
+    """
+
+    def __init__(
+        self,
+        target: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+        batch_window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        timeout_seconds: Optional[float] = None
+    ):
+        self.target = target or settings.NOTIFICATION_SERVICE_URL
+        self.max_in_flight = max_in_flight or settings.NOTIFICATION_MAX_IN_FLIGHT
+        self.batch_window = (batch_window_ms if batch_window_ms is not None else settings.NOTIFICATION_BATCH_WINDOW_MS) / 1000
+        self.max_batch_size = max_batch_size or settings.NOTIFICATION_MAX_BATCH_SIZE
+        self.timeout = timeout_seconds or settings.NOTIFICATION_TIMEOUT_SECONDS
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._channel: Optional[grpc.aio.Channel] = None
+        self._stub: Optional[NotificationServiceStub] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: List[Tuple[NotificationRequest, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._dispatching: Set[asyncio.Task] = set()
+
+    def _channel_options(self) -> list:
+        keepalive_ms = settings.NOTIFICATION_KEEPALIVE_SECONDS * 1000
+        return [
+            ('grpc.keepalive_time_ms', keepalive_ms),
+            ('grpc.keepalive_timeout_ms', 10000),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.http2.max_pings_without_data', 0),
+        ]
+
+    def _connect(self) -> NotificationServiceStub:
+        """The stub for the running loop, opening the channel on first use."""
+        loop = asyncio.get_running_loop()
+        if self._stub is None or self._loop is not loop:
+            if self._channel is not None:
+                logger.info("Event loop changed; reopening notification channel")
+            self._loop = loop
+            self._channel = grpc.aio.insecure_channel(self.target, options=self._channel_options())
+            self._stub = NotificationServiceStub(self._channel)
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._pending = []
+            self._flush_handle = None
+            self._dispatching = set()
+        return self._stub
+
+    async def send(self, request: NotificationRequest) -> NotificationResponse:
+        """One RPC, waiting for a free in-flight slot first."""
+        stub = self._connect()
+        async with self._semaphore:
+            return await stub.SendNotification(request, timeout=self.timeout)
+
+    def submit(self, request: NotificationRequest) -> asyncio.Future:
+        """Queue a notification for the next batch; the future resolves to its response."""
+        self._connect()
+        future = self._loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List[Tuple[NotificationRequest, asyncio.Future]]) -> None:
+        results = await asyncio.gather(
+            *(self.send(request) for request, _ in batch), return_exceptions=True
+        )
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def drain(self) -> None:
+        """Send whatever is queued and wait for every batch in flight."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        self._flush()
+        while self._dispatching:
+            await asyncio.gather(*self._dispatching, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Drain and close the channel; the next call reopens it."""
+        await self.drain()
+        if self._channel is not None and self._loop is asyncio.get_running_loop():
+            await self._channel.close()
+        self._channel = None
+        self._stub = None
+        self._loop = None
+
+
+notification_channel = NotificationChannel()
+
+
+async def send_notification(notification_data: dict) -> dict:
+    """Send a notification through the shared channel and wait for the result."""
+    response = await notification_channel.submit(build_notification_request(notification_data))
+    return _response_dict(response)
+
+
+def queue_notification(notification_data: dict) -> asyncio.Future:
+    """Send a notification without waiting for it; failures are logged."""
+    future = notification_channel.submit(build_notification_request(notification_data))
+
+    def _log_failure(done: asyncio.Future) -> None:
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"Error sending notification: {done.exception()}")
+
+    future.add_done_callback(_log_failure)
+    return future
+
+
 class NotificationClient:
-    def __init__(self):
-        self.channel = grpc.insecure_channel('notification-service:50051')
-        self.stub = NotificationServiceStub(self.channel)
-    
-    def send_notification(self, notification_data):
+    """Thin wrapper kept for existing callers; every instance shares one channel."""
+
+    def __init__(self, channel: Optional[NotificationChannel] = None):
+        self.channel = channel or notification_channel
+
+    async def send_notification(self, notification_data: dict) -> dict:
         """Send a notification using gRPC"""
-        # Create timestamp
-        created_at = Timestamp()
-        created_at.FromDatetime(datetime.now())
-        
-        # Create request
-        request = NotificationRequest(
-            id=str(uuid.uuid4()),
-            service=ServiceType.PHARMA_MANAGEMENT,
-            type=self._get_notification_type(notification_data.get('type', 'info')),
-            title=notification_data.get('title', ''),
-            message=notification_data.get('message', ''),
-            user_id=notification_data.get('user_id', ''),
-            created_at=created_at
-        )
-        
-        # Add expires_at if present
-        if notification_data.get('expires_at'):
-            expires_at = Timestamp()
-            expires_at.FromDatetime(notification_data.get('expires_at'))
-            request.expires_at.CopyFrom(expires_at)
-        
-        # Add data if present
-        if notification_data.get('data'):
-            for k, v in notification_data.get('data').items():
-                request.data[k] = str(v)
-        
-        # Send request
-        response = self.stub.SendNotification(request)
-        return {
-            'notification_id': response.notification_id,
-            'success': response.success,
-            'error_message': response.error_message
-        }
-    
-    def _get_notification_type(self, type_str):
-        """Convert string type to enum value"""
-        type_map = {
-            'info': NotificationType.INFO,
-            'success': NotificationType.SUCCESS,
-            'warning': NotificationType.WARNING,
-            'error': NotificationType.ERROR
-        }
-        return type_map.get(type_str.lower(), NotificationType.INFO)
+        response = await self.channel.submit(build_notification_request(notification_data))
+        return _response_dict(response)
+
 
 # Example usage
 async def send_prescription_ready_notification(patient_id, medication_name, pharmacy_name):
-    client = NotificationClient()
     notification = {
         'type': 'success',
         'title': 'Prescription Ready',
@@ -74,10 +216,9 @@ async def send_prescription_ready_notification(patient_id, medication_name, phar
             'pharmacy_name': pharmacy_name
         }
     }
-    return client.send_notification(notification)
+    return await send_notification(notification)
 
 async def send_refill_reminder_notification(patient_id, medication_name, days_remaining):
-    client = NotificationClient()
     notification = {
         'type': 'warning',
         'title': 'Medication Refill Reminder',
@@ -88,4 +229,4 @@ async def send_refill_reminder_notification(patient_id, medication_name, days_re
             'days_remaining': str(days_remaining)
         }
     }
-    return client.send_notification(notification)
\ No newline at end of file
+    return await send_notification(notification)
@@ -7,16 +7,152 @@ import numpy as np
 import pytesseract
 from PIL import Image
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import hashlib
+import os
 import re
 import asyncio
 from pathlib import Path
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.exceptions import OCRProcessingException, InvalidPrescriptionImageException
 
 logger = logging.getLogger(__name__)
 
+TESSERACT_CONFIG = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,;:()[]{}/-+*=@#$%^&!?"\' '
+
+# Parsed results keyed by the sha256 of the uploaded image bytes
+_result_cache = TTLCache(
+    maxsize=settings.OCR_RESULT_CACHE_MAX_ENTRIES,
+    ttl=settings.OCR_RESULT_CACHE_TTL_SECONDS
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def pool_size() -> int:
+    """Number of OCR worker processes."""
+    return settings.OCR_POOL_WORKERS or os.cpu_count() or 1
+
+
+def _warm_worker(tesseract_cmd: str) -> None:
+    """Pool initializer: load OpenCV and locate tesseract once per process."""
+    # Each process handles one image at a time; OpenCV's own thread pool
+    # would only oversubscribe the cores the pool already uses.
+    cv2.setNumThreads(1)
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        logger.warning(f"Tesseract not available in OCR worker: {e}")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the OCR worker pool on first use."""
+    global _pool
+    if _pool is None:
+        workers = pool_size()
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_warm_worker,
+            initargs=(settings.TESSERACT_CMD,)
+        )
+        logger.info(f"Started OCR process pool with {workers} workers")
+    return _pool
+
+
+def start_ocr_pool() -> None:
+    """Spawn every pool worker up front so the first jobs find them warm."""
+    pool = _get_pool()
+    for future in [pool.submit(os.getpid) for _ in range(pool_size())]:
+        future.result()
+
+
+def shutdown_ocr_pool() -> None:
+    """Stop the OCR worker pool, if one was started."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def text_from_tesseract_data(data: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """Rebuild page text and confidences from one ``image_to_data`` result.
+
+    Words are joined per (block, paragraph, line) in reading order, with a
+    blank line between blocks, which matches ``image_to_string`` layout
+    without running tesseract a second time.
+    """
+    lines: List[str] = []
+    words: List[str] = []
+    confidences: List[float] = []
+    current_line = None
+    current_block = None
+
+    for i, word in enumerate(data["text"]):
+        word = (word or "").strip()
+        if not word:
+            continue
+
+        line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        if line_key != current_line:
+            if words:
+                lines.append(" ".join(words))
+                words = []
+            if current_block is not None and line_key[0] != current_block:
+                lines.append("")
+            current_line, current_block = line_key, line_key[0]
+
+        words.append(word)
+        confidence = float(data["conf"][i])
+        if confidence > 0:
+            confidences.append(confidence)
+
+    if words:
+        lines.append(" ".join(words))
+
+    word_count = sum(len(line.split()) for line in lines)
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    return {
+        "text": "\n".join(lines).strip(),
+        "confidence": round(avg_confidence, 2),
+        "word_count": word_count
+    }
+
+
+def _run_ocr_pipeline(image_bytes: bytes, tesseract_cmd: str) -> Dict[str, Any]:
+    """Decode, preprocess, recognize and parse one image in a pool worker."""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError("Unable to read image file")
+
+    processed_image = PrescriptionOCR._preprocess_image(image)
+    ocr_result = PrescriptionOCR._extract_text(processed_image)
+    parsed_data = PrescriptionOCR._parse_prescription_text(ocr_result["text"])
+
+    return {
+        "text": ocr_result["text"],
+        "confidence": ocr_result["confidence"],
+        "parsed_data": parsed_data,
+        "success": True
+    }
+
+
+def _run_ocr_batch(images: List[bytes], tesseract_cmd: str) -> List[Dict[str, Any]]:
+    """Run the pipeline over several images in one worker round trip."""
+    results = []
+    for image_bytes in images:
+        try:
+            results.append(_run_ocr_pipeline(image_bytes, tesseract_cmd))
+        except Exception as e:
+            results.append({"success": False, "error": str(e)})
+    return results
+
 
 class PrescriptionOCR:
     """OCR service for processing prescription images."""
@@ -35,40 +171,101 @@ class PrescriptionOCR:
             if not Path(image_path).exists():
                 raise InvalidPrescriptionImageException("Image file not found")
             
-            # Preprocess image
-            processed_image = await self._preprocess_image(image_path)
-            
-            # Extract text using OCR
-            ocr_result = await self._extract_text(processed_image)
+            image_bytes = Path(image_path).read_bytes()
+            content_hash = hashlib.sha256(image_bytes).hexdigest()
             
-            # Parse prescription data
-            parsed_data = await self._parse_prescription_text(ocr_result["text"])
+            # Re-uploads of the same image reuse the earlier result
+            cached = _result_cache.get(content_hash)
+            if cached is not None:
+                logger.info(f"OCR cache hit for image {content_hash[:12]}")
+                return copy.deepcopy(cached)
             
-            # Combine results
-            result = {
-                "text": ocr_result["text"],
-                "confidence": ocr_result["confidence"],
-                "parsed_data": parsed_data,
-                "success": True
-            }
+            # Tesseract is CPU bound, so run the whole pipeline in a worker process
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                _get_pool(), _run_ocr_pipeline, image_bytes, self.tesseract_cmd
+            )
+            _result_cache.set(content_hash, copy.deepcopy(result))
             
-            logger.info(f"OCR processing completed with {ocr_result['confidence']}% confidence")
+            logger.info(f"OCR processing completed with {result['confidence']}% confidence")
             return result
             
         except Exception as e:
             logger.error(f"OCR processing failed: {e}")
             raise OCRProcessingException(str(e))
     
-    async def _preprocess_image(self, image_path: str) -> np.ndarray:
-        """Preprocess image for better OCR results."""
+    async def process_prescription_images(self, image_paths: List[str]) -> List[Dict[str, Any]]:
+        """Process a batch of images, one result per path in the same order.
+
+        Failed images yield ``{"success": False, "error": ...}`` instead of
+        failing the batch. Cache misses are split into one chunk per pool
+        worker so each worker gets a single round trip.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(image_paths)
+        pending: Dict[str, List[int]] = {}
+        pending_bytes: Dict[str, bytes] = {}
+
+        for i, image_path in enumerate(image_paths):
+            try:
+                image_bytes = Path(image_path).read_bytes()
+            except OSError as e:
+                results[i] = {"success": False, "error": f"Image file not readable: {e}"}
+                continue
+
+            content_hash = hashlib.sha256(image_bytes).hexdigest()
+            cached = _result_cache.get(content_hash)
+            if cached is not None:
+                results[i] = copy.deepcopy(cached)
+            else:
+                pending.setdefault(content_hash, []).append(i)
+                pending_bytes[content_hash] = image_bytes
+
+        if pending:
+            hashes = list(pending)
+            chunk_size = -(-len(hashes) // pool_size())
+            chunks = [hashes[i:i + chunk_size] for i in range(0, len(hashes), chunk_size)]
+
+            loop = asyncio.get_running_loop()
+            chunk_results = await asyncio.gather(*(
+                loop.run_in_executor(
+                    _get_pool(), _run_ocr_batch,
+                    [pending_bytes[content_hash] for content_hash in chunk], self.tesseract_cmd
+                )
+                for chunk in chunks
+            ))
+
+            for chunk, outputs in zip(chunks, chunk_results):
+                for content_hash, result in zip(chunk, outputs):
+                    if result.get("success"):
+                        _result_cache.set(content_hash, copy.deepcopy(result))
+                    for i in pending[content_hash]:
+                        results[i] = copy.deepcopy(result)
+
+        return results
+    
+    @staticmethod
+    def _preprocess_image(
+        gray: np.ndarray,
+        target_dpi: Optional[int] = None,
+        max_page_inches: Optional[float] = None
+    ) -> np.ndarray:
+        """Preprocess a grayscale image for better OCR results."""
         try:
-            # Read image
-            image = cv2.imread(image_path)
-            if image is None:
-                raise InvalidPrescriptionImageException("Unable to read image file")
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            target_dpi = target_dpi or settings.OCR_TARGET_DPI
+            max_page_inches = max_page_inches or settings.OCR_MAX_PAGE_INCHES
+            
+            # Downsample to the target DPI first, assuming the prescription
+            # fills at most one page; phone photos are often 3-4x larger than
+            # tesseract needs and every later step scales with pixel count.
+            height, width = gray.shape
+            max_edge = int(target_dpi * max_page_inches)
+            if max(height, width) > max_edge:
+                scale_factor = max_edge / max(height, width)
+                gray = cv2.resize(
+                    gray,
+                    (int(width * scale_factor), int(height * scale_factor)),
+                    interpolation=cv2.INTER_AREA
+                )
             
             # Apply Gaussian blur to reduce noise
             blurred = cv2.GaussianBlur(gray, (5, 5), 0)
@@ -95,39 +292,25 @@ class PrescriptionOCR:
             
         except Exception as e:
             logger.error(f"Image preprocessing failed: {e}")
-            raise InvalidPrescriptionImageException(f"Image preprocessing failed: {e}")
+            raise ValueError(f"Image preprocessing failed: {e}")
     
-    async def _extract_text(self, image: np.ndarray) -> Dict[str, Any]:
-        """Extract text from preprocessed image."""
+    @staticmethod
+    def _extract_text(image: np.ndarray) -> Dict[str, Any]:
+        """Extract text and confidences from a preprocessed image in one pass."""
         try:
-            # Configure Tesseract
-            custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,;:()[]{}/-+*=@#$%^&!?"\' '
-            
-            # Extract text with confidence scores
             data = pytesseract.image_to_data(
                 image, 
-                config=custom_config, 
+                config=TESSERACT_CONFIG, 
                 output_type=pytesseract.Output.DICT
             )
-            
-            # Calculate average confidence
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            
-            # Extract text
-            text = pytesseract.image_to_string(image, config=custom_config)
-            
-            return {
-                "text": text.strip(),
-                "confidence": round(avg_confidence, 2),
-                "word_count": len([word for word in data['text'] if word.strip()])
-            }
+            return text_from_tesseract_data(data)
             
         except Exception as e:
             logger.error(f"Text extraction failed: {e}")
-            raise OCRProcessingException(f"Text extraction failed: {e}")
+            raise RuntimeError(f"Text extraction failed: {e}")
     
-    async def _parse_prescription_text(self, text: str) -> Dict[str, Any]:
+    @staticmethod
+    def _parse_prescription_text(text: str) -> Dict[str, Any]:
         """Parse extracted text to identify prescription components."""
         try:
             parsed_data = {
@@ -9,8 +9,9 @@ import logging
 from app.api.v1.api_router import api_router
 from app.core.config import settings
 from app.core.logging_config import setup_logging
+from app.db.migrations import MigrationController
 from app.db.session import engine
-from app.models.base import BaseModel
+from app.services.medicine_search_service import medicine_search_index
 
 # Setup logging
 setup_logging()
@@ -33,11 +34,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create database tables
+# Bring the schema to the current migration revision
 @app.on_event("startup")
-async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(BaseModel.metadata.create_all)
+async def migrate_schema():
+    await MigrationController(engine).ensure_schema()
+
+# Build the type-ahead trie before the first search asks for it
+@app.on_event("startup")
+async def warm_medicine_search():
+    medicine_search_index.schedule_rebuild()
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
@@ -4,7 +4,7 @@ Database models for Pharma Management Service
 
 from .pharmacy import Pharmacy
 from .staff import PharmacyStaff
-from .medicine import Medicine, MedicineBatch
+from .medicine import Medicine, MedicineBatch, MedicineEquivalenceGroup
 from .prescription import Prescription, PrescriptionItem
 from .order import Order, OrderItem, OrderStatusEnum
 from .inventory import InventoryItem, InventoryTransaction
@@ -19,6 +19,7 @@ __all__ = [
     "PharmacyStaff",
     "Medicine",
     "MedicineBatch",
+    "MedicineEquivalenceGroup",
     
     # Prescription & Orders
     "Prescription",
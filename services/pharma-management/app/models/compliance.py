@@ -2,11 +2,13 @@
 Compliance and audit models for regulatory requirements
 """
 
-from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, ForeignKey, Integer, Index, CheckConstraint, PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
+from app.db.partitions import create_default_partition
 import enum
+import uuid
 
 
 class AuditActionEnum(enum.Enum):
@@ -24,10 +26,48 @@ class AuditActionEnum(enum.Enum):
     CONTROLLED_SUBSTANCE_DISPENSE = "controlled_substance_dispense"
 
 
+class AuditResourceTypeEnum(enum.Enum):
+    PHARMACY = "pharmacy"
+    STAFF = "staff"
+    MEDICINE = "medicine"
+    INVENTORY = "inventory"
+    PRESCRIPTION = "prescription"
+    PRESCRIPTION_ITEM = "prescription_item"
+    ORDER = "order"
+    INVOICE = "invoice"
+    PURCHASE_ORDER = "purchase_order"
+    GOODS_RECEIPT_NOTE = "goods_receipt_note"
+    CLINICAL = "clinical"
+    CONTROLLED_SUBSTANCE = "controlled_substance"
+
+
+PRESCRIPTION_RESOURCE_TYPES = (
+    AuditResourceTypeEnum.PRESCRIPTION.value,
+    AuditResourceTypeEnum.PRESCRIPTION_ITEM.value,
+)
+
+
 class AuditLog(BaseModel):
     """Comprehensive audit logging for compliance."""
     
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Per-pharmacy date range scans for audit queries and reports
+        Index("ix_audit_logs_pharmacy_id_created_at", "pharmacy_id", "created_at"),
+        CheckConstraint(
+            "resource_type IN ({})".format(
+                ", ".join(f"'{member.value}'" for member in AuditResourceTypeEnum)
+            ),
+            name="ck_audit_logs_resource_type"
+        ),
+        # Partitioned tables need the partition key in the primary key
+        PrimaryKeyConstraint("id", "created_at", name="audit_logs_pkey"),
+        # Monthly partitions are managed by app.db.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
+    # Part of the composite primary key declared above
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False, index=True)
     
     # Basic Information
     user_id = Column(UUID(as_uuid=True), nullable=True, index=True)
@@ -36,7 +76,7 @@ class AuditLog(BaseModel):
     
     # Action Details
     action = Column(String(100), nullable=False, index=True)
-    resource_type = Column(String(100), nullable=False, index=True)  # prescription, order, inventory
+    resource_type = Column(String(100), nullable=False, index=True)  # AuditResourceTypeEnum
     resource_id = Column(UUID(as_uuid=True), nullable=True, index=True)
     
     # Request Information
@@ -67,6 +107,10 @@ class AuditLog(BaseModel):
         return f"<AuditLog(action='{self.action}', user='{self.user_id}')>"
 
 
+# Tables built by create_all get a catch-all partition until the monthly ones exist
+create_default_partition(AuditLog.__table__)
+
+
 class ControlledSubstanceLog(BaseModel):
     """Special logging for controlled substances (DEA requirement)."""
     
@@ -2,7 +2,7 @@
 Inventory management models
 """
 
-from sqlalchemy import Column, String, Integer, Numeric, DateTime, Boolean, ForeignKey, JSON, Text
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, Boolean, ForeignKey, JSON, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -23,6 +23,17 @@ class InventoryItem(BaseModel):
     """Inventory tracking for medicines at pharmacy level."""
     
     __tablename__ = "inventory_items"
+    __table_args__ = (
+        # Covering index for basket availability lookups: stock columns are
+        # carried in the leaf pages so the probe never touches the heap.
+        Index(
+            "ix_inventory_items_medicine_pharmacy_stock",
+            "medicine_id",
+            "pharmacy_id",
+            postgresql_include=["current_stock", "reserved_stock"],
+            postgresql_where=text("is_active"),
+        ),
+    )
     
     # References
     pharmacy_id = Column(UUID(as_uuid=True), ForeignKey("pharmacies.id"), nullable=False, index=True)
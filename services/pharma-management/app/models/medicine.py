@@ -2,16 +2,45 @@
 Medicine and batch tracking models
 """
 
-from sqlalchemy import Column, String, Text, Numeric, Integer, Date, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, String, Text, Numeric, Integer, Date, Boolean, JSON, ForeignKey, Computed, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 
+class MedicineEquivalenceGroup(BaseModel):
+    """Medicines sharing salt composition, strength and dosage form."""
+    
+    __tablename__ = "medicine_equivalence_groups"
+    __table_args__ = (
+        UniqueConstraint("salt_composition", "strength", "dosage_form", name="uq_medicine_equivalence_key"),
+    )
+    
+    # Normalized equivalence key
+    salt_composition = Column(String(1000), nullable=False)  # Sorted ingredients joined with "+"
+    strength = Column(String(100), nullable=False)
+    dosage_form = Column(String(100), nullable=False)
+    
+    # Relationships
+    medicines = relationship("Medicine", back_populates="equivalence_group")
+    
+    def __repr__(self):
+        return f"<MedicineEquivalenceGroup(salt='{self.salt_composition}', strength='{self.strength}')>"
+
+
 class Medicine(BaseModel):
     """Medicine master data with regulatory information."""
     
     __tablename__ = "medicines"
+    __table_args__ = (
+        # Trigram index for substring and fuzzy search (requires pg_trgm)
+        Index(
+            "ix_medicines_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
     
     # Basic Information
     name = Column(String(255), nullable=False, index=True)
@@ -34,6 +63,7 @@ class Medicine(BaseModel):
     therapeutic_class = Column(String(255), nullable=True)
     pharmacological_class = Column(String(255), nullable=True)
     atc_code = Column(String(20), nullable=True)  # Anatomical Therapeutic Chemical code
+    hsn_code = Column(String(20), nullable=True)  # GST Harmonized System of Nomenclature code
     
     # Prescription Requirements
     prescription_required = Column(Boolean, default=True, nullable=False)
@@ -53,14 +83,27 @@ class Medicine(BaseModel):
     brand_alternatives = Column(JSON, nullable=True)  # List of brand alternatives
     contraindications = Column(JSON, nullable=True)  # List of contraindications
     drug_interactions = Column(JSON, nullable=True)  # Known drug interactions
+    equivalence_group_id = Column(
+        UUID(as_uuid=True), ForeignKey("medicine_equivalence_groups.id"), nullable=True, index=True
+    )  # Materialized substitute group
     
     # Metadata
     description = Column(Text, nullable=True)
     side_effects = Column(JSON, nullable=True)  # Common side effects
     warnings = Column(JSON, nullable=True)  # FDA warnings and precautions
     
+    # Search
+    search_text = Column(
+        Text,
+        Computed(
+            "lower(name || ' ' || generic_name || ' ' || coalesce(brand_name, '') || ' ' || manufacturer)",
+            persisted=True
+        )
+    )  # Normalized haystack for trigram search
+    
     # Relationships
     batches = relationship("MedicineBatch", back_populates="medicine")
+    equivalence_group = relationship("MedicineEquivalenceGroup", back_populates="medicines")
     inventory_items = relationship("InventoryItem", back_populates="medicine")
     prescription_items = relationship("PrescriptionItem", back_populates="medicine", foreign_keys="PrescriptionItem.medicine_id")
     
@@ -72,9 +115,21 @@ class MedicineBatch(BaseModel):
     """Batch/Lot tracking for medicines with expiry and recall management."""
     
     __tablename__ = "medicine_batches"
+    __table_args__ = (
+        # First-expiry-first-out lookups: a pharmacy's in-stock batches of a
+        # medicine in expiry order, empty batches left out of the index.
+        Index(
+            "ix_medicine_batches_fefo",
+            "medicine_id",
+            "pharmacy_id",
+            "expiry_date",
+            postgresql_where=text("current_quantity > 0"),
+        ),
+    )
     
     # Batch Information
     medicine_id = Column(UUID(as_uuid=True), ForeignKey("medicines.id"), nullable=False, index=True)
+    pharmacy_id = Column(UUID(as_uuid=True), ForeignKey("pharmacies.id"), nullable=True)  # Stocking pharmacy
     batch_number = Column(String(100), nullable=False, index=True)
     lot_number = Column(String(100), nullable=True)
     
@@ -2,7 +2,7 @@
 Pharmacy model for managing pharmacy information
 """
 
-from sqlalchemy import Column, String, Text, Boolean, JSON, Float
+from sqlalchemy import Column, String, Text, Boolean, JSON, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -12,6 +12,10 @@ class Pharmacy(BaseModel):
     """Pharmacy entity with registration and operational details."""
     
     __tablename__ = "pharmacies"
+    __table_args__ = (
+        # Bounding-box prefilter for radius searches
+        Index("ix_pharmacies_latitude_longitude", "latitude", "longitude"),
+    )
     
     # Basic Information
     name = Column(String(255), nullable=False, index=True)
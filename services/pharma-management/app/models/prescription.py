@@ -2,7 +2,7 @@
 Prescription models for managing prescriptions and items
 """
 
-from sqlalchemy import Column, String, Text, Integer, Date, Boolean, JSON, ForeignKey, Numeric
+from sqlalchemy import Column, String, Text, Integer, Date, Boolean, JSON, ForeignKey, Numeric, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -22,6 +22,16 @@ class Prescription(BaseModel):
     """Prescription entity with OCR and validation."""
     
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        # Keyset walk for the expiry sweep: only prescriptions that can
+        # still expire are indexed, so expired history never slows it down.
+        Index(
+            "ix_prescriptions_open_id_expiry",
+            "id",
+            postgresql_include=["expiry_date"],
+            postgresql_where=text("status IN ('uploaded', 'processing', 'validated')"),
+        ),
+    )
     
     # Basic Information
     prescription_number = Column(String(100), unique=True, nullable=False, index=True)
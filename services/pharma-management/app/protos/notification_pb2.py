@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: app/protos/notification.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1d\x61pp/protos/notification.proto\x12\x0cnotification\x1a\x1fgoogle/protobuf/timestamp.proto\"\x88\x03\n\x13NotificationRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12*\n\x07service\x18\x02 \x01(\x0e\x32\x19.notification.ServiceType\x12,\n\x04type\x18\x03 \x01(\x0e\x32\x1e.notification.NotificationType\x12\r\n\x05title\x18\x04 \x01(\t\x12\x0f\n\x07message\x18\x05 \x01(\t\x12\x0f\n\x07user_id\x18\x06 \x01(\t\x12.\n\ncreated_at\x18\x07 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x33\n\nexpires_at\x18\x08 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\x00\x88\x01\x01\x12\x39\n\x04\x64\x61ta\x18\t \x03(\x0b\x32+.notification.NotificationRequest.DataEntry\x1a+\n\tDataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\r\n\x0b_expires_at\"W\n\x14NotificationResponse\x12\x17\n\x0fnotification_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x15\n\rerror_message\x18\x03 \x01(\t\"`\n\x18UserNotificationsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x14\n\x0cinclude_read\x18\x02 \x01(\x08\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x0e\n\x06offset\x18\x04 \x01(\x05\"\x88\x03\n\x0cNotification\x12\n\n\x02id\x18\x01 \x01(\t\x12*\n\x07service\x18\x02 \x01(\x0e\x32\x19.notification.ServiceType\x12,\n\x04type\x18\x03 \x01(\x0e\x32\x1e.notification.NotificationType\x12\r\n\x05title\x18\x04 \x01(\t\x12\x0f\n\x07message\x18\x05 \x01(\t\x12\x0f\n\x07user_id\x18\x06 \x01(\t\x12.\n\ncreated_at\x18\x07 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x33\n\nexpires_at\x18\x08 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\x00\x88\x01\x01\x12\x32\n\x04\x64\x61ta\x18\t \x03(\x0b\x32$.notification.Notification.DataEntry\x12\x0c\n\x04read\x18\n \x01(\x08\x1a+\n\tDataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\r\n\x0b_expires_at\"y\n\x19UserNotificationsResponse\x12\x31\n\rnotifications\x18\x01 \x03(\x0b\x32\x1a.notification.Notification\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\x12\x14\n\x0cunread_count\x18\x03 \x01(\x05\"=\n\x11MarkAsReadRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x17\n\x0fnotification_id\x18\x02 \x01(\t\"<\n\x12MarkAsReadResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x15\n\rerror_message\x18\x02 \x01(\t*A\n\x10NotificationType\x12\x08\n\x04INFO\x10\x00\x12\x0b\n\x07SUCCESS\x10\x01\x12\x0b\n\x07WARNING\x10\x02\x12\t\n\x05\x45RROR\x10\x03*p\n\x0bServiceType\x12\x13\n\x0fUSER_MANAGEMENT\x10\x00\x12\x12\n\x0eLAB_MANAGEMENT\x10\x01\x12\x15\n\x11PHARMA_MANAGEMENT\x10\x02\x12\x17\n\x13HOSPITAL_MANAGEMENT\x10\x03\x12\x08\n\x04\x43HAT\x10\x04\x32\xbc\x02\n\x13NotificationService\x12[\n\x10SendNotification\x12!.notification.NotificationRequest\x1a\".notification.NotificationResponse\"\x00\x12i\n\x14GetUserNotifications\x12&.notification.UserNotificationsRequest\x1a\'.notification.UserNotificationsResponse\"\x00\x12]\n\x16MarkNotificationAsRead\x12\x1f.notification.MarkAsReadRequest\x1a .notification.MarkAsReadResponse\"\x00\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'app.protos.notification_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _NOTIFICATIONREQUEST_DATAENTRY._options = None
+  _NOTIFICATIONREQUEST_DATAENTRY._serialized_options = b'8\001'
+  _NOTIFICATION_DATAENTRY._options = None
+  _NOTIFICATION_DATAENTRY._serialized_options = b'8\001'
+  _globals['_NOTIFICATIONTYPE']._serialized_start=1305
+  _globals['_NOTIFICATIONTYPE']._serialized_end=1370
+  _globals['_SERVICETYPE']._serialized_start=1372
+  _globals['_SERVICETYPE']._serialized_end=1484
+  _globals['_NOTIFICATIONREQUEST']._serialized_start=81
+  _globals['_NOTIFICATIONREQUEST']._serialized_end=473
+  _globals['_NOTIFICATIONREQUEST_DATAENTRY']._serialized_start=415
+  _globals['_NOTIFICATIONREQUEST_DATAENTRY']._serialized_end=458
+  _globals['_NOTIFICATIONRESPONSE']._serialized_start=475
+  _globals['_NOTIFICATIONRESPONSE']._serialized_end=562
+  _globals['_USERNOTIFICATIONSREQUEST']._serialized_start=564
+  _globals['_USERNOTIFICATIONSREQUEST']._serialized_end=660
+  _globals['_NOTIFICATION']._serialized_start=663
+  _globals['_NOTIFICATION']._serialized_end=1055
+  _globals['_NOTIFICATION_DATAENTRY']._serialized_start=415
+  _globals['_NOTIFICATION_DATAENTRY']._serialized_end=458
+  _globals['_USERNOTIFICATIONSRESPONSE']._serialized_start=1057
+  _globals['_USERNOTIFICATIONSRESPONSE']._serialized_end=1178
+  _globals['_MARKASREADREQUEST']._serialized_start=1180
+  _globals['_MARKASREADREQUEST']._serialized_end=1241
+  _globals['_MARKASREADRESPONSE']._serialized_start=1243
+  _globals['_MARKASREADRESPONSE']._serialized_end=1303
+  _globals['_NOTIFICATIONSERVICE']._serialized_start=1487
+  _globals['_NOTIFICATIONSERVICE']._serialized_end=1803
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,120 @@
+"""
+Audit log repository for compliance queries
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+from datetime import date, datetime, time, timedelta
+import logging
+
+from app.models.compliance import (
+    AuditLog, AuditResourceTypeEnum, ControlledSubstanceLog, PRESCRIPTION_RESOURCE_TYPES
+)
+from app.repositories.base_repository import BaseRepository
+from app.schemas.compliance import AuditLogFilter
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_resource_type(resource_type: Union[str, AuditResourceTypeEnum]) -> str:
+    """Map a resource type to its canonical enum value, rejecting unknown ones."""
+    if isinstance(resource_type, AuditResourceTypeEnum):
+        return resource_type.value
+    try:
+        return AuditResourceTypeEnum(resource_type.strip().lower()).value
+    except ValueError:
+        raise ValueError(f"Unknown audit resource type: {resource_type}")
+
+
+def date_range_bounds(start_date: Optional[date], end_date: Optional[date]):
+    """Half-open datetime bounds covering whole days, end date inclusive."""
+    start = datetime.combine(start_date, time.min) if start_date else None
+    end = datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None
+    return start, end
+
+
+def build_audit_filters(filter_params: AuditLogFilter) -> list:
+    """Compile an AuditLogFilter into SQL predicates."""
+    filters = []
+    if filter_params.pharmacy_id:
+        filters.append(AuditLog.pharmacy_id == filter_params.pharmacy_id)
+    if filter_params.user_id:
+        filters.append(AuditLog.user_id == filter_params.user_id)
+    if filter_params.action:
+        filters.append(AuditLog.action == filter_params.action)
+    if filter_params.resource_type:
+        filters.append(AuditLog.resource_type == normalize_resource_type(filter_params.resource_type))
+    if filter_params.severity:
+        filters.append(AuditLog.severity == filter_params.severity)
+
+    start, end = date_range_bounds(filter_params.start_date, filter_params.end_date)
+    if start:
+        filters.append(AuditLog.created_at >= start)
+    if end:
+        filters.append(AuditLog.created_at < end)
+    return filters
+
+
+class AuditLogRepository(BaseRepository[AuditLog]):
+    """Repository for audit log queries."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, AuditLog)
+
+    async def search(self, filter_params: AuditLogFilter) -> List[AuditLog]:
+        """Return one page of audit logs in creation order, filtered in SQL."""
+        try:
+            query = (
+                select(AuditLog)
+                .where(and_(*build_audit_filters(filter_params)))
+                .order_by(AuditLog.created_at, AuditLog.id)
+                .offset(filter_params.skip)
+                .limit(filter_params.limit)
+            )
+            result = await self.db.execute(query)
+            return result.scalars().all()
+        except Exception as e:
+            logger.error(f"Error searching audit logs: {e}")
+            raise
+
+    async def get_report_counts(
+        self,
+        pharmacy_id: UUID,
+        start_date: date,
+        end_date: date
+    ) -> Dict[str, Any]:
+        """Compliance report counts for a pharmacy in one round trip."""
+        try:
+            start, end = date_range_bounds(start_date, end_date)
+            controlled_substance_count = (
+                select(func.count(ControlledSubstanceLog.id))
+                .where(
+                    and_(
+                        ControlledSubstanceLog.pharmacy_id == pharmacy_id,
+                        ControlledSubstanceLog.created_at >= start,
+                        ControlledSubstanceLog.created_at < end
+                    )
+                )
+                .scalar_subquery()
+            )
+            result = await self.db.execute(
+                select(
+                    func.count(AuditLog.id).label("total_transactions"),
+                    func.count(AuditLog.id).filter(
+                        AuditLog.resource_type.in_(PRESCRIPTION_RESOURCE_TYPES)
+                    ).label("prescription_validations"),
+                    controlled_substance_count.label("controlled_substance_transactions")
+                ).where(
+                    and_(
+                        AuditLog.pharmacy_id == pharmacy_id,
+                        AuditLog.created_at >= start,
+                        AuditLog.created_at < end
+                    )
+                )
+            )
+            return dict(result.one()._mapping)
+        except Exception as e:
+            logger.error(f"Error getting compliance report counts for pharmacy {pharmacy_id}: {e}")
+            raise
@@ -6,12 +6,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, update
 from typing import List, Optional, Dict, Any
 from uuid import UUID
+from datetime import date
 import logging
 
 from app.models.inventory import InventoryItem, InventoryTransaction
-from app.models.medicine import Medicine
+from app.models.medicine import Medicine, MedicineBatch
+from app.models.order import Order
 from app.models.pharmacy import Pharmacy
 from app.repositories.base_repository import BaseRepository
+from app.repositories.medicine_repository import (
+    BatchAllocation, BatchAllocationModeEnum, MedicineBatchRepository
+)
 from app.core.exceptions import InsufficientStockException
 
 logger = logging.getLogger(__name__)
@@ -22,6 +27,7 @@ class InventoryRepository(BaseRepository[InventoryItem]):
     
     def __init__(self, db: AsyncSession):
         super().__init__(db, InventoryItem)
+        self.batch_repo = MedicineBatchRepository(db)
     
     async def get_pharmacy_inventory(
         self, 
@@ -90,6 +96,58 @@ class InventoryRepository(BaseRepository[InventoryItem]):
             logger.error(f"Error checking availability: {e}")
             raise
     
+    async def get_stocked_pharmacies(
+        self,
+        medicine_ids: List[UUID],
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float
+    ) -> List[Dict[str, Any]]:
+        """Get per-pharmacy stock of the given medicines inside a bounding box.
+
+        The bounding box is a cheap prefilter on the pharmacy lat/lon index;
+        callers apply the exact radius check on the returned coordinates.
+        """
+        try:
+            available = (InventoryItem.current_stock - InventoryItem.reserved_stock).label('available')
+            query = select(
+                InventoryItem.pharmacy_id,
+                InventoryItem.medicine_id,
+                available,
+                Pharmacy.name.label('pharmacy_name'),
+                Pharmacy.latitude,
+                Pharmacy.longitude
+            ).join(
+                Pharmacy, InventoryItem.pharmacy_id == Pharmacy.id
+            ).where(
+                and_(
+                    InventoryItem.medicine_id.in_(medicine_ids),
+                    InventoryItem.is_active == True,
+                    InventoryItem.current_stock > InventoryItem.reserved_stock,
+                    Pharmacy.is_active == True,
+                    Pharmacy.operational_status == "active",
+                    Pharmacy.latitude.between(min_lat, max_lat),
+                    Pharmacy.longitude.between(min_lon, max_lon)
+                )
+            )
+            
+            result = await self.db.execute(query)
+            return [
+                {
+                    "pharmacy_id": row.pharmacy_id,
+                    "pharmacy_name": row.pharmacy_name,
+                    "latitude": float(row.latitude),
+                    "longitude": float(row.longitude),
+                    "medicine_id": row.medicine_id,
+                    "available": int(row.available)
+                }
+                for row in result.all()
+            ]
+        except Exception as e:
+            logger.error(f"Error getting stocked pharmacies: {e}")
+            raise
+    
     async def reserve_stock(
         self, 
         pharmacy_id: UUID, 
@@ -129,6 +187,18 @@ class InventoryRepository(BaseRepository[InventoryItem]):
                 .values(reserved_stock=item.reserved_stock + quantity)
             )
             
+            # Hold the earliest-expiring unexpired batches for the order
+            allocations = await self.batch_repo.allocate(
+                pharmacy_id, medicine_id, quantity, BatchAllocationModeEnum.RESERVE
+            )
+            reserved = sum(allocation.quantity for allocation in allocations)
+            if reserved < quantity and (reserved or await self._tracks_batches(pharmacy_id, medicine_id)):
+                raise InsufficientStockException(
+                    medicine_name=str(medicine_id),
+                    available=reserved,
+                    requested=quantity
+                )
+            
             await self.db.commit()
             logger.info(f"Reserved {quantity} units of medicine {medicine_id}")
             return True
@@ -166,6 +236,9 @@ class InventoryRepository(BaseRepository[InventoryItem]):
                 .where(InventoryItem.id == item.id)
                 .values(reserved_stock=new_reserved)
             )
+            await self.batch_repo.allocate(
+                pharmacy_id, medicine_id, quantity, BatchAllocationModeEnum.RELEASE
+            )
             
             await self.db.commit()
             logger.info(f"Released {quantity} units of medicine {medicine_id}")
@@ -231,6 +304,230 @@ class InventoryRepository(BaseRepository[InventoryItem]):
             logger.error(f"Error updating stock: {e}")
             raise
     
+    async def dispense_stock(
+        self,
+        pharmacy_id: UUID,
+        medicine_id: UUID,
+        quantity: int,
+        reference_number: Optional[str] = None,
+        reserved: bool = False
+    ) -> List[BatchAllocation]:
+        """Take stock off the shelf, earliest-expiring batches first.
+
+        With ``reserved`` the quantity was reserved for an order and is
+        released from the item and its batches before being dispensed.
+        Batches are picked and decremented in one statement; the inventory
+        item and one transaction per batch are written in the same commit.
+        Pharmacies that record no batches of the medicine only have the
+        item decremented.
+        """
+        try:
+            allocations = await self._dispense(pharmacy_id, medicine_id, quantity, reference_number, reserved)
+            await self.db.commit()
+            logger.info(f"Dispensed {quantity} units of medicine {medicine_id} from {len(allocations)} batches")
+            return allocations
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error dispensing stock: {e}")
+            raise
+    
+    async def dispense_order(
+        self,
+        order_id: UUID,
+        pharmacy_id: UUID,
+        medicine_quantities: List[dict],
+        reference_number: Optional[str],
+        order_values: Dict[str, Any]
+    ) -> bool:
+        """Dispense an order's reserved stock and update the order in one commit.
+
+        The order row is locked first and its sale transactions looked up,
+        so an order is dispensed once however often it is fulfilled; a
+        failure on any item leaves stock and order untouched. Returns
+        whether stock was dispensed by this call.
+        """
+        try:
+            await self.db.execute(select(Order.id).where(Order.id == order_id).with_for_update())
+            dispensed = await self.db.execute(
+                select(InventoryTransaction.id).where(
+                    and_(
+                        InventoryTransaction.order_id == order_id,
+                        InventoryTransaction.transaction_type == "sale"
+                    )
+                ).limit(1)
+            )
+            first_time = dispensed.first() is None
+            if first_time:
+                for item in medicine_quantities:
+                    await self._dispense(
+                        pharmacy_id, item["medicine_id"], item["quantity"], reference_number,
+                        reserved=True, order_id=order_id
+                    )
+            else:
+                logger.info(f"Order {order_id} was already dispensed")
+            
+            await self.db.execute(
+                update(Order)
+                .where(Order.id == order_id)
+                .values(**order_values)
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            return first_time
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error dispensing order {order_id}: {e}")
+            raise
+    
+    async def _dispense(
+        self,
+        pharmacy_id: UUID,
+        medicine_id: UUID,
+        quantity: int,
+        reference_number: Optional[str],
+        reserved: bool,
+        order_id: Optional[UUID] = None
+    ) -> List[BatchAllocation]:
+        """Dispense without committing; see dispense_stock."""
+        stock_values = {"current_stock": InventoryItem.current_stock - quantity}
+        if reserved:
+            await self.batch_repo.allocate(
+                pharmacy_id, medicine_id, quantity, BatchAllocationModeEnum.RELEASE
+            )
+            stock_values["reserved_stock"] = func.greatest(InventoryItem.reserved_stock - quantity, 0)
+        
+        allocations = await self.batch_repo.allocate(
+            pharmacy_id, medicine_id, quantity, BatchAllocationModeEnum.DISPENSE
+        )
+        dispensed = sum(allocation.quantity for allocation in allocations)
+        if dispensed < quantity and (dispensed or await self._tracks_batches(pharmacy_id, medicine_id)):
+            raise InsufficientStockException(
+                medicine_name=str(medicine_id),
+                available=dispensed,
+                requested=quantity
+            )
+        
+        result = await self.db.execute(
+            update(InventoryItem)
+            .where(
+                and_(
+                    InventoryItem.pharmacy_id == pharmacy_id,
+                    InventoryItem.medicine_id == medicine_id,
+                    InventoryItem.is_active == True
+                )
+            )
+            .values(**stock_values)
+            .returning(InventoryItem.id, InventoryItem.current_stock)
+            .execution_options(synchronize_session=False)
+        )
+        item_id, stock_after = result.one()
+        if stock_after < 0:
+            raise InsufficientStockException(
+                medicine_name=str(medicine_id),
+                available=stock_after + quantity,
+                requested=quantity
+            )
+        
+        stock = stock_after + quantity
+        taken = [(allocation.batch_id, allocation.quantity) for allocation in allocations] or [(None, quantity)]
+        for batch_id, batch_quantity in taken:
+            self.db.add(InventoryTransaction(
+                inventory_item_id=item_id,
+                batch_id=batch_id,
+                order_id=order_id,
+                transaction_type="sale",
+                quantity=-batch_quantity,
+                stock_before=stock,
+                stock_after=stock - batch_quantity,
+                reference_number=reference_number
+            ))
+            stock -= batch_quantity
+        return allocations
+    
+    async def receive_batch(
+        self,
+        pharmacy_id: UUID,
+        medicine_id: UUID,
+        batch_number: str,
+        manufacturing_date: date,
+        expiry_date: date,
+        quantity: int,
+        received_quantity: Optional[int] = None,
+        reference_number: Optional[str] = None
+    ) -> MedicineBatch:
+        """Record a received batch at a pharmacy and add it to the shelf.
+
+        The batch, the inventory item's stock and a purchase transaction
+        against the batch are written in one commit. Without an inventory
+        item for the medicine only the batch is recorded.
+        """
+        try:
+            received = quantity if received_quantity is None else received_quantity
+            batch = MedicineBatch(
+                medicine_id=medicine_id,
+                pharmacy_id=pharmacy_id,
+                batch_number=batch_number,
+                manufacturing_date=manufacturing_date,
+                expiry_date=expiry_date,
+                manufactured_quantity=received,
+                received_quantity=received,
+                current_quantity=quantity
+            )
+            self.db.add(batch)
+            await self.db.flush()
+            
+            result = await self.db.execute(
+                update(InventoryItem)
+                .where(
+                    and_(
+                        InventoryItem.pharmacy_id == pharmacy_id,
+                        InventoryItem.medicine_id == medicine_id,
+                        InventoryItem.is_active == True
+                    )
+                )
+                .values(current_stock=InventoryItem.current_stock + quantity)
+                .returning(InventoryItem.id, InventoryItem.current_stock)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+            if row:
+                item_id, stock_after = row
+                self.db.add(InventoryTransaction(
+                    inventory_item_id=item_id,
+                    batch_id=batch.id,
+                    transaction_type="purchase",
+                    quantity=quantity,
+                    stock_before=stock_after - quantity,
+                    stock_after=stock_after,
+                    reference_number=reference_number
+                ))
+            else:
+                logger.warning(
+                    f"Batch {batch_number} received at pharmacy {pharmacy_id} "
+                    f"has no inventory item for medicine {medicine_id}"
+                )
+            
+            await self.db.commit()
+            logger.info(f"Received batch {batch_number}: {quantity} units of medicine {medicine_id}")
+            return batch
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error receiving batch: {e}")
+            raise
+    
+    async def _tracks_batches(self, pharmacy_id: UUID, medicine_id: UUID) -> bool:
+        """Whether the pharmacy records batches for this medicine at all."""
+        result = await self.db.execute(
+            select(MedicineBatch.id).where(
+                and_(
+                    MedicineBatch.pharmacy_id == pharmacy_id,
+                    MedicineBatch.medicine_id == medicine_id,
+                    MedicineBatch.is_active == True
+                )
+            ).limit(1)
+        )
+        return result.first() is not None
+    
     async def get_low_stock_items(self, pharmacy_id: UUID) -> List[InventoryItem]:
         """Get items that need reordering."""
         try:
@@ -3,18 +3,142 @@ Medicine repository for data access operations
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from typing import List, Optional
+from sqlalchemy import select, and_, func, update, tuple_, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from datetime import date, timedelta
 from uuid import UUID
+import enum
 import logging
 
-from app.models.medicine import Medicine, MedicineBatch
+from app.models.inventory import InventoryItem
+from app.models.medicine import Medicine, MedicineBatch, MedicineEquivalenceGroup
 from app.repositories.base_repository import BaseRepository
 from app.core.exceptions import MedicineNotFoundException
 
 logger = logging.getLogger(__name__)
 
 
+# Rendered inline so the planner can match the ix_medicine_batches_fefo predicate
+IN_STOCK_FLOOR = literal(0, literal_execute=True)
+
+
+class BatchAllocationModeEnum(enum.Enum):
+    DISPENSE = "dispense"  # take unreserved stock off the shelf
+    RESERVE = "reserve"  # hold unreserved stock for an order
+    RELEASE = "release"  # give reserved stock back
+
+
+class BatchAllocation(NamedTuple):
+    """Quantity taken from one batch by a FEFO allocation."""
+    batch_id: UUID
+    batch_number: str
+    expiry_date: date
+    quantity: int
+
+
+def fefo_allocation_statement(
+    pharmacy_id: UUID,
+    medicine_id: UUID,
+    quantity: int,
+    mode: BatchAllocationModeEnum,
+    on: date
+):
+    """One UPDATE that spreads ``quantity`` over batches, earliest expiry first.
+
+    Candidate batches are locked in expiry order, a running total picks how
+    much each one gives, and only batches that give something are updated.
+    Expired batches are never dispensed or reserved. The statement returns
+    what it took; callers compare the total with ``quantity``.
+    """
+    conditions = [
+        MedicineBatch.medicine_id == medicine_id,
+        MedicineBatch.pharmacy_id == pharmacy_id,
+        MedicineBatch.current_quantity > IN_STOCK_FLOOR,
+        MedicineBatch.is_active == True
+    ]
+    if mode == BatchAllocationModeEnum.RELEASE:
+        available = MedicineBatch.reserved_quantity
+        conditions.append(MedicineBatch.reserved_quantity > 0)
+    else:
+        available = MedicineBatch.current_quantity - MedicineBatch.reserved_quantity
+        conditions.extend([
+            MedicineBatch.current_quantity > MedicineBatch.reserved_quantity,
+            MedicineBatch.expiry_date >= on,
+            MedicineBatch.recall_status == "none"
+        ])
+
+    # Row locks and window functions cannot share a SELECT, hence two CTEs
+    locked = (
+        select(MedicineBatch.id, MedicineBatch.expiry_date, available.label("available"))
+        .where(and_(*conditions))
+        .order_by(MedicineBatch.expiry_date, MedicineBatch.id)
+        .with_for_update()
+        .cte("locked")
+    )
+    taken_before = func.sum(locked.c.available).over(
+        order_by=(locked.c.expiry_date, locked.c.id)
+    ) - locked.c.available
+    plan = select(
+        locked.c.id,
+        func.least(locked.c.available, quantity - taken_before).label("take")
+    ).cte("plan")
+
+    if mode == BatchAllocationModeEnum.DISPENSE:
+        values = {"current_quantity": MedicineBatch.current_quantity - plan.c.take}
+    elif mode == BatchAllocationModeEnum.RESERVE:
+        values = {"reserved_quantity": MedicineBatch.reserved_quantity + plan.c.take}
+    else:
+        values = {"reserved_quantity": MedicineBatch.reserved_quantity - plan.c.take}
+
+    return (
+        update(MedicineBatch)
+        .where(and_(MedicineBatch.id == plan.c.id, plan.c.take > 0))
+        .values(**values)
+        .returning(MedicineBatch.id, MedicineBatch.batch_number, MedicineBatch.expiry_date, plan.c.take)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def normalize_search_text(value: str) -> str:
+    """Lower-case a search query and collapse its whitespace."""
+    return " ".join(value.lower().split())
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards in user input."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+DOSAGE_FORM_SYNONYMS = {
+    "tab": "tablet", "tabs": "tablet", "tablets": "tablet",
+    "cap": "capsule", "caps": "capsule", "capsules": "capsule",
+    "inj": "injection", "injections": "injection",
+    "syp": "syrup", "susp": "suspension",
+}
+
+
+def equivalence_key(
+    active_ingredients: Optional[Union[List[Any], str]],
+    strength: str,
+    dosage_form: str
+) -> Tuple[str, str, str]:
+    """Normalize (salt composition, strength, form) into an equivalence key."""
+    if isinstance(active_ingredients, str):
+        active_ingredients = [active_ingredients]
+    salts = sorted({
+        " ".join(str(ingredient.get("name", "") if isinstance(ingredient, dict) else ingredient).lower().split())
+        for ingredient in (active_ingredients or [])
+    } - {""})
+    form = " ".join((dosage_form or "").lower().split())
+    return (
+        "+".join(salts),
+        "".join((strength or "").lower().split()),
+        DOSAGE_FORM_SYNONYMS.get(form, form),
+    )
+
+
 class MedicineRepository(BaseRepository[Medicine]):
     """Repository for medicine operations."""
     
@@ -22,19 +146,28 @@ class MedicineRepository(BaseRepository[Medicine]):
         super().__init__(db, Medicine)
     
     async def search_medicines(self, query: str, limit: int = 20) -> List[Medicine]:
-        """Search medicines by name, generic name, or manufacturer."""
+        """Search medicines by name, generic name, brand or manufacturer.
+        
+        Matches run against the generated ``search_text`` column so the
+        pg_trgm GIN index serves the substring scan. Results are ranked by
+        name prefix match, then trigram word similarity.
+        """
         try:
+            normalized = normalize_search_text(query)
+            if not normalized:
+                return []
+            
+            pattern = f"%{escape_like(normalized)}%"
             search_query = select(Medicine).where(
                 and_(
                     Medicine.is_active == True,
-                    or_(
-                        Medicine.name.ilike(f"%{query}%"),
-                        Medicine.generic_name.ilike(f"%{query}%"),
-                        Medicine.brand_name.ilike(f"%{query}%"),
-                        Medicine.manufacturer.ilike(f"%{query}%")
-                    )
+                    Medicine.search_text.like(pattern, escape="\\")
                 )
-            ).order_by(Medicine.name).limit(limit)
+            ).order_by(
+                func.lower(Medicine.name).startswith(normalized, autoescape=True).desc(),
+                func.word_similarity(normalized, Medicine.search_text).desc(),
+                Medicine.name
+            ).limit(limit)
             
             result = await self.db.execute(search_query)
             medicines = result.scalars().all()
@@ -45,45 +178,81 @@ class MedicineRepository(BaseRepository[Medicine]):
             logger.error(f"Error searching medicines: {e}")
             raise
     
+    async def get_search_terms(self) -> List[tuple]:
+        """Get (id, name, generic_name, brand_name) for every active medicine."""
+        try:
+            result = await self.db.execute(
+                select(
+                    Medicine.id,
+                    Medicine.name,
+                    Medicine.generic_name,
+                    Medicine.brand_name
+                ).where(Medicine.is_active == True)
+            )
+            return [tuple(row) for row in result.all()]
+        except Exception as e:
+            logger.error(f"Error loading medicine search terms: {e}")
+            raise
+    
     async def get_alternatives(
         self, 
         medicine_id: UUID, 
         include_generic: bool = True, 
-        include_brand: bool = True
+        include_brand: bool = True,
+        pharmacy_id: Optional[UUID] = None
     ) -> dict:
-        """Get alternative medicines."""
+        """Get alternative medicines with live stock in a single query.
+        
+        Alternatives are the other active members of the medicine's
+        equivalence group. Branded members are reported as brand
+        alternatives, unbranded ones as generic alternatives.
+        """
         try:
-            # Get the base medicine
-            base_medicine = await self.get_by_id(medicine_id)
-            if not base_medicine:
+            base = aliased(Medicine)
+            stock_filter = [
+                InventoryItem.medicine_id == Medicine.id,
+                InventoryItem.is_active == True
+            ]
+            if pharmacy_id:
+                stock_filter.append(InventoryItem.pharmacy_id == pharmacy_id)
+            available_stock = select(
+                func.coalesce(func.sum(InventoryItem.current_stock - InventoryItem.reserved_stock), 0)
+            ).where(and_(*stock_filter)).scalar_subquery().label("available_stock")
+            
+            query = select(
+                base, Medicine, available_stock
+            ).select_from(base).outerjoin(
+                Medicine,
+                and_(
+                    Medicine.equivalence_group_id == base.equivalence_group_id,
+                    Medicine.id != base.id,
+                    Medicine.is_active == True
+                )
+            ).where(
+                base.id == medicine_id
+            ).order_by(
+                available_stock.desc(), Medicine.unit_price
+            )
+            
+            result = await self.db.execute(query)
+            rows = result.all()
+            if not rows:
                 raise MedicineNotFoundException(str(medicine_id))
             
             alternatives = {
+                "medicine": rows[0][0],
                 "generic_alternatives": [],
                 "brand_alternatives": []
             }
-            
-            # Find generic alternatives
-            if include_generic and base_medicine.generic_alternatives:
-                generic_query = select(Medicine).where(
-                    and_(
-                        Medicine.id.in_(base_medicine.generic_alternatives),
-                        Medicine.is_active == True
-                    )
-                )
-                result = await self.db.execute(generic_query)
-                alternatives["generic_alternatives"] = result.scalars().all()
-            
-            # Find brand alternatives
-            if include_brand and base_medicine.brand_alternatives:
-                brand_query = select(Medicine).where(
-                    and_(
-                        Medicine.id.in_(base_medicine.brand_alternatives),
-                        Medicine.is_active == True
-                    )
-                )
-                result = await self.db.execute(brand_query)
-                alternatives["brand_alternatives"] = result.scalars().all()
+            for _, alternative, stock in rows:
+                if alternative is None:
+                    continue
+                entry = {"medicine": alternative, "available_stock": int(stock)}
+                if alternative.brand_name:
+                    if include_brand:
+                        alternatives["brand_alternatives"].append(entry)
+                elif include_generic:
+                    alternatives["generic_alternatives"].append(entry)
             
             logger.info(f"Found alternatives for medicine {medicine_id}")
             return alternatives
@@ -133,7 +302,6 @@ class MedicineBatchRepository(BaseRepository[MedicineBatch]):
     async def get_expiring_batches(self, days: int = 30) -> List[MedicineBatch]:
         """Get batches expiring within specified days."""
         try:
-            from datetime import date, timedelta
             expiry_threshold = date.today() + timedelta(days=days)
             
             result = await self.db.execute(
@@ -150,10 +318,66 @@ class MedicineBatchRepository(BaseRepository[MedicineBatch]):
             logger.error(f"Error getting expiring batches: {e}")
             raise
     
+    async def get_expiring_stock(
+        self,
+        days: int = 30,
+        pharmacy_id: Optional[UUID] = None
+    ) -> List[Dict[str, Any]]:
+        """Batches expiring within specified days joined with their medicine."""
+        try:
+            expiry_threshold = date.today() + timedelta(days=days)
+            query = select(
+                MedicineBatch.medicine_id,
+                Medicine.name.label("medicine_name"),
+                MedicineBatch.pharmacy_id,
+                MedicineBatch.batch_number,
+                MedicineBatch.expiry_date,
+                MedicineBatch.current_quantity
+            ).join(
+                Medicine, MedicineBatch.medicine_id == Medicine.id
+            ).where(
+                and_(
+                    MedicineBatch.expiry_date <= expiry_threshold,
+                    MedicineBatch.current_quantity > IN_STOCK_FLOOR,
+                    MedicineBatch.is_active == True
+                )
+            ).order_by(MedicineBatch.expiry_date, MedicineBatch.id)
+            
+            if pharmacy_id:
+                query = query.where(MedicineBatch.pharmacy_id == pharmacy_id)
+            
+            result = await self.db.execute(query)
+            return [dict(row._mapping) for row in result.all()]
+        except Exception as e:
+            logger.error(f"Error getting expiring stock: {e}")
+            raise
+    
+    async def allocate(
+        self,
+        pharmacy_id: UUID,
+        medicine_id: UUID,
+        quantity: int,
+        mode: BatchAllocationModeEnum = BatchAllocationModeEnum.DISPENSE,
+        on: Optional[date] = None
+    ) -> List[BatchAllocation]:
+        """Apply a FEFO allocation in one round trip, earliest expiry first.
+
+        Does not commit; the caller decides whether a short allocation
+        (total below ``quantity``) is rolled back.
+        """
+        try:
+            result = await self.db.execute(
+                fefo_allocation_statement(pharmacy_id, medicine_id, quantity, mode, on or date.today())
+            )
+            allocations = [BatchAllocation(*row) for row in result.all()]
+            return sorted(allocations, key=lambda allocation: (allocation.expiry_date, allocation.batch_id))
+        except Exception as e:
+            logger.error(f"Error allocating batches of medicine {medicine_id}: {e}")
+            raise
+    
     async def get_expired_batches(self) -> List[MedicineBatch]:
         """Get expired batches."""
         try:
-            from datetime import date
             today = date.today()
             
             result = await self.db.execute(
@@ -184,4 +408,101 @@ class MedicineBatchRepository(BaseRepository[MedicineBatch]):
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error getting batches for medicine {medicine_id}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+class MedicineEquivalenceGroupRepository(BaseRepository[MedicineEquivalenceGroup]):
+    """Repository for medicine equivalence groups."""
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, MedicineEquivalenceGroup)
+    
+    async def get_or_create_group_ids(self, keys: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], UUID]:
+        """Upsert equivalence keys and return their group ids."""
+        try:
+            keys = list(dict.fromkeys(keys))
+            if not keys:
+                return {}
+            
+            await self.db.execute(
+                insert(MedicineEquivalenceGroup).values([
+                    {"salt_composition": salt, "strength": strength, "dosage_form": form}
+                    for salt, strength, form in keys
+                ]).on_conflict_do_nothing(constraint="uq_medicine_equivalence_key")
+            )
+            
+            result = await self.db.execute(
+                select(
+                    MedicineEquivalenceGroup.id,
+                    MedicineEquivalenceGroup.salt_composition,
+                    MedicineEquivalenceGroup.strength,
+                    MedicineEquivalenceGroup.dosage_form
+                ).where(
+                    tuple_(
+                        MedicineEquivalenceGroup.salt_composition,
+                        MedicineEquivalenceGroup.strength,
+                        MedicineEquivalenceGroup.dosage_form
+                    ).in_(keys)
+                )
+            )
+            return {(row.salt_composition, row.strength, row.dosage_form): row.id for row in result.all()}
+        except Exception as e:
+            logger.error(f"Error upserting equivalence groups: {e}")
+            raise
+    
+    async def assign_group(self, medicine: Medicine) -> UUID:
+        """Materialize the equivalence group id for one medicine."""
+        try:
+            key = equivalence_key(medicine.active_ingredients, medicine.strength, medicine.dosage_form)
+            group_ids = await self.get_or_create_group_ids([key])
+            
+            await self.db.execute(
+                update(Medicine)
+                .where(Medicine.id == medicine.id)
+                .values(equivalence_group_id=group_ids[key])
+            )
+            await self.db.commit()
+            
+            medicine.equivalence_group_id = group_ids[key]
+            return group_ids[key]
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error assigning equivalence group to medicine {medicine.id}: {e}")
+            raise
+    
+    async def backfill(self, batch_size: int = 5000, only_missing: bool = True) -> int:
+        """Recompute equivalence groups for medicines in batches."""
+        try:
+            updated = 0
+            last_id = None
+            while True:
+                query = select(
+                    Medicine.id, Medicine.active_ingredients, Medicine.strength, Medicine.dosage_form
+                ).order_by(Medicine.id).limit(batch_size)
+                if only_missing:
+                    query = query.where(Medicine.equivalence_group_id.is_(None))
+                if last_id is not None:
+                    query = query.where(Medicine.id > last_id)
+                
+                rows = (await self.db.execute(query)).all()
+                if not rows:
+                    break
+                
+                keys = {row.id: equivalence_key(row.active_ingredients, row.strength, row.dosage_form) for row in rows}
+                group_ids = await self.get_or_create_group_ids(list(keys.values()))
+                
+                await self.db.execute(
+                    update(Medicine),
+                    [{"id": medicine_id, "equivalence_group_id": group_ids[key]} for medicine_id, key in keys.items()]
+                )
+                await self.db.commit()
+                
+                updated += len(rows)
+                last_id = rows[-1].id
+            
+            logger.info(f"Backfilled equivalence groups for {updated} medicines")
+            return updated
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error backfilling equivalence groups: {e}")
+            raise
@@ -16,7 +16,8 @@ class InvoiceItemCreate(BaseModel):
     quantity: int = Field(..., gt=0)
     unit_price: Decimal = Field(..., gt=0)
     discount_percentage: Decimal = Field(default=0, ge=0, le=100)
-    gst_rate: Decimal = Field(..., ge=0, le=100)
+    gst_rate: Optional[Decimal] = Field(default=None, ge=0, le=100)  # Looked up from hsn_code when omitted
+    hsn_code: Optional[str] = Field(default=None, max_length=20)
 
 
 class InvoiceCreate(BaseModel):
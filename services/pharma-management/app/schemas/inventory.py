@@ -3,7 +3,7 @@ Inventory management schemas
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 from datetime import date
 from decimal import Decimal
@@ -81,6 +81,18 @@ class InventoryAvailability(BaseModel):
     nearest_pharmacy: Optional[dict] = None
 
 
+class PharmacyBasketAvailability(BaseModel):
+    """Nearby pharmacy ranked by how much of a medicine basket it stocks."""
+    pharmacy_id: UUID
+    pharmacy_name: str
+    distance_km: float
+    medicines_available: int
+    medicines_requested: int
+    covers_all: bool
+    stock: Dict[UUID, int] = {}
+    missing_medicine_ids: List[UUID] = []
+
+
 class PurchaseOrderCreate(BaseModel):
     """Create purchase order schema."""
     pharmacy_id: UUID
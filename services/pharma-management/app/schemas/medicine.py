@@ -37,12 +37,23 @@ class MedicineResponse(MedicineBase):
         from_attributes = True
 
 
+class MedicineSuggestion(BaseModel):
+    """Type-ahead suggestion."""
+    id: UUID
+    name: str
+
+
+class AlternativeMedicineResponse(MedicineResponse):
+    """Substitute medicine with live stock."""
+    available_stock: int = 0
+
+
 class MedicineAlternatives(BaseModel):
     """Medicine alternatives response."""
     medicine_id: UUID
     medicine_name: str
-    generic_alternatives: List[MedicineResponse] = []
-    brand_alternatives: List[MedicineResponse] = []
+    generic_alternatives: List[AlternativeMedicineResponse] = []
+    brand_alternatives: List[AlternativeMedicineResponse] = []
     total_alternatives: int = 0
 
 
@@ -9,6 +9,7 @@ import logging
 from datetime import datetime, timedelta
 
 from app.models.compliance import AuditLog
+from app.repositories.audit_repository import normalize_resource_type
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -44,7 +45,7 @@ class AuditService:
                 user_id=user_id,
                 pharmacy_id=pharmacy_id,
                 action=action,
-                resource_type=resource_type,
+                resource_type=normalize_resource_type(resource_type),
                 resource_id=resource_id,
                 description=description,
                 old_values=old_values,
@@ -69,6 +70,38 @@ class AuditService:
             await self.db.rollback()
             raise
     
+    async def log_actions(self, entries: List[Dict[str, Any]]) -> int:
+        """Log many audit events in a single commit.
+
+        Each entry takes the same keyword arguments as ``log_action``.
+        """
+        try:
+            if not entries:
+                return 0
+            
+            retention_date = datetime.utcnow() + timedelta(days=settings.AUDIT_LOG_RETENTION_DAYS)
+            self.db.add_all([
+                AuditLog(
+                    **{
+                        "severity": "info",
+                        **entry,
+                        "resource_type": normalize_resource_type(entry["resource_type"])
+                    },
+                    retention_date=retention_date,
+                    hipaa_logged=True
+                )
+                for entry in entries
+            ])
+            await self.db.commit()
+            
+            logger.info(f"Audit logs created: {len(entries)} entries")
+            return len(entries)
+            
+        except Exception as e:
+            logger.error(f"Error creating audit logs: {e}")
+            await self.db.rollback()
+            raise
+    
     async def log_prescription_action(
         self,
         action: str,
@@ -157,7 +190,7 @@ class AuditService:
             if resource_id:
                 filters.append(AuditLog.resource_id == resource_id)
             if resource_type:
-                filters.append(AuditLog.resource_type == resource_type)
+                filters.append(AuditLog.resource_type == normalize_resource_type(resource_type))
             if action:
                 filters.append(AuditLog.action == action)
             if user_id:
@@ -208,7 +241,7 @@ class AuditService:
             if resource_id:
                 filters.append(AuditLog.resource_id == resource_id)
             if resource_type:
-                filters.append(AuditLog.resource_type == resource_type)
+                filters.append(AuditLog.resource_type == normalize_resource_type(resource_type))
             if action:
                 filters.append(AuditLog.action == action)
             if user_id:
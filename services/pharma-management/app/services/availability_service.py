@@ -0,0 +1,126 @@
+"""
+Radius-aware medicine availability engine
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.geo import bounding_box, cell_bounds, geo_cell, haversine_km
+from app.repositories.inventory_repository import InventoryRepository
+from app.schemas.inventory import PharmacyBasketAvailability
+
+logger = logging.getLogger(__name__)
+
+# Candidate rows per (geo cell, radius, basket). Rows cover the whole cell
+# expanded by the radius, so any caller inside the cell can be ranked from
+# them with an exact distance.
+_candidate_cache = TTLCache(
+    maxsize=settings.AVAILABILITY_CACHE_MAX_ENTRIES,
+    ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS
+)
+
+
+def rank_pharmacies(
+    rows: List[Dict[str, Any]],
+    medicine_ids: List[UUID],
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    limit: Optional[int] = None
+) -> List[PharmacyBasketAvailability]:
+    """Group stock rows by pharmacy and rank by basket coverage, then distance."""
+    requested = list(dict.fromkeys(medicine_ids))
+    pharmacies: Dict[UUID, Dict[str, Any]] = {}
+
+    for row in rows:
+        pharmacy = pharmacies.get(row["pharmacy_id"])
+        if pharmacy is None:
+            distance = haversine_km(latitude, longitude, row["latitude"], row["longitude"])
+            if distance > radius_km:
+                continue
+            pharmacy = {
+                "pharmacy_id": row["pharmacy_id"],
+                "pharmacy_name": row["pharmacy_name"],
+                "distance_km": distance,
+                "stock": {}
+            }
+            pharmacies[row["pharmacy_id"]] = pharmacy
+        pharmacy["stock"][row["medicine_id"]] = pharmacy["stock"].get(row["medicine_id"], 0) + row["available"]
+
+    ranked = sorted(
+        pharmacies.values(),
+        key=lambda p: (-len(p["stock"]), p["distance_km"])
+    )
+    if limit is not None:
+        ranked = ranked[:limit]
+
+    return [
+        PharmacyBasketAvailability(
+            pharmacy_id=p["pharmacy_id"],
+            pharmacy_name=p["pharmacy_name"],
+            distance_km=round(p["distance_km"], 3),
+            medicines_available=len(p["stock"]),
+            medicines_requested=len(requested),
+            covers_all=len(p["stock"]) == len(requested),
+            stock=p["stock"],
+            missing_medicine_ids=[m for m in requested if m not in p["stock"]]
+        )
+        for p in ranked
+    ]
+
+
+class AvailabilityService:
+    """Answers "which pharmacies within R km stock this basket"."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.inventory_repo = InventoryRepository(db)
+
+    async def find_nearby_pharmacies(
+        self,
+        medicine_ids: List[UUID],
+        latitude: float,
+        longitude: float,
+        radius_km: float = 10.0,
+        limit: Optional[int] = 20
+    ) -> List[PharmacyBasketAvailability]:
+        """Find pharmacies within the radius, best basket coverage first."""
+        try:
+            rows = await self._get_candidates(medicine_ids, latitude, longitude, radius_km)
+            ranked = rank_pharmacies(rows, medicine_ids, latitude, longitude, radius_km, limit)
+
+            logger.info(
+                f"Found {len(ranked)} pharmacies within {radius_km}km "
+                f"for {len(medicine_ids)} medicines"
+            )
+            return ranked
+        except Exception as e:
+            logger.error(f"Error finding nearby pharmacies: {e}")
+            raise
+
+    async def _get_candidates(
+        self,
+        medicine_ids: List[UUID],
+        latitude: float,
+        longitude: float,
+        radius_km: float
+    ) -> List[Dict[str, Any]]:
+        """Load stock rows for the caller's geo cell, from cache when warm."""
+        cell_degrees = settings.AVAILABILITY_GEO_CELL_DEGREES
+        cell = geo_cell(latitude, longitude, cell_degrees)
+        cache_key = (cell, radius_km, tuple(sorted(set(medicine_ids), key=str)))
+
+        rows = _candidate_cache.get(cache_key)
+        if rows is not None:
+            return rows
+
+        min_lat, min_lon, max_lat, max_lon = bounding_box(*cell_bounds(cell, cell_degrees), radius_km)
+        rows = await self.inventory_repo.get_stocked_pharmacies(
+            list(set(medicine_ids)), min_lat, min_lon, max_lat, max_lon
+        )
+        _candidate_cache.set(cache_key, rows)
+        return rows
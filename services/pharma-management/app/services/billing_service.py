@@ -8,8 +8,6 @@ from typing import Optional
 from uuid import UUID
 import logging
 from datetime import datetime, date
-from decimal import Decimal
-import uuid
 
 from app.models.billing import Invoice, InvoiceItem, Payment
 from app.models.order import Order, OrderItem
@@ -18,6 +16,8 @@ from app.repositories.base_repository import BaseRepository
 from app.schemas.billing import InvoiceCreate, InvoiceResponse, InvoiceNotification, InvoiceItemResponse
 from app.core.exceptions import OrderNotFoundException, PharmacyNotFoundException
 from app.services.audit_service import AuditService
+from app.services.document_number_service import DocumentTypeEnum, document_number_allocator
+from app.services.tax_engine import TaxLine, from_paise, is_inter_state, tax_engine
 
 logger = logging.getLogger(__name__)
 
@@ -54,25 +54,25 @@ class BillingService:
             # Generate invoice number
             invoice_number = await self._generate_invoice_number(invoice_data.pharmacy_id)
             
-            # Calculate totals
-            subtotal = Decimal('0.00')
-            total_cgst = Decimal('0.00')
-            total_sgst = Decimal('0.00')
-            total_igst = Decimal('0.00')
-            
-            for item in invoice_data.items:
-                item_total = item.unit_price * item.quantity
-                discount_amount = (item_total * item.discount_percentage) / 100
-                taxable_amount = item_total - discount_amount
-                
-                # Calculate GST (simplified - assuming intra-state)
-                gst_amount = (taxable_amount * item.gst_rate) / 100
-                cgst_amount = gst_amount / 2
-                sgst_amount = gst_amount / 2
-                
-                subtotal += taxable_amount
-                total_cgst += cgst_amount
-                total_sgst += sgst_amount
+            # Tax every line in one pass; totals are rounded once at the end
+            inter_state = is_inter_state(pharmacy.state, invoice_data.billing_address.get("state"))
+            taxes = tax_engine.compute(
+                [
+                    TaxLine(
+                        unit_price=item.unit_price,
+                        quantity=item.quantity,
+                        gst_rate=item.gst_rate,
+                        hsn_code=item.hsn_code,
+                        discount_percentage=item.discount_percentage
+                    )
+                    for item in invoice_data.items
+                ],
+                inter_state=inter_state
+            )
+            subtotal = taxes.subtotal
+            total_cgst = taxes.cgst_amount
+            total_sgst = taxes.sgst_amount
+            total_igst = taxes.igst_amount
             
             # Calculate final total
             total_amount = (
@@ -116,48 +116,40 @@ class BillingService:
             invoice = await self.invoice_repo.create(invoice_dict)
             
             # Create invoice items
-            invoice_items = []
-            for item_data in invoice_data.items:
-                # Get order item details
-                order_item_result = await self.db.execute(
-                    select(OrderItem).where(OrderItem.id == item_data.order_item_id)
+            order_items_result = await self.db.execute(
+                select(OrderItem).where(
+                    OrderItem.id.in_({item.order_item_id for item in invoice_data.items})
                 )
-                order_item = order_item_result.scalar_one_or_none()
-                
+            )
+            order_items = {order_item.id: order_item for order_item in order_items_result.scalars().all()}
+            
+            invoice_items = []
+            for item_data, line in zip(invoice_data.items, taxes.lines):
+                order_item = order_items.get(item_data.order_item_id)
                 if order_item:
-                    item_total = item_data.unit_price * item_data.quantity
-                    discount_amount = (item_total * item_data.discount_percentage) / 100
-                    taxable_amount = item_total - discount_amount
-                    
-                    # Calculate GST
-                    gst_amount = (taxable_amount * item_data.gst_rate) / 100
-                    cgst_amount = gst_amount / 2
-                    sgst_amount = gst_amount / 2
-                    final_amount = taxable_amount + gst_amount
-                    
-                    invoice_item_dict = {
-                        "invoice_id": invoice.id,
-                        "order_item_id": item_data.order_item_id,
-                        "medicine_id": item_data.medicine_id,
-                        "medicine_name": order_item.medicine_name,
-                        "strength": order_item.strength,
-                        "manufacturer": order_item.manufacturer,
-                        "batch_number": order_item.batch_number,
-                        "quantity": item_data.quantity,
-                        "unit_price": item_data.unit_price,
-                        "total_price": item_total,
-                        "discount_percentage": item_data.discount_percentage,
-                        "discount_amount": discount_amount,
-                        "gst_rate": item_data.gst_rate,
-                        "cgst_amount": cgst_amount,
-                        "sgst_amount": sgst_amount,
-                        "igst_amount": Decimal('0.00'),
-                        "taxable_amount": taxable_amount,
-                        "final_amount": final_amount
-                    }
-                    
-                    invoice_item = await self.invoice_item_repo.create(invoice_item_dict)
-                    invoice_items.append(invoice_item)
+                    invoice_items.append(InvoiceItem(
+                        invoice_id=invoice.id,
+                        order_item_id=item_data.order_item_id,
+                        medicine_id=item_data.medicine_id,
+                        medicine_name=order_item.medicine_name,
+                        strength=order_item.strength,
+                        manufacturer=order_item.manufacturer,
+                        batch_number=order_item.batch_number,
+                        hsn_code=item_data.hsn_code,
+                        quantity=item_data.quantity,
+                        unit_price=item_data.unit_price,
+                        total_price=from_paise(line.total_price),
+                        discount_percentage=item_data.discount_percentage,
+                        discount_amount=from_paise(line.discount_amount),
+                        gst_rate=from_paise(line.gst_rate_bp),
+                        cgst_amount=from_paise(line.cgst_amount),
+                        sgst_amount=from_paise(line.sgst_amount),
+                        igst_amount=from_paise(line.igst_amount),
+                        taxable_amount=from_paise(line.taxable_amount),
+                        final_amount=from_paise(line.final_amount)
+                    ))
+            self.db.add_all(invoice_items)
+            await self.db.commit()
             
             # Log audit trail
             await self.audit_service.log_action(
@@ -166,7 +158,7 @@ class BillingService:
                 resource_id=invoice.id,
                 pharmacy_id=invoice_data.pharmacy_id,
                 description=f"Generated invoice {invoice_number} for order {invoice_data.order_id}",
-                metadata={
+                extra_data={
                     "invoice_number": invoice_number,
                     "total_amount": float(total_amount),
                     "items_count": len(invoice_items)
@@ -257,20 +249,4 @@ class BillingService:
     
     async def _generate_invoice_number(self, pharmacy_id: UUID) -> str:
         """Generate unique invoice number."""
-        try:
-            # Get pharmacy code (first 3 letters of name)
-            pharmacy_result = await self.db.execute(
-                select(Pharmacy.name).where(Pharmacy.id == pharmacy_id)
-            )
-            pharmacy_name = pharmacy_result.scalar_one_or_none()
-            pharmacy_code = pharmacy_name[:3].upper() if pharmacy_name else "PHA"
-            
-            # Generate invoice number with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            invoice_number = f"INV-{pharmacy_code}-{timestamp}"
-            
-            return invoice_number
-        except Exception as e:
-            logger.error(f"Error generating invoice number: {e}")
-            # Fallback to UUID-based number
-            return f"INV-{str(uuid.uuid4())[:8].upper()}"
\ No newline at end of file
+        return await document_number_allocator.next_number(DocumentTypeEnum.INVOICE, pharmacy_id)
\ No newline at end of file
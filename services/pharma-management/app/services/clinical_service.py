@@ -16,6 +16,7 @@ from app.schemas.clinical import (
     ADRReportCreate, ADRReportResponse, DrugInteractionDetail
 )
 from app.services.audit_service import AuditService
+from app.services.interaction_engine import InteractionEntry, drug_interaction_index
 
 logger = logging.getLogger(__name__)
 
@@ -38,34 +39,21 @@ class ClinicalService:
         try:
             check_id = str(uuid.uuid4())[:8].upper()
             
-            # Get medicine names (simplified - would query medicine table)
-            medicine_names = [f"Medicine-{str(mid)[:8]}" for mid in request.medicine_ids]
+            # Pairwise lookups against the in-memory index; no per-pair queries
+            await drug_interaction_index.ensure_fresh(self.db)
+            found = drug_interaction_index.check(request.medicine_ids)
             
-            # Simulate interaction checking
-            # In production, this would query the drug interaction database
-            interactions = []
-            interactions_found = 0
-            highest_severity = "none"
-            
-            # Mock interaction for demonstration
-            if len(request.medicine_ids) >= 2:
-                interactions.append(DrugInteractionDetail(
-                    drug1_name=medicine_names[0],
-                    drug2_name=medicine_names[1],
-                    interaction_type="pharmacokinetic",
-                    severity="moderate",
-                    mechanism="CYP450 enzyme inhibition",
-                    clinical_effect="Increased plasma concentration",
-                    management_strategy="Monitor patient closely",
-                    monitoring_required=True,
-                    alternative_drugs=["Alternative-A", "Alternative-B"]
-                ))
-                interactions_found = 1
-                highest_severity = "moderate"
+            medicine_names = [
+                drug_interaction_index.names.get(mid, str(mid)) for mid in request.medicine_ids
+            ]
+            interactions = [self._to_interaction_detail(entry) for entry in found]
+            interactions_found = len(interactions)
+            highest_severity = found[0].severity if found else "none"
             
             # Create interaction check record
             check_data = {
                 "check_id": check_id,
+                "check_date": datetime.utcnow(),
                 "patient_id": request.patient_id,
                 "medicines_checked": [str(mid) for mid in request.medicine_ids],
                 "current_medications": request.current_medications,
@@ -91,7 +79,7 @@ class ClinicalService:
                 resource_type="clinical",
                 resource_id=interaction_check.id,
                 description=f"Checked interactions for {len(request.medicine_ids)} medicines",
-                metadata={
+                extra_data={
                     "patient_id": str(request.patient_id),
                     "medicines_count": len(request.medicine_ids),
                     "interactions_found": interactions_found,
@@ -117,6 +105,20 @@ class ClinicalService:
             logger.error(f"Error checking drug interactions: {e}")
             raise
     
+    def _to_interaction_detail(self, entry: InteractionEntry) -> DrugInteractionDetail:
+        """Convert an index entry to the API schema."""
+        return DrugInteractionDetail(
+            drug1_name=entry.drug1_name,
+            drug2_name=entry.drug2_name,
+            interaction_type=entry.interaction_type,
+            severity=entry.severity,
+            mechanism=entry.mechanism,
+            clinical_effect=entry.clinical_effect,
+            management_strategy=entry.management_strategy,
+            monitoring_required=entry.monitoring_required,
+            alternative_drugs=entry.alternative_drugs
+        )
+    
     async def submit_adr_report(self, adr_data: ADRReportCreate) -> ADRReportResponse:
         """Submit Adverse Drug Reaction report."""
         try:
@@ -160,28 +162,11 @@ class ClinicalService:
     ) -> List[DrugInteractionDetail]:
         """Get specific drug interactions."""
         try:
-            interactions = await self.interaction_repo.get_multi(
-                filters={
-                    "drug1_id": drug1_id,
-                    "drug2_id": drug2_id,
-                    "is_active": True
-                }
-            )
-            
-            interaction_details = []
-            for interaction in interactions:
-                detail = DrugInteractionDetail(
-                    drug1_name="Drug 1",  # Would get from medicine table
-                    drug2_name="Drug 2",  # Would get from medicine table
-                    interaction_type=interaction.interaction_type,
-                    severity=interaction.severity,
-                    mechanism=interaction.mechanism,
-                    clinical_effect=interaction.clinical_effect,
-                    management_strategy=interaction.management_strategy,
-                    monitoring_required=interaction.monitoring_required,
-                    alternative_drugs=interaction.alternative_drugs
-                )
-                interaction_details.append(detail)
+            await drug_interaction_index.ensure_fresh(self.db)
+            interaction_details = [
+                self._to_interaction_detail(entry)
+                for entry in drug_interaction_index.lookup(drug1_id, drug2_id)
+            ]
             
             return interaction_details
         except Exception as e:
@@ -3,13 +3,14 @@ Compliance service for audit and regulatory requirements
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from typing import List
 from uuid import UUID
 import logging
 from datetime import datetime, date
 
-from app.models.compliance import AuditLog, ControlledSubstanceLog
+from app.models.compliance import ControlledSubstanceLog
+from app.repositories.audit_repository import AuditLogRepository
 from app.repositories.base_repository import BaseRepository
 from app.schemas.compliance import AuditLogFilter, AuditLogResponse, ComplianceReport
 
@@ -21,44 +22,13 @@ class ComplianceService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.audit_repo = BaseRepository(db, AuditLog)
+        self.audit_repo = AuditLogRepository(db)
         self.controlled_substance_repo = BaseRepository(db, ControlledSubstanceLog)
     
     async def get_audit_logs(self, filter_params: AuditLogFilter) -> List[AuditLogResponse]:
         """Get audit logs with filtering."""
         try:
-            # Build filters
-            filters = {}
-            if filter_params.pharmacy_id:
-                filters["pharmacy_id"] = filter_params.pharmacy_id
-            if filter_params.user_id:
-                filters["user_id"] = filter_params.user_id
-            if filter_params.action:
-                filters["action"] = filter_params.action
-            if filter_params.resource_type:
-                filters["resource_type"] = filter_params.resource_type
-            if filter_params.severity:
-                filters["severity"] = filter_params.severity
-            
-            # Get audit logs
-            audit_logs = await self.audit_repo.get_multi(
-                skip=filter_params.skip,
-                limit=filter_params.limit,
-                filters=filters,
-                order_by="created_at"
-            )
-            
-            # Filter by date range if provided
-            if filter_params.start_date or filter_params.end_date:
-                filtered_logs = []
-                for log in audit_logs:
-                    log_date = log.created_at.date()
-                    if filter_params.start_date and log_date < filter_params.start_date:
-                        continue
-                    if filter_params.end_date and log_date > filter_params.end_date:
-                        continue
-                    filtered_logs.append(log)
-                audit_logs = filtered_logs
+            audit_logs = await self.audit_repo.search(filter_params)
             
             logger.info(f"Retrieved {len(audit_logs)} audit logs")
             return [AuditLogResponse.from_orm(log) for log in audit_logs]
@@ -74,42 +44,10 @@ class ComplianceService:
     ) -> ComplianceReport:
         """Generate compliance report for a pharmacy."""
         try:
-            # Get audit statistics
-            audit_count_result = await self.db.execute(
-                select(func.count(AuditLog.id)).where(
-                    and_(
-                        AuditLog.pharmacy_id == pharmacy_id,
-                        AuditLog.created_at >= start_date,
-                        AuditLog.created_at <= end_date
-                    )
-                )
-            )
-            total_transactions = audit_count_result.scalar() or 0
-            
-            # Get controlled substance transactions
-            cs_count_result = await self.db.execute(
-                select(func.count(ControlledSubstanceLog.id)).where(
-                    and_(
-                        ControlledSubstanceLog.pharmacy_id == pharmacy_id,
-                        ControlledSubstanceLog.created_at >= start_date,
-                        ControlledSubstanceLog.created_at <= end_date
-                    )
-                )
-            )
-            controlled_substance_transactions = cs_count_result.scalar() or 0
-            
-            # Get prescription validations
-            validation_count_result = await self.db.execute(
-                select(func.count(AuditLog.id)).where(
-                    and_(
-                        AuditLog.pharmacy_id == pharmacy_id,
-                        AuditLog.action.like('%prescription%'),
-                        AuditLog.created_at >= start_date,
-                        AuditLog.created_at <= end_date
-                    )
-                )
-            )
-            prescription_validations = validation_count_result.scalar() or 0
+            counts = await self.audit_repo.get_report_counts(pharmacy_id, start_date, end_date)
+            total_transactions = counts["total_transactions"] or 0
+            controlled_substance_transactions = counts["controlled_substance_transactions"] or 0
+            prescription_validations = counts["prescription_validations"] or 0
             
             # Calculate compliance score (simplified)
             compliance_score = min(100.0, (prescription_validations / max(1, total_transactions)) * 100)
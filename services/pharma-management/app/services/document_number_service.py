@@ -0,0 +1,140 @@
+"""
+Document number allocation backed by Postgres sequences
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import Dict, Optional, Tuple
+from datetime import date
+from uuid import UUID
+import asyncio
+import enum
+import logging
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentTypeEnum(enum.Enum):
+    PURCHASE_ORDER = "po"
+    GOODS_RECEIPT = "grn"
+    ORDER = "ord"
+    INVOICE = "inv"
+
+
+DOCUMENT_PREFIXES = {
+    DocumentTypeEnum.PURCHASE_ORDER: "PO",
+    DocumentTypeEnum.GOODS_RECEIPT: "GRN",
+    DocumentTypeEnum.ORDER: "ORD",
+    DocumentTypeEnum.INVOICE: "INV",
+}
+
+
+def fiscal_year_label(day: date, start_month: Optional[int] = None) -> str:
+    """Fiscal year as 'YYyy', e.g. '2425' for April 2024 - March 2025."""
+    start_month = start_month or settings.FISCAL_YEAR_START_MONTH
+    start_year = day.year if day.month >= start_month else day.year - 1
+    return f"{start_year % 100:02d}{(start_year + 1) % 100:02d}"
+
+
+def pharmacy_code(pharmacy_id: UUID) -> str:
+    """Pharmacy discriminator used in document numbers.
+
+    Every pharmacy's sequence starts at 1 and the number columns are
+    globally unique, so this must be unique per pharmacy: the full id.
+    """
+    return pharmacy_id.hex.upper()
+
+
+def render_document_number(
+    doc_type: DocumentTypeEnum,
+    pharmacy_id: UUID,
+    fiscal_year: str,
+    sequence: int,
+    template: Optional[str] = None
+) -> str:
+    """Render a number such as ``INV-<PHARMACY ID HEX>-2425-000042``."""
+    template = template or settings.DOCUMENT_NUMBER_FORMAT
+    return template.format(
+        prefix=DOCUMENT_PREFIXES[doc_type],
+        pharmacy=pharmacy_code(pharmacy_id),
+        fy=fiscal_year,
+        seq=sequence
+    )
+
+
+def sequence_name(doc_type: DocumentTypeEnum, pharmacy_id: UUID, fiscal_year: str) -> str:
+    """Postgres sequence for one (document type, pharmacy, fiscal year)."""
+    return f"docseq_{doc_type.value}_{pharmacy_id.hex}_{fiscal_year}"
+
+
+class DocumentNumberAllocator:
+    """Hands out document numbers from per-process blocks.
+
+    Each (document type, pharmacy, fiscal year) has its own Postgres
+    sequence that advances by ``block_size``, so one ``nextval`` reserves a
+    whole block for this process and the next ``block_size - 1`` documents
+    need no database round trip. Numbers are unique and increasing per
+    process; a block that is not used up before a restart leaves a gap, so
+    set DOCUMENT_NUMBER_BLOCK_SIZE to 1 where gap-free series matter more
+    than throughput.
+    """
+
+    def __init__(self, db_engine: AsyncEngine, block_size: Optional[int] = None):
+        self.engine = db_engine
+        self.block_size = block_size or settings.DOCUMENT_NUMBER_BLOCK_SIZE
+        self._blocks: Dict[str, Tuple[int, int]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._increments: Dict[str, int] = {}
+
+    async def next_number(
+        self,
+        doc_type: DocumentTypeEnum,
+        pharmacy_id: UUID,
+        on: Optional[date] = None
+    ) -> str:
+        """Allocate and render the next number for a pharmacy's document."""
+        fiscal_year = fiscal_year_label(on or date.today())
+        sequence = await self.next_value(sequence_name(doc_type, pharmacy_id, fiscal_year))
+        return render_document_number(doc_type, pharmacy_id, fiscal_year, sequence)
+
+    async def next_value(self, name: str) -> int:
+        """Next value of a sequence, reserving a new block when exhausted."""
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            current, end = self._blocks.get(name, (0, 0))
+            if current >= end:
+                current, end = await self._reserve_block(name)
+            self._blocks[name] = (current + 1, end)
+            return current
+
+    async def _reserve_block(self, name: str) -> Tuple[int, int]:
+        # Runs on its own autocommit connection: nextval is not transactional,
+        # and the caller's transaction should not carry sequence DDL.
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            if name not in self._increments:
+                try:
+                    await conn.execute(text(
+                        f"CREATE SEQUENCE IF NOT EXISTS {name} "
+                        f"START WITH 1 INCREMENT BY {self.block_size} MINVALUE 1"
+                    ))
+                except Exception as e:
+                    # Concurrent creation by another process; the sequence exists
+                    logger.warning(f"Sequence {name} creation raced: {e}")
+                # The sequence's own increment defines the block, so processes
+                # configured with different block sizes never overlap
+                result = await conn.execute(
+                    text("SELECT increment_by FROM pg_sequences WHERE sequencename = :name"),
+                    {"name": name}
+                )
+                self._increments[name] = result.scalar_one()
+
+            result = await conn.execute(text(f"SELECT nextval('{name}')"))
+            start = result.scalar_one()
+            return start, start + self._increments[name]
+
+
+document_number_allocator = DocumentNumberAllocator(engine)
@@ -0,0 +1,172 @@
+"""
+In-memory drug interaction pair index
+"""
+
+from sqlalchemy import select, func, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.models.clinical import DrugInteraction
+from app.models.medicine import Medicine
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_RANK = {
+    "none": 0,
+    "minor": 1,
+    "moderate": 2,
+    "major": 3,
+    "contraindicated": 4,
+}
+
+
+class InteractionEntry(NamedTuple):
+    """One known interaction between a canonical drug pair."""
+    drug1_id: UUID
+    drug2_id: UUID
+    drug1_name: str
+    drug2_name: str
+    interaction_type: str
+    severity: str
+    mechanism: str
+    clinical_effect: str
+    management_strategy: Optional[str]
+    monitoring_required: bool
+    alternative_drugs: Optional[List[str]]
+
+    @property
+    def severity_rank(self) -> int:
+        return SEVERITY_RANK.get(self.severity, 0)
+
+
+def canonical_pair(drug_a: UUID, drug_b: UUID) -> Tuple[UUID, UUID]:
+    """Order a drug pair so (a, b) and (b, a) share one key."""
+    return (drug_a, drug_b) if drug_a <= drug_b else (drug_b, drug_a)
+
+
+class DrugInteractionIndex:
+    """Hash of canonical (min_id, max_id) pairs to interactions.
+
+    Checking n drugs costs n(n-1)/2 dictionary probes and no database
+    round trips. The index reloads itself when the drug_interactions
+    table version changes.
+    """
+
+    def __init__(self, poll_interval_seconds: float = 30.0):
+        self.poll_interval_seconds = poll_interval_seconds
+        self.pairs: Dict[Tuple[UUID, UUID], List[InteractionEntry]] = {}
+        self.names: Dict[UUID, str] = {}
+        self.version: Optional[Tuple] = None
+        self.checked_at: float = 0.0
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def load(self, entries: Iterable[InteractionEntry]) -> None:
+        """Replace the index contents."""
+        pairs: Dict[Tuple[UUID, UUID], List[InteractionEntry]] = {}
+        names: Dict[UUID, str] = {}
+        for entry in entries:
+            pairs.setdefault(canonical_pair(entry.drug1_id, entry.drug2_id), []).append(entry)
+            names[entry.drug1_id] = entry.drug1_name
+            names[entry.drug2_id] = entry.drug2_name
+
+        # Swap in one assignment so concurrent readers never see a partial index
+        self.pairs, self.names = pairs, names
+
+    def lookup(self, drug_a: UUID, drug_b: UUID) -> List[InteractionEntry]:
+        """Interactions between two drugs, in either order."""
+        return self.pairs.get(canonical_pair(drug_a, drug_b), [])
+
+    def check(self, medicine_ids: List[UUID]) -> List[InteractionEntry]:
+        """All interactions among a set of drugs, most severe first."""
+        unique_ids = list(dict.fromkeys(medicine_ids))
+        pairs = self.pairs
+        found: List[InteractionEntry] = []
+
+        for i, drug_a in enumerate(unique_ids):
+            for drug_b in unique_ids[i + 1:]:
+                entries = pairs.get(canonical_pair(drug_a, drug_b))
+                if entries:
+                    found.extend(entries)
+
+        found.sort(key=lambda entry: entry.severity_rank, reverse=True)
+        return found
+
+    def mark_stale(self) -> None:
+        """Record a local change; the next check reloads the index."""
+        self._stale = True
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Reload when marked stale or when the table version has moved."""
+        if not self._stale and time.monotonic() - self.checked_at < self.poll_interval_seconds:
+            return
+
+        async with self._lock:
+            if not self._stale and time.monotonic() - self.checked_at < self.poll_interval_seconds:
+                return
+
+            version = await self._get_table_version(db)
+            if self._stale or version != self.version:
+                self._stale = False
+                await self._reload(db)
+                self.version = version
+            self.checked_at = time.monotonic()
+
+    async def _get_table_version(self, db: AsyncSession) -> Tuple:
+        """Cheap change detector: row count plus latest update time."""
+        result = await db.execute(
+            select(func.count(DrugInteraction.id), func.max(DrugInteraction.updated_at))
+        )
+        return tuple(result.one())
+
+    async def _reload(self, db: AsyncSession) -> None:
+        started = time.perf_counter()
+        drug1, drug2 = aliased(Medicine), aliased(Medicine)
+        result = await db.execute(
+            select(
+                DrugInteraction.drug1_id,
+                DrugInteraction.drug2_id,
+                drug1.name,
+                drug2.name,
+                DrugInteraction.interaction_type,
+                DrugInteraction.severity,
+                DrugInteraction.mechanism,
+                DrugInteraction.clinical_effect,
+                DrugInteraction.management_strategy,
+                DrugInteraction.monitoring_required,
+                DrugInteraction.alternative_drugs
+            ).join(
+                drug1, DrugInteraction.drug1_id == drug1.id
+            ).join(
+                drug2, DrugInteraction.drug2_id == drug2.id
+            ).where(DrugInteraction.is_active == True)
+        )
+        self.load(
+            InteractionEntry(
+                row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8],
+                bool(row[9]), row[10]
+            )
+            for row in result.all()
+        )
+        logger.info(
+            f"Loaded {len(self.pairs)} drug interaction pairs "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+
+drug_interaction_index = DrugInteractionIndex(
+    poll_interval_seconds=settings.INTERACTION_INDEX_POLL_SECONDS
+)
+
+
+@event.listens_for(DrugInteraction, "after_insert")
+@event.listens_for(DrugInteraction, "after_update")
+@event.listens_for(DrugInteraction, "after_delete")
+def _on_interaction_change(mapper, connection, target) -> None:
+    drug_interaction_index.mark_stale()
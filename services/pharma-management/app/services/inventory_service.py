@@ -14,6 +14,7 @@ from app.schemas.inventory import InventoryUpdate, InventoryItemResponse, Invent
 from app.schemas.inventory import InventoryItemCreate, InventoryItemResponse, InventoryTransactionCreate
 from app.core.exceptions import MedicineNotFoundException, InsufficientStockException
 from app.services.audit_service import AuditService
+from app.services.availability_service import AvailabilityService
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ class InventoryService:
         self.transaction_repo = InventoryTransactionRepository(db)
         self.medicine_repo = MedicineRepository(db)
         self.audit_service = AuditService(db)
+        self.availability_service = AvailabilityService(db)
     
     async def add_medicine_batch(
         self, 
@@ -216,14 +218,34 @@ class InventoryService:
                 medicine_ids, pharmacy_id
             )
             
+            # Rank nearby pharmacies once for the whole basket
+            nearby = []
+            if latitude is not None and longitude is not None:
+                nearby = await self.availability_service.find_nearby_pharmacies(
+                    medicine_ids, latitude, longitude, radius_km, limit=None
+                )
+            
             availability_list = []
             for data in availability_data:
+                pharmacies = sorted(
+                    (
+                        {
+                            "pharmacy_id": str(match.pharmacy_id),
+                            "pharmacy_name": match.pharmacy_name,
+                            "distance_km": match.distance_km,
+                            "available": match.stock[data["medicine_id"]]
+                        }
+                        for match in nearby
+                        if data["medicine_id"] in match.stock
+                    ),
+                    key=lambda p: p["distance_km"]
+                )
                 availability = InventoryAvailability(
                     medicine_id=data["medicine_id"],
                     medicine_name=data["medicine_name"],
                     total_available=data["total_available"],
-                    pharmacies=[],  # Would be populated with nearby pharmacy data
-                    nearest_pharmacy=None  # Would be calculated based on location
+                    pharmacies=pharmacies,
+                    nearest_pharmacy=pharmacies[0] if pharmacies else None
                 )
                 availability_list.append(availability)
             
@@ -232,7 +254,7 @@ class InventoryService:
                 action="availability_check",
                 resource_type="inventory",
                 description=f"Checked availability for {len(medicine_ids)} medicines",
-                metadata={
+                extra_data={
                     "medicine_ids": [str(id) for id in medicine_ids],
                     "pharmacy_id": str(pharmacy_id) if pharmacy_id else None
                 }
@@ -274,6 +296,26 @@ class InventoryService:
             logger.error(f"Error reserving medicines: {e}")
             raise
     
+    async def dispense_order(
+        self,
+        order_id: UUID,
+        pharmacy_id: UUID,
+        medicine_quantities: List[dict],
+        reference_number: Optional[str],
+        order_values: dict
+    ) -> bool:
+        """Dispense an order's reserved medicines, FEFO, together with its status update."""
+        try:
+            dispensed = await self.inventory_repo.dispense_order(
+                order_id, pharmacy_id, medicine_quantities, reference_number, order_values
+            )
+            if dispensed:
+                logger.info(f"Dispensed reserved medicines of order {order_id} at pharmacy {pharmacy_id}")
+            return dispensed
+        except Exception as e:
+            logger.error(f"Error dispensing order {order_id}: {e}")
+            raise
+    
     async def _rollback_reservations(
         self, 
         pharmacy_id: UUID, 
@@ -454,14 +496,22 @@ class InventoryService:
             else:
                 raise ValueError(f"Invalid transaction type: {transaction_data.transaction_type}")
             
-            # Update stock
-            await self.inventory_repo.update_stock(
-                pharmacy_id=inventory_item.pharmacy_id,
-                medicine_id=inventory_item.medicine_id,
-                quantity_change=quantity_change,
-                transaction_type=transaction_data.transaction_type,
-                reference_number=transaction_data.reference_number
-            )
+            # Update stock; sales come off the earliest-expiring batches
+            if transaction_data.transaction_type == "sale":
+                await self.inventory_repo.dispense_stock(
+                    pharmacy_id=inventory_item.pharmacy_id,
+                    medicine_id=inventory_item.medicine_id,
+                    quantity=transaction_data.quantity,
+                    reference_number=transaction_data.reference_number
+                )
+            else:
+                await self.inventory_repo.update_stock(
+                    pharmacy_id=inventory_item.pharmacy_id,
+                    medicine_id=inventory_item.medicine_id,
+                    quantity_change=quantity_change,
+                    transaction_type=transaction_data.transaction_type,
+                    reference_number=transaction_data.reference_number
+                )
             
             # Get updated inventory item
             updated_item = await self.inventory_repo.get_by_id(transaction_data.inventory_item_id)
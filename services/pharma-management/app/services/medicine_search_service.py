@@ -0,0 +1,215 @@
+"""
+Medicine type-ahead search backed by an in-memory prefix trie
+"""
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.medicine import Medicine
+from app.repositories.medicine_repository import MedicineRepository, normalize_search_text
+from app.schemas.medicine import MedicineSuggestion
+
+logger = logging.getLogger(__name__)
+
+
+class _TrieNode:
+    __slots__ = ("children", "top", "ends")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[Tuple[UUID, str]] = []
+        # Every medicine with a word ending here, for multi-word filtering
+        self.ends: List[Tuple[UUID, str]] = []
+
+
+class MedicinePrefixTrie:
+    """Prefix trie over medicine name tokens.
+
+    Every node keeps the best ``max_suggestions`` medicines reachable below
+    it, so a lookup costs one walk of the prefix and no subtree traversal.
+    """
+
+    def __init__(self, max_suggestions: int = 10, max_depth: int = 16):
+        self.max_suggestions = max_suggestions
+        self.max_depth = max_depth
+        self.root = _TrieNode()
+        self.size = 0
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable[Tuple[UUID, str, Optional[str], Optional[str]]],
+        max_suggestions: int = 10,
+        max_depth: int = 16
+    ) -> "MedicinePrefixTrie":
+        """Build a trie from (id, name, generic_name, brand_name) rows."""
+        trie = cls(max_suggestions, max_depth)
+        # Inserting in rank order lets each node simply keep the first k
+        # medicines it sees instead of maintaining a sorted list.
+        ranked = sorted(rows, key=lambda row: (len(row[1]), row[1].lower()))
+        for medicine_id, name, generic_name, brand_name in ranked:
+            trie.insert(medicine_id, name, (name, generic_name, brand_name))
+        return trie
+
+    def insert(self, medicine_id: UUID, display_name: str, terms: Iterable[Optional[str]]) -> None:
+        """Index every word of the given terms for one medicine."""
+        entry = (medicine_id, display_name)
+        tokens = {
+            token
+            for term in terms if term
+            for token in normalize_search_text(term).split()
+        }
+        for token in tokens:
+            node = self.root
+            for char in token[:self.max_depth]:
+                node = node.children.setdefault(char, _TrieNode())
+                if len(node.top) < self.max_suggestions and entry not in node.top:
+                    node.top.append(entry)
+            node.ends.append(entry)
+        self.size += 1
+
+    def search(self, prefix: str, limit: int = 10) -> List[Tuple[UUID, str]]:
+        """Return up to ``limit`` medicines with a word starting with prefix."""
+        words = normalize_search_text(prefix).split()
+        if not words:
+            return []
+
+        # Match the last word as a prefix; earlier words filter by display name
+        node = self.root
+        for char in words[-1][:self.max_depth]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        if len(words) == 1:
+            return node.top[:limit]
+
+        # node.top is already cut to max_suggestions, so filtering it could
+        # drop matches ranked further down; filter the whole subtree instead
+        leading = words[:-1]
+        matches = [m for m in self._entries_below(node) if all(w in m[1].lower() for w in leading)]
+        matches.sort(key=lambda m: (len(m[1]), m[1].lower()))
+        return matches[:limit]
+
+    @staticmethod
+    def _entries_below(node: _TrieNode) -> List[Tuple[UUID, str]]:
+        """Every medicine reachable from node, once each."""
+        seen = {}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for entry in current.ends:
+                seen.setdefault(entry[0], entry)
+            stack.extend(current.children.values())
+        return list(seen.values())
+
+
+class MedicineSearchIndex:
+    """Process-wide type-ahead index, rebuilt on catalogue change events.
+
+    Only the very first lookup waits for a build. After that a stale or
+    aged trie keeps serving while a background task rebuilds it on its own
+    session, so no search request pays for a rebuild.
+    """
+
+    def __init__(self, max_age_seconds: float, max_suggestions: int, session_factory=AsyncSessionLocal):
+        self.max_age_seconds = max_age_seconds
+        self.max_suggestions = max_suggestions
+        self.session_factory = session_factory
+        self.trie: Optional[MedicinePrefixTrie] = None
+        self.built_at: float = 0.0
+        self._stale = True
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def mark_stale(self) -> None:
+        """Record a catalogue change; the next lookup schedules a rebuild."""
+        self._stale = True
+
+    @property
+    def needs_rebuild(self) -> bool:
+        # Age-based refresh picks up writes made by other replicas
+        return (
+            self.trie is None
+            or self._stale
+            or time.monotonic() - self.built_at > self.max_age_seconds
+        )
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Reload medicine names and rebuild the trie off the event loop."""
+        async with self._lock:
+            if not self.needs_rebuild:
+                return
+
+            # Cleared before loading so a change made mid-rebuild is not lost
+            self._stale = False
+            started = time.perf_counter()
+            rows = await MedicineRepository(db).get_search_terms()
+            loop = asyncio.get_running_loop()
+            self.trie = await loop.run_in_executor(
+                None, MedicinePrefixTrie.build, rows, self.max_suggestions
+            )
+            self.built_at = time.monotonic()
+
+            logger.info(
+                f"Rebuilt medicine search trie with {len(rows)} medicines "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+
+    def schedule_rebuild(self) -> None:
+        """Start a background rebuild unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            async with self.session_factory() as db:
+                await self.rebuild(db)
+        except Exception as e:
+            # The current trie keeps serving; the next lookup tries again
+            self._stale = True
+            logger.error(f"Error rebuilding medicine search trie: {e}")
+
+    async def suggest(self, db: AsyncSession, prefix: str, limit: int = 10) -> List[Tuple[UUID, str]]:
+        """Return type-ahead suggestions, refreshing the trie in the background."""
+        if self.trie is None:
+            await self.rebuild(db)
+        elif self.needs_rebuild:
+            self.schedule_rebuild()
+        return self.trie.search(prefix, limit)
+
+
+medicine_search_index = MedicineSearchIndex(
+    max_age_seconds=settings.MEDICINE_TRIE_MAX_AGE_SECONDS,
+    max_suggestions=settings.MEDICINE_TRIE_MAX_SUGGESTIONS
+)
+
+
+@event.listens_for(Medicine, "after_insert")
+@event.listens_for(Medicine, "after_update")
+@event.listens_for(Medicine, "after_delete")
+def _on_medicine_change(mapper, connection, target) -> None:
+    medicine_search_index.mark_stale()
+
+
+class MedicineSearchService:
+    """Service for medicine type-ahead suggestions."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def suggest(self, prefix: str, limit: int = 10) -> List[MedicineSuggestion]:
+        """Suggest medicines whose name, generic or brand starts with prefix."""
+        try:
+            matches = await medicine_search_index.suggest(self.db, prefix, limit)
+            return [MedicineSuggestion(id=medicine_id, name=name) for medicine_id, name in matches]
+        except Exception as e:
+            logger.error(f"Error suggesting medicines for prefix {prefix}: {e}")
+            raise
@@ -3,17 +3,23 @@ Medicine business logic service
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import date
 from uuid import UUID
 import logging
 
-from app.repositories.medicine_repository import MedicineRepository, MedicineBatchRepository
-from app.schemas.medicine import MedicineResponse, MedicineAlternatives
+from app.repositories.medicine_repository import (
+    MedicineRepository, MedicineBatchRepository, MedicineEquivalenceGroupRepository
+)
+from app.schemas.medicine import MedicineResponse, MedicineAlternatives, AlternativeMedicineResponse
 from app.core.exceptions import MedicineNotFoundException
 from app.services.audit_service import AuditService
+from app.services.medicine_search_service import medicine_search_index
 
 logger = logging.getLogger(__name__)
 
+EQUIVALENCE_FIELDS = {"active_ingredients", "strength", "dosage_form"}
+
 
 class MedicineService:
     """Service for medicine operations."""
@@ -22,6 +28,7 @@ class MedicineService:
         self.db = db
         self.medicine_repo = MedicineRepository(db)
         self.batch_repo = MedicineBatchRepository(db)
+        self.equivalence_repo = MedicineEquivalenceGroupRepository(db)
         self.audit_service = AuditService(db)
     
     async def search_medicines(self, query: str, limit: int = 20) -> List[MedicineResponse]:
@@ -54,32 +61,65 @@ class MedicineService:
             logger.error(f"Error getting medicine {medicine_id}: {e}")
             raise
     
+    async def update_medicine(self, medicine_id: UUID, update_data: dict) -> MedicineResponse:
+        """Update a medicine, regrouping it when its composition changes."""
+        try:
+            medicine = await self.medicine_repo.update(medicine_id, update_data)
+            if not medicine:
+                raise MedicineNotFoundException(str(medicine_id))
+            
+            # The repository update is a Core statement, which mapper events
+            # do not see; renames and deactivations must leave the trie now
+            medicine_search_index.mark_stale()
+            
+            # Salts, strength and form make up the equivalence key
+            if EQUIVALENCE_FIELDS & update_data.keys() or medicine.equivalence_group_id is None:
+                await self.equivalence_repo.assign_group(medicine)
+            
+            await self.audit_service.log_action(
+                action="medicine_updated",
+                resource_type="medicine",
+                resource_id=medicine.id,
+                description=f"Updated medicine: {medicine.name}",
+                extra_data={"fields": sorted(update_data.keys())}
+            )
+            
+            logger.info(f"Updated medicine: {medicine.name}")
+            return MedicineResponse.from_orm(medicine)
+        except Exception as e:
+            logger.error(f"Error updating medicine {medicine_id}: {e}")
+            raise
+    
     async def get_alternatives(
         self, 
         medicine_id: UUID, 
         include_generic: bool = True, 
-        include_brand: bool = True
+        include_brand: bool = True,
+        pharmacy_id: Optional[UUID] = None
     ) -> MedicineAlternatives:
-        """Get alternative medicines."""
+        """Get alternative medicines with their available stock."""
         try:
-            # Get base medicine
-            base_medicine = await self.medicine_repo.get_by_id(medicine_id)
-            if not base_medicine:
-                raise MedicineNotFoundException(str(medicine_id))
-            
-            # Get alternatives
+            # Base medicine, alternatives and stock come back in one query
             alternatives_data = await self.medicine_repo.get_alternatives(
-                medicine_id, include_generic, include_brand
+                medicine_id, include_generic, include_brand, pharmacy_id
             )
+            base_medicine = alternatives_data["medicine"]
+            if base_medicine.equivalence_group_id is None:
+                # Not grouped yet (written outside create/update); group it now
+                await self.equivalence_repo.assign_group(base_medicine)
+                alternatives_data = await self.medicine_repo.get_alternatives(
+                    medicine_id, include_generic, include_brand, pharmacy_id
+                )
+                base_medicine = alternatives_data["medicine"]
             
             # Convert to response format
             generic_alternatives = [
-                MedicineResponse.from_orm(med) 
-                for med in alternatives_data["generic_alternatives"]
+                self._to_alternative_response(entry)
+                for entry in alternatives_data["generic_alternatives"]
             ]
             brand_alternatives = [
-                MedicineResponse.from_orm(med) 
-                for med in alternatives_data["brand_alternatives"]
+                self._to_alternative_response(entry)
+                for entry in alternatives_data["brand_alternatives"]
             ]
             
             total_alternatives = len(generic_alternatives) + len(brand_alternatives)
@@ -107,6 +147,12 @@ class MedicineService:
             logger.error(f"Error getting alternatives for medicine {medicine_id}: {e}")
             raise
     
+    def _to_alternative_response(self, entry: dict) -> AlternativeMedicineResponse:
+        """Convert an alternatives row to a response with stock."""
+        response = AlternativeMedicineResponse.from_orm(entry["medicine"])
+        response.available_stock = entry["available_stock"]
+        return response
+    
     async def check_drug_interactions(self, medicine_ids: List[UUID]) -> dict:
         """Check for drug interactions between medicines."""
         try:
@@ -133,23 +179,24 @@ class MedicineService:
             logger.error(f"Error checking drug interactions: {e}")
             raise
     
-    async def get_expiring_medicines(self, days: int = 30) -> List[dict]:
+    async def get_expiring_medicines(self, days: int = 30, pharmacy_id: Optional[UUID] = None) -> List[dict]:
         """Get medicines with batches expiring soon."""
         try:
-            expiring_batches = await self.batch_repo.get_expiring_batches(days)
-            
-            expiring_medicines = []
-            for batch in expiring_batches:
-                medicine = await self.medicine_repo.get_by_id(batch.medicine_id)
-                if medicine:
-                    expiring_medicines.append({
-                        "medicine_id": medicine.id,
-                        "medicine_name": medicine.name,
-                        "batch_number": batch.batch_number,
-                        "expiry_date": batch.expiry_date,
-                        "days_to_expiry": batch.days_to_expiry,
-                        "quantity": batch.current_quantity
-                    })
+            today = date.today()
+            expiring_stock = await self.batch_repo.get_expiring_stock(days, pharmacy_id)
+            
+            expiring_medicines = [
+                {
+                    "medicine_id": row["medicine_id"],
+                    "medicine_name": row["medicine_name"],
+                    "pharmacy_id": row["pharmacy_id"],
+                    "batch_number": row["batch_number"],
+                    "expiry_date": row["expiry_date"],
+                    "days_to_expiry": (row["expiry_date"] - today).days,
+                    "quantity": row["current_quantity"]
+                }
+                for row in expiring_stock
+            ]
             
             logger.info(f"Found {len(expiring_medicines)} expiring medicines")
             return expiring_medicines
@@ -163,6 +210,9 @@ class MedicineService:
             # Create medicine
             medicine = await self.medicine_repo.create(medicine_data)
             
+            # Materialize the substitute group used by alternatives lookups
+            await self.equivalence_repo.assign_group(medicine)
+            
             # Log audit trail
             await self.audit_service.log_action(
                 action="medicine_created",
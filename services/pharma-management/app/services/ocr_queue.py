@@ -0,0 +1,333 @@
+"""
+Shared OCR job queue and worker service
+"""
+
+from sqlalchemy import update
+from typing import Any, Dict, List, NamedTuple, Optional
+from datetime import datetime
+from uuid import UUID, uuid4
+import asyncio
+import json
+import logging
+import time
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.exceptions import OCRQueueFullException
+from app.db.session import AsyncSessionLocal
+from app.integrations.ocr.prescription_ocr import PrescriptionOCR
+from app.models.prescription import Prescription, PrescriptionStatusEnum
+from app.services.audit_service import AuditService
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+# Priority dominates the score; enqueue time (ms) keeps FIFO order within it
+_PRIORITY_WEIGHT = 10 ** 13
+
+# Pops up to ARGV[1] jobs from KEYS[1] and leases them in KEYS[2] until
+# ARGV[2], in one step: no job is ever out of both sets
+_LEASE_SCRIPT = """
+local popped = redis.call('ZPOPMIN', KEYS[1], ARGV[1])
+local members = {}
+for i = 1, #popped, 2 do
+    redis.call('ZADD', KEYS[2], ARGV[2], popped[i])
+    members[#members + 1] = popped[i]
+end
+return members
+"""
+
+
+class OCRJob(NamedTuple):
+    """One prescription image waiting for OCR."""
+    job_id: str
+    prescription_id: str
+    image_path: str
+    priority: int
+    enqueued_at: float
+    attempts: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(self._asdict())
+
+    @classmethod
+    def from_json(cls, payload: str) -> "OCRJob":
+        return cls(**json.loads(payload))
+
+
+def job_score(priority: int, enqueued_at: float) -> float:
+    """Sorted-set score; lower scores are popped first."""
+    return priority * _PRIORITY_WEIGHT + int(enqueued_at * 1000)
+
+
+class OCRJobQueue:
+    """Bounded priority queue of OCR jobs in a Redis sorted set.
+
+    API replicas and Celery tasks only enqueue; the OCR worker service is
+    the single consumer, so bursts queue up instead of stalling requests.
+    Popped jobs are leased: they sit in ``<key>:inflight`` scored by their
+    lease deadline until acked, and are requeued when released or expired.
+    Every push also leaves a token in ``<key>:signal``, the list an idle
+    consumer blocks on, since the atomic pop itself cannot block.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        key: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.redis = redis_client
+        self.key = key or settings.OCR_QUEUE_KEY
+        self.inflight_key = f"{self.key}:inflight"
+        self.signal_key = f"{self.key}:signal"
+        self.max_depth = max_depth or settings.OCR_QUEUE_MAX_DEPTH
+        self.lease_seconds = lease_seconds or settings.OCR_JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.OCR_JOB_MAX_ATTEMPTS
+        self._lease_script = redis_client.register_script(_LEASE_SCRIPT)
+
+    async def enqueue(
+        self,
+        prescription_id: UUID,
+        image_path: str,
+        priority: int = PRIORITY_NORMAL
+    ) -> OCRJob:
+        """Add a job, rejecting it when the queue is at capacity."""
+        await self.ensure_capacity()
+
+        job = OCRJob(uuid4().hex, str(prescription_id), image_path, priority, time.time())
+        await self._push(job)
+        return job
+
+    async def _push(self, job: OCRJob) -> None:
+        """Queue a job and wake a blocked consumer in one transaction."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.key, {job.to_json(): job_score(job.priority, job.enqueued_at)})
+            pipe.lpush(self.signal_key, 1)
+            # One token is enough to wake the consumer; keep the list bounded
+            pipe.ltrim(self.signal_key, 0, 0)
+            await pipe.execute()
+
+    async def ensure_capacity(self) -> None:
+        """Raise OCRQueueFullException when no more jobs are accepted."""
+        depth = await self.redis.zcard(self.key)
+        if depth >= self.max_depth:
+            raise OCRQueueFullException(depth)
+
+    async def pop_batch(self, max_jobs: int, timeout: float = 5.0) -> List[OCRJob]:
+        """Take up to max_jobs jobs, waiting up to timeout when the queue is empty.
+
+        The jobs are leased, not removed: ack() them once their results are
+        stored, or release() them when processing failed. Popping and
+        leasing happen in one script, so a crash cannot lose a job.
+        """
+        members = await self._lease(max_jobs)
+        if not members:
+            # A token pushed after the empty lease wakes us; a stale one
+            # only costs an empty batch
+            await self.redis.blpop([self.signal_key], timeout=timeout)
+            members = await self._lease(max_jobs)
+        return [OCRJob.from_json(member) for member in members]
+
+    async def _lease(self, max_jobs: int) -> List[str]:
+        return await self._lease_script(
+            keys=[self.key, self.inflight_key],
+            args=[max_jobs, time.time() + self.lease_seconds]
+        )
+
+    async def ack(self, jobs: List[OCRJob]) -> None:
+        """Drop finished jobs from the in-flight set."""
+        if jobs:
+            await self.redis.zrem(self.inflight_key, *[job.to_json() for job in jobs])
+
+    async def release(self, jobs: List[OCRJob]) -> List[OCRJob]:
+        """Requeue leased jobs that failed, at their original position.
+
+        Jobs that used up max_attempts stay leased for another lease period
+        and are returned; the caller records them as failed and acks them.
+        """
+        exhausted = []
+        for job in jobs:
+            member = job.to_json()
+            if job.attempts + 1 >= self.max_attempts:
+                exhausted.append(job)
+                await self.redis.zadd(self.inflight_key, {member: time.time() + self.lease_seconds}, xx=True)
+                continue
+            # Only whoever removes the lease requeues, so a job is never doubled
+            if await self.redis.zrem(self.inflight_key, member):
+                await self._push(job._replace(attempts=job.attempts + 1))
+        return exhausted
+
+    async def expired(self, now: Optional[float] = None) -> List[OCRJob]:
+        """Leased jobs whose worker did not ack or release them in time."""
+        members = await self.redis.zrangebyscore(self.inflight_key, "-inf", now or time.time())
+        return [OCRJob.from_json(member) for member in members]
+
+    async def depth(self) -> int:
+        """Number of jobs waiting."""
+        return await self.redis.zcard(self.key)
+
+
+_queue: Optional[OCRJobQueue] = None
+
+
+def get_ocr_queue() -> OCRJobQueue:
+    """Process-wide queue client for producers."""
+    global _queue
+    if _queue is None:
+        _queue = OCRJobQueue(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+    return _queue
+
+
+class OCRWorkerService:
+    """Consumes OCR jobs in batches on a warm process pool.
+
+    Each batch is marked processing, recognized in one pool round trip per
+    worker process, written back to the prescription rows in one
+    transaction and announced on the OCR events channel. A batch is acked
+    only after its results are stored; a failed batch is released back to
+    the queue, and jobs out of attempts are stored as rejected.
+    """
+
+    def __init__(
+        self,
+        queue: OCRJobQueue,
+        ocr: Optional[PrescriptionOCR] = None,
+        session_factory=AsyncSessionLocal,
+        batch_size: Optional[int] = None,
+        channel: Optional[str] = None
+    ):
+        self.queue = queue
+        self.ocr = ocr or PrescriptionOCR()
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.OCR_BATCH_SIZE
+        self.channel = channel or settings.OCR_EVENTS_CHANNEL
+        self._stopping = False
+
+    async def run_forever(self, poll_timeout: float = 5.0) -> None:
+        """Process batches until stop() is called."""
+        logger.info(f"OCR worker consuming {self.queue.key} in batches of {self.batch_size}")
+        while not self._stopping:
+            try:
+                await self.run_once(poll_timeout)
+            except Exception as e:
+                logger.error(f"OCR worker batch failed: {e}")
+                await asyncio.sleep(1)
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    async def run_once(self, poll_timeout: float = 5.0) -> int:
+        """Process one batch; returns the number of jobs handled."""
+        await self.recover_expired()
+        jobs = await self.queue.pop_batch(self.batch_size, poll_timeout)
+        if not jobs:
+            return 0
+
+        try:
+            await self._mark_processing(jobs)
+            results = await self.ocr.process_prescription_images([job.image_path for job in jobs])
+            await self._store_results(jobs, results)
+        except Exception as e:
+            await self._give_up(await self.queue.release(jobs), e)
+            raise
+        await self.queue.ack(jobs)
+        await self._publish(jobs, results, time.time())
+        return len(jobs)
+
+    async def recover_expired(self) -> int:
+        """Requeue jobs whose lease ran out, e.g. after a worker crash."""
+        jobs = await self.queue.expired()
+        if jobs:
+            logger.warning(f"Requeueing {len(jobs)} OCR jobs with expired leases")
+            await self._give_up(await self.queue.release(jobs), "lease expired")
+        return len(jobs)
+
+    async def _give_up(self, jobs: List[OCRJob], error: Any) -> None:
+        """Reject prescriptions whose jobs failed max_attempts times."""
+        if not jobs:
+            return
+        results = [
+            {"success": False, "error": f"gave up after {job.attempts + 1} attempts ({error})"}
+            for job in jobs
+        ]
+        try:
+            await self._store_results(jobs, results)
+        except Exception as e:
+            # Still leased, so the next expiry sweep tries again
+            logger.error(f"Error rejecting {len(jobs)} failed OCR jobs: {e}")
+            return
+        await self.queue.ack(jobs)
+        await self._publish(jobs, results, time.time())
+
+    @staticmethod
+    def resolve_status(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Prescription column values for one OCR result."""
+        if not result.get("success"):
+            return {
+                "status": PrescriptionStatusEnum.REJECTED.value,
+                "validation_notes": f"OCR failed: {result.get('error')}"
+            }
+
+        values = {
+            "ocr_text": result.get("text", ""),
+            "ocr_confidence": result.get("confidence", 0),
+            "ocr_processed_at": datetime.utcnow(),
+        }
+        if result.get("confidence", 0) >= settings.OCR_CONFIDENCE_THRESHOLD:
+            values["status"] = PrescriptionStatusEnum.VALIDATED.value
+        else:
+            values["status"] = PrescriptionStatusEnum.REJECTED.value
+            values["validation_notes"] = "Low OCR confidence"
+        return values
+
+    async def _mark_processing(self, jobs: List[OCRJob]) -> None:
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Prescription)
+                .where(Prescription.id.in_([UUID(job.prescription_id) for job in jobs]))
+                .values(status=PrescriptionStatusEnum.PROCESSING.value)
+            )
+            await db.commit()
+
+    async def _store_results(self, jobs: List[OCRJob], results: List[Dict[str, Any]]) -> None:
+        async with self.session_factory() as db:
+            audit_entries = []
+            for job, result in zip(jobs, results):
+                prescription_id = UUID(job.prescription_id)
+                await db.execute(
+                    update(Prescription)
+                    .where(Prescription.id == prescription_id)
+                    .values(**self.resolve_status(result))
+                )
+                audit_entries.append({
+                    "action": "prescription_ocr_processed",
+                    "resource_type": "prescription",
+                    "resource_id": prescription_id,
+                    "description": f"OCR processed with {result.get('confidence', 0)}% confidence",
+                    "extra_data": {
+                        "confidence": result.get("confidence", 0),
+                        "success": result.get("success", False),
+                        "wait_seconds": round(time.time() - job.enqueued_at, 3)
+                    }
+                })
+            # log_actions commits the row updates together with the audit trail
+            await AuditService(db).log_actions(audit_entries)
+
+    async def _publish(self, jobs: List[OCRJob], results: List[Dict[str, Any]], finished_at: float) -> None:
+        async with self.queue.redis.pipeline(transaction=False) as pipe:
+            for job, result in zip(jobs, results):
+                pipe.publish(self.channel, json.dumps({
+                    "prescription_id": job.prescription_id,
+                    "status": self.resolve_status(result)["status"],
+                    "confidence": result.get("confidence", 0),
+                    "priority": job.priority,
+                    "wait_seconds": round(finished_at - job.enqueued_at, 3)
+                }))
+            await pipe.execute()
@@ -8,18 +8,23 @@ from typing import List, Optional
 from uuid import UUID
 import logging
 from datetime import datetime
-import uuid
 
 from app.models.order import Order, OrderItem, OrderStatusEnum
+from app.models.medicine import Medicine
 from app.models.prescription import Prescription
 from app.repositories.base_repository import BaseRepository
 from app.schemas.order import OrderCreate, OrderResponse, OrderStatusUpdate, OrderList
 from app.core.exceptions import OrderNotFoundException, PrescriptionNotFoundException
 from app.services.audit_service import AuditService
+from app.services.document_number_service import DocumentTypeEnum, document_number_allocator
 from app.services.inventory_service import InventoryService
+from app.services.tax_engine import TaxLine, tax_engine
 
 logger = logging.getLogger(__name__)
 
+# Statuses in which an order's medicines have left the pharmacy
+FULFILLED_STATUSES = {OrderStatusEnum.DISPATCHED.value, OrderStatusEnum.DELIVERED.value}
+
 
 class OrderService:
     """Service for order management operations."""
@@ -45,10 +50,24 @@ class OrderService:
             # Generate order number
             order_number = await self._generate_order_number(order_data.pharmacy_id)
             
-            # Calculate totals
-            subtotal = sum(item.unit_price * item.quantity for item in order_data.items)
-            tax_amount = subtotal * 0.18  # 18% GST
-            total_amount = subtotal + tax_amount
+            # Calculate totals, taxing each medicine at its HSN code's GST rate
+            hsn_result = await self.db.execute(
+                select(Medicine.id, Medicine.hsn_code).where(
+                    Medicine.id.in_({item.medicine_id for item in order_data.items})
+                )
+            )
+            hsn_codes = dict(hsn_result.all())
+            taxes = tax_engine.compute([
+                TaxLine(
+                    unit_price=item.unit_price,
+                    quantity=item.quantity,
+                    hsn_code=hsn_codes.get(item.medicine_id)
+                )
+                for item in order_data.items
+            ], itemize=False)
+            subtotal = taxes.subtotal
+            tax_amount = taxes.tax_amount
+            total_amount = taxes.total_amount
             
             # Create order
             order_dict = {
@@ -192,7 +211,22 @@ class OrderService:
             if status_update.status == "ready":
                 update_data["actual_ready_time"] = datetime.utcnow()
             
-            updated_order = await self.order_repo.update(order_id, update_data)
+            if status_update.status in FULFILLED_STATUSES:
+                # Reserved stock leaves the shelf in the same commit as the
+                # status; an order already dispensed is not dispensed again
+                order_items = await self.order_item_repo.get_multi(filters={"order_id": order_id})
+                await self.inventory_service.dispense_order(
+                    order_id,
+                    order.pharmacy_id,
+                    [
+                        {"medicine_id": item.medicine_id, "quantity": item.quantity_ordered}
+                        for item in order_items
+                    ],
+                    order.order_number,
+                    update_data
+                )
+            else:
+                await self.order_repo.update(order_id, update_data)
             
             # Log audit trail
             await self.audit_service.log_order_action(
@@ -253,10 +287,4 @@ class OrderService:
     
     async def _generate_order_number(self, pharmacy_id: UUID) -> str:
         """Generate unique order number."""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            order_number = f"ORD-{str(pharmacy_id)[:8].upper()}-{timestamp}"
-            return order_number
-        except Exception as e:
-            logger.error(f"Error generating order number: {e}")
-            return f"ORD-{str(uuid.uuid4())[:8].upper()}"
\ No newline at end of file
+        return await document_number_allocator.next_number(DocumentTypeEnum.ORDER, pharmacy_id)
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Set-based sweep of expired prescriptions
+"""
+
+from sqlalchemy import select, update, and_, func, bindparam
+from typing import Any, Dict, List, Optional
+from datetime import date
+from uuid import UUID
+import json
+import logging
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.prescription import Prescription, PrescriptionStatusEnum
+from app.services.audit_service import AuditService
+
+logger = logging.getLogger(__name__)
+
+# Statuses a prescription can expire from
+SWEEPABLE_STATUSES = [
+    PrescriptionStatusEnum.UPLOADED.value,
+    PrescriptionStatusEnum.PROCESSING.value,
+    PrescriptionStatusEnum.VALIDATED.value,
+]
+
+
+def expire_batch_statement(today: date, after_id: Optional[UUID], batch_size: int):
+    """UPDATE ... RETURNING for the next batch of expired prescriptions.
+
+    Rows are claimed in id order with FOR UPDATE SKIP LOCKED, so a row
+    being edited by a request is left for the next sweep instead of
+    blocking this one.
+    """
+    conditions = [
+        Prescription.expiry_date < today,
+        # Rendered inline so the planner can match ix_prescriptions_open_id_expiry
+        Prescription.status.in_(
+            bindparam("sweepable_statuses", SWEEPABLE_STATUSES, expanding=True, literal_execute=True)
+        ),
+    ]
+    if after_id is not None:
+        conditions.append(Prescription.id > after_id)
+
+    batch = (
+        select(Prescription.id)
+        .where(and_(*conditions))
+        .order_by(Prescription.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("expiring")
+    )
+    return (
+        update(Prescription)
+        .where(Prescription.id == batch.c.id)
+        .values(status=PrescriptionStatusEnum.EXPIRED.value, updated_at=func.now())
+        .returning(Prescription.id, Prescription.pharmacy_id, Prescription.expiry_date)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class SweepCheckpoint:
+    """Progress of one day's sweep, kept in Redis so a killed sweep resumes."""
+
+    def __init__(self, redis_client, key: Optional[str] = None, ttl_seconds: int = 2 * 86400):
+        self.redis = redis_client
+        self.key = key or settings.PRESCRIPTION_EXPIRY_CHECKPOINT_KEY
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, today: date) -> str:
+        return f"{self.key}:{today.isoformat()}"
+
+    async def load(self, today: date) -> Dict[str, Any]:
+        payload = await self.redis.get(self._key(today))
+        if not payload:
+            return {"after_id": None, "updated_count": 0}
+        state = json.loads(payload)
+        return {
+            "after_id": UUID(state["after_id"]) if state["after_id"] else None,
+            "updated_count": state["updated_count"],
+        }
+
+    async def save(self, today: date, after_id: UUID, updated_count: int) -> None:
+        await self.redis.set(
+            self._key(today),
+            json.dumps({"after_id": str(after_id), "updated_count": updated_count}),
+            ex=self.ttl_seconds
+        )
+
+    async def clear(self, today: date) -> None:
+        await self.redis.delete(self._key(today))
+
+
+class ExpiredPrescriptionSweeper:
+    """Expires overdue prescriptions in chunks.
+
+    Each chunk is one transaction: a single UPDATE ... RETURNING flips up to
+    ``batch_size`` rows to expired and the matching audit rows are inserted
+    in the same commit. The last id of every committed chunk is
+    checkpointed, so a sweep interrupted part way resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: Optional[int] = None,
+        checkpoint: Optional[SweepCheckpoint] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.PRESCRIPTION_EXPIRY_BATCH_SIZE
+        self.checkpoint = checkpoint
+
+    async def sweep(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """Expire every overdue prescription; returns counts for this day's sweep."""
+        today = today or date.today()
+        state = {"after_id": None, "updated_count": 0}
+        if self.checkpoint:
+            state = await self.checkpoint.load(today)
+            if state["after_id"]:
+                logger.info(f"Resuming prescription expiry sweep after {state['after_id']}")
+
+        after_id, updated_count, batches = state["after_id"], state["updated_count"], 0
+        while True:
+            expired = await self.expire_batch(today, after_id)
+            if not expired:
+                break
+
+            batches += 1
+            updated_count += len(expired)
+            after_id = max(row["id"] for row in expired)
+            if self.checkpoint:
+                await self.checkpoint.save(today, after_id, updated_count)
+            if len(expired) < self.batch_size:
+                break
+
+        if self.checkpoint:
+            await self.checkpoint.clear(today)
+
+        logger.info(f"Updated {updated_count} expired prescriptions in {batches} batches")
+        return {"success": True, "updated_count": updated_count, "batches": batches}
+
+    async def expire_batch(self, today: date, after_id: Optional[UUID]) -> List[Dict[str, Any]]:
+        """Expire one chunk and write its audit rows in the same transaction."""
+        async with self.session_factory() as db:
+            try:
+                result = await db.execute(expire_batch_statement(today, after_id, self.batch_size))
+                expired = [dict(row._mapping) for row in result.all()]
+                if not expired:
+                    await db.rollback()
+                    return []
+
+                # log_actions commits the status updates together with the audit trail
+                await AuditService(db).log_actions([
+                    {
+                        "action": "prescription_expired",
+                        "resource_type": "prescription",
+                        "resource_id": row["id"],
+                        "pharmacy_id": row["pharmacy_id"],
+                        "description": f"Prescription expired on {row['expiry_date']}"
+                    }
+                    for row in expired
+                ])
+                return expired
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Error expiring prescription batch after {after_id}: {e}")
+                raise
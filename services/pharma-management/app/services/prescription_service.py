@@ -11,12 +11,12 @@ from datetime import datetime
 import uuid
 import os
 
-from app.models.prescription import Prescription, PrescriptionItem
+from app.models.prescription import Prescription, PrescriptionItem, PrescriptionStatusEnum
 from app.repositories.base_repository import BaseRepository
 from app.schemas.prescription import PrescriptionResponse, PrescriptionValidation
 from app.core.exceptions import PrescriptionNotFoundException
 from app.services.audit_service import AuditService
-# from app.tasks.prescription_tasks import process_prescription_ocr
+from app.services.ocr_queue import PRIORITY_NORMAL, get_ocr_queue
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -36,7 +36,8 @@ class PrescriptionService:
         patient_id: UUID, 
         doctor_id: UUID, 
         pharmacy_id: UUID,
-        file: UploadFile
+        file: UploadFile,
+        priority: int = PRIORITY_NORMAL
     ) -> PrescriptionResponse:
         """Upload prescription image for OCR processing."""
         try:
@@ -47,6 +48,10 @@ class PrescriptionService:
             if file.size > settings.MAX_FILE_SIZE:
                 raise ValueError("File size exceeds maximum allowed size")
             
+            # Shed load before storing anything when the OCR backlog is full
+            ocr_queue = get_ocr_queue()
+            await ocr_queue.ensure_capacity()
+            
             # Generate prescription number
             prescription_number = await self._generate_prescription_number()
             
@@ -70,8 +75,18 @@ class PrescriptionService:
             
             prescription = await self.prescription_repo.create(prescription_dict)
             
-            # Start OCR processing in background
-            process_prescription_ocr.delay(str(prescription.id), file_path)
+            # Queue for the shared OCR worker; the result lands on the
+            # prescription row and the OCR events channel
+            try:
+                await ocr_queue.enqueue(prescription.id, file_path, priority)
+            except Exception as e:
+                # The row is already committed; without a job it would stay
+                # uploaded forever, so record that OCR never started
+                await self.prescription_repo.update(prescription.id, {
+                    "status": PrescriptionStatusEnum.REJECTED.value,
+                    "validation_notes": f"OCR could not be queued: {e}"
+                })
+                raise
             
             # Log audit trail
             await self.audit_service.log_prescription_action(
@@ -79,7 +94,7 @@ class PrescriptionService:
                 prescription_id=prescription.id,
                 pharmacy_id=pharmacy_id,
                 description=f"Uploaded prescription {prescription_number}",
-                metadata={
+                extra_data={
                     "prescription_number": prescription_number,
                     "file_name": file.filename,
                     "file_size": file.size
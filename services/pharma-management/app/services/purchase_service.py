@@ -6,13 +6,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 import logging
-from datetime import datetime, date
-import uuid
+from datetime import date
 
 from app.models.purchase import PurchaseOrder, PurchaseOrderItem, GoodsReceiptNote, GoodsReceiptNoteItem
 from app.repositories.base_repository import BaseRepository
+from app.repositories.inventory_repository import InventoryRepository
 from app.schemas.inventory import PurchaseOrderCreate, PurchaseOrderResponse, GRNCreate, GRNResponse
 from app.services.audit_service import AuditService
+from app.services.document_number_service import DocumentTypeEnum, document_number_allocator
+from app.services.tax_engine import TaxLine, from_paise, tax_engine
 
 logger = logging.getLogger(__name__)
 
@@ -26,18 +28,29 @@ class PurchaseService:
         self.po_item_repo = BaseRepository(db, PurchaseOrderItem)
         self.grn_repo = BaseRepository(db, GoodsReceiptNote)
         self.grn_item_repo = BaseRepository(db, GoodsReceiptNoteItem)
+        self.inventory_repo = InventoryRepository(db)
         self.audit_service = AuditService(db)
     
     async def create_purchase_order(self, purchase_data: PurchaseOrderCreate) -> PurchaseOrderResponse:
         """Create a purchase order to supplier."""
         try:
             # Generate PO number
-            po_number = await self._generate_po_number()
+            po_number = await self._generate_po_number(purchase_data.pharmacy_id)
             
-            # Calculate totals
-            subtotal = sum(item.get('unit_price', 0) * item.get('quantity', 0) for item in purchase_data.items)
-            tax_amount = subtotal * 0.18  # 18% GST
-            total_amount = subtotal + tax_amount
+            # Calculate totals; items may carry their own tax_percentage or an HSN code
+            taxes = tax_engine.compute([
+                TaxLine(
+                    unit_price=item.get('unit_price', 0),
+                    quantity=item.get('quantity', 0),
+                    gst_rate=item.get('tax_percentage'),
+                    hsn_code=item.get('hsn_code'),
+                    discount_percentage=item.get('discount_percentage', 0)
+                )
+                for item in purchase_data.items
+            ])
+            subtotal = taxes.subtotal
+            tax_amount = taxes.tax_amount
+            total_amount = taxes.total_amount
             
             # Create purchase order
             po_dict = {
@@ -57,7 +70,7 @@ class PurchaseService:
             purchase_order = await self.po_repo.create(po_dict)
             
             # Create PO items
-            for item_data in purchase_data.items:
+            for item_data, line in zip(purchase_data.items, taxes.lines):
                 po_item_dict = {
                     "purchase_order_id": purchase_order.id,
                     "medicine_id": item_data.get('medicine_id'),
@@ -67,7 +80,11 @@ class PurchaseService:
                     "quantity_ordered": item_data.get('quantity', 0),
                     "unit": item_data.get('unit', 'units'),
                     "unit_price": item_data.get('unit_price', 0),
-                    "total_price": item_data.get('unit_price', 0) * item_data.get('quantity', 0),
+                    "total_price": from_paise(line.total_price),
+                    "discount_percentage": item_data.get('discount_percentage', 0),
+                    "discount_amount": from_paise(line.discount_amount),
+                    "tax_percentage": from_paise(line.gst_rate_bp),
+                    "tax_amount": from_paise(line.tax_amount),
                     "quantity_pending": item_data.get('quantity', 0)
                 }
                 
@@ -99,14 +116,14 @@ class PurchaseService:
     async def create_grn(self, grn_data: GRNCreate) -> GRNResponse:
         """Create Goods Receipt Note for incoming stock."""
         try:
-            # Generate GRN number
-            grn_number = await self._generate_grn_number()
-            
             # Get purchase order
             purchase_order = await self.po_repo.get_by_id(grn_data.purchase_order_id)
             if not purchase_order:
                 raise ValueError("Purchase order not found")
             
+            # Generate GRN number
+            grn_number = await self._generate_grn_number(purchase_order.pharmacy_id)
+            
             # Create GRN
             grn_dict = {
                 "grn_number": grn_number,
@@ -143,6 +160,19 @@ class PurchaseService:
                 }
                 
                 await self.grn_item_repo.create(grn_item_dict)
+                
+                # Accepted stock becomes a batch of the receiving pharmacy
+                if grn_item_dict["medicine_id"] and grn_item_dict["quantity_accepted"] > 0:
+                    await self.inventory_repo.receive_batch(
+                        pharmacy_id=purchase_order.pharmacy_id,
+                        medicine_id=grn_item_dict["medicine_id"],
+                        batch_number=grn_item_dict["batch_number"],
+                        manufacturing_date=grn_item_dict["manufacturing_date"],
+                        expiry_date=grn_item_dict["expiry_date"],
+                        quantity=grn_item_dict["quantity_accepted"],
+                        received_quantity=grn_item_dict["quantity_received"],
+                        reference_number=grn_number
+                    )
             
             # Log audit trail
             await self.audit_service.log_action(
@@ -166,22 +196,14 @@ class PurchaseService:
             logger.error(f"Error creating GRN: {e}")
             raise
     
-    async def _generate_po_number(self) -> str:
+    async def _generate_po_number(self, pharmacy_id: UUID) -> str:
         """Generate unique purchase order number."""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            po_number = f"PO-{timestamp}"
-            return po_number
-        except Exception as e:
-            logger.error(f"Error generating PO number: {e}")
-            return f"PO-{str(uuid.uuid4())[:8].upper()}"
+        return await document_number_allocator.next_number(
+            DocumentTypeEnum.PURCHASE_ORDER, pharmacy_id
+        )
     
-    async def _generate_grn_number(self) -> str:
+    async def _generate_grn_number(self, pharmacy_id: UUID) -> str:
         """Generate unique GRN number."""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            grn_number = f"GRN-{timestamp}"
-            return grn_number
-        except Exception as e:
-            logger.error(f"Error generating GRN number: {e}")
-            return f"GRN-{str(uuid.uuid4())[:8].upper()}"
\ No newline at end of file
+        return await document_number_allocator.next_number(
+            DocumentTypeEnum.GOODS_RECEIPT, pharmacy_id
+        )
@@ -0,0 +1,227 @@
+"""
+GST computation shared by orders, invoices and purchase orders
+"""
+
+from decimal import Decimal
+from operator import mul
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Amount = Union[Decimal, int, float, str]
+
+# Rates and percentages are carried in basis points (1% = 100)
+BASIS_POINTS = 10000
+
+# Scale of exact per-line tax: paise x rate bp x discount bp
+TAX_SCALE = BASIS_POINTS * BASIS_POINTS
+
+# Standard GST rates (percent) for the HSN headings a pharmacy bills most;
+# GST_HSN_RATES adds to or overrides these
+DEFAULT_HSN_RATES: Dict[str, Decimal] = {
+    "3001": Decimal("12"),  # Glands and organo-therapeutic extracts
+    "3002": Decimal("5"),  # Vaccines, blood fractions
+    "3003": Decimal("12"),  # Medicaments, not in measured doses
+    "3004": Decimal("12"),  # Medicaments in measured doses
+    "300431": Decimal("5"),  # Insulin
+    "3005": Decimal("12"),  # Dressings and bandages
+    "3006": Decimal("12"),  # Pharmaceutical goods
+    "9018": Decimal("12"),  # Medical instruments
+    "9019": Decimal("12"),  # Therapy appliances
+    "9021": Decimal("5"),  # Orthopaedic appliances
+}
+
+
+def to_paise(amount: Amount) -> int:
+    """Rupee amount to integer paise, rounding half up past two places."""
+    if isinstance(amount, float):
+        # Go through the shortest repr so 2.675 stays 2.675 rather than 2.67499...
+        amount = Decimal(repr(amount))
+    elif isinstance(amount, str):
+        amount = Decimal(amount)
+    numerator, denominator = amount.as_integer_ratio()
+    return (200 * numerator + denominator) // (2 * denominator)
+
+
+def to_basis_points(percentage: Amount) -> int:
+    """Percentage to integer basis points."""
+    return to_paise(percentage)
+
+
+def from_paise(paise: int) -> Decimal:
+    """Integer paise back to a two-place rupee Decimal."""
+    return Decimal(paise).scaleb(-2)
+
+
+def round_half_up(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half up, for non-negative numerators."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+class TaxLine(NamedTuple):
+    """One billable line. gst_rate wins over hsn_code when both are given."""
+    unit_price: Amount
+    quantity: int
+    gst_rate: Optional[Amount] = None
+    hsn_code: Optional[str] = None
+    discount_percentage: Amount = 0
+
+
+class LineTax(NamedTuple):
+    """Per-line amounts in integer paise, each rounded to the paisa; see from_paise."""
+    total_price: int
+    discount_amount: int
+    taxable_amount: int
+    gst_rate_bp: int
+    cgst_amount: int
+    sgst_amount: int
+    igst_amount: int
+    tax_amount: int
+    final_amount: int
+
+
+class TaxBreakdown(NamedTuple):
+    """Document totals, rounded once from the exact sums of every line."""
+    gross_amount: Decimal
+    discount_amount: Decimal
+    subtotal: Decimal
+    cgst_amount: Decimal
+    sgst_amount: Decimal
+    igst_amount: Decimal
+    tax_amount: Decimal
+    total_amount: Decimal
+    lines: List[LineTax]
+
+
+class TaxRateTable:
+    """HSN code to GST rate, resolved by longest matching prefix.
+
+    Rates are compiled to basis points once and every code looked up is
+    memoised, so a long invoice resolves each distinct HSN code a single
+    time.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, Amount]] = None, default_rate: Optional[Amount] = None):
+        rates = dict(DEFAULT_HSN_RATES) if rates is None else dict(rates)
+        self._prefixes = {self._normalize(code): to_basis_points(rate) for code, rate in rates.items()}
+        self._longest = max((len(code) for code in self._prefixes), default=0)
+        self.default_bp = to_basis_points(settings.GST_DEFAULT_RATE if default_rate is None else default_rate)
+        self._resolved: Dict[str, int] = {}
+
+    @staticmethod
+    def _normalize(code: str) -> str:
+        return "".join(ch for ch in str(code) if ch.isdigit())
+
+    def rate_bp(self, hsn_code: Optional[str]) -> int:
+        """GST rate in basis points for an HSN code; the default rate when unknown."""
+        if not hsn_code:
+            return self.default_bp
+        cached = self._resolved.get(hsn_code)
+        if cached is not None:
+            return cached
+
+        code = self._normalize(hsn_code)
+        rate = self.default_bp
+        for length in range(min(len(code), self._longest), 1, -1):
+            match = self._prefixes.get(code[:length])
+            if match is not None:
+                rate = match
+                break
+        self._resolved[hsn_code] = rate
+        return rate
+
+    def rate(self, hsn_code: Optional[str]) -> Decimal:
+        """GST rate as a percentage."""
+        return from_paise(self.rate_bp(hsn_code))
+
+
+class TaxEngine:
+    """Computes GST for a whole document in column passes over integer paise.
+
+    Every line is reduced to exact integers: taxable values are carried in
+    paise x 10^4 and tax in paise x 10^8, which is exact for two-place
+    prices and percentages. Document totals are summed at that scale and
+    rounded half up only once at the end, so they never pick up per-line
+    rounding drift.
+    """
+
+    def __init__(self, rate_table: Optional[TaxRateTable] = None):
+        self.rate_table = rate_table or TaxRateTable({**DEFAULT_HSN_RATES, **settings.GST_HSN_RATES})
+
+    def compute(self, lines: Sequence[TaxLine], inter_state: bool = False, itemize: bool = True) -> TaxBreakdown:
+        """Tax a list of lines; inter-state supplies are charged IGST instead of CGST + SGST.
+
+        Pass ``itemize=False`` when only the document totals are needed.
+        """
+        rate_bp = self.rate_table.rate_bp
+        gross = [to_paise(line.unit_price) * line.quantity for line in lines]
+        discount = [
+            amount * to_basis_points(line.discount_percentage) if line.discount_percentage else 0
+            for amount, line in zip(gross, lines)
+        ]
+        taxable = [amount * BASIS_POINTS - off for amount, off in zip(gross, discount)]
+        rates = [
+            to_basis_points(line.gst_rate) if line.gst_rate is not None else rate_bp(line.hsn_code)
+            for line in lines
+        ]
+        tax = list(map(mul, taxable, rates))
+
+        subtotal = round_half_up(sum(taxable), BASIS_POINTS)
+        cgst, sgst, igst = self._split(sum(tax), inter_state)
+        return TaxBreakdown(
+            gross_amount=from_paise(sum(gross)),
+            discount_amount=from_paise(round_half_up(sum(discount), BASIS_POINTS)),
+            subtotal=from_paise(subtotal),
+            cgst_amount=from_paise(cgst),
+            sgst_amount=from_paise(sgst),
+            igst_amount=from_paise(igst),
+            tax_amount=from_paise(cgst + sgst + igst),
+            total_amount=from_paise(subtotal + cgst + sgst + igst),
+            lines=self._itemize(gross, discount, taxable, rates, tax, inter_state) if itemize else [],
+        )
+
+    @staticmethod
+    def _split(tax: int, inter_state: bool):
+        """Exact tax (paise x 10^8) to rounded (cgst, sgst, igst) paise."""
+        if inter_state:
+            return 0, 0, round_half_up(tax, TAX_SCALE)
+        half = round_half_up(tax, 2 * TAX_SCALE)
+        return half, half, 0
+
+    @staticmethod
+    def _itemize(gross, discount, taxable, rates, tax, inter_state) -> List[LineTax]:
+        """Round each column to the paisa; same arithmetic as round_half_up, inlined."""
+        if inter_state:
+            cgst = sgst = [0] * len(tax)
+            igst = [(2 * amount + TAX_SCALE) // (2 * TAX_SCALE) for amount in tax]
+        else:
+            cgst = sgst = [(amount + TAX_SCALE) // (2 * TAX_SCALE) for amount in tax]
+            igst = [0] * len(tax)
+        return list(map(
+            LineTax,
+            gross,
+            [(2 * amount + BASIS_POINTS) // (2 * BASIS_POINTS) for amount in discount],
+            [(2 * amount + BASIS_POINTS) // (2 * BASIS_POINTS) for amount in taxable],
+            rates,
+            cgst,
+            sgst,
+            igst,
+            [c + s + i for c, s, i in zip(cgst, sgst, igst)],
+            [
+                (2 * (amount * BASIS_POINTS + line_tax) + TAX_SCALE) // (2 * TAX_SCALE)
+                for amount, line_tax in zip(taxable, tax)
+            ],
+        ))
+
+
+def is_inter_state(supplier_state: Optional[str], place_of_supply: Optional[str]) -> bool:
+    """Whether a supply crosses state lines; unknown places count as intra-state."""
+    if not supplier_state or not place_of_supply:
+        return False
+    return supplier_state.strip().casefold() != place_of_supply.strip().casefold()
+
+
+tax_engine = TaxEngine()
@@ -46,8 +46,8 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.notification_tasks.send_order_reminders",
         "schedule": 1800.0,  # Every 30 minutes
     },
-    "cleanup-old-audit-logs": {
-        "task": "app.tasks.compliance_tasks.cleanup_old_audit_logs",
-        "schedule": 604800.0,  # Weekly
+    "maintain-audit-log-partitions": {
+        "task": "app.tasks.compliance_tasks.maintain_audit_log_partitions",
+        "schedule": 86400.0,  # Daily
     },
 }
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""
+Celery tasks for compliance data maintenance
+"""
+
+from typing import Dict, Any
+import asyncio
+import logging
+
+from app.tasks.celery_app import celery_app
+from app.db.partitions import audit_log_partitions
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def maintain_audit_log_partitions() -> Dict[str, Any]:
+    """Pre-create upcoming audit log partitions and archive expired ones."""
+    try:
+        return asyncio.run(_maintain_audit_log_partitions_async())
+    except Exception as exc:
+        logger.error(f"Error maintaining audit log partitions: {exc}")
+        return {"success": False, "error": str(exc)}
+
+
+async def _maintain_audit_log_partitions_async() -> Dict[str, Any]:
+    """Async logic for audit log partition rotation."""
+    try:
+        result = await audit_log_partitions().rotate(engine)
+        logger.info(
+            f"Audit log partitions: created {len(result['created'])}, "
+            f"archived {len(result['archived'])}"
+        )
+        return {"success": True, **result}
+    finally:
+        # Pooled connections are bound to this task's event loop
+        await engine.dispose()
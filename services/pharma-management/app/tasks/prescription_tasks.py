@@ -2,19 +2,19 @@
 Celery tasks for prescription processing
 """
 
-from celery import current_task
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from datetime import datetime, date, timedelta
+from sqlalchemy import select
+from datetime import datetime
 import logging
 import asyncio
 from typing import Dict, Any
+import redis.asyncio as aioredis
 
 from app.tasks.celery_app import celery_app
 from app.db.session import AsyncSessionLocal
-from app.models.prescription import Prescription, PrescriptionStatusEnum
-from app.integrations.ocr.prescription_ocr import PrescriptionOCR
-from app.services.notification_service import NotificationService
+from app.models.prescription import Prescription
+from app.core.config import settings
+from app.services.ocr_queue import OCRJob, OCRJobQueue
+from app.services.prescription_expiry_service import ExpiredPrescriptionSweeper, SweepCheckpoint
 from app.services.audit_service import AuditService
 
 logger = logging.getLogger(__name__)
@@ -22,74 +22,28 @@ logger = logging.getLogger(__name__)
 
 @celery_app.task(bind=True, max_retries=3)
 def process_prescription_ocr(self, prescription_id: str, image_path: str) -> Dict[str, Any]:
-    """Process prescription image with OCR."""
+    """Hand a prescription image to the shared OCR worker service.
+
+    OCR itself runs in the OCR worker's warm process pool; this task only
+    enqueues, so Celery workers no longer run tesseract per job.
+    """
     try:
-        return asyncio.run(_process_prescription_ocr_async(prescription_id, image_path))
+        job = asyncio.run(_enqueue_ocr_async(prescription_id, image_path))
+        return {"success": True, "job_id": job.job_id}
     except Exception as exc:
-        logger.error(f"OCR processing failed for prescription {prescription_id}: {exc}")
+        logger.error(f"Queueing OCR failed for prescription {prescription_id}: {exc}")
         if self.request.retries < self.max_retries:
             raise self.retry(countdown=60 * (self.request.retries + 1))
         return {"success": False, "error": str(exc)}
 
 
-async def _process_prescription_ocr_async(prescription_id: str, image_path: str) -> Dict[str, Any]:
-    """Async OCR processing logic."""
-    async with AsyncSessionLocal() as db:
-        try:
-            # Get prescription
-            result = await db.execute(
-                select(Prescription).where(Prescription.id == prescription_id)
-            )
-            prescription = result.scalar_one_or_none()
-            
-            if not prescription:
-                return {"success": False, "error": "Prescription not found"}
-            
-            # Update status to processing
-            prescription.status = PrescriptionStatusEnum.PROCESSING.value
-            await db.commit()
-            
-            # Initialize OCR service
-            ocr_service = PrescriptionOCR()
-            
-            # Process image
-            ocr_result = await ocr_service.process_prescription_image(image_path)
-            
-            # Update prescription with OCR results
-            prescription.ocr_text = ocr_result.get("text", "")
-            prescription.ocr_confidence = ocr_result.get("confidence", 0)
-            prescription.ocr_processed_at = datetime.utcnow()
-            
-            # Update status based on confidence
-            if ocr_result.get("confidence", 0) >= 60:  # Configurable threshold
-                prescription.status = PrescriptionStatusEnum.VALIDATED.value
-            else:
-                prescription.status = PrescriptionStatusEnum.REJECTED.value
-                prescription.validation_notes = "Low OCR confidence"
-            
-            await db.commit()
-            
-            # Log audit trail
-            audit_service = AuditService(db)
-            await audit_service.log_prescription_action(
-                action="prescription_ocr_processed",
-                prescription_id=prescription.id,
-                description=f"OCR processed with {ocr_result.get('confidence', 0)}% confidence",
-                metadata=ocr_result
-            )
-            
-            # Send notification if successful
-            if prescription.status == PrescriptionStatusEnum.VALIDATED.value:
-                notification_service = NotificationService(db)
-                await notification_service.send_prescription_ready_notification(prescription.id)
-            
-            logger.info(f"OCR processing completed for prescription {prescription_id}")
-            return {"success": True, "ocr_result": ocr_result}
-            
-        except Exception as e:
-            await db.rollback()
-            logger.error(f"Error in OCR processing: {e}")
-            raise
+async def _enqueue_ocr_async(prescription_id: str, image_path: str) -> OCRJob:
+    """Enqueue on a short-lived client; each task runs on its own event loop."""
+    redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        return await OCRJobQueue(redis_client).enqueue(prescription_id, image_path)
+    finally:
+        await redis_client.aclose()
 
 
 @celery_app.task
@@ -103,47 +57,13 @@ def check_expired_prescriptions() -> Dict[str, Any]:
 
 
 async def _check_expired_prescriptions_async() -> Dict[str, Any]:
-    """Async logic for checking expired prescriptions."""
-    async with AsyncSessionLocal() as db:
-        try:
-            # Find prescriptions that have expired
-            today = date.today()
-            result = await db.execute(
-                select(Prescription).where(
-                    and_(
-                        Prescription.expiry_date < today,
-                        Prescription.status.in_([
-                            PrescriptionStatusEnum.UPLOADED.value,
-                            PrescriptionStatusEnum.PROCESSING.value,
-                            PrescriptionStatusEnum.VALIDATED.value
-                        ])
-                    )
-                )
-            )
-            expired_prescriptions = result.scalars().all()
-            
-            updated_count = 0
-            for prescription in expired_prescriptions:
-                prescription.status = PrescriptionStatusEnum.EXPIRED.value
-                updated_count += 1
-                
-                # Log audit trail
-                audit_service = AuditService(db)
-                await audit_service.log_prescription_action(
-                    action="prescription_expired",
-                    prescription_id=prescription.id,
-                    description=f"Prescription expired on {prescription.expiry_date}"
-                )
-            
-            await db.commit()
-            
-            logger.info(f"Updated {updated_count} expired prescriptions")
-            return {"success": True, "updated_count": updated_count}
-            
-        except Exception as e:
-            await db.rollback()
-            logger.error(f"Error checking expired prescriptions: {e}")
-            raise
+    """Sweep expired prescriptions in checkpointed set-based batches."""
+    redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        sweeper = ExpiredPrescriptionSweeper(checkpoint=SweepCheckpoint(redis_client))
+        return await sweeper.sweep()
+    finally:
+        await redis_client.aclose()
 
 
 @celery_app.task(bind=True, max_retries=3)
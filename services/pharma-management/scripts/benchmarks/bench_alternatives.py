@@ -0,0 +1,130 @@
+"""
+Benchmark equivalence-group alternatives against the JSON id-array approach
+
+Usage:
+    python scripts/benchmarks/bench_alternatives.py --medicines 50000 --group-size 8
+
+Seeds a catalogue into DATABASE_URL (a disposable Postgres database) where
+every medicine carries both the legacy generic_alternatives/brand_alternatives
+JSON arrays and a materialized equivalence group, then compares lookups.
+The legacy path reproduces the old repository: load the medicine, then run
+one lookup per JSON array, and separately load stock per alternative.
+"""
+
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+from uuid import uuid4
+
+from common import summarize, timed
+
+from sqlalchemy import and_, func, insert, select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.base import BaseModel
+from app.models.inventory import InventoryItem
+from app.models.medicine import Medicine
+from app.models.pharmacy import Pharmacy
+from app.repositories.medicine_repository import MedicineEquivalenceGroupRepository, MedicineRepository
+
+
+async def legacy_alternatives(session, medicine_id):
+    base = (await session.execute(select(Medicine).where(Medicine.id == medicine_id))).scalar_one()
+    alternatives = []
+    for ids in (base.generic_alternatives, base.brand_alternatives):
+        if ids:
+            result = await session.execute(
+                select(Medicine).where(and_(Medicine.id.in_(ids), Medicine.is_active == True))
+            )
+            alternatives.extend(result.scalars().all())
+    for alternative in alternatives:
+        await session.execute(
+            select(func.sum(InventoryItem.current_stock - InventoryItem.reserved_stock))
+            .where(InventoryItem.medicine_id == alternative.id)
+        )
+    return alternatives
+
+
+async def seed(medicine_count: int, group_size: int, pharmacy_count: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    rows = []
+    for group in range(medicine_count // group_size):
+        members = [uuid4() for _ in range(group_size)]
+        for index, medicine_id in enumerate(members):
+            others = [str(m) for m in members if m != medicine_id]
+            rows.append({
+                "id": medicine_id,
+                "name": f"Bench {group}-{index}",
+                "generic_name": f"Salt {group}",
+                "brand_name": f"Brand {group}-{index}" if index % 2 else None,
+                "manufacturer": "Bench Labs",
+                "active_ingredients": [f"Salt {group}"],
+                "strength": "500mg",
+                "dosage_form": "Tablet",
+                "route_of_administration": "oral",
+                "unit_price": Decimal("10.00"),
+                "generic_alternatives": others[: len(others) // 2],
+                "brand_alternatives": others[len(others) // 2:],
+            })
+
+    pharmacies = []
+    for i in range(pharmacy_count):
+        tag = uuid4().hex[:12]
+        pharmacies.append({
+            "id": uuid4(), "name": f"Bench Pharmacy {i}", "license_number": f"AL{tag}",
+            "registration_number": f"AR{tag}", "email": f"alt{i}@example.com", "phone": "+91 9000000000",
+            "address_line1": "Bench Street", "city": "Bangalore", "state": "Karnataka",
+            "postal_code": "560001", "owner_name": "Owner", "pharmacist_in_charge": "Pharmacist",
+        })
+
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(rows), 5000):
+            await session.execute(insert(Medicine), rows[start:start + 5000])
+        await session.execute(insert(Pharmacy), pharmacies)
+        inventory = [
+            {
+                "id": uuid4(), "pharmacy_id": pharmacy["id"], "medicine_id": row["id"],
+                "current_stock": random.randint(0, 100), "reserved_stock": 0,
+                "cost_price": Decimal("8.00"), "selling_price": Decimal("10.00"), "mrp": Decimal("12.00"),
+            }
+            for row in rows for pharmacy in pharmacies
+        ]
+        for start in range(0, len(inventory), 10000):
+            await session.execute(insert(InventoryItem), inventory[start:start + 10000])
+        await session.commit()
+
+        await MedicineEquivalenceGroupRepository(session).backfill()
+
+    return [row["id"] for row in rows]
+
+
+async def run(args):
+    random.seed(args.seed)
+    medicine_ids = await seed(args.medicines, args.group_size, args.pharmacies)
+    sample = random.sample(medicine_ids, args.queries)
+
+    legacy, grouped = [], []
+    async with AsyncSessionLocal() as session:
+        repo = MedicineRepository(session)
+        for medicine_id in sample:
+            with timed(legacy):
+                await legacy_alternatives(session, medicine_id)
+            with timed(grouped):
+                await repo.get_alternatives(medicine_id)
+
+    summarize("JSON id arrays + per-item stock", legacy)
+    summarize("equivalence group, single query", grouped)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--medicines", type=int, default=50000)
+    parser.add_argument("--group-size", type=int, default=8)
+    parser.add_argument("--pharmacies", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,176 @@
+"""
+Benchmark the monthly-partitioned audit log against a single flat table
+
+Usage:
+    python scripts/benchmarks/bench_audit_partitions.py --rows 100000000 --months 24
+
+Creates the partitioned audit_logs table and a flat copy with the same
+indexes in DATABASE_URL (a disposable Postgres database), seeds both with
+rows spread over --months months using generate_series, then measures:
+
+* insert throughput of application-sized batches into each table,
+* latency of a one-month per-pharmacy page and a one-month report count,
+* retiring the oldest month: archive_partition vs DELETE on the flat table.
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+from common import summarize, timed
+
+from sqlalchemy import text
+
+from app.db.partitions import MonthlyPartitionManager, add_months, month_start
+from app.db.session import engine
+from app.models.base import BaseModel
+
+FLAT_TABLE = "audit_logs_flat"
+RESOURCE_TYPES = ["prescription", "prescription_item", "order", "inventory", "medicine", "invoice"]
+COLUMNS = "id, pharmacy_id, action, resource_type, created_at, updated_at, is_active, hipaa_logged, severity"
+
+
+def _seed_sql(table: str, rows: int, minutes: int) -> str:
+    types = ", ".join(f"'{t}'" for t in RESOURCE_TYPES)
+    return f"""
+        INSERT INTO {table} ({COLUMNS})
+        SELECT gen_random_uuid(),
+               p.ids[1 + (g % array_length(p.ids, 1))],
+               (ARRAY['prescription_uploaded', 'order_created', 'inventory_updated'])[1 + g % 3],
+               (ARRAY[{types}])[1 + g % {len(RESOURCE_TYPES)}],
+               now() - (g % {minutes}) * interval '1 minute',
+               now(), true, true, 'info'
+        FROM generate_series(1, {rows}) AS g,
+             (SELECT array_agg(id) AS ids FROM bench_pharmacies) AS p
+    """
+
+
+async def setup(manager: MonthlyPartitionManager, args):
+    today = date.today()
+    oldest = add_months(month_start(today), -args.months)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {FLAT_TABLE}"))
+        await conn.execute(text("DROP TABLE IF EXISTS audit_logs CASCADE"))
+        await conn.run_sync(BaseModel.metadata.create_all)
+        for i in range(args.months + 1):
+            await conn.execute(text(manager.create_partition_sql(add_months(oldest, i))))
+        await manager.ensure_partitions(conn, today)
+        await conn.execute(text(
+            f"CREATE TABLE {FLAT_TABLE} (LIKE audit_logs INCLUDING DEFAULTS INCLUDING INDEXES)"
+        ))
+        await conn.execute(text("DROP TABLE IF EXISTS bench_pharmacies"))
+        await conn.execute(text(
+            "CREATE TABLE bench_pharmacies AS "
+            f"SELECT gen_random_uuid() AS id FROM generate_series(1, {args.pharmacies})"
+        ))
+        # LIKE does not copy foreign keys; drop ours so both tables pay the same insert costs
+        await conn.execute(text("ALTER TABLE audit_logs DROP CONSTRAINT IF EXISTS audit_logs_pharmacy_id_fkey"))
+
+    minutes = (today - oldest).days * 24 * 60
+    for table in ("audit_logs", FLAT_TABLE):
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(text(_seed_sql(table, args.rows, minutes)))
+            await conn.execute(text(f"ANALYZE {table}"))
+        print(f"seeded {args.rows} rows into {table} in {time.perf_counter() - started:.1f}s")
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT id FROM bench_pharmacies"))
+        return [row[0] for row in result.all()], oldest
+
+
+async def insert_throughput(table: str, pharmacy_ids, args):
+    rng = random.Random(args.seed)
+    statement = text(
+        f"INSERT INTO {table} ({COLUMNS}) "
+        "VALUES (:id, :pharmacy_id, 'order_created', 'order', :created_at, :created_at, true, true, 'info')"
+    )
+    samples = []
+    async with engine.connect() as conn:
+        for _ in range(args.insert_batches):
+            now = datetime.now(timezone.utc)
+            batch = [
+                {"id": uuid4(), "pharmacy_id": rng.choice(pharmacy_ids), "created_at": now}
+                for _ in range(args.batch_size)
+            ]
+            with timed(samples):
+                await conn.execute(statement, batch)
+                await conn.commit()
+    rows_per_sec = args.batch_size * len(samples) / sum(samples)
+    summarize(f"insert batch of {args.batch_size} ({table})", samples)
+    print(f"{'':<40} rows/s={rows_per_sec:.0f}")
+
+
+async def query_latency(table: str, pharmacy_ids, args):
+    rng = random.Random(args.seed)
+    page = text(
+        f"SELECT * FROM {table} WHERE pharmacy_id = :pharmacy_id "
+        "AND created_at >= :start AND created_at < :end ORDER BY created_at, id LIMIT 100"
+    )
+    count = text(
+        f"SELECT count(*) FROM {table} WHERE created_at >= :start AND created_at < :end"
+    )
+    page_samples, count_samples = [], []
+    async with engine.connect() as conn:
+        for _ in range(args.queries):
+            start = add_months(month_start(date.today()), -rng.randint(1, args.months - 1))
+            params = {"pharmacy_id": rng.choice(pharmacy_ids), "start": start, "end": add_months(start, 1)}
+            with timed(page_samples):
+                (await conn.execute(page, params)).all()
+            with timed(count_samples):
+                (await conn.execute(count, params)).scalar()
+    summarize(f"one-month pharmacy page ({table})", page_samples)
+    summarize(f"one-month count ({table})", count_samples)
+
+
+async def retire_oldest_month(manager: MonthlyPartitionManager, oldest: date):
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(f"DELETE FROM {FLAT_TABLE} WHERE created_at < :end"),
+            {"end": add_months(oldest, 1)}
+        )
+    print(f"DELETE oldest month from {FLAT_TABLE}: {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    partition = next(p for p in await _partitions(manager) if p.start == oldest)
+    async with engine.begin() as conn:
+        path = await manager.archive_partition(conn, partition)
+    print(
+        f"archive {partition.name} to {path.name} ({path.stat().st_size / 1e6:.1f} MB): "
+        f"{time.perf_counter() - started:.1f}s"
+    )
+
+
+async def _partitions(manager: MonthlyPartitionManager):
+    async with engine.connect() as conn:
+        return await manager.list_partitions(conn)
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as archive_dir:
+        manager = MonthlyPartitionManager(
+            "audit_logs", retention_days=args.months * 31, archive_dir=archive_dir
+        )
+        pharmacy_ids, oldest = await setup(manager, args)
+        for table in ("audit_logs", FLAT_TABLE):
+            await insert_throughput(table, pharmacy_ids, args)
+            await query_latency(table, pharmacy_ids, args)
+        await retire_oldest_month(manager, oldest)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--pharmacies", type=int, default=200)
+    parser.add_argument("--insert-batches", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
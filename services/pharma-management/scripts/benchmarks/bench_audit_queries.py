@@ -0,0 +1,135 @@
+"""
+Benchmark compliance audit queries on a large audit log
+
+Usage:
+    python scripts/benchmarks/bench_audit_queries.py --rows 20000000 --pharmacies 200
+
+Seeds DATABASE_URL (a disposable Postgres database) with audit rows spread
+over a year using generate_series, then compares the legacy paths (page via
+get_multi then filter dates in Python; three report counts including a
+LIKE scan) with the SQL-pushed AuditLogRepository queries.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+from common import summarize, timed
+
+from sqlalchemy import and_, func, insert, select, text
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.base import BaseModel
+from app.models.compliance import AuditLog, ControlledSubstanceLog
+from app.models.pharmacy import Pharmacy
+from app.repositories.audit_repository import AuditLogRepository
+from app.repositories.base_repository import BaseRepository
+from app.schemas.compliance import AuditLogFilter
+
+RESOURCE_TYPES = ["prescription", "prescription_item", "order", "inventory", "medicine", "invoice"]
+
+
+async def seed(rows: int, pharmacy_count: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    pharmacies = []
+    for i in range(pharmacy_count):
+        tag = uuid4().hex[:12]
+        pharmacies.append({
+            "id": uuid4(), "name": f"Bench Pharmacy {i}", "license_number": f"AU{tag}",
+            "registration_number": f"AR{tag}", "email": f"audit{i}@example.com", "phone": "+91 9000000000",
+            "address_line1": "Bench Street", "city": "Bangalore", "state": "Karnataka",
+            "postal_code": "560001", "owner_name": "Owner", "pharmacist_in_charge": "Pharmacist",
+        })
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(Pharmacy), pharmacies)
+        await session.commit()
+
+    started = time.perf_counter()
+    types = ", ".join(f"'{t}'" for t in RESOURCE_TYPES)
+    async with engine.begin() as conn:
+        # Server-side generation keeps seeding 20M rows to a few minutes
+        await conn.execute(text(f"""
+            INSERT INTO audit_logs (id, pharmacy_id, action, resource_type, created_at, updated_at,
+                                    is_active, hipaa_logged, severity)
+            SELECT gen_random_uuid(),
+                   p.ids[1 + (g % array_length(p.ids, 1))],
+                   (ARRAY['prescription_uploaded', 'order_created', 'inventory_updated', 'medicine_viewed'])[1 + g % 4],
+                   (ARRAY[{types}])[1 + g % {len(RESOURCE_TYPES)}],
+                   now() - (g % 525600) * interval '1 minute',
+                   now(), true, true, 'info'
+            FROM generate_series(1, {rows}) AS g,
+                 (SELECT array_agg(id) AS ids FROM pharmacies WHERE name LIKE 'Bench Pharmacy %') AS p
+        """))
+        await conn.execute(text("ANALYZE audit_logs"))
+    print(f"seeded {rows} audit rows in {time.perf_counter() - started:.1f}s")
+    return [p["id"] for p in pharmacies]
+
+
+async def legacy_page(session, filter_params):
+    logs = await BaseRepository(session, AuditLog).get_multi(
+        skip=filter_params.skip, limit=filter_params.limit,
+        filters={"pharmacy_id": filter_params.pharmacy_id}, order_by="created_at"
+    )
+    return [
+        log for log in logs
+        if filter_params.start_date <= log.created_at.date() <= filter_params.end_date
+    ]
+
+
+async def legacy_report(session, pharmacy_id, start_date, end_date):
+    window = and_(AuditLog.pharmacy_id == pharmacy_id, AuditLog.created_at >= start_date, AuditLog.created_at <= end_date)
+    await session.execute(select(func.count(AuditLog.id)).where(window))
+    await session.execute(select(func.count(ControlledSubstanceLog.id)).where(and_(
+        ControlledSubstanceLog.pharmacy_id == pharmacy_id,
+        ControlledSubstanceLog.created_at >= start_date,
+        ControlledSubstanceLog.created_at <= end_date
+    )))
+    await session.execute(select(func.count(AuditLog.id)).where(and_(window, AuditLog.action.like('%prescription%'))))
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    pharmacy_ids = await seed(args.rows, args.pharmacies)
+    today = date.today()
+
+    samples = {"legacy page": [], "sql page": [], "legacy report": [], "filter report": []}
+    short_pages = 0
+    async with AsyncSessionLocal() as session:
+        repo = AuditLogRepository(session)
+        for _ in range(args.queries):
+            pharmacy_id = rng.choice(pharmacy_ids)
+            start_date = today - timedelta(days=rng.randint(30, 300))
+            end_date = start_date + timedelta(days=30)
+            filter_params = AuditLogFilter(
+                pharmacy_id=pharmacy_id, start_date=start_date, end_date=end_date, limit=100
+            )
+
+            with timed(samples["legacy page"]):
+                page = await legacy_page(session, filter_params)
+            short_pages += len(page) < filter_params.limit
+            with timed(samples["sql page"]):
+                await repo.search(filter_params)
+            with timed(samples["legacy report"]):
+                await legacy_report(session, pharmacy_id, start_date, end_date)
+            with timed(samples["filter report"]):
+                await repo.get_report_counts(pharmacy_id, start_date, end_date)
+
+    for name, values in samples.items():
+        summarize(name, values)
+    print(f"legacy pages returned short: {short_pages}/{args.queries}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000000)
+    parser.add_argument("--pharmacies", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
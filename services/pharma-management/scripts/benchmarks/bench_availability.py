@@ -0,0 +1,127 @@
+"""
+Benchmark 5-item basket availability lookups across 10k pharmacies
+
+Usage:
+    python scripts/benchmarks/bench_availability.py --pharmacies 10000 --queries 500
+
+Seeds pharmacies, medicines and inventory into DATABASE_URL (a disposable
+Postgres database), then measures cold (cache miss) and warm (same geo cell)
+lookups through AvailabilityService.
+"""
+
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+from uuid import uuid4
+
+from common import summarize, timed
+
+from sqlalchemy import insert
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.base import BaseModel
+from app.models.inventory import InventoryItem
+from app.models.medicine import Medicine
+from app.models.pharmacy import Pharmacy
+from app.services import availability_service
+from app.services.availability_service import AvailabilityService
+
+CENTER = (12.9716, 77.5946)  # Bangalore
+SPREAD_DEGREES = 0.5
+
+
+async def seed(pharmacy_count: int, medicine_count: int, stocked_per_pharmacy: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    medicine_rows = [
+        {
+            "id": uuid4(),
+            "name": f"Bench Medicine {i}",
+            "generic_name": f"Bench Generic {i}",
+            "manufacturer": "Bench Labs",
+            "active_ingredients": [f"ingredient-{i}"],
+            "strength": "500mg",
+            "dosage_form": "Tablet",
+            "route_of_administration": "oral",
+            "unit_price": Decimal("10.00"),
+        }
+        for i in range(medicine_count)
+    ]
+    pharmacy_rows = []
+    for i in range(pharmacy_count):
+        tag = uuid4().hex[:12]
+        pharmacy_rows.append({
+            "id": uuid4(),
+            "name": f"Bench Pharmacy {i}",
+            "license_number": f"BL{tag}",
+            "registration_number": f"BR{tag}",
+            "email": f"bench{i}@example.com",
+            "phone": "+91 9000000000",
+            "address_line1": "Bench Street",
+            "city": "Bangalore",
+            "state": "Karnataka",
+            "postal_code": "560001",
+            "owner_name": "Bench Owner",
+            "pharmacist_in_charge": "Bench Pharmacist",
+            "latitude": CENTER[0] + random.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            "longitude": CENTER[1] + random.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+        })
+
+    inventory_rows = []
+    for pharmacy in pharmacy_rows:
+        for medicine in random.sample(medicine_rows, stocked_per_pharmacy):
+            inventory_rows.append({
+                "id": uuid4(),
+                "pharmacy_id": pharmacy["id"],
+                "medicine_id": medicine["id"],
+                "current_stock": random.randint(0, 200),
+                "reserved_stock": 0,
+                "cost_price": Decimal("8.00"),
+                "selling_price": Decimal("10.00"),
+                "mrp": Decimal("12.00"),
+            })
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(Medicine), medicine_rows)
+        await session.execute(insert(Pharmacy), pharmacy_rows)
+        for start in range(0, len(inventory_rows), 10000):
+            await session.execute(insert(InventoryItem), inventory_rows[start:start + 10000])
+        await session.commit()
+
+    return [m["id"] for m in medicine_rows]
+
+
+async def run(args):
+    random.seed(args.seed)
+    medicine_ids = await seed(args.pharmacies, args.medicines, args.stocked)
+
+    cold, warm = [], []
+    async with AsyncSessionLocal() as session:
+        service = AvailabilityService(session)
+        for _ in range(args.queries):
+            basket = random.sample(medicine_ids, 5)
+            lat = CENTER[0] + random.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+            lon = CENTER[1] + random.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+
+            availability_service._candidate_cache.clear()
+            with timed(cold):
+                await service.find_nearby_pharmacies(basket, lat, lon, args.radius)
+            with timed(warm):
+                await service.find_nearby_pharmacies(basket, lat + 0.0001, lon + 0.0001, args.radius)
+
+    summarize("basket lookup (cache miss)", cold)
+    summarize("basket lookup (same geo cell)", warm)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pharmacies", type=int, default=10000)
+    parser.add_argument("--medicines", type=int, default=500)
+    parser.add_argument("--stocked", type=int, default=100, help="medicines stocked per pharmacy")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--radius", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,157 @@
+"""
+Benchmark FEFO batch allocation throughput
+
+Usage:
+    python scripts/benchmarks/bench_batch_allocation.py --pharmacies 200 --medicines 200 --concurrency 16
+
+Seeds pharmacies, medicines, inventory and several batches per stocked
+medicine into DATABASE_URL (a disposable Postgres database), then runs
+concurrent dispensing allocations two ways: the read-modify-write loop a
+service would otherwise need (load batches, pick in Python, update each
+one) and the single-statement MedicineBatchRepository.allocate. Reports
+allocations per second and per-allocation latency for each.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from common import summarize, timed
+
+from sqlalchemy import and_, insert, select, update
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.base import BaseModel
+from app.models.inventory import InventoryItem
+from app.models.medicine import Medicine, MedicineBatch
+from app.models.pharmacy import Pharmacy
+from app.repositories.medicine_repository import BatchAllocationModeEnum, MedicineBatchRepository
+
+
+async def seed(pharmacy_count: int, medicine_count: int, stocked: int, batches: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    medicines = [
+        {
+            "id": uuid4(), "name": f"FEFO Medicine {i}", "generic_name": f"FEFO Generic {i}",
+            "manufacturer": "Bench Labs", "active_ingredients": [f"fefo-{i}"], "strength": "500mg",
+            "dosage_form": "Tablet", "route_of_administration": "oral", "unit_price": Decimal("10.00"),
+        }
+        for i in range(medicine_count)
+    ]
+    pharmacies = []
+    for i in range(pharmacy_count):
+        tag = uuid4().hex[:12]
+        pharmacies.append({
+            "id": uuid4(), "name": f"FEFO Pharmacy {i}", "license_number": f"FL{tag}",
+            "registration_number": f"FR{tag}", "email": f"fefo{i}@example.com", "phone": "+91 9000000000",
+            "address_line1": "Bench Street", "city": "Bangalore", "state": "Karnataka",
+            "postal_code": "560001", "owner_name": "Owner", "pharmacist_in_charge": "Pharmacist",
+        })
+
+    today = date.today()
+    items, batch_rows, pairs = [], [], []
+    for pharmacy in pharmacies:
+        for medicine in random.sample(medicines, stocked):
+            pairs.append((pharmacy["id"], medicine["id"]))
+            quantities = [random.randint(50, 500) for _ in range(batches)]
+            items.append({
+                "id": uuid4(), "pharmacy_id": pharmacy["id"], "medicine_id": medicine["id"],
+                "current_stock": sum(quantities), "reserved_stock": 0, "cost_price": Decimal("8.00"),
+                "selling_price": Decimal("10.00"), "mrp": Decimal("12.00"),
+            })
+            for n, quantity in enumerate(quantities):
+                batch_rows.append({
+                    "id": uuid4(), "medicine_id": medicine["id"], "pharmacy_id": pharmacy["id"],
+                    "batch_number": f"B{n}-{uuid4().hex[:8]}", "manufacturing_date": today - timedelta(days=365),
+                    # Some batches are already expired so allocation has to skip them
+                    "expiry_date": today + timedelta(days=random.randint(-30, 720)),
+                    "manufactured_quantity": quantity, "received_quantity": quantity,
+                    "current_quantity": quantity, "reserved_quantity": 0,
+                })
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(Medicine), medicines)
+        await session.execute(insert(Pharmacy), pharmacies)
+        for start in range(0, len(items), 10000):
+            await session.execute(insert(InventoryItem), items[start:start + 10000])
+        for start in range(0, len(batch_rows), 10000):
+            await session.execute(insert(MedicineBatch), batch_rows[start:start + 10000])
+        await session.commit()
+    return pairs
+
+
+async def legacy_allocate(session, pharmacy_id, medicine_id, quantity):
+    """Load candidate batches, pick FEFO in Python, update them one by one."""
+    result = await session.execute(
+        select(MedicineBatch).where(
+            and_(
+                MedicineBatch.pharmacy_id == pharmacy_id,
+                MedicineBatch.medicine_id == medicine_id,
+                MedicineBatch.current_quantity > MedicineBatch.reserved_quantity,
+                MedicineBatch.expiry_date >= date.today(),
+                MedicineBatch.is_active == True
+            )
+        ).order_by(MedicineBatch.expiry_date, MedicineBatch.id).with_for_update()
+    )
+    remaining = quantity
+    for batch in result.scalars().all():
+        if remaining <= 0:
+            break
+        take = min(batch.available_quantity, remaining)
+        await session.execute(
+            update(MedicineBatch).where(MedicineBatch.id == batch.id)
+            .values(current_quantity=MedicineBatch.current_quantity - take)
+        )
+        remaining -= take
+    await session.commit()
+
+
+async def fefo_allocate(session, pharmacy_id, medicine_id, quantity):
+    await MedicineBatchRepository(session).allocate(
+        pharmacy_id, medicine_id, quantity, BatchAllocationModeEnum.DISPENSE
+    )
+    await session.commit()
+
+
+async def drive(name, allocate, pairs, args):
+    rng = random.Random(args.seed)
+    work = [(rng.choice(pairs), rng.randint(1, 120)) for _ in range(args.allocations)]
+    samples = []
+
+    async def worker(chunk):
+        async with AsyncSessionLocal() as session:
+            for (pharmacy_id, medicine_id), quantity in chunk:
+                with timed(samples):
+                    await allocate(session, pharmacy_id, medicine_id, quantity)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(work[i::args.concurrency]) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    summarize(name, samples)
+    print(f"{'':<40} allocations/s={len(work) / elapsed:.0f} (concurrency {args.concurrency})")
+
+
+async def run(args):
+    random.seed(args.seed)
+    pairs = await seed(args.pharmacies, args.medicines, args.stocked, args.batches)
+    await drive("legacy read-modify-write", legacy_allocate, pairs, args)
+    await drive("single-statement FEFO", fefo_allocate, pairs, args)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pharmacies", type=int, default=200)
+    parser.add_argument("--medicines", type=int, default=200)
+    parser.add_argument("--stocked", type=int, default=50, help="medicines stocked per pharmacy")
+    parser.add_argument("--batches", type=int, default=6, help="batches per stocked medicine")
+    parser.add_argument("--allocations", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
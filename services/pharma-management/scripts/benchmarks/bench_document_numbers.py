@@ -0,0 +1,76 @@
+"""
+Check document number uniqueness and throughput across processes
+
+Usage:
+    python scripts/benchmarks/bench_document_numbers.py --processes 4 --documents 20000
+
+Runs several processes against DATABASE_URL (a disposable Postgres
+database), each allocating invoice numbers for a handful of pharmacies from
+many concurrent tasks, then checks that no number was issued twice and
+reports documents per second for each block size.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from uuid import UUID, uuid4
+
+import common  # noqa: F401  (puts the service on sys.path)
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.services.document_number_service import DocumentNumberAllocator, DocumentTypeEnum
+
+
+async def allocate(pharmacy_ids, documents: int, concurrency: int, block_size: int):
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=concurrency)
+    allocator = DocumentNumberAllocator(engine, block_size=block_size)
+    numbers = []
+
+    async def worker(offset: int):
+        for i in range(offset, documents, concurrency):
+            pharmacy_id = pharmacy_ids[i % len(pharmacy_ids)]
+            numbers.append(await allocator.next_number(DocumentTypeEnum.INVOICE, pharmacy_id))
+
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    await engine.dispose()
+    return numbers
+
+
+def process_main(args):
+    pharmacy_ids, documents, concurrency, block_size = args
+    return asyncio.run(allocate([UUID(p) for p in pharmacy_ids], documents, concurrency, block_size))
+
+
+def run(args):
+    for block_size in args.block_sizes:
+        # Fresh pharmacies per run so every block size starts new sequences
+        pharmacy_ids = [str(uuid4()) for _ in range(args.pharmacies)]
+        per_process = args.documents // args.processes
+        jobs = [(pharmacy_ids, per_process, args.concurrency, block_size)] * args.processes
+
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.map(process_main, jobs)
+        elapsed = time.perf_counter() - started
+
+        numbers = [number for result in results for number in result]
+        duplicates = len(numbers) - len(set(numbers))
+        print(
+            f"block={block_size:<5} documents={len(numbers):<7} elapsed={elapsed:.2f}s "
+            f"docs/s={len(numbers) / elapsed:.0f} duplicates={duplicates}"
+        )
+        if duplicates:
+            raise SystemExit("duplicate document numbers issued")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent tasks per process")
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--pharmacies", type=int, default=5)
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=[1, 50, 500])
+    run(parser.parse_args())
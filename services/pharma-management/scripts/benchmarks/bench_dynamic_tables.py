@@ -0,0 +1,111 @@
+"""
+Benchmark per-pharmacy table onboarding and routed query overhead
+
+Usage:
+    python scripts/benchmarks/bench_dynamic_tables.py --pharmacies 1000 --queries 20000
+
+Runs against DATABASE_URL (a disposable Postgres database). Onboards
+--legacy-pharmacies pharmacies the old way (one transaction per pharmacy,
+one statement per table) and extrapolates to --pharmacies, then onboards
+--pharmacies with the bulk provisioner, --per-transaction pharmacies per
+commit. Afterwards it runs primary-key lookups against random pharmacies,
+once building the table name and SQL string ad hoc on every call and
+once through PharmacyTableRouter's cached tables and statement templates,
+and reports the Python-side preparation cost and end-to-end latency.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from uuid import uuid4
+
+from common import summarize, timed
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex, CreateSchema, CreateTable
+
+from app.core.dynamic_tables import (
+    PharmacyTableRouter, build_pharmacy_tables, pharmacy_schema_name, pharmacy_table_name
+)
+from app.db.session import engine
+
+
+async def legacy_onboard(pharmacy_ids):
+    """One transaction and one round trip per DDL statement, per pharmacy."""
+    for pharmacy_id in pharmacy_ids:
+        async with engine.begin() as conn:
+            await conn.execute(CreateSchema(pharmacy_schema_name(pharmacy_id), if_not_exists=True))
+            for table in build_pharmacy_tables(pharmacy_id).values():
+                await conn.execute(CreateTable(table))
+                for index in table.indexes:
+                    await conn.execute(CreateIndex(index))
+
+
+async def bulk_onboard(router, pharmacy_ids, per_transaction):
+    for start in range(0, len(pharmacy_ids), per_transaction):
+        async with engine.begin() as conn:
+            await router.provision(conn, pharmacy_ids[start:start + per_transaction])
+
+
+async def adhoc_lookup(conn, pharmacy_id, row_id, prep_samples):
+    with timed(prep_samples):
+        table_name = f"{pharmacy_schema_name(pharmacy_id)}.{pharmacy_table_name(pharmacy_id, 'inventory_items')}"
+        statement = text(f"SELECT * FROM {table_name} WHERE id = :row_id")
+    return await conn.execute(statement, {"row_id": row_id})
+
+
+async def routed_lookup(conn, router, pharmacy_id, row_id, prep_samples):
+    with timed(prep_samples):
+        statement = (await router.route(conn, pharmacy_id))["inventory"].get_by_id
+    return await conn.execute(statement, {"row_id": row_id})
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    router = PharmacyTableRouter(maxsize=args.cache_size)
+
+    legacy_ids = [uuid4() for _ in range(args.legacy_pharmacies)]
+    started = time.perf_counter()
+    await legacy_onboard(legacy_ids)
+    legacy_seconds = time.perf_counter() - started
+    print(
+        f"legacy onboarding: {len(legacy_ids)} pharmacies in {legacy_seconds:.1f}s "
+        f"(~{legacy_seconds / len(legacy_ids) * args.pharmacies:.0f}s for {args.pharmacies})"
+    )
+
+    pharmacy_ids = [uuid4() for _ in range(args.pharmacies)]
+    started = time.perf_counter()
+    await bulk_onboard(router, pharmacy_ids, args.per_transaction)
+    print(f"bulk provisioning: {len(pharmacy_ids)} pharmacies in {time.perf_counter() - started:.1f}s")
+
+    hot = rng.sample(pharmacy_ids, min(args.hot_pharmacies, len(pharmacy_ids)))
+    work = [(rng.choice(hot), uuid4()) for _ in range(args.queries)]
+    async with engine.connect() as conn:
+        for name, lookup in (
+            ("ad hoc name + SQL string", lambda p, r, s: adhoc_lookup(conn, p, r, s)),
+            ("router templates", lambda p, r, s: routed_lookup(conn, router, p, r, s)),
+        ):
+            prep, total = [], []
+            for pharmacy_id, row_id in work:
+                with timed(total):
+                    await lookup(pharmacy_id, row_id, prep)
+            summarize(f"{name} (prepare)", prep)
+            summarize(f"{name} (end to end)", total)
+
+    async with engine.begin() as conn:
+        for pharmacy_id in legacy_ids + pharmacy_ids:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {pharmacy_schema_name(pharmacy_id)} CASCADE"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pharmacies", type=int, default=1000)
+    parser.add_argument("--legacy-pharmacies", type=int, default=100)
+    parser.add_argument("--per-transaction", type=int, default=250)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--hot-pharmacies", type=int, default=200)
+    parser.add_argument("--cache-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""
+Benchmark 10-drug interaction checks per second against 200k pairs
+
+Usage:
+    python scripts/benchmarks/bench_interactions.py --pairs 200000 --drugs 10
+
+Builds the in-memory DrugInteractionIndex from synthetic pairs produced by
+the local seed generator, then times index.check() on random prescriptions.
+"""
+
+import argparse
+import random
+import time
+from uuid import uuid4
+
+from common import summarize, timed
+
+from app.services.interaction_engine import DrugInteractionIndex, InteractionEntry
+from scripts.generate_interaction_seed import make_interaction_rows
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    drug_ids = [uuid4() for _ in range(args.medicines)]
+    rows = make_interaction_rows(drug_ids, args.pairs, rng)
+
+    index = DrugInteractionIndex()
+    started = time.perf_counter()
+    index.load(
+        InteractionEntry(
+            row["drug1_id"], row["drug2_id"], "Drug A", "Drug B", row["interaction_type"],
+            row["severity"], row["mechanism"], row["clinical_effect"], row["management_strategy"],
+            row["monitoring_required"], None
+        )
+        for row in rows
+    )
+    print(f"index load: {len(index.pairs)} pairs in {time.perf_counter() - started:.2f}s")
+
+    samples = []
+    found = 0
+    for _ in range(args.checks):
+        prescription = rng.sample(drug_ids, args.drugs)
+        with timed(samples):
+            found += len(index.check(prescription))
+    summarize(f"{args.drugs}-drug interaction check", samples)
+    print(f"interactions found: {found} across {args.checks} checks")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=200000)
+    parser.add_argument("--medicines", type=int, default=5000)
+    parser.add_argument("--drugs", type=int, default=10)
+    parser.add_argument("--checks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
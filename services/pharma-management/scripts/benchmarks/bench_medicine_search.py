@@ -0,0 +1,119 @@
+"""
+Benchmark p99 latency of 2- and 6-character medicine searches on 500k medicines
+
+Usage:
+    python scripts/benchmarks/bench_medicine_search.py --medicines 500000
+    python scripts/benchmarks/bench_medicine_search.py --medicines 500000 --db
+
+Without --db only the in-memory type-ahead trie is measured. With --db the
+synthetic catalogue is also loaded into DATABASE_URL (a disposable Postgres
+database) and the trigram-backed MedicineRepository.search_medicines is
+measured against the same queries.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from decimal import Decimal
+from uuid import uuid4
+
+from common import summarize, timed
+
+from sqlalchemy import insert, text
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.base import BaseModel
+from app.models.medicine import Medicine
+from app.repositories.medicine_repository import MedicineRepository
+from app.services.medicine_search_service import MedicinePrefixTrie
+
+SYLLABLES = ["par", "ace", "ta", "mol", "amo", "xi", "cil", "lin", "met", "for", "min",
+             "ator", "va", "sta", "tin", "lo", "sar", "tan", "ome", "pra", "zole", "cet", "iri", "zine"]
+
+
+def synthetic_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def make_rows(count: int, rng: random.Random):
+    return [
+        (uuid4(), f"{synthetic_name(rng)} {rng.choice(['5mg', '10mg', '250mg', '500mg'])}",
+         synthetic_name(rng), synthetic_name(rng) if rng.random() < 0.5 else None)
+        for _ in range(count)
+    ]
+
+
+def make_queries(rows, length: int, count: int, rng: random.Random):
+    queries = []
+    while len(queries) < count:
+        name = rng.choice(rows)[1].lower()
+        if len(name) >= length:
+            queries.append(name[:length])
+    return queries
+
+
+async def bench_db(rows, queries_by_length, limit: int):
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(rows), 10000):
+            await session.execute(insert(Medicine), [
+                {
+                    "id": medicine_id,
+                    "name": name,
+                    "generic_name": generic_name,
+                    "brand_name": brand_name,
+                    "manufacturer": "Bench Labs",
+                    "active_ingredients": [generic_name],
+                    "strength": "500mg",
+                    "dosage_form": "Tablet",
+                    "route_of_administration": "oral",
+                    "unit_price": Decimal("10.00"),
+                }
+                for medicine_id, name, generic_name, brand_name in rows[start:start + 10000]
+            ])
+        await session.commit()
+        await session.execute(text("ANALYZE medicines"))
+
+        repo = MedicineRepository(session)
+        for length, queries in queries_by_length.items():
+            samples = []
+            for query in queries:
+                with timed(samples):
+                    await repo.search_medicines(query, limit)
+            summarize(f"trigram search, {length}-char query", samples)
+
+    await engine.dispose()
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    rows = make_rows(args.medicines, rng)
+
+    started = time.perf_counter()
+    trie = MedicinePrefixTrie.build(rows)
+    print(f"trie build: {len(rows)} medicines in {time.perf_counter() - started:.2f}s")
+
+    queries_by_length = {length: make_queries(rows, length, args.queries, rng) for length in (2, 6)}
+    for length, queries in queries_by_length.items():
+        samples = []
+        for query in queries:
+            with timed(samples):
+                trie.search(query, args.limit)
+        summarize(f"trie type-ahead, {length}-char query", samples)
+
+    if args.db:
+        asyncio.run(bench_db(rows, queries_by_length, args.limit))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--medicines", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", action="store_true", help="also benchmark the trigram SQL search")
+    run(parser.parse_args())
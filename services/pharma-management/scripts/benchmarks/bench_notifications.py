@@ -0,0 +1,109 @@
+"""
+Benchmark notification throughput against an in-process fake server
+
+Usage:
+    python scripts/benchmarks/bench_notifications.py --notifications 5000 --concurrency 64
+
+Starts a NotificationService on a thread pool in this process that
+acknowledges every request, then sends notifications three ways: the old
+client (a new channel per notification, blocking call), the shared
+NotificationChannel awaited one at a time, and the shared channel with
+--concurrency concurrent callers going through the micro-batcher.
+Reports latency and notifications per second for each.
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import common  # noqa: F401  (puts the service on sys.path)
+from common import summarize, timed
+
+import grpc
+
+from app.grpc_client import NotificationChannel, build_notification_request
+from app.protos.notification_pb2 import NotificationResponse
+from app.protos.notification_pb2_grpc import (
+    NotificationServiceServicer, NotificationServiceStub, add_NotificationServiceServicer_to_server
+)
+
+
+class AckService(NotificationServiceServicer):
+    def SendNotification(self, request, context):
+        return NotificationResponse(notification_id=request.id, success=True)
+
+
+def start_server(workers: int):
+    """Thread-pool server, so it neither shares the clients' event loop nor
+    runs a second grpc.aio poller in this process."""
+    server = grpc.server(ThreadPoolExecutor(max_workers=workers))
+    add_NotificationServiceServicer_to_server(AckService(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+def payload(i: int) -> dict:
+    return {"type": "success", "title": "Prescription Ready", "message": f"Order {i}", "user_id": str(i)}
+
+
+def report(name, samples, elapsed):
+    summarize(name, samples)
+    print(f"{'':<40} notifications/s={len(samples) / elapsed:.0f}")
+
+
+def legacy(target, count):
+    """The old NotificationClient: new channel and blocking call per notification."""
+    samples = []
+    started = time.perf_counter()
+    for i in range(count):
+        with timed(samples):
+            channel = grpc.insecure_channel(target)
+            NotificationServiceStub(channel).SendNotification(build_notification_request(payload(i)))
+            channel.close()
+    report("new channel per call", samples, time.perf_counter() - started)
+
+
+async def pooled_sequential(target, count):
+    channel = NotificationChannel(target=target, batch_window_ms=0)
+    samples = []
+    started = time.perf_counter()
+    for i in range(count):
+        with timed(samples):
+            await channel.send(build_notification_request(payload(i)))
+    report("shared channel, one at a time", samples, time.perf_counter() - started)
+    await channel.close()
+
+
+async def pooled_batched(target, count, concurrency, window_ms):
+    channel = NotificationChannel(target=target, batch_window_ms=window_ms)
+    samples = []
+
+    async def caller(indexes):
+        for i in indexes:
+            with timed(samples):
+                await channel.submit(build_notification_request(payload(i)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(range(n, count, concurrency)) for n in range(concurrency)))
+    report(f"shared channel, batched x{concurrency}", samples, time.perf_counter() - started)
+    await channel.close()
+
+
+def run(args):
+    server, target = start_server(args.server_workers)
+    legacy(target, args.legacy_notifications)
+    asyncio.run(pooled_sequential(target, args.notifications))
+    asyncio.run(pooled_batched(target, args.notifications, args.concurrency, args.window_ms))
+    server.stop(None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notifications", type=int, default=5000)
+    parser.add_argument("--legacy-notifications", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--server-workers", type=int, default=16)
+    run(parser.parse_args())
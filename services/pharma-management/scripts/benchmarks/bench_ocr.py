@@ -0,0 +1,101 @@
+"""
+Benchmark prescription OCR throughput in images per second
+
+Usage:
+    python scripts/benchmarks/bench_ocr.py --fixtures path/to/prescriptions
+    python scripts/benchmarks/bench_ocr.py --generate 40
+
+Needs the tesseract binary (TESSERACT_CMD). With --fixtures every image in the
+directory is used; otherwise synthetic phone-sized prescription photos are
+rendered into a temporary directory. Three passes are compared: the legacy
+in-process pipeline (full resolution, image_to_data plus image_to_string),
+the process-pool pipeline, and a second pool pass served from the
+content-hash cache.
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import common  # noqa: F401  (puts the service on sys.path)
+
+import cv2
+import pytesseract
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.integrations.ocr import prescription_ocr
+from app.integrations.ocr.prescription_ocr import TESSERACT_CONFIG, PrescriptionOCR
+
+MEDICINES = ["Paracetamol 500mg", "Amoxicillin 250mg", "Metformin 500mg", "Atorvastatin 10mg",
+             "Omeprazole 20mg", "Cetirizine 10mg", "Losartan 50mg", "Azithromycin 500mg"]
+
+
+def generate_fixtures(directory: Path, count: int, seed: int):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        image = Image.new("L", (3024, 4032), 255)
+        draw = ImageDraw.Draw(image)
+        lines = [f"Dr. Bench {i}  City Clinic", f"Patient: Test Patient {i}", f"Date: {rng.randint(1, 28)}/06/2024", ""]
+        lines += [f"Rx {name} take {rng.randint(1, 3)} times daily" for name in rng.sample(MEDICINES, 4)]
+        for row, line in enumerate(lines):
+            draw.text((200, 300 + row * 120), line, fill=0)
+        path = directory / f"prescription_{i:03d}.png"
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def legacy_pipeline(path: Path):
+    """The pre-pool pipeline: full resolution and two tesseract passes."""
+    gray = cv2.cvtColor(cv2.imread(str(path)), cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    pytesseract.image_to_data(thresh, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+    text = pytesseract.image_to_string(thresh, config=TESSERACT_CONFIG)
+    PrescriptionOCR._parse_prescription_text(text)
+
+
+async def pool_pass(paths):
+    ocr = PrescriptionOCR()
+    started = time.perf_counter()
+    await asyncio.gather(*(ocr.process_prescription_image(str(path)) for path in paths))
+    return time.perf_counter() - started
+
+
+def report(name: str, images: int, elapsed: float):
+    print(f"{name:<40} images={images:<5} elapsed={elapsed:.2f}s images/s={images / elapsed:.2f}")
+
+
+def run(args):
+    pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            paths = sorted(p for p in Path(args.fixtures).iterdir() if p.suffix.lower() in {".png", ".jpg", ".jpeg"})
+        else:
+            paths = generate_fixtures(Path(tmp), args.generate, args.seed)
+
+        legacy_paths = paths[:args.legacy_sample] if args.legacy_sample else paths
+        started = time.perf_counter()
+        for path in legacy_paths:
+            legacy_pipeline(path)
+        report("legacy in-process, two passes", len(legacy_paths), time.perf_counter() - started)
+
+        prescription_ocr._result_cache.clear()
+        report("process pool, single pass", len(paths), asyncio.run(pool_pass(paths)))
+        report("process pool, cached", len(paths), asyncio.run(pool_pass(paths)))
+        prescription_ocr.shutdown_ocr_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", help="directory of prescription images")
+    parser.add_argument("--generate", type=int, default=40, help="synthetic images when no fixtures given")
+    parser.add_argument("--legacy-sample", type=int, default=0, help="limit legacy pass to N images (0 = all)")
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
@@ -0,0 +1,159 @@
+"""
+Load test the shared OCR queue at a fixed upload rate
+
+Usage:
+    python scripts/benchmarks/bench_ocr_queue.py --rate 50 --duration 60
+    python scripts/benchmarks/bench_ocr_queue.py --rate 50 --simulate-ms 80
+
+Producers enqueue at --rate jobs per second into REDIS_URL while one
+OCRWorkerService consumes them. Results are collected from the OCR events
+channel, as a client would receive them. Reports queue depth, time from
+enqueue to result, and throughput. By default real OCR runs on synthetic
+prescriptions (needs tesseract); --simulate-ms replaces recognition with a
+fixed per-image cost spread over the pool. Prescription rows are not
+written, so no database is needed.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from common import percentile
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.integrations.ocr import prescription_ocr
+from app.integrations.ocr.prescription_ocr import PrescriptionOCR, pool_size, shutdown_ocr_pool, start_ocr_pool
+from app.services.ocr_queue import PRIORITY_BULK, PRIORITY_NORMAL, PRIORITY_URGENT, OCRJobQueue, OCRWorkerService
+from bench_ocr import generate_fixtures
+
+
+class SimulatedOCR:
+    """Stands in for tesseract with a fixed per-image cost on pool_size() workers."""
+
+    def __init__(self, per_image_ms: float):
+        self.per_image_ms = per_image_ms
+
+    async def process_prescription_images(self, image_paths):
+        rounds = math.ceil(len(image_paths) / pool_size())
+        await asyncio.sleep(rounds * self.per_image_ms / 1000)
+        return [{"success": True, "text": "Rx", "confidence": 90.0, "parsed_data": {}} for _ in image_paths]
+
+
+class BenchWorker(OCRWorkerService):
+    """Worker that skips the prescription table writes."""
+
+    async def _mark_processing(self, jobs):
+        pass
+
+    async def _store_results(self, jobs, results):
+        pass
+
+
+async def produce(queue, paths, rate: float, duration: float, rng: random.Random):
+    sent = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        priority = rng.choices([PRIORITY_URGENT, PRIORITY_NORMAL, PRIORITY_BULK], [1, 8, 1])[0]
+        await queue.enqueue(uuid4(), str(rng.choice(paths)), priority)
+        sent += 1
+        # Pace against the wall clock so slow enqueues do not lower the rate
+        delay = started + sent / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    return sent
+
+
+async def sample_depth(queue, samples, stop: asyncio.Event):
+    while not stop.is_set():
+        samples.append(await queue.depth())
+        await asyncio.sleep(0.5)
+
+
+async def collect_events(redis_client, channel, expected: dict, waits, done: asyncio.Event):
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(channel)
+    try:
+        while not done.is_set():
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message:
+                event = json.loads(message["data"])
+                waits.setdefault(event["priority"], []).append(event["wait_seconds"])
+                expected["received"] += 1
+                if expected["sent"] is not None and expected["received"] >= expected["sent"]:
+                    done.set()
+    finally:
+        await pubsub.unsubscribe(channel)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    key = f"bench:ocr:{uuid4().hex[:8]}"
+    channel = f"{key}:events"
+    queue = OCRJobQueue(redis_client, key=key, max_depth=args.max_depth)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate_fixtures(Path(tmp), args.images, args.seed)
+        if args.simulate_ms:
+            ocr = SimulatedOCR(args.simulate_ms)
+        else:
+            if not args.use_cache:
+                # Fixtures repeat; without this most uploads would be cache hits
+                prescription_ocr._result_cache.maxsize = 0
+            start_ocr_pool()
+            ocr = PrescriptionOCR()
+        worker = BenchWorker(queue, ocr=ocr, batch_size=args.batch_size, channel=channel)
+
+        expected = {"sent": None, "received": 0}
+        waits, depths = {}, []
+        done, stop_sampling = asyncio.Event(), asyncio.Event()
+        collector = asyncio.create_task(collect_events(redis_client, channel, expected, waits, done))
+        sampler = asyncio.create_task(sample_depth(queue, depths, stop_sampling))
+        consumer = asyncio.create_task(worker.run_forever(poll_timeout=1.0))
+        await asyncio.sleep(0.2)
+
+        started = time.perf_counter()
+        expected["sent"] = await produce(queue, paths, args.rate, args.duration, rng)
+        if expected["received"] >= expected["sent"]:
+            done.set()
+        await done.wait()
+        elapsed = time.perf_counter() - started
+
+        worker.stop()
+        stop_sampling.set()
+        await asyncio.gather(consumer, sampler, collector)
+        await redis_client.delete(key)
+        await redis_client.aclose()
+        shutdown_ocr_pool()
+
+    all_waits = [w for values in waits.values() for w in values]
+    print(f"uploads: {expected['sent']} at {args.rate}/s, processed {expected['received']} in {elapsed:.1f}s")
+    print(f"throughput: {expected['received'] / elapsed:.1f} images/s")
+    print(f"queue depth: max={max(depths, default=0)} mean={statistics.fmean(depths) if depths else 0:.1f}")
+    for name, values in [("all", all_waits)] + [(f"priority {p}", v) for p, v in sorted(waits.items())]:
+        print(
+            f"wait {name:<12} n={len(values):<6} p50={percentile(values, 50):.3f}s "
+            f"p95={percentile(values, 95):.3f}s p99={percentile(values, 99):.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=50.0, help="uploads per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--batch-size", type=int, default=settings.OCR_BATCH_SIZE)
+    parser.add_argument("--max-depth", type=int, default=settings.OCR_QUEUE_MAX_DEPTH)
+    parser.add_argument("--images", type=int, default=20, help="distinct synthetic prescriptions")
+    parser.add_argument("--simulate-ms", type=float, default=0.0, help="fake per-image OCR cost")
+    parser.add_argument("--use-cache", action="store_true", help="let repeated fixtures hit the result cache")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
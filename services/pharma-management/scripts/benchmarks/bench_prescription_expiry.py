@@ -0,0 +1,107 @@
+"""
+Benchmark the expired prescription sweep on a large backlog
+
+Usage:
+    python scripts/benchmarks/bench_prescription_expiry.py --rows 2000000 --batch-size 1000
+
+Seeds DATABASE_URL (a disposable Postgres database) with --rows overdue
+prescriptions using generate_series, then times the legacy per-row loop
+(one ORM update and one committed audit row per prescription) on the first
+--legacy-rows of them and the chunked ExpiredPrescriptionSweeper on the
+rest. Legacy throughput on the full backlog is extrapolated.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+import common  # noqa: F401  (puts the service on sys.path)
+
+from sqlalchemy import select, text
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.base import BaseModel
+from app.models.prescription import Prescription, PrescriptionStatusEnum
+from app.services.audit_service import AuditService
+from app.services.prescription_expiry_service import ExpiredPrescriptionSweeper, SWEEPABLE_STATUSES
+
+
+async def seed(rows: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+        await conn.execute(text("TRUNCATE prescriptions CASCADE"))
+
+    started = time.perf_counter()
+    statuses = ", ".join(f"'{status}'" for status in SWEEPABLE_STATUSES)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"""
+            INSERT INTO prescriptions (id, prescription_number, patient_id, doctor_id, issue_date,
+                                       expiry_date, status, patient_name, doctor_name,
+                                       created_at, updated_at, is_active)
+            SELECT gen_random_uuid(), 'RX-BENCH-' || g, gen_random_uuid(), gen_random_uuid(),
+                   current_date - 400, current_date - 1 - (g % 300),
+                   (ARRAY[{statuses}])[1 + g % 3], 'Patient', 'Doctor',
+                   now(), now(), true
+            FROM generate_series(1, {rows}) AS g
+        """))
+        await conn.execute(text("ANALYZE prescriptions"))
+    print(f"seeded {rows} overdue prescriptions in {time.perf_counter() - started:.1f}s")
+
+
+async def legacy_sweep(limit: int) -> int:
+    """The pre-sweeper loop, capped at limit rows."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Prescription).where(
+                Prescription.expiry_date < date.today(),
+                Prescription.status.in_(SWEEPABLE_STATUSES)
+            ).limit(limit)
+        )
+        updated = 0
+        for prescription in result.scalars().all():
+            prescription.status = PrescriptionStatusEnum.EXPIRED.value
+            updated += 1
+            await AuditService(db).log_prescription_action(
+                action="prescription_expired",
+                prescription_id=prescription.id,
+                description=f"Prescription expired on {prescription.expiry_date}"
+            )
+        await db.commit()
+        return updated
+
+
+async def run(args):
+    await seed(args.rows)
+
+    started = time.perf_counter()
+    legacy_count = await legacy_sweep(args.legacy_rows)
+    legacy_seconds = time.perf_counter() - started
+    legacy_rate = legacy_count / legacy_seconds
+    print(
+        f"legacy loop: {legacy_count} rows in {legacy_seconds:.1f}s "
+        f"({legacy_rate:.0f} rows/s, ~{args.rows / legacy_rate / 60:.0f} min for {args.rows})"
+    )
+
+    started = time.perf_counter()
+    result = await ExpiredPrescriptionSweeper(batch_size=args.batch_size).sweep()
+    sweep_seconds = time.perf_counter() - started
+    print(
+        f"sweeper: {result['updated_count']} rows in {result['batches']} batches, "
+        f"{sweep_seconds:.1f}s ({result['updated_count'] / sweep_seconds:.0f} rows/s)"
+    )
+
+    async with engine.connect() as conn:
+        audit_rows = await conn.scalar(text(
+            "SELECT count(*) FROM audit_logs WHERE action = 'prescription_expired'"
+        ))
+    print(f"audit rows written: {audit_rows}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--legacy-rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
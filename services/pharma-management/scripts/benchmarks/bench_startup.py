@@ -0,0 +1,75 @@
+"""
+Benchmark cold-start schema preparation per replica
+
+Usage:
+    python scripts/benchmarks/bench_startup.py --replicas 8 --rounds 5
+
+Brings DATABASE_URL (a disposable Postgres database) to the migration head
+once, then starts --replicas replicas concurrently for each of --rounds
+rounds. Every replica gets its own engine, so each start opens a fresh
+connection as a new pod would. Each round runs twice: once with the old
+startup hook (create_all plus partition upkeep on every start) and once
+with MigrationController.ensure_schema. Reports per-replica cold-start
+latency for each.
+"""
+
+import argparse
+import asyncio
+
+from common import summarize, timed
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.migrations import MigrationController
+from app.db.partitions import audit_log_partitions
+from app.models.base import BaseModel
+
+
+async def legacy_start():
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.run_sync(BaseModel.metadata.create_all)
+            await audit_log_partitions().ensure_partitions(conn)
+    finally:
+        await engine.dispose()
+
+
+async def controlled_start(head: str):
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        await MigrationController(engine, head=head).ensure_schema()
+    finally:
+        await engine.dispose()
+
+
+async def drive(name, start, args):
+    samples = []
+
+    async def replica():
+        with timed(samples):
+            await start()
+
+    for _ in range(args.rounds):
+        await asyncio.gather(*(replica() for _ in range(args.replicas)))
+    summarize(name, samples)
+
+
+async def run(args):
+    engine = create_async_engine(settings.DATABASE_URL)
+    controller = MigrationController(engine)
+    print(f"schema {(await controller.ensure_schema()).value} at revision {controller.head}")
+    await engine.dispose()
+
+    await drive("create_all on every start", legacy_start, args)
+    await drive("revision fast path", lambda: controlled_start(controller.head), args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--replicas", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
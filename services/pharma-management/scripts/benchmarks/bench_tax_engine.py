@@ -0,0 +1,91 @@
+"""
+Benchmark GST computation on large invoices
+
+Usage:
+    python scripts/benchmarks/bench_tax_engine.py --lines 1000 --invoices 500
+
+Pure CPU, no database needed. Builds random invoices of --lines lines and
+computes their taxes two ways: the per-line Decimal loop BillingService
+used (run twice per invoice, once for the totals and once for the stored
+items, as it did) and TaxEngine.compute, which does both in one integer
+pass, with and without the per-line breakdown (orders only need the
+totals). Reports per-invoice latency for each.
+"""
+
+import argparse
+import random
+from decimal import Decimal
+
+from common import summarize, timed
+
+from app.services.tax_engine import TaxEngine, TaxLine, TaxRateTable
+
+HSN_CODES = [None, "30049099", "30043110", "30022012", "30051010", "90183100", "90211000"]
+
+
+def random_invoice(rng: random.Random, lines: int):
+    return [
+        TaxLine(
+            unit_price=Decimal(rng.randint(100, 500000)) / 100,
+            quantity=rng.randint(1, 60),
+            hsn_code=rng.choice(HSN_CODES),
+            discount_percentage=Decimal(rng.choice([0, 0, 0, 500, 1000, 1250])) / 100,
+        )
+        for _ in range(lines)
+    ]
+
+
+def decimal_invoice(lines, table: TaxRateTable):
+    """The legacy BillingService arithmetic."""
+    subtotal = total_cgst = total_sgst = Decimal("0.00")
+    for line in lines:
+        item_total = line.unit_price * line.quantity
+        discount_amount = (item_total * line.discount_percentage) / 100
+        taxable_amount = item_total - discount_amount
+        gst_amount = (taxable_amount * table.rate(line.hsn_code)) / 100
+        subtotal += taxable_amount
+        total_cgst += gst_amount / 2
+        total_sgst += gst_amount / 2
+
+    items = []
+    for line in lines:
+        item_total = line.unit_price * line.quantity
+        discount_amount = (item_total * line.discount_percentage) / 100
+        taxable_amount = item_total - discount_amount
+        gst_amount = (taxable_amount * table.rate(line.hsn_code)) / 100
+        items.append((item_total, discount_amount, taxable_amount, gst_amount / 2, gst_amount / 2,
+                      taxable_amount + gst_amount))
+    return subtotal, total_cgst, total_sgst, items
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    invoices = [random_invoice(rng, args.lines) for _ in range(args.invoices)]
+    table = TaxRateTable()
+    engine = TaxEngine(table)
+
+    samples = []
+    for lines in invoices:
+        with timed(samples):
+            decimal_invoice(lines, table)
+    summarize(f"Decimal per line ({args.lines} lines)", samples)
+
+    samples = []
+    for lines in invoices:
+        with timed(samples):
+            engine.compute(lines)
+    summarize(f"integer paise engine ({args.lines} lines)", samples)
+
+    samples = []
+    for lines in invoices:
+        with timed(samples):
+            engine.compute(lines, itemize=False)
+    summarize(f"engine, totals only ({args.lines} lines)", samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1000)
+    parser.add_argument("--invoices", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
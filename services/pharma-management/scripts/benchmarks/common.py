@@ -0,0 +1,51 @@
+"""
+Shared timing helpers for benchmark scripts
+"""
+
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+# Make the service package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, samples: List[float], unit: str = "ms") -> Dict[str, float]:
+    """Print and return latency stats for samples recorded in seconds."""
+    scale = 1000.0 if unit == "ms" else 1.0
+    stats = {
+        "count": len(samples),
+        "mean": statistics.fmean(samples) * scale if samples else 0.0,
+        "p50": percentile(samples, 50) * scale,
+        "p95": percentile(samples, 95) * scale,
+        "p99": percentile(samples, 99) * scale,
+        "ops_per_sec": len(samples) / sum(samples) if samples and sum(samples) else 0.0,
+    }
+    print(
+        f"{name:<40} n={stats['count']:<7} mean={stats['mean']:.3f}{unit} "
+        f"p50={stats['p50']:.3f}{unit} p95={stats['p95']:.3f}{unit} "
+        f"p99={stats['p99']:.3f}{unit} ops/s={stats['ops_per_sec']:.1f}"
+    )
+    return stats
+
+
+@contextmanager
+def timed(samples: List[float]) -> Iterator[None]:
+    """Append the wall-clock duration of the block to samples."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - start)
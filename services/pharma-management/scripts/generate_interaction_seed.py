@@ -0,0 +1,111 @@
+"""
+Generate local drug interaction seed data
+
+Usage:
+    python scripts/generate_interaction_seed.py --medicines 5000 --pairs 200000
+
+Creates synthetic medicines when the catalogue is smaller than requested,
+then inserts random, de-duplicated drug pairs with a realistic severity mix.
+Intended for local databases only.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+from typing import Dict, List
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.clinical import DrugInteraction
+from app.models.medicine import Medicine
+
+SEVERITY_WEIGHTS = {"minor": 50, "moderate": 35, "major": 12, "contraindicated": 3}
+INTERACTION_TYPES = ["pharmacokinetic", "pharmacodynamic"]
+MECHANISMS = [
+    "CYP3A4 inhibition",
+    "CYP2D6 inhibition",
+    "Additive QT prolongation",
+    "Additive CNS depression",
+    "Reduced renal clearance",
+    "Additive bleeding risk",
+]
+
+
+def make_interaction_rows(drug_ids: List[UUID], pair_count: int, rng: random.Random) -> List[Dict]:
+    """Build unique, canonical drug pairs with random interaction details."""
+    max_pairs = len(drug_ids) * (len(drug_ids) - 1) // 2
+    if pair_count > max_pairs:
+        raise ValueError(f"{len(drug_ids)} drugs allow at most {max_pairs} pairs")
+
+    severities = list(SEVERITY_WEIGHTS)
+    weights = list(SEVERITY_WEIGHTS.values())
+    seen = set()
+    rows = []
+    while len(rows) < pair_count:
+        drug_a, drug_b = rng.sample(drug_ids, 2)
+        pair = (drug_a, drug_b) if drug_a <= drug_b else (drug_b, drug_a)
+        if pair in seen:
+            continue
+        seen.add(pair)
+
+        severity = rng.choices(severities, weights)[0]
+        rows.append({
+            "id": uuid4(),
+            "drug1_id": pair[0],
+            "drug2_id": pair[1],
+            "interaction_type": rng.choice(INTERACTION_TYPES),
+            "severity": severity,
+            "mechanism": rng.choice(MECHANISMS),
+            "clinical_effect": f"Synthetic {severity} interaction",
+            "management_strategy": "Monitor patient closely",
+            "monitoring_required": severity in ("major", "contraindicated"),
+        })
+    return rows
+
+
+async def seed(medicine_count: int, pair_count: int, seed_value: int):
+    rng = random.Random(seed_value)
+    async with AsyncSessionLocal() as session:
+        drug_ids = list((await session.execute(select(Medicine.id).limit(medicine_count))).scalars())
+
+        missing = medicine_count - len(drug_ids)
+        if missing > 0:
+            new_medicines = [
+                {
+                    "id": uuid4(),
+                    "name": f"Seed Medicine {i}",
+                    "generic_name": f"Seed Generic {i}",
+                    "manufacturer": "Seed Labs",
+                    "active_ingredients": [f"seed-ingredient-{i}"],
+                    "strength": "10mg",
+                    "dosage_form": "Tablet",
+                    "route_of_administration": "oral",
+                    "unit_price": Decimal("5.00"),
+                }
+                for i in range(missing)
+            ]
+            await session.execute(insert(Medicine), new_medicines)
+            drug_ids.extend(m["id"] for m in new_medicines)
+
+        rows = make_interaction_rows(drug_ids, pair_count, rng)
+        for start in range(0, len(rows), 10000):
+            await session.execute(insert(DrugInteraction), rows[start:start + 10000])
+        await session.commit()
+
+    print(f"Seeded {len(rows)} interaction pairs across {len(drug_ids)} medicines")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--medicines", type=int, default=5000)
+    parser.add_argument("--pairs", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(seed(args.medicines, args.pairs, args.seed))
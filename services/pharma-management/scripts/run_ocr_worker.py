@@ -0,0 +1,37 @@
+"""
+Run the shared OCR worker service
+
+Usage:
+    python scripts/run_ocr_worker.py
+
+Consumes the Redis OCR job queue with a warm process pool; run one per host.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import signal
+
+from app.core.logging_config import setup_logging
+from app.integrations.ocr.prescription_ocr import shutdown_ocr_pool, start_ocr_pool
+from app.services.ocr_queue import OCRWorkerService, get_ocr_queue
+
+
+async def main():
+    worker = OCRWorkerService(get_ocr_queue())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    start_ocr_pool()
+    try:
+        await worker.run_forever()
+    finally:
+        shutdown_ocr_pool()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
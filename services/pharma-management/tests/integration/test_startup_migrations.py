@@ -0,0 +1,55 @@
+"""
+Integration tests for concurrent startup migration
+
+These need Postgres; set POSTGRES_TEST_DATABASE_URL to a disposable database
+(postgresql+asyncpg://...) to run them. The public schema is dropped.
+"""
+
+import asyncio
+import os
+import pytest
+import pytest_asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.migrations import MigrationController, SchemaStateEnum
+
+POSTGRES_URL = os.environ.get("POSTGRES_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="POSTGRES_TEST_DATABASE_URL not set")
+
+
+async def _reset(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+
+
+@pytest_asyncio.fixture
+async def fresh_engine():
+    engine = create_async_engine(POSTGRES_URL)
+    await _reset(engine)
+    yield engine
+    await _reset(engine)
+    await engine.dispose()
+
+
+class TestConcurrentStartup:
+    """Test replicas starting together against one database."""
+
+    @pytest.mark.asyncio
+    async def test_one_replica_builds_the_schema(self, fresh_engine):
+        """Exactly one of several concurrent replicas does the work."""
+        engines = [create_async_engine(POSTGRES_URL) for _ in range(4)]
+        try:
+            states = await asyncio.gather(*(MigrationController(engine).ensure_schema() for engine in engines))
+        finally:
+            for engine in engines:
+                await engine.dispose()
+
+        assert sorted(state.value for state in states) == ["created", "current", "current", "current"]
+
+        controller = MigrationController(fresh_engine)
+        assert await controller.current_revision() == controller.head
+        assert await controller.ensure_schema() == SchemaStateEnum.CURRENT
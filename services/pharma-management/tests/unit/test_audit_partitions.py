@@ -0,0 +1,139 @@
+"""
+Unit tests for audit log partition management
+"""
+
+from datetime import date
+
+from sqlalchemy import create_mock_engine
+
+from app.db.partitions import (
+    MonthlyPartitionManager, PartitionInfo, add_months, parse_partition_bound
+)
+from app.models.compliance import AuditLog
+
+
+def _manager(**kwargs):
+    return MonthlyPartitionManager("audit_logs", retention_days=kwargs.pop("retention_days", 365), **kwargs)
+
+
+class TestPartitionBounds:
+    """Test month arithmetic and bound parsing."""
+
+    def test_add_months_crosses_years(self):
+        """Months roll over year boundaries in both directions."""
+        assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+        assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+    def test_parse_partition_bound(self):
+        """Range bounds are parsed from pg_get_expr output; DEFAULT has none."""
+        expression = (
+            "FOR VALUES FROM ('2025-03-01 00:00:00+00') TO ('2025-04-01 00:00:00+00')"
+        )
+
+        assert parse_partition_bound(expression) == (date(2025, 3, 1), date(2025, 4, 1))
+        assert parse_partition_bound("DEFAULT") is None
+
+
+class TestMonthlyPartitionManager:
+    """Test which partitions are created and archived."""
+
+    def test_months_to_create_skips_existing(self):
+        """Only missing months up to the pre-create horizon are created."""
+        manager = _manager(premake_months=2)
+        existing = [PartitionInfo("audit_logs_p2025_06", date(2025, 6, 1), date(2025, 7, 1))]
+
+        months = manager.months_to_create(existing, today=date(2025, 6, 15))
+
+        assert months == [date(2025, 7, 1), date(2025, 8, 1)]
+        assert manager.create_partition_sql(months[0]) == (
+            "CREATE TABLE IF NOT EXISTS audit_logs_p2025_07 PARTITION OF audit_logs "
+            "FOR VALUES FROM ('2025-07-01') TO ('2025-08-01')"
+        )
+
+    def test_expired_requires_whole_partition_past_retention(self):
+        """A partition expires only once its newest possible row is past retention."""
+        manager = _manager(retention_days=30)
+        partitions = [
+            PartitionInfo("audit_logs_p2025_04", date(2025, 4, 1), date(2025, 5, 1)),
+            PartitionInfo("audit_logs_p2025_05", date(2025, 5, 1), date(2025, 6, 1)),
+        ]
+
+        expired = manager.expired(partitions, today=date(2025, 6, 15))
+
+        assert [p.name for p in expired] == ["audit_logs_p2025_04"]
+
+
+class _Result:
+    def __init__(self, value=None, rows=()):
+        self.value = value
+        self.rows = list(rows)
+        self.rowcount = 1
+
+    def scalar(self):
+        return self.value
+
+    def all(self):
+        return self.rows
+
+
+class _FakeConnection:
+    """Answers the catalog queries of ensure_partitions and records the DDL."""
+
+    def __init__(self, default_rows_in):
+        self.default_rows_in = default_rows_in
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if sql.startswith("SELECT relkind"):
+            return _Result(True)
+        if sql.startswith("SELECT pg_get_partkeydef"):
+            return _Result("RANGE (created_at)")
+        if sql.startswith("SELECT child.relname"):
+            return _Result(rows=[("audit_logs_default", "DEFAULT")])
+        if sql.startswith("SELECT to_regclass"):
+            return _Result(True)
+        if sql.startswith("SELECT EXISTS"):
+            return _Result(params["start"] in self.default_rows_in)
+        return _Result()
+
+
+class TestDefaultPartitionRecovery:
+    """Test creating months whose rows already landed in the default partition."""
+
+    async def test_rows_move_out_of_default(self):
+        """The default is detached, the month created and filled, then the default re-attached."""
+        manager = _manager(premake_months=1)
+        conn = _FakeConnection(default_rows_in={date(2025, 6, 1)})
+
+        created = await manager.ensure_partitions(conn, today=date(2025, 6, 15))
+
+        assert created == ["audit_logs_p2025_06", "audit_logs_p2025_07"]
+        ddl = [sql for sql in conn.statements if not sql.startswith("SELECT")]
+        assert ddl[:5] == [
+            "ALTER TABLE audit_logs DETACH PARTITION audit_logs_default",
+            manager.create_partition_sql(date(2025, 6, 1)),
+            "INSERT INTO audit_logs_p2025_06 SELECT * FROM audit_logs_default "
+            "WHERE created_at >= :start AND created_at < :end",
+            "DELETE FROM audit_logs_default WHERE created_at >= :start AND created_at < :end",
+            "ALTER TABLE audit_logs ATTACH PARTITION audit_logs_default DEFAULT",
+        ]
+        assert ddl[5] == manager.create_partition_sql(date(2025, 7, 1))
+
+
+class TestCreateAllPartitions:
+    """Test schemas built from the models rather than the migrations."""
+
+    def test_create_all_attaches_default_partition(self):
+        """create_all follows the partitioned parent with its DEFAULT partition."""
+        statements = []
+        engine = create_mock_engine(
+            "postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect)))
+        )
+
+        AuditLog.__table__.create(engine)
+
+        created = [sql.strip() for sql in statements if sql.strip().startswith("CREATE TABLE")]
+        assert created[0].startswith("CREATE TABLE audit_logs (")
+        assert created[1] == "CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT"
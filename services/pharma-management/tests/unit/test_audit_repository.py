@@ -0,0 +1,78 @@
+"""
+Unit tests for SQL-pushed compliance audit queries
+"""
+
+import pytest
+from datetime import date
+from uuid import uuid4
+
+from sqlalchemy import and_, select
+from sqlalchemy.dialects import postgresql
+
+from app.models.compliance import AuditLog
+from app.repositories.audit_repository import (
+    AuditLogRepository, build_audit_filters, normalize_resource_type
+)
+from app.schemas.compliance import AuditLogFilter
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class FakeResult:
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+    def one(self):
+        return self
+
+
+class FakeSession:
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.mapping)
+
+
+class TestAuditFilters:
+    """Test compiling filters into SQL."""
+
+    def test_resource_type_is_normalized(self):
+        """Resource types are matched on their canonical enum value."""
+        assert normalize_resource_type(" Prescription ") == "prescription"
+        with pytest.raises(ValueError):
+            normalize_resource_type("prescriptions")
+
+    def test_date_range_is_pushed_into_sql(self):
+        """Dates become a half-open created_at range including the end day."""
+        filters = build_audit_filters(AuditLogFilter(start_date=date(2024, 1, 1), end_date=date(2024, 1, 31)))
+
+        sql = _sql(select(AuditLog.id).where(and_(*filters)))
+
+        assert "audit_logs.created_at >= '2024-01-01 00:00:00'" in sql
+        assert "audit_logs.created_at < '2024-02-01 00:00:00'" in sql
+
+
+class TestReportCounts:
+    """Test the single-statement compliance report."""
+
+    @pytest.mark.asyncio
+    async def test_counts_in_one_filter_aggregate(self):
+        """All report counts come from one statement using FILTER, not LIKE."""
+        session = FakeSession({
+            "total_transactions": 10,
+            "prescription_validations": 4,
+            "controlled_substance_transactions": 2
+        })
+
+        counts = await AuditLogRepository(session).get_report_counts(uuid4(), date(2024, 1, 1), date(2024, 1, 31))
+
+        assert counts["prescription_validations"] == 4
+        assert len(session.statements) == 1
+        sql = _sql(session.statements[0])
+        assert "FILTER (WHERE audit_logs.resource_type IN ('prescription', 'prescription_item'))" in sql
+        assert "LIKE" not in sql
@@ -22,7 +22,7 @@ class TestAuditService:
         resource_id = uuid4()
         audit_log = await service.log_action(
             action="test_action",
-            resource_type="test_resource",
+            resource_type="medicine",
             resource_id=resource_id,
             description="Test audit log",
             extra_data={"test_key": "test_value"}
@@ -31,7 +31,7 @@ class TestAuditService:
         # Verify log was created by checking the returned object
         assert audit_log is not None
         assert audit_log.action == "test_action"
-        assert audit_log.resource_type == "test_resource"
+        assert audit_log.resource_type == "medicine"
         assert audit_log.description == "Test audit log"
     
     @pytest.mark.asyncio
@@ -44,7 +44,7 @@ class TestAuditService:
         for i in range(3):
             await service.log_action(
                 action=f"test_action_{i}",
-                resource_type="test_resource",
+                resource_type="medicine",
                 resource_id=resource_id,
                 description=f"Test audit log {i}"
             )
@@ -0,0 +1,117 @@
+"""
+Unit tests for the radius-aware availability engine
+"""
+
+import pytest
+from uuid import uuid4
+
+from app.core.cache import TTLCache
+from app.core.geo import bounding_box, haversine_km
+from app.services import availability_service
+from app.services.availability_service import AvailabilityService, rank_pharmacies
+
+ORIGIN = (12.9716, 77.5946)
+
+
+def _row(pharmacy_id, medicine_id, lat, lon, available=10, name="Pharmacy"):
+    return {
+        "pharmacy_id": pharmacy_id,
+        "pharmacy_name": name,
+        "latitude": lat,
+        "longitude": lon,
+        "medicine_id": medicine_id,
+        "available": available
+    }
+
+
+class TestGeoHelpers:
+    """Test distance and bounding box helpers."""
+
+    def test_haversine_known_distance(self):
+        """One degree of latitude is roughly 111 km."""
+        assert haversine_km(0, 0, 1, 0) == pytest.approx(111.19, rel=1e-3)
+
+    def test_bounding_box_contains_radius(self):
+        """Points at the radius edge fall inside the prefilter box."""
+        min_lat, min_lon, max_lat, max_lon = bounding_box(*ORIGIN, *ORIGIN, 5.0)
+
+        assert min_lat < ORIGIN[0] - 5.0 / 111.2
+        assert max_lat > ORIGIN[0] + 5.0 / 111.2
+        assert haversine_km(ORIGIN[0], ORIGIN[1], ORIGIN[0], max_lon) >= 5.0
+
+
+class TestTTLCache:
+    """Test the in-process TTL cache."""
+
+    def test_entries_expire(self):
+        """Entries are dropped once their TTL has passed."""
+        now = [0.0]
+        cache = TTLCache(maxsize=10, ttl=5, timer=lambda: now[0])
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        now[0] = 6.0
+        assert cache.get("key") is None
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+
+
+class TestRankPharmacies:
+    """Test basket coverage ranking."""
+
+    def test_full_coverage_ranks_before_nearer_partial(self):
+        """A farther pharmacy with the whole basket beats a nearer partial one."""
+        med_a, med_b = uuid4(), uuid4()
+        near, far = uuid4(), uuid4()
+        rows = [
+            _row(near, med_a, ORIGIN[0] + 0.001, ORIGIN[1]),
+            _row(far, med_a, ORIGIN[0] + 0.02, ORIGIN[1]),
+            _row(far, med_b, ORIGIN[0] + 0.02, ORIGIN[1]),
+        ]
+
+        ranked = rank_pharmacies(rows, [med_a, med_b], *ORIGIN, radius_km=10)
+
+        assert [r.pharmacy_id for r in ranked] == [far, near]
+        assert ranked[0].covers_all is True
+        assert ranked[1].missing_medicine_ids == [med_b]
+
+    def test_excludes_pharmacies_outside_radius(self):
+        """Rows from the bounding box corners outside the radius are dropped."""
+        medicine_id = uuid4()
+        rows = [_row(uuid4(), medicine_id, ORIGIN[0] + 0.5, ORIGIN[1])]
+
+        assert rank_pharmacies(rows, [medicine_id], *ORIGIN, radius_km=10) == []
+
+
+class TestAvailabilityService:
+    """Test candidate caching per geo cell."""
+
+    @pytest.mark.asyncio
+    async def test_same_cell_reuses_candidates(self, monkeypatch):
+        """A second lookup from the same cell does not hit the repository."""
+        availability_service._candidate_cache.clear()
+        medicine_id, pharmacy_id = uuid4(), uuid4()
+        calls = []
+
+        async def fake_get_stocked_pharmacies(medicine_ids, *bbox):
+            calls.append(bbox)
+            return [_row(pharmacy_id, medicine_id, ORIGIN[0] + 0.01, ORIGIN[1])]
+
+        service = AvailabilityService(db=None)
+        monkeypatch.setattr(service.inventory_repo, "get_stocked_pharmacies", fake_get_stocked_pharmacies)
+
+        first = await service.find_nearby_pharmacies([medicine_id], *ORIGIN, radius_km=5)
+        second = await service.find_nearby_pharmacies([medicine_id], ORIGIN[0] + 0.0001, ORIGIN[1], radius_km=5)
+
+        assert len(calls) == 1
+        assert first[0].pharmacy_id == second[0].pharmacy_id == pharmacy_id
+        assert first[0].distance_km != second[0].distance_km
@@ -0,0 +1,296 @@
+"""
+Unit tests for first-expiry-first-out batch allocation
+"""
+
+import pytest
+from datetime import date, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import InsufficientStockException
+from app.repositories.inventory_repository import InventoryRepository
+from app.repositories.medicine_repository import (
+    BatchAllocationModeEnum, MedicineBatchRepository, fefo_allocation_statement
+)
+from app.services.medicine_service import MedicineService
+from app.services.order_service import OrderService
+from app.schemas.order import OrderStatusUpdate
+
+TODAY = date(2025, 6, 1)
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def one(self):
+        return self._rows[0]
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class _Row:
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+
+class _FakeSession:
+    """Returns queued row lists in execution order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.added = []
+        self.committed = False
+        self.rolled_back = False
+
+    async def execute(self, query):
+        self.statements.append(query)
+        return _FakeResult(self.results.pop(0))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+def _sql(mode):
+    statement = fefo_allocation_statement(uuid4(), uuid4(), 30, mode, TODAY)
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+class TestFefoAllocationStatement:
+    """Test the single-statement allocation SQL."""
+
+    def test_reserve_locks_unexpired_batches_in_expiry_order(self):
+        """Candidates are locked earliest expiry first and split with a running total."""
+        sql = _sql(BatchAllocationModeEnum.RESERVE)
+
+        assert "ORDER BY medicine_batches.expiry_date, medicine_batches.id FOR UPDATE" in sql
+        assert "OVER (ORDER BY locked.expiry_date, locked.id)" in sql
+        assert "medicine_batches.expiry_date >=" in sql
+        # Literal so the partial FEFO index predicate matches
+        assert "medicine_batches.current_quantity > 0" in sql
+        assert sql.count("UPDATE medicine_batches") == 1
+
+    def test_release_ignores_expiry(self):
+        """Reserved stock can be given back even after the batch expires."""
+        sql = _sql(BatchAllocationModeEnum.RELEASE)
+
+        assert "medicine_batches.expiry_date >=" not in sql
+        assert "reserved_quantity=(medicine_batches.reserved_quantity - plan.take)" in sql
+
+
+class TestBatchAllocation:
+    """Test allocation results and dispensing."""
+
+    @pytest.mark.asyncio
+    async def test_allocations_sorted_by_expiry(self):
+        """RETURNING order is arbitrary; allocations come back FEFO ordered."""
+        late, early = uuid4(), uuid4()
+        session = _FakeSession([
+            (late, "B2", TODAY + timedelta(days=90), 5),
+            (early, "B1", TODAY + timedelta(days=10), 20),
+        ])
+
+        allocations = await MedicineBatchRepository(session).allocate(uuid4(), uuid4(), 25, on=TODAY)
+
+        assert [a.batch_id for a in allocations] == [early, late]
+
+    @pytest.mark.asyncio
+    async def test_dispense_writes_one_transaction_per_batch(self):
+        """Stock and per-batch transactions land in one commit."""
+        item_id = uuid4()
+        session = _FakeSession(
+            [
+                (uuid4(), "B1", TODAY + timedelta(days=10), 20),
+                (uuid4(), "B2", TODAY + timedelta(days=90), 5),
+            ],
+            [(item_id, 75)],
+        )
+
+        await InventoryRepository(session).dispense_stock(uuid4(), uuid4(), 25, reference_number="ORD-1")
+
+        assert session.committed
+        assert [(t.quantity, t.stock_before, t.stock_after) for t in session.added] == [(-20, 100, 80), (-5, 80, 75)]
+
+    @pytest.mark.asyncio
+    async def test_dispense_short_allocation_rolls_back(self):
+        """Unexpired stock below the request fails without touching the item."""
+        session = _FakeSession([(uuid4(), "B1", TODAY + timedelta(days=10), 3)])
+
+        with pytest.raises(InsufficientStockException):
+            await InventoryRepository(session).dispense_stock(uuid4(), uuid4(), 10)
+
+        assert session.rolled_back and not session.committed
+
+    @pytest.mark.asyncio
+    async def test_dispense_reserved_releases_first(self):
+        """An order's reservation is given back before its stock is dispensed."""
+        session = _FakeSession(
+            [(uuid4(), "B1", TODAY + timedelta(days=10), 4)],
+            [(uuid4(), "B1", TODAY + timedelta(days=10), 4)],
+            [(uuid4(), 16)],
+        )
+
+        await InventoryRepository(session).dispense_stock(uuid4(), uuid4(), 4, reserved=True)
+
+        release, dispense, item = [
+            str(statement.compile(dialect=postgresql.dialect())) for statement in session.statements
+        ]
+        assert "reserved_quantity=(medicine_batches.reserved_quantity - plan.take)" in release
+        assert "current_quantity=(medicine_batches.current_quantity - plan.take)" in dispense
+        assert "reserved_stock=greatest" in item
+        assert session.committed
+
+    @pytest.mark.asyncio
+    async def test_dispense_without_batches_updates_item_only(self):
+        """Pharmacies that record no batches still sell from the item's stock."""
+        session = _FakeSession([], [], [(uuid4(), 40)])
+
+        allocations = await InventoryRepository(session).dispense_stock(uuid4(), uuid4(), 10)
+
+        assert allocations == []
+        assert [(t.batch_id, t.quantity, t.stock_before, t.stock_after) for t in session.added] == [(None, -10, 50, 40)]
+
+    @pytest.mark.asyncio
+    async def test_received_batch_belongs_to_pharmacy(self):
+        """A received batch carries its pharmacy and is added to the item's stock."""
+        pharmacy_id, medicine_id = uuid4(), uuid4()
+        session = _FakeSession([(uuid4(), 30)])
+
+        batch = await InventoryRepository(session).receive_batch(
+            pharmacy_id, medicine_id, "B9", TODAY, TODAY + timedelta(days=365), 20,
+            received_quantity=24, reference_number="GRN-1"
+        )
+
+        assert batch.pharmacy_id == pharmacy_id
+        assert (batch.received_quantity, batch.current_quantity) == (24, 20)
+        transaction = session.added[1]
+        assert (transaction.transaction_type, transaction.stock_before, transaction.stock_after) == ("purchase", 10, 30)
+        assert session.committed
+
+
+class TestOrderFulfilment:
+    """Test that fulfilled orders dispense their reserved stock once, with their status."""
+
+    @staticmethod
+    def _allocation(quantity):
+        return [(uuid4(), "B1", TODAY + timedelta(days=10), quantity)]
+
+    @pytest.mark.asyncio
+    async def test_order_dispensed_with_status_in_one_commit(self):
+        """Stock movements and the order update land in the same commit."""
+        order_id = uuid4()
+        session = _FakeSession(
+            [(order_id,)], [],
+            self._allocation(3), self._allocation(3), [(uuid4(), 7)],
+            [],
+        )
+
+        dispensed = await InventoryRepository(session).dispense_order(
+            order_id, uuid4(), [{"medicine_id": uuid4(), "quantity": 3}], "ORD-7", {"status": "dispatched"}
+        )
+
+        assert dispensed and session.committed
+        assert [(t.order_id, t.quantity, t.reference_number) for t in session.added] == [(order_id, -3, "ORD-7")]
+        assert "FOR UPDATE" in str(session.statements[0].compile(dialect=postgresql.dialect()))
+        assert str(session.statements[-1]).startswith("UPDATE orders")
+
+    @pytest.mark.asyncio
+    async def test_dispensed_order_is_not_dispensed_again(self):
+        """A retried fulfilment only updates the order."""
+        session = _FakeSession([(uuid4(),)], [(uuid4(),)], [])
+
+        dispensed = await InventoryRepository(session).dispense_order(
+            uuid4(), uuid4(), [{"medicine_id": uuid4(), "quantity": 3}], "ORD-7", {"status": "delivered"}
+        )
+
+        assert not dispensed and session.committed
+        assert session.added == [] and session.results == []
+
+    @pytest.mark.asyncio
+    async def test_short_item_rolls_back_whole_order(self):
+        """An item that cannot be dispensed leaves the earlier items and the status untouched."""
+        session = _FakeSession(
+            [(uuid4(),)], [],
+            self._allocation(3), self._allocation(3), [(uuid4(), 7)],
+            self._allocation(1), self._allocation(1),
+        )
+
+        with pytest.raises(InsufficientStockException):
+            await InventoryRepository(session).dispense_order(
+                uuid4(), uuid4(),
+                [{"medicine_id": uuid4(), "quantity": 3}, {"medicine_id": uuid4(), "quantity": 5}],
+                "ORD-7", {"status": "dispatched"}
+            )
+
+        assert session.rolled_back and not session.committed
+
+    @pytest.mark.asyncio
+    async def test_dispatch_status_goes_through_dispense(self, monkeypatch):
+        """Moving an order to dispatched hands the status update to the dispense."""
+        order = SimpleNamespace(id=uuid4(), pharmacy_id=uuid4(), order_number="ORD-7", status="ready")
+        items = [SimpleNamespace(medicine_id=uuid4(), quantity_ordered=3)]
+        service = OrderService(_FakeSession())
+        calls = []
+
+        async def get_order(order_id):
+            return order
+
+        async def get_items(**kwargs):
+            return items
+
+        async def update(order_id, data):
+            raise AssertionError("status must be written with the dispense")
+
+        async def dispense_order(order_id, pharmacy_id, medicine_quantities, reference_number, order_values):
+            calls.append((medicine_quantities, reference_number, order_values["status"]))
+            return True
+
+        async def log_order_action(**kwargs):
+            pass
+
+        monkeypatch.setattr(service.order_repo, "get_by_id", get_order)
+        monkeypatch.setattr(service.order_repo, "update", update)
+        monkeypatch.setattr(service.order_item_repo, "get_multi", get_items)
+        monkeypatch.setattr(service.inventory_service.inventory_repo, "dispense_order", dispense_order)
+        monkeypatch.setattr(service.audit_service, "log_order_action", log_order_action)
+        monkeypatch.setattr(service, "get_order", get_order)
+
+        await service.update_order_status(order.id, OrderStatusUpdate(status="dispatched", updated_by=uuid4()))
+
+        assert calls == [([{"medicine_id": items[0].medicine_id, "quantity": 3}], "ORD-7", "dispatched")]
+
+
+class TestExpiringStockReport:
+    """Test the joined expiring-stock report."""
+
+    @pytest.mark.asyncio
+    async def test_single_query(self):
+        """Medicine names come from the join; no per-batch lookups."""
+        expiry = date.today() + timedelta(days=5)
+        row = {
+            "medicine_id": uuid4(), "medicine_name": "Amoxicillin", "pharmacy_id": uuid4(),
+            "batch_number": "B1", "expiry_date": expiry, "current_quantity": 12
+        }
+        session = _FakeSession([_Row(row)])
+
+        report = await MedicineService(session).get_expiring_medicines(days=30)
+
+        assert session.results == []
+        assert report[0]["medicine_name"] == "Amoxicillin"
+        assert report[0]["days_to_expiry"] == 5
@@ -0,0 +1,93 @@
+"""
+Unit tests for document number allocation
+"""
+
+import asyncio
+import time
+import pytest
+from datetime import date
+from uuid import UUID, uuid4
+
+from app.services.document_number_service import (
+    DocumentNumberAllocator, DocumentTypeEnum, fiscal_year_label, render_document_number
+)
+
+
+class FakeSequence:
+    """In-memory stand-in for a Postgres sequence shared by several processes."""
+
+    def __init__(self, increment):
+        self.increment = increment
+        self.values = {}
+        self.calls = 0
+
+    async def nextval(self, name):
+        self.calls += 1
+        await asyncio.sleep(0)  # a database round trip yields to other tasks
+        value = self.values.get(name, 1)
+        self.values[name] = value + self.increment
+        return value, value + self.increment
+
+
+def _allocator(sequence, block_size):
+    allocator = DocumentNumberAllocator(db_engine=None, block_size=block_size)
+    allocator._reserve_block = sequence.nextval
+    return allocator
+
+
+class TestRendering:
+    """Test fiscal years and number formatting."""
+
+    def test_fiscal_year_starts_in_april(self):
+        """March belongs to the previous fiscal year, April starts a new one."""
+        assert fiscal_year_label(date(2025, 3, 31), start_month=4) == "2425"
+        assert fiscal_year_label(date(2025, 4, 1), start_month=4) == "2526"
+
+    def test_render(self):
+        """Numbers carry prefix, pharmacy code, fiscal year and padded sequence."""
+        pharmacy_id = uuid4()
+
+        number = render_document_number(DocumentTypeEnum.INVOICE, pharmacy_id, "2425", 42)
+
+        assert number == f"INV-{pharmacy_id.hex.upper()}-2425-000042"
+
+    def test_pharmacies_sharing_an_id_prefix_get_distinct_numbers(self):
+        """The first sequence value of two pharmacies never renders the same number."""
+        first = UUID("1a2b3c4d" + "0" * 24)
+        second = UUID("1a2b3c4d" + "f" * 24)
+
+        assert render_document_number(DocumentTypeEnum.ORDER, first, "2425", 1) != \
+            render_document_number(DocumentTypeEnum.ORDER, second, "2425", 1)
+
+
+class TestDocumentNumberAllocator:
+    """Test block allocation under concurrency."""
+
+    @pytest.mark.asyncio
+    async def test_block_needs_one_round_trip(self):
+        """A block of N numbers costs a single sequence call."""
+        sequence = FakeSequence(increment=10)
+        allocator = _allocator(sequence, block_size=10)
+
+        values = [await allocator.next_value("seq") for _ in range(10)]
+
+        assert values == list(range(1, 11))
+        assert sequence.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_unique_across_processes_at_5k_per_second(self):
+        """5,000 concurrent documents from four allocators never share a number."""
+        sequence = FakeSequence(increment=50)
+        allocators = [_allocator(sequence, block_size=50) for _ in range(4)]
+        pharmacy_id = uuid4()
+
+        started = time.perf_counter()
+        numbers = await asyncio.gather(*(
+            allocators[i % 4].next_number(DocumentTypeEnum.ORDER, pharmacy_id, on=date(2024, 6, 1))
+            for i in range(5000)
+        ))
+        elapsed = time.perf_counter() - started
+
+        assert len(set(numbers)) == 5000
+        assert 5000 / elapsed > 5000
+        assert sequence.calls <= 5000 // 50 + 4
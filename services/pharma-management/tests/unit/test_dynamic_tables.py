@@ -4,9 +4,29 @@ Unit tests for dynamic table creation
 
 import pytest
 from uuid import uuid4
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dynamic_tables import PharmacyTableManager
+from app.core.dynamic_tables import (
+    PharmacyTableManager, PharmacyTableRouter, build_pharmacy_tables, pharmacy_schema_name
+)
+
+
+class _FakeConnection:
+    """Stands in for an AsyncConnection; reflection returns the declared tables."""
+
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.reflections = 0
+        self.executed = []
+
+    async def run_sync(self, fn, pharmacy_id):
+        self.reflections += 1
+        return build_pharmacy_tables(pharmacy_id)
+
+    async def exec_driver_sql(self, sql):
+        self.executed.append(sql)
 
 class TestDynamicTables:
     """Test dynamic table creation functionality."""
@@ -61,4 +81,51 @@ class TestDynamicTables:
             assert result is True
         except Exception as e:
             # SQLite might not support some features, so we'll be lenient
-            pytest.skip(f"Skipping due to database limitation: {e}")
\ No newline at end of file
+            pytest.skip(f"Skipping due to database limitation: {e}")
+
+
+class TestPharmacyTableRouter:
+    """Test table routing, statement templates and bulk provisioning."""
+
+    @pytest.mark.asyncio
+    async def test_route_reflects_once_and_evicts_least_recent(self):
+        """Hot pharmacies stay cached; the LRU bound evicts the coldest."""
+        router = PharmacyTableRouter(maxsize=2, ttl_seconds=3600)
+        conn = _FakeConnection()
+        first, second, third = uuid4(), uuid4(), uuid4()
+
+        routed = await router.route(conn, first)
+        assert await router.route(conn, first) is routed
+        await router.route(conn, second)
+        await router.route(conn, first)
+        await router.route(conn, third)  # evicts second
+        await router.route(conn, second)
+
+        assert conn.reflections == 4
+
+    @pytest.mark.asyncio
+    async def test_statements_target_pharmacy_schema(self):
+        """Templates are built against the pharmacy's own schema-qualified table."""
+        pharmacy_id = uuid4()
+        routed = await PharmacyTableRouter(maxsize=4).route(_FakeConnection(), pharmacy_id)
+
+        sql = str(routed["inventory"].get_by_id.compile(dialect=postgresql.dialect()))
+        table_name = PharmacyTableManager(None).get_pharmacy_inventory_table(pharmacy_id)
+
+        assert f"FROM {pharmacy_schema_name(pharmacy_id)}.{table_name}" in sql
+        assert "%(row_id)s" in sql
+
+    @pytest.mark.asyncio
+    async def test_provision_groups_pharmacies_per_round_trip(self):
+        """Five pharmacies at two per chunk take three statements."""
+        router = PharmacyTableRouter(maxsize=4, chunk_size=2)
+        conn = _FakeConnection()
+        pharmacy_ids = [uuid4() for _ in range(5)]
+
+        created = await router.provision(conn, pharmacy_ids)
+
+        assert len(conn.executed) == 3
+        assert all(block.startswith("DO $$") for block in conn.executed)
+        for pharmacy_id in pharmacy_ids:
+            assert f"CREATE SCHEMA IF NOT EXISTS {pharmacy_schema_name(pharmacy_id)}" in "".join(conn.executed)
+            assert created[pharmacy_id]["orders"].startswith("orders_pharma_")
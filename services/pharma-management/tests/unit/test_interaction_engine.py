@@ -0,0 +1,73 @@
+"""
+Unit tests for the in-memory drug interaction index
+"""
+
+import pytest
+from uuid import uuid4
+
+from app.services.interaction_engine import DrugInteractionIndex, InteractionEntry, canonical_pair
+
+
+def _entry(drug1_id, drug2_id, severity="moderate"):
+    return InteractionEntry(
+        drug1_id, drug2_id, "Drug 1", "Drug 2", "pharmacokinetic", severity,
+        "CYP3A4 inhibition", "Raised plasma levels", None, False, None
+    )
+
+
+class TestDrugInteractionIndex:
+    """Test pair lookups and prescription checks."""
+
+    def test_canonical_pair_is_order_independent(self):
+        """(a, b) and (b, a) map to the same key."""
+        a, b = uuid4(), uuid4()
+        assert canonical_pair(a, b) == canonical_pair(b, a)
+
+    def test_lookup_either_direction(self):
+        """Pairs stored as (a, b) are found when queried as (b, a)."""
+        a, b = uuid4(), uuid4()
+        index = DrugInteractionIndex()
+        index.load([_entry(a, b)])
+
+        assert len(index.lookup(b, a)) == 1
+        assert index.lookup(a, uuid4()) == []
+
+    def test_check_orders_by_severity(self):
+        """All pairwise interactions are returned, most severe first."""
+        a, b, c, d = (uuid4() for _ in range(4))
+        index = DrugInteractionIndex()
+        index.load([_entry(a, b, "minor"), _entry(c, a, "contraindicated"), _entry(b, d, "major")])
+
+        found = index.check([a, b, c])
+
+        assert [entry.severity for entry in found] == ["contraindicated", "minor"]
+
+    def test_check_ignores_duplicate_drugs(self):
+        """A drug listed twice does not interact with itself."""
+        a, b = uuid4(), uuid4()
+        index = DrugInteractionIndex()
+        index.load([_entry(a, b)])
+
+        assert len(index.check([a, a, b])) == 1
+
+    @pytest.mark.asyncio
+    async def test_reload_on_version_change(self, monkeypatch):
+        """The index reloads only when stale or the table version moves."""
+        index = DrugInteractionIndex(poll_interval_seconds=0)
+        versions = [(1, "t1"), (1, "t1"), (2, "t2")]
+        reloads = []
+
+        async def fake_version(db):
+            return versions.pop(0)
+
+        async def fake_reload(db):
+            reloads.append(1)
+
+        monkeypatch.setattr(index, "_get_table_version", fake_version)
+        monkeypatch.setattr(index, "_reload", fake_reload)
+
+        await index.ensure_fresh(None)
+        await index.ensure_fresh(None)
+        await index.ensure_fresh(None)
+
+        assert len(reloads) == 2
@@ -0,0 +1,133 @@
+"""
+Unit tests for equivalence-group based medicine alternatives
+"""
+
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.core.exceptions import MedicineNotFoundException
+from app.repositories.medicine_repository import MedicineRepository, equivalence_key
+from app.services.medicine_service import MedicineService
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        return _FakeResult(self.rows)
+
+
+def _medicine(name, brand_name=None):
+    return SimpleNamespace(id=uuid4(), name=name, brand_name=brand_name)
+
+
+class TestEquivalenceKey:
+    """Test normalization of the equivalence key."""
+
+    def test_ingredient_order_and_case_ignored(self):
+        """Salt composition is order- and case-insensitive."""
+        assert equivalence_key(["Amoxicillin", "Clavulanic  Acid"], "625 mg", "Tablet") == \
+            equivalence_key(["clavulanic acid", "AMOXICILLIN"], "625mg", "tablets")
+
+    def test_different_strength_is_different_group(self):
+        """Strength is part of the key."""
+        assert equivalence_key(["Metformin"], "500mg", "Tablet") != \
+            equivalence_key(["Metformin"], "850mg", "Tablet")
+
+    def test_dict_ingredients(self):
+        """Structured ingredient entries are keyed by name."""
+        assert equivalence_key([{"name": "Paracetamol", "amount": "500mg"}], "500mg", "tab")[0] == "paracetamol"
+
+
+class TestGetAlternatives:
+    """Test alternatives lookup."""
+
+    @pytest.mark.asyncio
+    async def test_single_query_splits_generic_and_brand(self):
+        """Alternatives come from one query and are split by brand."""
+        base = _medicine("Crocin", brand_name="Crocin")
+        generic = _medicine("Paracetamol")
+        branded = _medicine("Dolo", brand_name="Dolo")
+        session = _FakeSession([(base, branded, 40), (base, generic, 12)])
+
+        result = await MedicineRepository(session).get_alternatives(base.id)
+
+        assert len(session.queries) == 1
+        assert result["medicine"] is base
+        assert result["brand_alternatives"] == [{"medicine": branded, "available_stock": 40}]
+        assert result["generic_alternatives"] == [{"medicine": generic, "available_stock": 12}]
+
+    @pytest.mark.asyncio
+    async def test_no_alternatives(self):
+        """A medicine alone in its group has no alternatives."""
+        base = _medicine("Unique")
+        session = _FakeSession([(base, None, 0)])
+
+        result = await MedicineRepository(session).get_alternatives(base.id, include_brand=False)
+
+        assert result["generic_alternatives"] == []
+        assert result["brand_alternatives"] == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_medicine(self):
+        """An unknown base medicine raises."""
+        with pytest.raises(MedicineNotFoundException):
+            await MedicineRepository(_FakeSession([])).get_alternatives(uuid4())
+
+
+class TestRegroupOnUpdate:
+    """Test that updates keep the equivalence group in step."""
+
+    def _service(self, monkeypatch, medicine):
+        assigned = []
+
+        async def fake_update(medicine_id, update_data):
+            return medicine
+
+        async def fake_assign_group(target):
+            assigned.append(target)
+
+        async def fake_log_action(**kwargs):
+            pass
+
+        service = MedicineService(db=None)
+        monkeypatch.setattr(service.medicine_repo, "update", fake_update)
+        monkeypatch.setattr(service.equivalence_repo, "assign_group", fake_assign_group)
+        monkeypatch.setattr(service.audit_service, "log_action", fake_log_action)
+        monkeypatch.setattr("app.services.medicine_service.MedicineResponse.from_orm", lambda obj: obj)
+        return service, assigned
+
+    @pytest.mark.asyncio
+    async def test_composition_change_regroups(self, monkeypatch):
+        """Changing strength recomputes the group."""
+        medicine = SimpleNamespace(id=uuid4(), name="Metformin", equivalence_group_id=uuid4())
+        service, assigned = self._service(monkeypatch, medicine)
+
+        await service.update_medicine(medicine.id, {"strength": "850mg"})
+
+        assert assigned == [medicine]
+
+    @pytest.mark.asyncio
+    async def test_other_fields_keep_group(self, monkeypatch):
+        """Price changes leave a grouped medicine alone, ungrouped ones are grouped."""
+        medicine = SimpleNamespace(id=uuid4(), name="Metformin", equivalence_group_id=uuid4())
+        service, assigned = self._service(monkeypatch, medicine)
+
+        await service.update_medicine(medicine.id, {"unit_price": 12})
+        assert assigned == []
+
+        medicine.equivalence_group_id = None
+        await service.update_medicine(medicine.id, {"unit_price": 12})
+        assert assigned == [medicine]
@@ -0,0 +1,157 @@
+"""
+Unit tests for medicine search helpers and the type-ahead trie
+"""
+
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+from app.repositories.medicine_repository import escape_like, normalize_search_text
+from app.services.medicine_search_service import MedicinePrefixTrie, MedicineSearchIndex
+
+
+def _rows():
+    return [
+        (uuid4(), "Paracetamol", "Acetaminophen", "Crocin"),
+        (uuid4(), "Pantoprazole", "Pantoprazole Sodium", None),
+        (uuid4(), "Amoxicillin", "Amoxicillin", "Mox"),
+        (uuid4(), "Para", "Acetaminophen", None),
+    ]
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield None
+
+
+class TestSearchNormalization:
+    """Test query normalization and LIKE escaping."""
+
+    def test_normalize_collapses_whitespace(self):
+        """Queries are lower-cased with single spaces."""
+        assert normalize_search_text("  Para   CETAMOL ") == "para cetamol"
+
+    def test_escape_like_wildcards(self):
+        """User-supplied wildcards are matched literally."""
+        assert escape_like("50%_off") == "50\\%\\_off"
+
+
+class TestMedicinePrefixTrie:
+    """Test prefix trie lookups."""
+
+    def test_prefix_matches_any_name_token(self):
+        """Prefixes match name, generic and brand words."""
+        trie = MedicinePrefixTrie.build(_rows())
+
+        assert {name for _, name in trie.search("pa")} == {"Para", "Paracetamol", "Pantoprazole"}
+        assert [name for _, name in trie.search("croc")] == ["Paracetamol"]
+        assert [name for _, name in trie.search("acet")] == ["Para", "Paracetamol"]
+
+    def test_shorter_names_rank_first(self):
+        """Suggestions are ordered by name length, then alphabetically."""
+        trie = MedicinePrefixTrie.build(_rows())
+
+        assert [name for _, name in trie.search("par")] == ["Para", "Paracetamol"]
+
+    def test_suggestions_are_bounded(self):
+        """Each node keeps at most max_suggestions entries."""
+        rows = [(uuid4(), f"Drug {i:03d}", "Generic", None) for i in range(50)]
+        trie = MedicinePrefixTrie.build(rows, max_suggestions=5)
+
+        assert len(trie.search("drug", limit=20)) == 5
+
+    def test_multi_word_search_looks_past_top_suggestions(self):
+        """Leading words filter every match, not just the node's top entries."""
+        rows = [(uuid4(), f"Drug {i:03d}", "Generic", None) for i in range(50)]
+        rows.append((uuid4(), "Zinc Drug Syrup", None, None))
+        trie = MedicinePrefixTrie.build(rows, max_suggestions=5)
+
+        assert [name for _, name in trie.search("zinc dr")] == ["Zinc Drug Syrup"]
+        assert [name for _, name in trie.search("drug 04", limit=3)] == ["Drug 040", "Drug 041", "Drug 042"]
+
+    def test_unknown_prefix(self):
+        """Unknown prefixes return nothing."""
+        trie = MedicinePrefixTrie.build(_rows())
+
+        assert trie.search("zz") == []
+        assert trie.search("   ") == []
+
+
+class TestMedicineSearchIndex:
+    """Test rebuilds triggered by catalogue changes."""
+
+    @pytest.mark.asyncio
+    async def test_rebuild_only_when_stale(self, monkeypatch):
+        """The trie is rebuilt after mark_stale and reused otherwise."""
+        loads = []
+
+        async def fake_get_search_terms(self):
+            loads.append(1)
+            return _rows()
+
+        monkeypatch.setattr(
+            "app.repositories.medicine_repository.MedicineRepository.get_search_terms",
+            fake_get_search_terms
+        )
+        index = MedicineSearchIndex(max_age_seconds=3600, max_suggestions=10, session_factory=_fake_session)
+
+        await index.suggest(None, "pa")
+        await index.suggest(None, "am")
+        assert len(loads) == 1
+
+        index.mark_stale()
+        await index.suggest(None, "amox")
+        await index._refresh_task
+        assert len(loads) == 2
+        assert [name for _, name in await index.suggest(None, "amox")] == ["Amoxicillin"]
+        assert len(loads) == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_trie_serves_while_rebuilding(self, monkeypatch):
+        """A lookup after a change answers from the old trie, not the rebuild."""
+        rows = _rows()
+        release = asyncio.Event()
+
+        async def fake_get_search_terms(self):
+            if index.trie is not None:
+                await release.wait()
+            return list(rows)
+
+        monkeypatch.setattr(
+            "app.repositories.medicine_repository.MedicineRepository.get_search_terms",
+            fake_get_search_terms
+        )
+        index = MedicineSearchIndex(max_age_seconds=3600, max_suggestions=10, session_factory=_fake_session)
+        await index.suggest(None, "amox")
+
+        rows[2] = (rows[2][0], "Amoxycillin", "Amoxicillin", "Mox")
+        index.mark_stale()
+        assert [name for _, name in await index.suggest(None, "amox")] == ["Amoxicillin"]
+        assert not index._refresh_task.done()
+
+        release.set()
+        await index._refresh_task
+        assert [name for _, name in await index.suggest(None, "amoxy")] == ["Amoxycillin"]
+
+    @pytest.mark.asyncio
+    async def test_update_medicine_marks_trie_stale(self, monkeypatch):
+        """Core updates bypass mapper events, so the service marks the trie."""
+        from app.services import medicine_service as module
+        from app.services.medicine_service import MedicineService
+
+        medicine = type("M", (), {"id": uuid4(), "name": "Amoxycillin", "equivalence_group_id": uuid4()})()
+
+        async def fake_update(self, medicine_id, update_data):
+            return medicine
+
+        async def fake_log_action(self, **kwargs):
+            return None
+
+        monkeypatch.setattr(module.MedicineRepository, "update", fake_update)
+        monkeypatch.setattr(module.AuditService, "log_action", fake_log_action)
+        monkeypatch.setattr(module.MedicineResponse, "from_orm", classmethod(lambda cls, obj: obj))
+
+        module.medicine_search_index._stale = False
+        await MedicineService(None).update_medicine(medicine.id, {"name": "Amoxycillin"})
+        assert module.medicine_search_index._stale
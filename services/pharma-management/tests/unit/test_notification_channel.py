@@ -0,0 +1,110 @@
+"""
+Unit tests for the pooled notification channel
+"""
+
+import asyncio
+import grpc
+import pytest
+
+from app.grpc_client import NotificationChannel, build_notification_request
+from app.protos.notification_pb2 import NotificationResponse, NotificationType, ServiceType
+from app.protos.notification_pb2_grpc import (
+    NotificationServiceServicer, add_NotificationServiceServicer_to_server
+)
+
+
+class _FakeNotificationService(NotificationServiceServicer):
+    """Acknowledges every notification and records peak concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.received = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def SendNotification(self, request, context):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            self.received.append(request)
+            return NotificationResponse(notification_id=request.id, success=True)
+        finally:
+            self.in_flight -= 1
+
+
+async def _serve(servicer):
+    server = grpc.aio.server()
+    add_NotificationServiceServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+class TestNotificationChannel:
+    """Test connection reuse, in-flight bounds and micro-batching."""
+
+    def test_build_request(self):
+        """Dict payloads map onto the proto with string data values."""
+        request = build_notification_request({
+            "type": "WARNING", "title": "Refill", "message": "Soon", "user_id": 7, "data": {"days": 3}
+        })
+
+        assert request.type == NotificationType.WARNING
+        assert request.service == ServiceType.PHARMA_MANAGEMENT
+        assert request.user_id == "7"
+        assert dict(request.data) == {"days": "3"}
+
+    @pytest.mark.asyncio
+    async def test_burst_shares_one_channel_and_batch(self):
+        """Notifications issued together go out in one batch over one channel."""
+        servicer = _FakeNotificationService()
+        server, target = await _serve(servicer)
+        channel = NotificationChannel(target=target, batch_window_ms=20, max_batch_size=100)
+        dispatched = []
+        dispatch = channel._dispatch
+
+        async def record(batch):
+            dispatched.append(len(batch))
+            await dispatch(batch)
+
+        channel._dispatch = record
+        try:
+            requests = [build_notification_request({"title": f"n{i}"}) for i in range(10)]
+            responses = await asyncio.gather(*(channel.submit(request) for request in requests))
+            grpc_channel = channel._channel
+            await channel.submit(build_notification_request({"title": "later"}))
+
+            assert [response.notification_id for response in responses] == [r.id for r in requests]
+            assert dispatched == [10, 1]
+            assert channel._channel is grpc_channel
+        finally:
+            await channel.close()
+            await server.stop(None)
+
+    @pytest.mark.asyncio
+    async def test_in_flight_is_bounded(self):
+        """A large batch never has more RPCs open than max_in_flight."""
+        servicer = _FakeNotificationService(delay=0.01)
+        server, target = await _serve(servicer)
+        channel = NotificationChannel(target=target, max_in_flight=4, batch_window_ms=1, max_batch_size=50)
+        try:
+            await asyncio.gather(*(
+                channel.submit(build_notification_request({"title": f"n{i}"})) for i in range(40)
+            ))
+
+            assert len(servicer.received) == 40
+            assert servicer.peak_in_flight <= 4
+        finally:
+            await channel.close()
+            await server.stop(None)
+
+    @pytest.mark.asyncio
+    async def test_failures_reach_each_caller(self):
+        """An unreachable service fails the queued futures instead of hanging them."""
+        channel = NotificationChannel(target="127.0.0.1:1", batch_window_ms=1, timeout_seconds=0.5)
+        try:
+            with pytest.raises(grpc.aio.AioRpcError):
+                await channel.submit(build_notification_request({"title": "lost"}))
+        finally:
+            await channel.close()
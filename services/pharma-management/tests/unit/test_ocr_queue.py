@@ -0,0 +1,264 @@
+"""
+Unit tests for the shared OCR job queue and worker
+"""
+
+import pytest
+from uuid import uuid4
+
+pytest.importorskip("cv2")
+pytest.importorskip("pytesseract")
+
+from app.core.exceptions import OCRQueueFullException
+from app.services.ocr_queue import (
+    PRIORITY_BULK, PRIORITY_NORMAL, PRIORITY_URGENT, OCRJob, OCRJobQueue, OCRWorkerService
+)
+
+
+class FakeRedis:
+    """Just enough of the sorted-set, list, script and pub/sub API for the queue."""
+
+    def __init__(self):
+        self.zsets = {}
+        self.lists = {}
+        self.published = []
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def zadd(self, key, mapping, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or member in zset:
+                zset[member] = score
+
+    async def zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    async def zrangebyscore(self, key, low, high):
+        return [member for member, score in sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1]) if score <= high]
+
+    async def zpopmin(self, key, count=1):
+        zset = self.zsets.get(key, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return popped
+
+    async def lpush(self, key, *values):
+        self.lists.setdefault(key, [])[:0] = reversed(values)
+
+    async def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:end + 1]
+
+    async def blpop(self, keys, timeout=0):
+        for key in keys:
+            if self.lists.get(key):
+                return key, self.lists[key].pop(0)
+        return None
+
+    def register_script(self, script):
+        # Stands in for the lease script: ZPOPMIN then ZADD to the in-flight set
+        async def lease(keys, args):
+            popped = await self.zpopmin(keys[0], args[0])
+            await self.zadd(keys[1], {member: args[1] for member, _ in popped})
+            return [member for member, _ in popped]
+        return lease
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and applies them on execute, like a MULTI block."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", (channel, message), {}))
+
+    async def execute(self):
+        results = []
+        for name, args, kwargs in self.commands:
+            if name == "publish":
+                self.redis.published.append(args)
+                results.append(1)
+            else:
+                results.append(await getattr(self.redis, name)(*args, **kwargs))
+        self.commands = []
+        return results
+
+
+class FakeOCR:
+    def __init__(self, failing=False):
+        self.batches = []
+        self.failing = failing
+
+    async def process_prescription_images(self, image_paths):
+        self.batches.append(list(image_paths))
+        if self.failing:
+            raise RuntimeError("pool crashed")
+        return [{"success": True, "text": "Rx", "confidence": 90.0} for _ in image_paths]
+
+
+class TestOCRJobQueue:
+    """Test priority ordering and the depth bound."""
+
+    @pytest.mark.asyncio
+    async def test_priority_then_fifo(self, monkeypatch):
+        """Urgent jobs pop first; equal priorities pop in enqueue order."""
+        clock = iter(range(100, 110))
+        monkeypatch.setattr("app.services.ocr_queue.time.time", lambda: next(clock))
+        queue = OCRJobQueue(FakeRedis(), key="ocr", max_depth=10)
+
+        await queue.enqueue(uuid4(), "bulk.png", PRIORITY_BULK)
+        await queue.enqueue(uuid4(), "first.png", PRIORITY_NORMAL)
+        await queue.enqueue(uuid4(), "second.png", PRIORITY_NORMAL)
+        await queue.enqueue(uuid4(), "urgent.png", PRIORITY_URGENT)
+
+        jobs = await queue.pop_batch(10)
+
+        assert [job.image_path for job in jobs] == ["urgent.png", "first.png", "second.png", "bulk.png"]
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full(self):
+        """Enqueueing past max_depth raises instead of growing the backlog."""
+        queue = OCRJobQueue(FakeRedis(), key="ocr", max_depth=2)
+        await queue.enqueue(uuid4(), "a.png")
+        await queue.enqueue(uuid4(), "b.png")
+
+        with pytest.raises(OCRQueueFullException):
+            await queue.enqueue(uuid4(), "c.png")
+
+    @pytest.mark.asyncio
+    async def test_popped_jobs_are_leased_in_one_step(self):
+        """Every popped job is already in the in-flight set when pop_batch returns."""
+        redis = FakeRedis()
+        queue = OCRJobQueue(redis, key="ocr", max_depth=10)
+        await queue.enqueue(uuid4(), "a.png")
+        await queue.enqueue(uuid4(), "b.png")
+
+        jobs = await queue.pop_batch(5)
+
+        assert sorted(redis.zsets["ocr:inflight"]) == sorted(job.to_json() for job in jobs)
+        assert await redis.zcard("ocr") == 0
+
+    @pytest.mark.asyncio
+    async def test_waits_on_signal_when_empty(self):
+        """An empty queue waits on the signal list and the token list stays bounded."""
+        redis = FakeRedis()
+        queue = OCRJobQueue(redis, key="ocr", max_depth=10)
+
+        assert await queue.pop_batch(5, timeout=0.01) == []
+
+        for i in range(3):
+            await queue.enqueue(uuid4(), f"{i}.png")
+        assert len(redis.lists["ocr:signal"]) == 1
+
+
+class TestOCRWorkerService:
+    """Test batching and result delivery."""
+
+    def test_low_confidence_is_rejected(self):
+        """Results under the confidence threshold reject the prescription."""
+        values = OCRWorkerService.resolve_status({"success": True, "text": "x", "confidence": 10})
+
+        assert values["status"] == "rejected"
+        assert values["validation_notes"] == "Low OCR confidence"
+
+    @pytest.mark.asyncio
+    async def test_batches_and_publishes(self, monkeypatch):
+        """One run takes up to batch_size jobs and publishes one event per job."""
+        redis = FakeRedis()
+        queue = OCRJobQueue(redis, key="ocr", max_depth=100)
+        for i in range(5):
+            await queue.enqueue(uuid4(), f"{i}.png")
+
+        ocr = FakeOCR()
+        stored = []
+        worker = OCRWorkerService(queue, ocr=ocr, batch_size=3, channel="events")
+
+        async def fake_mark(jobs):
+            pass
+
+        async def fake_store(jobs, results):
+            stored.extend(jobs)
+
+        monkeypatch.setattr(worker, "_mark_processing", fake_mark)
+        monkeypatch.setattr(worker, "_store_results", fake_store)
+
+        assert await worker.run_once() == 3
+        assert await worker.run_once() == 2
+        assert [len(batch) for batch in ocr.batches] == [3, 2]
+        assert len(stored) == len(redis.published) == 5
+        assert all(channel == "events" for channel, _ in redis.published)
+
+    @pytest.mark.asyncio
+    async def test_acked_jobs_leave_no_lease(self, monkeypatch):
+        """Stored batches are removed from the in-flight set."""
+        redis = FakeRedis()
+        queue = OCRJobQueue(redis, key="ocr", max_depth=100)
+        await queue.enqueue(uuid4(), "a.png")
+        worker = _worker(monkeypatch, queue, FakeOCR(), [])
+
+        assert await worker.run_once() == 1
+        assert await redis.zcard("ocr") == await redis.zcard("ocr:inflight") == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_requeued_then_rejected(self, monkeypatch):
+        """A failing job is retried up to max_attempts, then stored as a failure and acked."""
+        redis = FakeRedis()
+        queue = OCRJobQueue(redis, key="ocr", max_depth=100, max_attempts=2)
+        await queue.enqueue(uuid4(), "a.png")
+        stored = []
+        worker = _worker(monkeypatch, queue, FakeOCR(failing=True), stored)
+
+        with pytest.raises(RuntimeError):
+            await worker.run_once()
+        assert [OCRJob.from_json(member).attempts for member in redis.zsets["ocr"]] == [1]
+        assert stored == []
+
+        with pytest.raises(RuntimeError):
+            await worker.run_once()
+        assert len(stored) == 1
+        assert stored[0][1]["success"] is False
+        assert await redis.zcard("ocr") == await redis.zcard("ocr:inflight") == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_requeued(self, monkeypatch):
+        """Jobs leased by a worker that died go back to the queue."""
+        redis = FakeRedis()
+        queue = OCRJobQueue(redis, key="ocr", max_depth=100, lease_seconds=30)
+        await queue.enqueue(uuid4(), "a.png")
+        await queue.pop_batch(1)
+        for member in list(redis.zsets["ocr:inflight"]):
+            redis.zsets["ocr:inflight"][member] = 0
+
+        worker = _worker(monkeypatch, queue, FakeOCR(), [])
+        assert await worker.recover_expired() == 1
+        assert await queue.depth() == 1
+
+
+def _worker(monkeypatch, queue, ocr, stored):
+    worker = OCRWorkerService(queue, ocr=ocr, batch_size=3, channel="events")
+
+    async def fake_mark(jobs):
+        pass
+
+    async def fake_store(jobs, results):
+        stored.extend(zip(jobs, results))
+
+    monkeypatch.setattr(worker, "_mark_processing", fake_mark)
+    monkeypatch.setattr(worker, "_store_results", fake_store)
+    return worker
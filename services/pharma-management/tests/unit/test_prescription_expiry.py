@@ -0,0 +1,101 @@
+"""
+Unit tests for the expired prescription sweep
+"""
+
+import pytest
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.prescription_expiry_service import (
+    ExpiredPrescriptionSweeper, SweepCheckpoint, expire_batch_statement
+)
+
+TODAY = date(2025, 6, 1)
+
+
+class FakeRedis:
+    """Key/value subset of the Redis API used by checkpoints."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+class FakeBacklog:
+    """Sorted ids standing in for the prescriptions table."""
+
+    def __init__(self, count, fail_after_batches=None):
+        self.ids = [UUID(int=i) for i in range(1, count + 1)]
+        self.expired = []
+        self.calls = 0
+        self.fail_after_batches = fail_after_batches
+
+    def sweeper(self, batch_size, checkpoint):
+        sweeper = ExpiredPrescriptionSweeper(session_factory=None, batch_size=batch_size, checkpoint=checkpoint)
+        sweeper.expire_batch = self.expire_batch
+        return sweeper
+
+    async def expire_batch(self, today, after_id):
+        self.calls += 1
+        if self.fail_after_batches is not None and self.calls > self.fail_after_batches:
+            raise RuntimeError("connection lost")
+        remaining = [i for i in self.ids if after_id is None or i > after_id]
+        batch = remaining[:3]
+        self.expired.extend(batch)
+        return [{"id": i, "pharmacy_id": None, "expiry_date": today} for i in batch]
+
+
+class TestExpireBatchStatement:
+    """Test the SQL issued per batch."""
+
+    def test_claims_rows_with_skip_locked(self):
+        """One UPDATE ... RETURNING over a locked, id-ordered batch."""
+        sql = str(expire_batch_statement(TODAY, UUID(int=7), 500).compile(dialect=postgresql.dialect()))
+
+        assert sql.startswith("WITH expiring AS")
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "prescriptions.id > " in sql
+        assert "RETURNING prescriptions.id" in sql
+
+
+class TestExpiredPrescriptionSweeper:
+    """Test chunking and checkpoint resume."""
+
+    @pytest.mark.asyncio
+    async def test_sweeps_in_batches_and_clears_checkpoint(self):
+        """Every row is expired once and the checkpoint is gone afterwards."""
+        redis = FakeRedis()
+        backlog = FakeBacklog(8)
+
+        result = await backlog.sweeper(3, SweepCheckpoint(redis, key="sweep")).sweep(TODAY)
+
+        assert result == {"success": True, "updated_count": 8, "batches": 3}
+        assert backlog.expired == backlog.ids
+        assert redis.values == {}
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_interruption(self):
+        """A failed sweep restarts after the last committed batch."""
+        redis = FakeRedis()
+        checkpoint = SweepCheckpoint(redis, key="sweep")
+        backlog = FakeBacklog(8, fail_after_batches=2)
+
+        with pytest.raises(RuntimeError):
+            await backlog.sweeper(3, checkpoint).sweep(TODAY)
+        assert (await checkpoint.load(TODAY))["after_id"] == UUID(int=6)
+
+        backlog.fail_after_batches = None
+        result = await backlog.sweeper(3, checkpoint).sweep(TODAY)
+
+        assert result["updated_count"] == 8
+        assert backlog.expired == backlog.ids
@@ -0,0 +1,122 @@
+"""
+Unit tests for the prescription OCR pipeline
+"""
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("pytesseract")
+
+import numpy as np
+
+from app.integrations.ocr import prescription_ocr
+from app.integrations.ocr.prescription_ocr import PrescriptionOCR, text_from_tesseract_data
+
+
+def _data(rows):
+    """Build an image_to_data style dict from (block, par, line, word, conf) rows."""
+    return {
+        "block_num": [r[0] for r in rows],
+        "par_num": [r[1] for r in rows],
+        "line_num": [r[2] for r in rows],
+        "text": [r[3] for r in rows],
+        "conf": [r[4] for r in rows],
+    }
+
+
+class TestTextFromTesseractData:
+    """Test rebuilding text from a single image_to_data pass."""
+
+    def test_rebuilds_lines_and_blocks(self):
+        """Words join per line and blocks are separated by a blank line."""
+        data = _data([
+            (1, 0, 0, "", "-1"),
+            (1, 1, 1, "Dr.", "96"),
+            (1, 1, 1, "Rao", "90"),
+            (1, 1, 2, "Clinic", "88"),
+            (2, 1, 1, "Paracetamol", "80.5"),
+            (2, 1, 1, "500mg", "75"),
+        ])
+
+        result = text_from_tesseract_data(data)
+
+        assert result["text"] == "Dr. Rao\nClinic\n\nParacetamol 500mg"
+        assert result["word_count"] == 5
+        assert result["confidence"] == pytest.approx((96 + 90 + 88 + 80.5 + 75) / 5, abs=0.01)
+
+    def test_empty_page(self):
+        """No recognised words yields empty text and zero confidence."""
+        result = text_from_tesseract_data(_data([(1, 0, 0, " ", "-1")]))
+
+        assert result == {"text": "", "confidence": 0, "word_count": 0}
+
+
+class TestPreprocessImage:
+    """Test DPI-based downsampling."""
+
+    def test_downsamples_to_target_dpi(self):
+        """Images larger than a page at the target DPI are shrunk."""
+        image = np.full((4000, 3000), 255, dtype=np.uint8)
+
+        processed = PrescriptionOCR._preprocess_image(image, target_dpi=200, max_page_inches=10)
+
+        assert max(processed.shape) == 2000
+
+    def test_keeps_page_sized_images(self):
+        """Images already within the target size are not resized."""
+        image = np.full((1000, 800), 255, dtype=np.uint8)
+
+        assert PrescriptionOCR._preprocess_image(image, target_dpi=300, max_page_inches=11).shape == (1000, 800)
+
+
+class TestResultCache:
+    """Test the content-hash result cache."""
+
+    @pytest.mark.asyncio
+    async def test_identical_images_processed_once(self, monkeypatch, tmp_path):
+        """A second upload with the same bytes is served from the cache."""
+        prescription_ocr._result_cache.clear()
+        calls = []
+
+        def fake_pipeline(image_bytes, tesseract_cmd):
+            calls.append(image_bytes)
+            return {"text": "Rx", "confidence": 90.0, "parsed_data": {"medicines": []}, "success": True}
+
+        monkeypatch.setattr(prescription_ocr, "_get_pool", lambda: None)
+        monkeypatch.setattr(prescription_ocr, "_run_ocr_pipeline", fake_pipeline)
+        first_path, second_path = tmp_path / "a.png", tmp_path / "b.png"
+        first_path.write_bytes(b"same image")
+        second_path.write_bytes(b"same image")
+
+        ocr = PrescriptionOCR()
+        first = await ocr.process_prescription_image(str(first_path))
+        first["parsed_data"]["medicines"].append("mutated")
+        second = await ocr.process_prescription_image(str(second_path))
+
+        assert len(calls) == 1
+        assert second["parsed_data"]["medicines"] == []
+
+    @pytest.mark.asyncio
+    async def test_batch_dedupes_and_keeps_order(self, monkeypatch, tmp_path):
+        """Duplicate images in a batch are recognized once; results follow input order."""
+        prescription_ocr._result_cache.clear()
+        batches = []
+
+        def fake_batch(images, tesseract_cmd):
+            batches.append(images)
+            return [{"success": True, "text": image.decode(), "confidence": 90.0} for image in images]
+
+        monkeypatch.setattr(prescription_ocr, "_get_pool", lambda: None)
+        monkeypatch.setattr(prescription_ocr, "pool_size", lambda: 1)
+        monkeypatch.setattr(prescription_ocr, "_run_ocr_batch", fake_batch)
+        paths = []
+        for name, content in [("a", b"one"), ("b", b"two"), ("c", b"one")]:
+            (tmp_path / name).write_bytes(content)
+            paths.append(str(tmp_path / name))
+        paths.append(str(tmp_path / "missing"))
+
+        results = await PrescriptionOCR().process_prescription_images(paths)
+
+        assert batches == [[b"one", b"two"]]
+        assert [r.get("text") for r in results[:3]] == ["one", "two", "one"]
+        assert results[3]["success"] is False
@@ -90,4 +90,50 @@ class TestPrescriptionService:
         assert prescription_item.prescription_id == prescription.id
         assert prescription_item.medicine_id == medicine_id
         assert prescription_item.medicine_name == "Test Medicine"
-        assert prescription_item.quantity_prescribed == 30
\ No newline at end of file
+        assert prescription_item.quantity_prescribed == 30
+
+class TestPrescriptionUpload:
+    """Test the upload path around the OCR queue."""
+
+    @pytest.mark.asyncio
+    async def test_failed_enqueue_rejects_the_prescription(self, monkeypatch):
+        """A prescription whose OCR job could not be queued does not stay uploaded."""
+        from types import SimpleNamespace
+        from app.services import prescription_service as module
+
+        prescription_id = uuid4()
+        updates = []
+
+        class FailingQueue:
+            async def ensure_capacity(self):
+                pass
+
+            async def enqueue(self, *args):
+                raise ConnectionError("redis down")
+
+        async def fake_create(self, data):
+            return SimpleNamespace(id=prescription_id, **data)
+
+        async def fake_update(self, id, data):
+            updates.append((id, data))
+
+        async def fake_number(self):
+            return "RX-1"
+
+        async def fake_save(self, file, number):
+            return "/tmp/rx-1.png"
+
+        monkeypatch.setattr(module, "get_ocr_queue", lambda: FailingQueue())
+        monkeypatch.setattr(module.BaseRepository, "create", fake_create)
+        monkeypatch.setattr(module.BaseRepository, "update", fake_update)
+        monkeypatch.setattr(PrescriptionService, "_generate_prescription_number", fake_number)
+        monkeypatch.setattr(PrescriptionService, "_save_prescription_file", fake_save)
+
+        upload = SimpleNamespace(content_type="image/png", size=10, filename="rx.png")
+        with pytest.raises(ConnectionError):
+            await PrescriptionService(None).upload_prescription(uuid4(), uuid4(), uuid4(), upload)
+
+        assert updates == [(prescription_id, {
+            "status": "rejected",
+            "validation_notes": "OCR could not be queued: redis down"
+        })]
@@ -0,0 +1,141 @@
+"""
+Unit tests for the startup migration controller
+"""
+
+import pytest
+from alembic.script import ScriptDirectory
+
+from app.db import migrations
+from app.db.migrations import BASELINE_REVISION, MigrationController, SchemaStateEnum, alembic_config
+
+
+class _FakeConnection:
+    """Records statements; the stamped revision is whatever the test sets."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.engine.statements.append(str(statement))
+
+    async def scalar(self, statement, parameters=None):
+        self.engine.statements.append(str(statement))
+        if "information_schema" in str(statement):
+            return self.engine.tables
+        return self.engine.revision
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def run_sync(self, fn):
+        if self.engine.schema_calls is None:
+            raise AssertionError("schema should not be touched")
+        fn(self)
+
+
+class _FakeEngine:
+    def __init__(self, revision, tables=0, schema_calls=None):
+        self.revision = revision
+        self.tables = tables
+        self.schema_calls = schema_calls
+        self.statements = []
+
+    def connect(self):
+        return _FakeConnection(self)
+
+
+class TestMigrationController:
+    """Test the revision fast path and the locked migration step."""
+
+    def test_single_migration_head(self):
+        """The fast path compares against one head, so the scripts must not branch."""
+        assert len(ScriptDirectory.from_config(alembic_config()).get_heads()) == 1
+
+    @pytest.mark.asyncio
+    async def test_current_revision_takes_one_query(self):
+        """A replica starting against a migrated database only reads the revision."""
+        engine = _FakeEngine(revision="009")
+
+        state = await MigrationController(engine, head="009").ensure_schema()
+
+        assert state == SchemaStateEnum.CURRENT
+        assert engine.statements == ["SELECT version_num FROM alembic_version"]
+
+    @pytest.mark.asyncio
+    async def test_behind_without_migrating(self):
+        """With startup migration disabled a stale schema is reported, not changed."""
+        engine = _FakeEngine(revision="008")
+
+        state = await MigrationController(engine, migrate=False, head="009").ensure_schema()
+
+        assert state == SchemaStateEnum.BEHIND
+        assert len(engine.statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_rechecks_after_waiting_for_lock(self):
+        """A replica that waited on the lock skips migrating if another replica finished."""
+        engine = _FakeEngine(revision="008")
+        controller = MigrationController(engine, lock_key=42, head="009")
+        first_check = controller.current_revision
+
+        async def stale_then_current(conn=None):
+            revision = await first_check(conn)
+            engine.revision = "009"  # migrated by another replica meanwhile
+            return revision
+
+        controller.current_revision = stale_then_current
+        state = await controller.ensure_schema()
+
+        assert state == SchemaStateEnum.CURRENT
+        assert any("pg_advisory_lock" in statement for statement in engine.statements)
+        assert any("pg_advisory_unlock" in statement for statement in engine.statements)
+
+
+class _FakePartitions:
+    async def ensure_partitions(self, conn):
+        pass
+
+
+def _record_schema_calls(monkeypatch, calls):
+    """Record alembic commands and create_all instead of running them."""
+    monkeypatch.setattr(migrations.command, "stamp", lambda config, revision: calls.append(("stamp", revision)))
+    monkeypatch.setattr(migrations.command, "upgrade", lambda config, revision: calls.append(("upgrade", revision)))
+    monkeypatch.setattr(migrations.BaseModel.metadata, "create_all", lambda conn: calls.append(("create_all",)))
+    monkeypatch.setattr(migrations, "audit_log_partitions", _FakePartitions)
+
+
+class TestUnstampedDatabase:
+    """Test how a database without an Alembic revision is brought to head."""
+
+    @pytest.mark.asyncio
+    async def test_empty_database_is_created_at_head(self, monkeypatch):
+        """Nothing to migrate: build from the models and stamp head."""
+        calls = []
+        _record_schema_calls(monkeypatch, calls)
+        engine = _FakeEngine(revision=None, tables=0, schema_calls=calls)
+
+        state = await MigrationController(engine, head="009").ensure_schema()
+
+        assert state == SchemaStateEnum.CREATED
+        assert calls == [("create_all",), ("stamp", "head")]
+
+    @pytest.mark.asyncio
+    async def test_tables_without_revision_are_upgraded_from_baseline(self, monkeypatch):
+        """A schema built by create_all runs every migration after the baseline."""
+        calls = []
+        _record_schema_calls(monkeypatch, calls)
+        engine = _FakeEngine(revision=None, tables=12, schema_calls=calls)
+
+        state = await MigrationController(engine, head="009").ensure_schema()
+
+        assert state == SchemaStateEnum.MIGRATED
+        assert calls == [("stamp", BASELINE_REVISION), ("upgrade", "head"), ("create_all",)]
@@ -0,0 +1,103 @@
+"""
+Unit tests for the GST tax engine
+"""
+
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+from app.services.tax_engine import TaxEngine, TaxLine, TaxRateTable, is_inter_state
+
+CENT = Decimal("0.01")
+
+
+def _decimal_reference(lines, table, inter_state=False):
+    """The per-line Decimal computation BillingService used, rounded at the end."""
+    subtotal = gst_total = Decimal("0")
+    for line in lines:
+        rate = line.gst_rate if line.gst_rate is not None else table.rate(line.hsn_code)
+        item_total = line.unit_price * line.quantity
+        discount_amount = (item_total * line.discount_percentage) / 100
+        taxable_amount = item_total - discount_amount
+        subtotal += taxable_amount
+        gst_total += (taxable_amount * rate) / 100
+
+    if inter_state:
+        cgst = sgst = Decimal("0.00")
+        igst = gst_total.quantize(CENT, rounding=ROUND_HALF_UP)
+    else:
+        cgst = sgst = (gst_total / 2).quantize(CENT, rounding=ROUND_HALF_UP)
+        igst = Decimal("0.00")
+    subtotal = subtotal.quantize(CENT, rounding=ROUND_HALF_UP)
+    return subtotal, cgst, sgst, igst, subtotal + cgst + sgst + igst
+
+
+def _random_line(rng):
+    return TaxLine(
+        unit_price=Decimal(rng.randint(1, 5000000)) / 100,
+        quantity=rng.randint(1, 500),
+        gst_rate=rng.choice([None, Decimal("0"), Decimal("5"), Decimal("12"), Decimal("18"), Decimal("28")]),
+        hsn_code=rng.choice([None, "3004", "30043110", "3002 20", "9021", "4901"]),
+        discount_percentage=Decimal(rng.randint(0, 5000)) / 100,
+    )
+
+
+class TestTaxRateTable:
+    """Test HSN rate resolution."""
+
+    def test_longest_prefix_wins(self):
+        """A more specific heading overrides its chapter."""
+        table = TaxRateTable({"3004": 12, "300431": 5}, default_rate=18)
+
+        assert table.rate("30049099") == Decimal("12.00")
+        assert table.rate("3004 31 10") == Decimal("5.00")
+        assert table.rate("4901") == Decimal("18.00")
+        assert table.rate(None) == Decimal("18.00")
+
+
+class TestTaxEngine:
+    """Test invoice computation."""
+
+    def test_matches_decimal_reference(self):
+        """Random documents total exactly what the Decimal computation rounds to."""
+        rng = random.Random(37)
+        table = TaxRateTable(default_rate=18)
+        engine = TaxEngine(table)
+
+        for _ in range(300):
+            lines = [_random_line(rng) for _ in range(rng.randint(1, 40))]
+            inter_state = rng.random() < 0.3
+            taxes = engine.compute(lines, inter_state=inter_state)
+
+            assert (
+                taxes.subtotal, taxes.cgst_amount, taxes.sgst_amount, taxes.igst_amount, taxes.total_amount
+            ) == _decimal_reference(lines, table, inter_state)
+
+    def test_rounds_once_at_the_end(self):
+        """Sub-paisa tax on many lines accumulates instead of rounding away."""
+        engine = TaxEngine(TaxRateTable(default_rate=5))
+        taxes = engine.compute([TaxLine(unit_price=Decimal("0.01"), quantity=1)] * 100)
+
+        # Each line carries 0.0005 of GST, which per-line rounding would drop entirely
+        assert taxes.lines[0].tax_amount == 0
+        assert taxes.tax_amount == Decimal("0.06")
+        assert taxes.cgst_amount == taxes.sgst_amount == Decimal("0.03")
+        assert taxes.total_amount == Decimal("1.06")
+
+    def test_mixed_input_types(self):
+        """Purchase order dict items may carry floats, ints or strings."""
+        engine = TaxEngine(TaxRateTable(default_rate=18))
+        taxes = engine.compute([
+            TaxLine(unit_price=10.1, quantity=3),
+            TaxLine(unit_price="2.50", quantity=2, gst_rate=12),
+            TaxLine(unit_price=7, quantity=1, gst_rate="0"),
+        ])
+
+        assert taxes.subtotal == Decimal("42.30")
+        assert taxes.tax_amount == Decimal("6.06")
+        assert taxes.total_amount == Decimal("48.36")
+
+    def test_inter_state(self):
+        """Supplies to another state are charged IGST."""
+        assert is_inter_state("Karnataka", "Tamil Nadu")
+        assert not is_inter_state("Karnataka", " karnataka ")
+        assert not is_inter_state("Karnataka", None)
@@ -0,0 +1,37 @@
+"""Add compiled permission bitsets to permissions and roles
+
+Revision ID: add_permission_bitsets
+Revises: 1e340463214b
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_permission_bitsets'
+down_revision = '1e340463214b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('permissions', sa.Column('bit_index', sa.Integer(), nullable=True))
+    op.create_unique_constraint('uq_permissions_bit_index', 'permissions', ['bit_index'])
+    # Existing permissions get bits in name order
+    op.execute(
+        "UPDATE permissions SET bit_index = ranked.position - 1 "
+        "FROM (SELECT id, row_number() OVER (ORDER BY name) AS position FROM permissions) AS ranked "
+        "WHERE permissions.id = ranked.id"
+    )
+
+    # Masks stay NULL until the permission compiler builds them at startup
+    op.add_column('roles', sa.Column('permission_mask', sa.String(), nullable=True))
+    op.add_column('roles', sa.Column('permissions_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('roles', 'permissions_version')
+    op.drop_column('roles', 'permission_mask')
+    op.drop_constraint('uq_permissions_bit_index', 'permissions', type_='unique')
+    op.drop_column('permissions', 'bit_index')
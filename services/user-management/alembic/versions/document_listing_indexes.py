@@ -0,0 +1,40 @@
+"""Index medical documents for keyset listing and file name search
+
+Revision ID: document_listing_indexes
+Revises: refresh_token_digests
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'document_listing_indexes'
+down_revision = 'refresh_token_digests'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Newest-first pages of one patient's documents; also covers lookups by patient_id
+    op.create_index(
+        'ix_medical_documents_patient_created',
+        'medical_documents',
+        ['patient_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.drop_index('ix_medical_documents_patient_id', table_name='medical_documents')
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_medical_documents_file_name_trgm',
+        'medical_documents',
+        ['file_name'],
+        postgresql_using='gin',
+        postgresql_ops={'file_name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade():
+    op.drop_index('ix_medical_documents_file_name_trgm', table_name='medical_documents')
+    op.create_index('ix_medical_documents_patient_id', 'medical_documents', ['patient_id'])
+    op.drop_index('ix_medical_documents_patient_created', table_name='medical_documents')
@@ -0,0 +1,45 @@
+"""Look refresh tokens up by sha256 digest and index expiry for purging
+
+Revision ID: refresh_token_digests
+Revises: add_permission_bitsets
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'refresh_token_digests'
+down_revision = 'add_permission_bitsets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('refresh_tokens', sa.Column('token_digest', sa.String(length=64), nullable=True))
+    # Same digest as crud_token.token_digest
+    op.execute("UPDATE refresh_tokens SET token_digest = encode(sha256(convert_to(token, 'UTF8')), 'hex')")
+    op.alter_column('refresh_tokens', 'token_digest', nullable=False)
+    op.create_index(op.f('ix_refresh_tokens_token_digest'), 'refresh_tokens', ['token_digest'], unique=True)
+
+    # Raw tokens are no longer written or looked up
+    op.drop_index(op.f('ix_refresh_tokens_token'), table_name='refresh_tokens')
+    op.alter_column('refresh_tokens', 'token', nullable=True)
+
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index(
+        op.f('ix_revoked_refresh_tokens_expires_at'), 'revoked_refresh_tokens', ['expires_at'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_revoked_refresh_tokens_expires_at'), table_name='revoked_refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+
+    # Tokens issued since the upgrade only have a digest; their users log in again
+    op.execute("DELETE FROM refresh_tokens WHERE token IS NULL")
+    op.alter_column('refresh_tokens', 'token', nullable=False)
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=True)
+
+    op.drop_index(op.f('ix_refresh_tokens_token_digest'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token_digest')
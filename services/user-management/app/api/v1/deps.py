@@ -3,9 +3,12 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from typing import Generator, Optional
+import uuid
 
-from app.db.session import SessionLocal, engine
+from app.db.session import SessionLocal, tenant_router
 from app.core.config import settings
+from app.core.principal_cache import UserSnapshot, principal_cache
+from app.core.permission_compiler import decode_mask, has_permission, permission_compiler
 from app.db import models
 from app.crud import crud_user
 from app.api.v1.schemas.token import TokenData
@@ -40,18 +43,47 @@ def get_current_user(
         return {
             "email": email,
             "role": role,
-            "permissions": set(permissions)
+            "org_id": payload.get("org_id"),
+            "permissions": permissions,
+            # Compiled permission bits; None for tokens issued before masks existed
+            "permission_mask": decode_mask(payload["pmask"]) if "pmask" in payload else None
         }
     except JWTError:
         raise credentials_exception
 
-def get_current_user_from_db(
+def get_current_principal(
     db: Session = Depends(get_public_db),
     user_data: dict = Depends(get_current_user)
+) -> UserSnapshot:
+    """
+    The token's user as a cached snapshot. Only a cache miss queries the database.
+    """
+    principal = principal_cache.get(user_data["email"])
+    if principal is None:
+        try:
+            user = crud_user.get_user_by_email(db, email=user_data["email"], raise_exception=True)
+        except UserNotFoundException:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = principal_cache.snapshot(user)
+        principal_cache.put(user_data["email"], principal)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return principal
+
+def get_current_user_from_db(
+    db: Session = Depends(get_public_db),
+    user_data: dict = Depends(get_current_user),
+    principal: UserSnapshot = Depends(get_current_principal)
 ) -> models.User:
-    try:
-        user = crud_user.get_user_by_email(db, email=user_data["email"], raise_exception=True)
-    except UserNotFoundException:
+    # After a cache miss the row is already in the session's identity map
+    user = db.get(models.User, principal.id)
+    if user is None:
+        principal_cache.invalidate_user(user_data["email"])
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -60,20 +92,28 @@ def get_current_user_from_db(
     
     # Attach token data to the user object for use in endpoints
     user.token_role = user_data["role"]
-    user.token_permissions = user_data["permissions"]
+    user.token_permissions = set(user_data["permissions"])
     return user
 
 def require_permission(required_permission: str):
     """
     Dependency factory to check for a specific permission in the user's token.
     """
-    def permission_checker(current_user: models.User = Depends(get_current_user)):
-        if required_permission not in current_user.token_permissions:
+    def permission_checker(
+        db: Session = Depends(get_public_db),
+        user_data: dict = Depends(get_current_user),
+        principal: UserSnapshot = Depends(get_current_principal)
+    ) -> UserSnapshot:
+        if user_data["permission_mask"] is not None:
+            allowed = has_permission(user_data["permission_mask"], permission_compiler.bit(db, required_permission))
+        else:
+            allowed = required_permission in user_data["permissions"]
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Insufficient permissions. Requires: {required_permission}"
             )
-        return current_user
+        return principal
     return permission_checker
 
 def get_current_user_optional(
@@ -112,10 +152,20 @@ def get_current_user_optional(
     except (JWTError, ValueError):
         return None
 
-def get_db(current_user: models.User = Depends(get_current_user_from_db)) -> Generator:
-    tenant_schema_name = f"org_{str(current_user.organization_id).replace('-', '')}"
-    with engine.connect() as connection:
-        connection.exec_driver_sql(f"SET search_path TO {tenant_schema_name}, public")
+def get_current_organization_id(
+    db: Session = Depends(get_public_db),
+    user_data: dict = Depends(get_current_user)
+) -> uuid.UUID:
+    """
+    The organization from the token's org_id claim. Only tokens issued before
+    the claim existed fall back to the cached principal.
+    """
+    if user_data.get("org_id"):
+        return uuid.UUID(user_data["org_id"])
+    return get_current_principal(db=db, user_data=user_data).organization_id
+
+def get_db(organization_id: uuid.UUID = Depends(get_current_organization_id)) -> Generator:
+    with tenant_router.connect(organization_id) as connection:
         db = SessionLocal(bind=connection)
         try:
             yield db
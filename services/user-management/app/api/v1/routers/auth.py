@@ -2,13 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Any
 from pydantic import BaseModel, EmailStr
-from datetime import datetime
 import pyotp
-from datetime import timezone
 import traceback
 import os
 
-from app.crud import crud_token
 from app.core.security import create_refresh_token
 from fastapi import Response
 import uuid
@@ -19,7 +16,7 @@ from app.tasks.email_tasks import send_password_reset_email
 from app.integrations.s3_client import s3_client
 
 from app.api.v1 import deps
-from app.crud import crud_user, crud_organization, crud_patient, crud_rbac, crud_token
+from app.crud import crud_user, crud_organization, crud_patient, crud_rbac
 from app.api.v1.schemas import (
     user as user_schema,
     organization as org_schema,
@@ -30,6 +27,8 @@ from app.api.v1.schemas import (
     mfa as mfa_schema
 )
 from app.core.security import create_access_token, verify_password, hash_password, create_mfa_token
+from app.core.permission_compiler import encode_mask, permission_compiler
+from app.core.token_store import token_store
 from app.core.config import settings
 from app.db import models
 
@@ -397,13 +396,14 @@ def register_with_mfa(
         
         # Always generate tokens - for MFA we'll still need them to access the dashboard
         # The MFA verification will happen separately
-        user_permissions = {perm.name for role in new_user.roles for perm in role.permissions}
+        permission_mask = permission_compiler.mask_of(db, new_user.roles)
+        user_permissions = permission_compiler.names(db, permission_mask)
         user_role_names = {role.name for role in new_user.roles}
         default_role = list(user_role_names)[0] if user_role_names else "PATIENT"
         
         access_token = create_access_token(
             subject=new_user.email,
-            claims={"role": default_role, "org_id": str(new_user.organization_id), "perms": list(user_permissions)},
+            claims={"role": default_role, "org_id": str(new_user.organization_id), "perms": list(user_permissions), "pmask": encode_mask(permission_mask)},
             mfa_enabled=user_in.enable_mfa
         )
         refresh_token = create_refresh_token(subject=new_user.email)
@@ -513,7 +513,8 @@ def login(
         }
     
     # Get user permissions and roles
-    user_permissions = {perm.name for role in user.roles for perm in role.permissions}
+    permission_mask = permission_compiler.mask_of(db, user.roles)
+    user_permissions = permission_compiler.names(db, permission_mask)
     user_role_names = {role.name for role in user.roles}
     
     # Use the requested role if provided and valid, otherwise use the first role
@@ -526,7 +527,7 @@ def login(
     # Create access token
     access_token = create_access_token(
         subject=user.email,
-        claims={"role": role, "org_id": str(user.organization_id), "perms": list(user_permissions)},
+        claims={"role": role, "org_id": str(user.organization_id), "perms": list(user_permissions), "pmask": encode_mask(permission_mask)},
         mfa_enabled=user.mfa_enabled
     )
     
@@ -534,12 +535,7 @@ def login(
     refresh_token = create_refresh_token(subject=user.email)
     
     # Store refresh token in database
-    crud_token.create_refresh_token(
-        db=db,
-        user_id=user.id,
-        token=refresh_token,
-        expires_at=datetime.now(timezone.utc) + settings.REFRESH_TOKEN_EXPIRE_TIMEDELTA
-    )
+    token_store.issue(db, user_id=user.id, token=refresh_token)
     
     return {
         "mfa_required": False,
@@ -578,7 +574,7 @@ def verify_mfa(
         )
     
     # Get the user
-    user = crud_user.get_user_by_email(db, email=email)
+    user = crud_user.get_user_with_permissions(db, email=email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -600,14 +596,15 @@ def verify_mfa(
         )
     
     # Get user permissions and roles
-    user_permissions = {perm.name for role in user.roles for perm in role.permissions}
+    permission_mask = permission_compiler.mask_of(db, user.roles)
+    user_permissions = permission_compiler.names(db, permission_mask)
     user_role_names = {role.name for role in user.roles}
     role = list(user_role_names)[0] if user_role_names else "PATIENT"
     
     # Create access token
     access_token = create_access_token(
         subject=user.email,
-        claims={"role": role, "org_id": str(user.organization_id), "perms": list(user_permissions)},
+        claims={"role": role, "org_id": str(user.organization_id), "perms": list(user_permissions), "pmask": encode_mask(permission_mask)},
         mfa_verified=True
     )
     
@@ -615,12 +612,7 @@ def verify_mfa(
     refresh_token = create_refresh_token(subject=user.email)
     
     # Store refresh token in database
-    crud_token.create_refresh_token(
-        db=db,
-        user_id=user.id,
-        token=refresh_token,
-        expires_at=datetime.now(timezone.utc) + settings.REFRESH_TOKEN_EXPIRE_TIMEDELTA
-    )
+    token_store.issue(db, user_id=user.id, token=refresh_token)
     
     return {
         "access_token": access_token,
@@ -654,38 +646,38 @@ def refresh_token(
             detail="Invalid refresh token",
         )
     
+    # Check the revocation list (answered in memory for almost every token)
+    if payload.get("jti") and token_store.is_revoked(db, payload["jti"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+        )
+    
     # Get the user
-    user = crud_user.get_user_by_email(db, email=email)
+    user = crud_user.get_user_with_permissions(db, email=email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
     
-    # Verify the refresh token exists in the database
-    token_record = crud_token.get_refresh_token(db, token=refresh_request.refresh_token)
-    if not token_record or token_record.user_id != user.id:
+    # Verify the refresh token is live and belongs to the user (expired tokens are never returned)
+    if token_store.owner(db, refresh_request.refresh_token) != user.id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
     
-    # Check if the token has expired
-    if token_record.expires_at < datetime.now(timezone.utc):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token has expired",
-        )
-    
     # Get user permissions and roles
-    user_permissions = {perm.name for role in user.roles for perm in role.permissions}
+    permission_mask = permission_compiler.mask_of(db, user.roles)
+    user_permissions = permission_compiler.names(db, permission_mask)
     user_role_names = {role.name for role in user.roles}
     role = list(user_role_names)[0] if user_role_names else "PATIENT"
     
     # Create new access token
     access_token = create_access_token(
         subject=user.email,
-        claims={"role": role, "org_id": str(user.organization_id), "perms": list(user_permissions)},
+        claims={"role": role, "org_id": str(user.organization_id), "perms": list(user_permissions), "pmask": encode_mask(permission_mask)},
         mfa_enabled=user.mfa_enabled
     )
     
@@ -693,12 +685,11 @@ def refresh_token(
     new_refresh_token = create_refresh_token(subject=user.email)
     
     # Update refresh token in database
-    crud_token.delete_refresh_token(db, token=refresh_request.refresh_token)
-    crud_token.create_refresh_token(
-        db=db,
+    token_store.rotate(
+        db,
         user_id=user.id,
-        token=new_refresh_token,
-        expires_at=datetime.now(timezone.utc) + settings.REFRESH_TOKEN_EXPIRE_TIMEDELTA
+        old_token=refresh_request.refresh_token,
+        new_token=new_refresh_token
     )
     
     return {
@@ -717,8 +708,8 @@ def logout(
     Logout user by invalidating refresh token
     """
     try:
-        # Delete the refresh token from the database
-        crud_token.delete_refresh_token(db, token=refresh_request.refresh_token)
+        # Blacklist the token's JTI and delete the token from the database
+        token_store.revoke(db, refresh_request.refresh_token)
         return {"message": "Successfully logged out"}
     except Exception as e:
         raise HTTPException(
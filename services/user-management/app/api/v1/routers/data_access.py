@@ -1,52 +1,62 @@
-import boto3
 from botocore.exceptions import ClientError
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, ConfigDict
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 import uuid
-from datetime import date, datetime
-from typing import List, Any
+from datetime import date
+from typing import Any, Optional
 
 from app.api.v1 import deps
 from app.core.config import settings
+from app.core.principal_cache import UserSnapshot
 from app.db import models
 from app.crud import crud_document, crud_consent
+from app.api.v1.schemas import documents as docs_schema
+from app.integrations.s3_client import shared_s3_client
+from app.services.access_log_writer import access_log_writer
 
 router = APIRouter()
 
 # --- Schemas for this router ---
 
-class DocumentRead(BaseModel):
-    id: uuid.UUID
-    file_name: str
-    content_type: str
-    document_category: models.DocumentCategory
-    status: models.DocumentStatus
-    created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
-
 class DataAccessResponse(BaseModel):
     access_url: str
     expires_in_seconds: int
 
 # --- Endpoints ---
 
-@router.get("/data-access/documents", response_model=List[DocumentRead])
+@router.get("/data-access/documents", response_model=docs_schema.DocumentPage)
 def browse_documents(
-    # ... (function parameters are the same)
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: UserSnapshot = Depends(deps.get_current_principal),
+    search: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    source_org_id: Optional[uuid.UUID] = None,
+    source_practitioner_id: Optional[uuid.UUID] = None,
+    category: Optional[models.DocumentCategory] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
 ):
     """
-    Get a list of the current user's documents with powerful filtering and search.
+    Get a page of the current user's documents with powerful filtering and search.
     This uses the tenant-aware get_db because a user only browses their own data.
     """
-    documents = crud_document.get_documents_for_patient(
-        db=db,
-        patient_id=current_user.id,
-        # ... (filter parameters are the same)
-    )
-    return documents
+    try:
+        return crud_document.get_documents_for_patient(
+            db=db,
+            patient_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            search=search,
+            start_date=start_date,
+            end_date=end_date,
+            source_org_id=source_org_id,
+            source_practitioner_id=source_practitioner_id,
+            category=category
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/data-access/documents/{document_id}/view", response_model=DataAccessResponse)
 def access_patient_document(
@@ -54,10 +64,11 @@ def access_patient_document(
     # --- THIS IS THE CRITICAL FIX ---
     # Use the public DB session to find a document that may exist in another tenant's schema.
     db: Session = Depends(deps.get_public_db),
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: UserSnapshot = Depends(deps.get_current_principal)
 ):
     """
     Allows a user to access a patient's document, performing a cross-tenant consent check.
+    Consent decisions are cached (app/core/consent_cache.py) and access is logged in batches.
     """
     # 1. Get document metadata using the public session.
     doc = crud_document.get_document_by_id(db, doc_id=document_id)
@@ -72,18 +83,17 @@ def access_patient_document(
         has_access = True
     else:
         # Case 2: Check if the current user has active consent from the patient.
-        active_consent = crud_consent.find_active_consent(
+        decision = crud_consent.get_consent_decision(
             db=db,
             patient_id=doc.patient_id,
             fiduciary_id=current_user.id,
             data_category=doc.document_category.value
         )
-        if active_consent:
+        if decision.granted:
             has_access = True
-            # Log the data access event for auditing
-            crud_consent.log_data_access(
-                db=db,
-                consent_id=active_consent.id,
+            # Log the data access event for auditing (written in the background, in batches)
+            access_log_writer.log(
+                consent_id=decision.consent_id,
                 patient_id=doc.patient_id,
                 consumer_id=current_user.id,
                 data_accessed=[doc.s3_key]
@@ -97,7 +107,7 @@ def access_patient_document(
         )
 
     # --- Generate S3 URL (only if access is granted) ---
-    s3_client = boto3.client("s3", region_name=settings.AWS_REGION)
+    s3_client = shared_s3_client()
     url_expiry = 300 # URL is valid for 5 minutes
 
     try:
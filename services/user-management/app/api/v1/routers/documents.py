@@ -1,12 +1,13 @@
 import boto3
 from botocore.exceptions import ClientError
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 import uuid
-from typing import List
+from typing import Optional
 
 from app.api.v1 import deps
 from app.core.config import settings
+from app.core.principal_cache import UserSnapshot
 from app.db import models
 from app.crud import crud_document 
 from app.api.v1.schemas import documents as docs_schema
@@ -69,12 +70,17 @@ def confirm_upload(
     crud_document.update_document_status(db=db, doc=doc, status=models.DocumentStatus.UPLOAD_COMPLETE)
     return {"message": "Upload confirmed successfully."}
 
-@router.get("/documents", response_model=List[docs_schema.DocumentRead])
+@router.get("/documents", response_model=docs_schema.DocumentPage)
 def get_my_documents(
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: UserSnapshot = Depends(deps.get_current_principal),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
 ):
     """
-    Get a list of all documents for the currently logged-in patient.
+    Get the currently logged-in patient's documents, newest first, one page at a time.
     """
-    return crud_document.get_documents_for_patient(db=db, patient_id=current_user.id)
\ No newline at end of file
+    try:
+        return crud_document.get_documents_for_patient(db=db, patient_id=current_user.id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
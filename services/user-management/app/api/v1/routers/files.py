@@ -1,11 +1,10 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends, Header
-from jose import jwt, JWTError
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from jose import jwt
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 import uuid
 import os
-import shutil
-from datetime import datetime
 from enum import Enum
 from typing import Optional
 from pydantic import BaseModel
@@ -13,7 +12,10 @@ import boto3
 from botocore.exceptions import ClientError
 import io
 
+from app.core.config import settings
 from app.integrations.s3_client import s3_client
+from app.integrations.s3_uploads import MultipartStream, user_prefix
+from app.utils.file_compressor import IMAGE_EXTENSIONS, file_compressor
 from app.api.v1 import deps
 from app.db.models.user import User
 from app.crud import crud_user
@@ -40,141 +42,158 @@ class FileUploadResponse(BaseModel):
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "/app/uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+def _find_upload_user(db: Session, user_id: Optional[str], authorization: Optional[str]):
+    """The user named by the user_id field, else the bearer token's user, else None"""
+    if user_id:
+        try:
+            return crud_user.get_user_by_id(db, uuid.UUID(user_id))
+        except ValueError as e:
+            print(f"Invalid user_id format: {e}")
+    if authorization:
+        try:
+            scheme, token = authorization.split()
+            if scheme.lower() == 'bearer':
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                email = payload.get("sub")
+                if email:
+                    return crud_user.get_user_by_email(db, email=email)
+        except Exception as jwt_error:
+            print(f"Failed to extract user from JWT: {str(jwt_error)}")
+    return None
+
+
+class _LocalUpload:
+    """Local-storage counterpart of StreamingUpload, used when S3 is not configured"""
+
+    ready = False
+
+    def __init__(self, key: str):
+        self.key = key
+        self.size = 0
+        self.path = os.path.join(UPLOAD_DIR, key.replace("users/", "", 1))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "wb")
+
+    def write(self, data: bytes):
+        self._file.write(data)
+        self.size += len(data)
+
+    def flush(self):
+        pass
+
+    def complete(self, transform=None):
+        self._file.close()
+        return self.key
+
+    def abort(self):
+        self._file.close()
+        os.remove(self.path)
+
+
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
-    file: UploadFile = File(...),
-    file_type: str = Form("other"),
-    user_id: Optional[str] = Form(None),
+    request: Request,
     db: Session = Depends(deps.get_public_db),
     authorization: Optional[str] = Header(None)
 ):
     """
-    Upload a file to S3 or local storage.
-    If user_id is provided or user is authenticated, the file will be stored in a user-specific location.
+    Upload a file (multipart form fields: file, file_type, optional user_id) to S3,
+    or local storage when S3 is not configured.
+    The body is streamed into storage as it arrives (see app/integrations/s3_uploads.py).
+    Files of a known user go under users/<user id>/ in the main bucket.
     """
     try:
-        # Generate unique identifiers
-        file_id = str(uuid.uuid4())
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{file_id}_{timestamp}_{file.filename}"
-        
-        # First save locally as a fallback
-        type_dir = os.path.join(UPLOAD_DIR, file_type)
-        os.makedirs(type_dir, exist_ok=True)
-        file_path = os.path.join(type_dir, filename)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Generate local URL
-        local_url = f"/api/v1/files/{file_type}/{filename}"
-        
-        # Try to upload to S3
-        s3_url = None
-        target_user = None
-        
-        # Get user from JWT token or user_id parameter
-        target_user = None
-        print(f"File upload - user_id parameter: {user_id}")
-        print(f"File upload - authorization header: {'Present' if authorization else 'None'}")
-        
-        # Try to get user from JWT token first
-        if authorization and not user_id:
-            try:
-                from jose import jwt
-                from app.core.config import settings
-                
-                scheme, token = authorization.split()
-                if scheme.lower() == 'bearer':
-                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-                    email = payload.get("sub")
-                    if email:
-                        target_user = crud_user.get_user_by_email(db, email=email)
-                        if target_user:
-                            print(f"Found user from JWT token: {target_user.email}")
-            except Exception as jwt_error:
-                print(f"Failed to extract user from JWT: {str(jwt_error)}")
-        
-        # Fallback to user_id parameter
-        if not target_user and user_id:
-            try:
-                user_uuid = uuid.UUID(user_id)
-                target_user = crud_user.get_user_by_id(db, user_uuid)
-                print(f"Found target user by ID: {target_user.email if target_user else 'None'}")
-            except ValueError as e:
-                print(f"Invalid user_id format: {e}")
-        
-        if not target_user:
-            print("No user found for file upload - saving without user association")
-        
-        # If we have AWS credentials configured, upload to S3
-        if os.environ.get('AWS_ACCESS_KEY_ID') and os.environ.get('AWS_SECRET_ACCESS_KEY'):
-            try:
-                # If we have a user, create/use their bucket
-                if target_user:
-                    user_name = f"{target_user.personal_info.get('first_name', '')}-{target_user.personal_info.get('last_name', '')}"
-                    if not user_name.strip('-'):
-                        user_name = target_user.email.split('@')[0]
-                    
-                    # Use existing bucket if available, otherwise create a new one
-                    user_bucket = target_user.s3_bucket_name or s3_client.create_user_bucket(str(target_user.id), user_name)
-                    
-                    # Save bucket name to user if not already saved
-                    if not target_user.s3_bucket_name:
-                        # Update user with bucket name
-                        crud_user.update_user(
-                            db=db,
-                            user=target_user,
-                            updates={"s3_bucket_name": user_bucket}
-                        )
-                    
-                    # Reset file pointer to beginning
-                    file.file.seek(0)
-                    
-                    # Upload to S3
-                    s3_url = s3_client.upload_file_object(
-                        file.file, 
-                        user_bucket, 
-                        file_type, 
-                        file.filename
-                    )
-                    
-                    # If this is a profile photo, update the user's profile
-                    if file_type == "profile_photo":
-                        crud_user.update_user_profile_photo(
-                            db=db,
-                            user=target_user,
-                            photo_url=s3_url,
-                            s3_bucket=user_bucket
-                        )
-                        print(f"Updated user profile photo: {s3_url}")
-                else:
-                    # Use default bucket if no user
-                    file.file.seek(0)
-                    s3_url = s3_client.upload_file_object(
-                        file.file, 
-                        s3_client.bucket_name, 
-                        file_type, 
-                        file.filename
-                    )
-            except Exception as s3_error:
-                # Log the error but continue with local storage
-                print(f"S3 upload failed: {str(s3_error)}")
-        
-        return FileUploadResponse(
-            file_id=file_id,
-            file_url=local_url,
-            file_type=file_type,
-            content_type=file.content_type,
-            size=os.path.getsize(file_path),
-            s3_url=s3_url
-        )
+        form = MultipartStream(request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    file_id = str(uuid.uuid4())
+    owner = {}
+
+    def resolve_user():
+        if "user" not in owner:
+            owner["user"] = _find_upload_user(db, form.fields.get("user_id"), authorization)
+            if not owner["user"]:
+                print("No user found for file upload - saving without user association")
+        return owner["user"]
+
+    def object_key():
+        file_type = form.fields.get("file_type", FileType.OTHER.value)
+        if file_type not in FileType._value2member_map_:
+            raise ValueError(f"Unknown file_type '{file_type}'")
+        user = resolve_user()
+        prefix = user_prefix(user.id) if user else ""
+        if prefix and s3_client.s3_enabled:
+            s3_client.ensure_prefix(prefix)
+        return f"{prefix}{file_type}/{file_id}-{os.path.basename(form.filename) or 'upload'}"
+
+    def open_upload():
+        if s3_client.s3_enabled:
+            return s3_client.streaming_upload(object_key, content_type=form.file_content_type)
+        return _LocalUpload(object_key())
+
+    def compress(body: bytes) -> bytes:
+        # Same per-type compression as before; images are left to the worker in deferred mode
+        if is_image and s3_client._defer_image_compression():
+            return body
+        compressed = file_compressor.compress_file_by_type(io.BytesIO(body), form.filename).getvalue()
+        if compressed != body:
+            upload.content_type = "image/jpeg" if is_image else None
+        return compressed
+
+    upload = None
+    try:
+        async for chunk in request.stream():
+            data = form.feed(chunk)
+            if upload is None and form.file_started:
+                upload = await run_in_threadpool(open_upload)
+            for piece in data:
+                upload.write(piece)
+            if upload is not None and upload.ready:
+                # Blocking S3 call: keep it off the event loop
+                await run_in_threadpool(upload.flush)
+        form.finish()
+
+        is_image = form.filename.lower().split('.')[-1] in IMAGE_EXTENSIONS
+        streamed = s3_client.s3_enabled and upload.upload_id is not None
+        key = await run_in_threadpool(upload.complete, compress if s3_client.s3_enabled else None)
+        if s3_client.s3_enabled and is_image and (streamed or s3_client._defer_image_compression()):
+            # Too large to compress in the request, or deferred by configuration
+            s3_client._schedule_compression(key)
+    except ValueError as e:
+        if upload is not None:
+            await run_in_threadpool(upload.abort)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
+        if upload is not None:
+            await run_in_threadpool(upload.abort)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
 
+    file_type = form.fields.get("file_type", FileType.OTHER.value)
+    file_url = f"/files/public/{key}"
+    s3_url = file_url if s3_client.s3_enabled else None
+    target_user = resolve_user()
+    if s3_url and target_user and file_type == FileType.PROFILE_PHOTO.value:
+        crud_user.update_user_profile_photo(
+            db=db,
+            user=target_user,
+            photo_url=s3_url,
+            s3_bucket=f"{s3_client.bucket_name}/{user_prefix(target_user.id)}"
+        )
+        print(f"Updated user profile photo: {s3_url}")
+
+    return FileUploadResponse(
+        file_id=file_id,
+        file_url=file_url,
+        file_type=file_type,
+        content_type=form.file_content_type or "application/octet-stream",
+        size=upload.size,
+        s3_url=s3_url
+    )
+
 @router.get("/secure/{file_path:path}")
 async def get_secure_file(
     file_path: str,
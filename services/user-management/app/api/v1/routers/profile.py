@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Any, Optional
 from pydantic import BaseModel
@@ -10,6 +11,10 @@ from app.db import models
 from app.db.models import User
 from app.integrations.s3_client import s3_client
 from app.crud import crud_patient
+from app.core.principal_cache import UserSnapshot
+from app.services.profile_assembler import (
+    ProfileSnapshot, profile_assembler, render_profile, render_profile_tabs
+)
 
 router = APIRouter(prefix="/profile", tags=["User Profile"])
 
@@ -63,143 +68,20 @@ class ProfileResponse(BaseModel):
     message: str
     updated_fields: list[str]
 
+def get_profile_snapshot(db: Session, principal: UserSnapshot) -> ProfileSnapshot:
+    """The profile shared by the read endpoints, loaded in one query and cached per user."""
+    profile = profile_assembler.get(db, principal)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return profile
+
 @router.get("/me")
 def get_my_profile(
-    current_user: User = Depends(deps.get_current_user_from_db),
+    principal: UserSnapshot = Depends(deps.get_current_principal),
     db: Session = Depends(deps.get_public_db)
 ) -> Any:
     """Get the current user's profile information"""
-    # Get patient profile with insurance information
-    patient_info = {}
-    insurance_info = []
-    
-    # Get phone number from patient record if available
-    primary_phone = None
-    
-    if current_user.patient_profile:
-        # Get patient data
-        patient = db.query(models.Patient).filter(models.Patient.user_id == current_user.id).first()
-        if patient:
-            primary_phone = patient.primary_phone
-            patient_info.update({
-                "primary_phone": patient.primary_phone,
-                "alternate_phone": patient.alternate_phone,
-                "blood_group": patient.blood_group,
-                "aadhaar_id": patient.aadhaar_id,
-                "aadhaar_verified": patient.aadhaar_verified
-            })
-            
-            # Get insurance information
-            insurances = db.query(models.PatientInsurance).filter(
-                models.PatientInsurance.patient_id == current_user.id
-            ).all()
-            
-            for insurance in insurances:
-                insurance_info.append({
-                    "id": str(insurance.id),
-                    "provider_name": insurance.provider_name,
-                    "policy_number": insurance.policy_number,
-                    "scheme_name": insurance.scheme_name,
-                    "insurance_category": insurance.insurance_category,
-                    "group_number": insurance.group_number,
-                    "plan_type": insurance.plan_type,
-                    "effective_date": insurance.effective_date,
-                    "expiration_date": insurance.expiration_date,
-                    "copay_amount": insurance.copay_amount,
-                    "deductible_amount": insurance.deductible_amount,
-                    "policy_holder_name": insurance.policy_holder_name,
-                    "relationship_to_policy_holder": insurance.relationship_to_policy_holder,
-                    "is_active": insurance.is_active,
-                    "document_url": getattr(insurance, 'document_url', None)
-                })
-    
-    # Organize data into tabs similar to registration page
-    personal_info_dict = current_user.personal_info if current_user.personal_info else {}
-    patient_info_dict = {k: v for k, v in patient_info.items() if k not in ["primary_phone", "insurance_info"]}
-    
-    # Generate presigned URL for profile photo if it exists
-    profile_photo_url = current_user.profile_photo_url
-    if profile_photo_url:
-        try:
-            # Clean up the S3 key - remove /files/public/ prefix if present
-            s3_key = profile_photo_url
-            if s3_key.startswith('/files/public/'):
-                s3_key = s3_key.replace('/files/public/', '')
-            
-            # Generate presigned URL if it's not already a full URL
-            if not s3_key.startswith(('http://', 'https://')):
-                profile_photo_url = s3_client.generate_presigned_url(s3_key, expiration=3600)
-        except Exception as e:
-            print(f"Error generating presigned URL in /me endpoint: {str(e)}")
-    
-    return {
-        "title": "My Profile",
-        "id": str(current_user.id),
-        "email": current_user.email,
-        "primary_phone": patient_info.get("primary_phone"),
-        "profile_photo_url": profile_photo_url,
-        "organization_id": str(current_user.organization_id) if current_user.organization_id else None,
-        "mfa_enabled": current_user.mfa_enabled,
-        "roles": [role.name for role in current_user.roles],
-        
-        "tabs": [
-            {
-                "id": "personal",
-                "title": "Personal Information",
-                "fields": {
-                    "first_name": personal_info_dict.get("first_name", ""),
-                    "last_name": personal_info_dict.get("last_name", ""),
-                    "display_name": personal_info_dict.get("display_name", ""),
-                    "date_of_birth": personal_info_dict.get("date_of_birth", ""),
-                    "gender": personal_info_dict.get("gender", ""),
-                    "blood_group": personal_info_dict.get("blood_group", patient_info_dict.get("blood_group", "")),
-                    "emergency_contact": personal_info_dict.get("emergency_contact", ""),
-                    "aadhar_id": personal_info_dict.get("aadhar_id", patient_info_dict.get("aadhaar_id", ""))
-                }
-            },
-            {
-                "id": "address",
-                "title": "Address Information",
-                "fields": {
-                    "street": personal_info_dict.get("address", {}).get("street", ""),
-                    "city": personal_info_dict.get("address", {}).get("city", ""),
-                    "state": personal_info_dict.get("address", {}).get("state", ""),
-                    "zip_code": personal_info_dict.get("address", {}).get("zip_code", ""),
-                    "country": personal_info_dict.get("address", {}).get("country", ""),
-                    "address_type": personal_info_dict.get("address", {}).get("address_type", "")
-                }
-            },
-            {
-                "id": "account",
-                "title": "Account Settings",
-                "fields": {
-                    "email": current_user.email,
-                    "phone": primary_phone,
-                    "enable_mfa": current_user.mfa_enabled
-                }
-            },
-            {
-                "id": "insurance",
-                "title": "Insurance Information",
-                "fields": {
-                    "has_insurance": len(insurance_info) > 0,
-                    "insurance": insurance_info
-                }
-            }
-        ],
-        
-        # For backward compatibility
-        "personal_info": {**personal_info_dict, **patient_info_dict},
-        "address": current_user.personal_info.get("address", {}) if current_user.personal_info else {},
-        "account_settings": {
-            "mfa_enabled": current_user.mfa_enabled,
-            "email": current_user.email,
-            "primary_phone": patient_info.get("primary_phone")
-        },
-        "insurance_info": insurance_info,
-        "has_insurance": len(insurance_info) > 0,
-        "profile_data": current_user.profile_data
-    }
+    return render_profile(get_profile_snapshot(db, principal))
 
 @router.put("/me", response_model=ProfileResponse)
 def update_my_profile(
@@ -389,6 +271,7 @@ def update_my_profile(
                 updated_fields.append(f"insurance.{insurance.policy_number}.deactivated")
         
         db.commit()
+        profile_assembler.invalidate(current_user.email)
     
     return {
         "message": "Profile updated successfully",
@@ -447,8 +330,9 @@ async def update_profile_photo(
                 # Reset file pointer
                 file.file.seek(0)
                 
-                # Upload to S3
-                s3_url = s3_client.upload_file_object(
+                # Upload to S3; compressing and uploading block, so keep them off the event loop
+                s3_url = await run_in_threadpool(
+                    s3_client.upload_file_object,
                     file.file, 
                     user_bucket, 
                     "profile_photo", 
@@ -576,205 +460,19 @@ def update_profile_photo_base64(
 
 @router.get("/me/tabs")
 def get_profile_tabs(
-    current_user: User = Depends(deps.get_current_user_from_db),
+    principal: UserSnapshot = Depends(deps.get_current_principal),
     db: Session = Depends(deps.get_public_db)
 ) -> Any:
     """Get the profile tabs structure similar to registration page"""
-    # Get patient profile with insurance information
-    patient_info = {}
-    insurance_info = []
-    
-    # Get phone number
-    primary_phone = None
-    
-    if current_user.patient_profile:
-        # Get patient data
-        patient = db.query(models.Patient).filter(models.Patient.user_id == current_user.id).first()
-        if patient:
-            primary_phone = patient.primary_phone
-            patient_info = {
-                "blood_group": patient.blood_group,
-                "aadhaar_id": patient.aadhaar_id,
-                "aadhaar_verified": patient.aadhaar_verified
-            }
-            
-            # Get insurance information
-            insurances = db.query(models.PatientInsurance).filter(
-                models.PatientInsurance.patient_id == current_user.id
-            ).all()
-            
-            for insurance in insurances:
-                if insurance.is_active:
-                    insurance_info.append({
-                        "id": str(insurance.id),
-                        "provider_name": insurance.provider_name,
-                        "policy_number": insurance.policy_number,
-                        "scheme_name": insurance.scheme_name,
-                        "insurance_category": insurance.insurance_category,
-                        "group_number": insurance.group_number,
-                        "plan_type": insurance.plan_type,
-                        "effective_date": insurance.effective_date,
-                        "expiration_date": insurance.expiration_date,
-                        "copay_amount": insurance.copay_amount,
-                        "deductible_amount": insurance.deductible_amount,
-                        "policy_holder_name": insurance.policy_holder_name,
-                        "relationship_to_policy_holder": insurance.relationship_to_policy_holder
-                    })
-    
-    # Extract personal info
-    personal_info = current_user.personal_info or {}
-    address = personal_info.get("address", {})
-    
-    return {
-        "title": "My Profile",
-        "tabs": [
-            {
-                "id": "personal",
-                "title": "Personal Information",
-                "fields": {
-                    "first_name": personal_info.get("first_name", ""),
-                    "last_name": personal_info.get("last_name", ""),
-                    "display_name": personal_info.get("display_name", ""),
-                    "date_of_birth": personal_info.get("date_of_birth", ""),
-                    "gender": personal_info.get("gender", ""),
-                    "blood_group": personal_info.get("blood_group", patient_info.get("blood_group", "")),
-                    "emergency_contact": personal_info.get("emergency_contact", ""),
-                    "aadhar_id": personal_info.get("aadhar_id", patient_info.get("aadhaar_id", ""))
-                }
-            },
-            {
-                "id": "address",
-                "title": "Address Information",
-                "fields": {
-                    "street": address.get("street", ""),
-                    "city": address.get("city", ""),
-                    "state": address.get("state", ""),
-                    "zip_code": address.get("zip_code", ""),
-                    "country": address.get("country", ""),
-                    "address_type": address.get("address_type", "")
-                }
-            },
-            {
-                "id": "account",
-                "title": "Account Settings",
-                "fields": {
-                    "email": current_user.email,
-                    "phone": primary_phone,
-                    "enable_mfa": current_user.mfa_enabled
-                }
-            },
-            {
-                "id": "insurance",
-                "title": "Insurance Information",
-                "fields": {
-                    "has_insurance": len(insurance_info) > 0,
-                    "insurance": insurance_info
-                }
-            }
-        ],
-        "profile_photo_url": current_user.profile_photo_url
-    }
+    return render_profile_tabs(get_profile_snapshot(db, principal))
+
 @router.get("/me/profile-tabs")
 def get_profile_tabs_v2(
-    current_user: User = Depends(deps.get_current_user_from_db),
+    principal: UserSnapshot = Depends(deps.get_current_principal),
     db: Session = Depends(deps.get_public_db)
 ) -> Any:
     """Get the profile tabs structure for the frontend"""
-    # Get patient profile with insurance information
-    patient_info = {}
-    insurance_info = []
-    
-    # Get phone number
-    primary_phone = None
-    
-    if current_user.patient_profile:
-        # Get patient data
-        patient = db.query(models.Patient).filter(models.Patient.user_id == current_user.id).first()
-        if patient:
-            primary_phone = patient.primary_phone
-            patient_info = {
-                "blood_group": patient.blood_group,
-                "aadhaar_id": patient.aadhaar_id,
-                "aadhaar_verified": patient.aadhaar_verified
-            }
-            
-            # Get insurance information
-            insurances = db.query(models.PatientInsurance).filter(
-                models.PatientInsurance.patient_id == current_user.id
-            ).all()
-            
-            for insurance in insurances:
-                if insurance.is_active:
-                    insurance_info.append({
-                        "id": str(insurance.id),
-                        "provider_name": insurance.provider_name,
-                        "policy_number": insurance.policy_number,
-                        "scheme_name": insurance.scheme_name,
-                        "insurance_category": insurance.insurance_category,
-                        "group_number": insurance.group_number,
-                        "plan_type": insurance.plan_type,
-                        "effective_date": insurance.effective_date,
-                        "expiration_date": insurance.expiration_date,
-                        "copay_amount": insurance.copay_amount,
-                        "deductible_amount": insurance.deductible_amount,
-                        "policy_holder_name": insurance.policy_holder_name,
-                        "relationship_to_policy_holder": insurance.relationship_to_policy_holder
-                    })
-    
-    # Extract personal info
-    personal_info = current_user.personal_info or {}
-    address = personal_info.get("address", {})
-    
-    # Create a response with exactly 4 tabs and "My Profile" title
-    return {
-        "title": "My Profile",
-        "tabs": [
-            {
-                "id": "personal",
-                "title": "Personal Information",
-                "fields": {
-                    "first_name": personal_info.get("first_name", ""),
-                    "last_name": personal_info.get("last_name", ""),
-                    "display_name": personal_info.get("display_name", ""),
-                    "date_of_birth": personal_info.get("date_of_birth", ""),
-                    "gender": personal_info.get("gender", ""),
-                    "blood_group": personal_info.get("blood_group", patient_info.get("blood_group", "")),
-                    "emergency_contact": personal_info.get("emergency_contact", ""),
-                    "aadhar_id": personal_info.get("aadhar_id", patient_info.get("aadhaar_id", ""))
-                }
-            },
-            {
-                "id": "address",
-                "title": "Address Information",
-                "fields": {
-                    "street": address.get("street", ""),
-                    "city": address.get("city", ""),
-                    "state": address.get("state", ""),
-                    "zip_code": address.get("zip_code", ""),
-                    "country": address.get("country", ""),
-                    "address_type": address.get("address_type", "")
-                }
-            },
-            {
-                "id": "account",
-                "title": "Account Settings",
-                "fields": {
-                    "email": current_user.email,
-                    "phone": primary_phone,
-                    "enable_mfa": current_user.mfa_enabled
-                }
-            },
-            {
-                "id": "insurance",
-                "title": "Insurance Information",
-                "fields": {
-                    "has_insurance": len(insurance_info) > 0,
-                    "insurance": insurance_info
-                }
-            }
-        ],
-        "profile_photo_url": current_user.profile_photo_url
-    }
+    return render_profile_tabs(get_profile_snapshot(db, principal))
 
 @router.get("/me/photo-url")
 def get_profile_photo_url(
@@ -826,8 +524,9 @@ async def upload_insurance_document(
             db.add(current_user)
             db.flush()
         
-        # Upload document to S3
-        document_url = s3_client.upload_file_object(
+        # Upload document to S3; compressing and uploading block, so keep them off the event loop
+        document_url = await run_in_threadpool(
+            s3_client.upload_file_object,
             file.file,
             user_bucket,
             "insurance_documents",
@@ -844,6 +543,7 @@ async def upload_insurance_document(
             insurance.document_url = document_url
             db.add(insurance)
             db.commit()
+            profile_assembler.invalidate(current_user.email)
             print(f"Updated insurance {policy_number} with document URL: {document_url}")
         else:
             print(f"Insurance record not found for policy number: {policy_number}")
@@ -857,6 +557,7 @@ async def upload_insurance_document(
                 )
                 db.add(new_insurance)
                 db.commit()
+                profile_assembler.invalidate(current_user.email)
                 print(f"Created new insurance record with policy number: {policy_number}")
             except Exception as create_error:
                 print(f"Failed to create insurance record: {str(create_error)}")
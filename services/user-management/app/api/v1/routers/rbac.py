@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.db import models
 import uuid
 
 from app.api.v1 import deps
 from app.crud import crud_rbac
+from app.core.principal_cache import UserSnapshot
 from app.api.v1.schemas import rbac as rbac_schema
 
 # Use the powerful permission dependency we created
@@ -21,7 +21,7 @@ def list_all_permissions(db: Session = Depends(deps.get_public_db)):
 @router.get("/roles", response_model=List[rbac_schema.RoleRead])
 def get_organization_roles(
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user) # Using get_current_user to get org_id
+    current_user: UserSnapshot = Depends(deps.get_current_principal)
 ):
     """List all roles for the current user's organization."""
     return crud_rbac.get_roles_by_organization(db, org_id=current_user.organization_id)
@@ -30,7 +30,7 @@ def get_organization_roles(
 def create_role(
     role_in: rbac_schema.RoleCreate,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user) # Placeholder for proper permission check
+    current_user: UserSnapshot = Depends(deps.get_current_principal) # Placeholder for proper permission check
 ):
     """Create a new custom role within the admin's organization."""
     if crud_rbac.get_role_by_name(db, name=role_in.name, org_id=current_user.organization_id):
@@ -42,7 +42,7 @@ def update_role(
     role_id: uuid.UUID,
     role_in: rbac_schema.RoleUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: UserSnapshot = Depends(deps.get_current_principal)
 ):
     """Update a role's name, description, and permissions."""
     role = crud_rbac.get_role_by_id(db, role_id=role_id, org_id=current_user.organization_id)
@@ -57,7 +57,7 @@ def update_role(
 def delete_role(
     role_id: uuid.UUID,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user) # Add appropriate permission check
+    current_user: UserSnapshot = Depends(deps.get_current_principal) # Add appropriate permission check
 ):
     """
     Delete a custom role within the organization.
@@ -20,7 +20,7 @@ router = APIRouter()
 
 @router.get("/users/me", response_model=user_schema.UserRead)
 def read_current_user(
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: models.User = Depends(deps.get_current_user_from_db)
 ) -> Any:
     """
     Get current user's profile.
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, ConfigDict
 import uuid
 from datetime import datetime
+from typing import List, Optional
+
+from app.db.models.document import DocumentCategory, DocumentStatus
 
 # --- Schemas ---
 class GenerateUploadURLRequest(BaseModel):
@@ -20,5 +23,20 @@ class DocumentRead(BaseModel):
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class DocumentListItem(BaseModel):
+    id: uuid.UUID
+    file_name: str
+    content_type: str
+    document_category: DocumentCategory
+    status: DocumentStatus
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+class DocumentPage(BaseModel):
+    items: List[DocumentListItem]
+    # Pass as ?cursor= for the next page; null on the last page
+    next_cursor: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
 class MessageResponse(BaseModel):
     message: str
@@ -12,5 +12,13 @@ celery_app = Celery(
     "worker",
     broker=broker_url,
     backend=result_backend,
-    include=["app.tasks.email_tasks"]
-)
\ No newline at end of file
+    include=["app.tasks.email_tasks", "app.tasks.token_tasks", "app.tasks.image_tasks"]
+)
+
+# Periodic tasks, run by `celery -A app.core.celery_app beat`
+celery_app.conf.beat_schedule = {
+    "purge-expired-tokens": {
+        "task": "app.tasks.token_tasks.purge_expired_tokens",
+        "schedule": 3600.0,
+    },
+}
\ No newline at end of file
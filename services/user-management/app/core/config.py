@@ -49,6 +49,59 @@ class Settings(BaseSettings):
     # MFA Settings
     MFA_ISSUER_NAME: str = "eHealthPlatform"
 
+    # Tenant routing: "search_path" or "translate" (see app/db/tenancy.py)
+    TENANT_ROUTING_MODE: str = "search_path"
+
+    # Principal cache (see app/core/principal_cache.py)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_REDIS_URL: str | None = None
+
+    # Password hashing (see app/core/credentials.py)
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_WORKERS: int = 4
+    BCRYPT_QUEUE_SIZE: int = 64
+    BCRYPT_QUEUE_TIMEOUT_SECONDS: float = 0.5
+
+    # Refresh token store (see app/core/token_store.py)
+    TOKEN_STORE_REDIS_URL: str | None = None
+    REVOKED_TOKEN_BLOOM_CAPACITY: int = 1_000_000
+    REVOKED_TOKEN_BLOOM_ERROR_RATE: float = 0.001
+    REVOKED_TOKEN_BLOOM_REBUILD_SECONDS: int = 300
+    TOKEN_PURGE_BATCH_SIZE: int = 10000
+
+    # Profile snapshots (see app/services/profile_assembler.py); keep the TTL
+    # well below the photo URL expiry, which is generated once per snapshot
+    PROFILE_CACHE_SIZE: int = 10000
+    PROFILE_CACHE_TTL_SECONDS: int = 300
+    PROFILE_PHOTO_URL_EXPIRE_SECONDS: int = 3600
+
+    # Image uploads (see app/utils/image_pipeline.py): "inline" compresses
+    # before storing, "deferred" stores the original and compresses it in a
+    # Celery task. IMAGE_COMPRESSION_WORKERS = 0 compresses in process.
+    IMAGE_COMPRESSION_MODE: str = "inline"
+    IMAGE_COMPRESSION_WORKERS: int = 2
+    IMAGE_COMPRESSION_TIMEOUT_SECONDS: float = 30
+
+    # Streamed uploads (see app/integrations/s3_uploads.py): S3 part size for
+    # multipart uploads (at least 5 MB) and how many bucket/prefix pairs each
+    # process remembers as existing
+    S3_UPLOAD_PART_SIZE_MB: int = 8
+    S3_PREFIX_CACHE_SIZE: int = 4096
+    # Connections per shared S3 client (see shared_s3_client in app/integrations/s3_client.py)
+    S3_MAX_POOL_CONNECTIONS: int = 50
+
+    # Consent decisions (see app/core/consent_cache.py); the TTL bounds how long
+    # a worker without the Redis channel can miss a revocation
+    CONSENT_CACHE_SIZE: int = 10000
+    CONSENT_CACHE_TTL_SECONDS: int = 60
+    CONSENT_CACHE_REDIS_URL: str | None = None
+
+    # Data sharing logs (see app/services/access_log_writer.py)
+    ACCESS_LOG_BATCH_SIZE: int = 500
+    ACCESS_LOG_FLUSH_SECONDS: float = 1.0
+    ACCESS_LOG_QUEUE_SIZE: int = 10000
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8')
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+In-process cache of consent decisions for cross-user data access.
+
+Every document a doctor or family member opened used to look the patient's
+consent up again. The cache keeps the decision per (grantee, patient, data
+category): the id of the active consent, until that consent expires, or
+"no consent". No entry is kept longer than the TTL, which bounds how long
+another worker can act on a decision made stale by a write it did not see.
+
+Entries for a (grantee, patient) pair are dropped when a consent between
+them is created or revoked (crud_consent). Every invalidation also bumps the
+pair's generation, and decide() only stores a lookup's result if the
+generation it read before the lookup is still current, so a decision read
+just before a revoke cannot be cached after it. With CONSENT_CACHE_REDIS_URL set,
+those invalidations are also published on a Redis channel and applied by
+every other worker process.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "user-management:consent-invalidations"
+
+
+class ConsentDecision(NamedTuple):
+    consent_id: Optional[uuid.UUID]
+    expires_at: Optional[datetime]  # naive UTC, like ConsentRecord.expires_at
+
+    @property
+    def granted(self) -> bool:
+        return self.consent_id is not None
+
+
+DENIED = ConsentDecision(None, None)
+
+
+class ConsentCache:
+    """Bounded LRU of (grantee, patient) pairs, each holding decisions per data category. Thread safe."""
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 60, redis_url: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, tuple[float, ConsentDecision]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Generations of recently invalidated pairs; _epoch moves on clear() and
+        # whenever one is evicted, which invalidates every in-flight lookup
+        self._generations: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._epoch = 0
+        self._redis = None
+        self._listener: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, grantee_id: uuid.UUID, patient_id: uuid.UUID, scope: str) -> Optional[ConsentDecision]:
+        """The cached decision, or None when missing or expired."""
+        pair = (str(grantee_id), str(patient_id))
+        now = time.monotonic()
+        with self._lock:
+            scopes = self._entries.get(pair)
+            entry = scopes.get(scope) if scopes else None
+            if entry is not None:
+                expires_at, decision = entry
+                if expires_at > now:
+                    self._entries.move_to_end(pair)
+                    self.hits += 1
+                    return decision
+                del scopes[scope]
+            self.misses += 1
+            return None
+
+    def generation(self, grantee_id: uuid.UUID, patient_id: uuid.UUID) -> Tuple[int, int]:
+        """Token for a pair that changes whenever the pair is invalidated."""
+        pair = (str(grantee_id), str(patient_id))
+        with self._lock:
+            return self._epoch, self._generations.get(pair, 0)
+
+    def put(
+        self,
+        grantee_id: uuid.UUID,
+        patient_id: uuid.UUID,
+        scope: str,
+        decision: ConsentDecision,
+        generation: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Cache a decision; skipped when generation is given and the pair was invalidated since."""
+        ttl = self.ttl_seconds
+        if decision.expires_at is not None:
+            ttl = min(ttl, (decision.expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+        pair = (str(grantee_id), str(patient_id))
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(pair, 0)):
+                return
+            self._entries.setdefault(pair, {})[scope] = (time.monotonic() + ttl, decision)
+            self._entries.move_to_end(pair)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def decide(
+        self,
+        grantee_id: uuid.UUID,
+        patient_id: uuid.UUID,
+        scope: str,
+        lookup: Callable[[], ConsentDecision]
+    ) -> ConsentDecision:
+        """The cached decision, else lookup()'s, which is cached unless the pair was invalidated meanwhile."""
+        decision = self.get(grantee_id, patient_id, scope)
+        if decision is None:
+            generation = self.generation(grantee_id, patient_id)
+            decision = lookup()
+            self.put(grantee_id, patient_id, scope, decision, generation)
+        return decision
+
+    def invalidate(self, grantee_id: uuid.UUID, patient_id: uuid.UUID) -> None:
+        """Drop a pair's decisions after one of its consents changed, here and in every other worker."""
+        self._drop(str(grantee_id), str(patient_id))
+        self._publish({"grantee_id": str(grantee_id), "patient_id": str(patient_id)})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def _drop(self, grantee_id: str, patient_id: str) -> None:
+        pair = (grantee_id, patient_id)
+        with self._lock:
+            self._entries.pop(pair, None)
+            self._generations[pair] = self._generations.get(pair, 0) + 1
+            self._generations.move_to_end(pair)
+            while len(self._generations) > self.maxsize:
+                self._generations.popitem(last=False)
+                self._epoch += 1
+
+    def _publish(self, message: dict) -> None:
+        if not self.redis_url:
+            return
+        try:
+            self._connect_redis().publish(INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            # Other workers fall back to the TTL
+            logger.error(f"Error publishing consent invalidation: {e}")
+
+    def _connect_redis(self):
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def start_listener(self) -> None:
+        """Apply invalidations published by other workers, from a daemon thread."""
+        if not self.redis_url or (self._listener is not None and self._listener.is_alive()):
+            return
+        self._listener = threading.Thread(target=self._listen, name="consent-cache-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._connect_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    self._drop(payload["grantee_id"], payload["patient_id"])
+            except Exception as e:
+                # Whatever was published while disconnected is lost; start clean
+                logger.error(f"Consent invalidation listener failed, clearing cache: {e}")
+                self.clear()
+                time.sleep(1)
+
+
+consent_cache = ConsentCache(
+    maxsize=settings.CONSENT_CACHE_SIZE,
+    ttl_seconds=settings.CONSENT_CACHE_TTL_SECONDS,
+    redis_url=settings.CONSENT_CACHE_REDIS_URL
+)
@@ -0,0 +1,70 @@
+"""
+Password verification on a dedicated, bounded bcrypt pool.
+
+bcrypt is deliberately slow and CPU bound. Run inline, a burst of logins
+(a shift change) occupies every request thread and the cores thrash on
+more hashes than they can compute, so every login slows down together.
+Here at most BCRYPT_WORKERS hashes run at once, BCRYPT_QUEUE_SIZE more
+may wait for a worker, and anything beyond that is turned away with a
+ServiceBusyException (503) instead of queueing without bound.
+
+Verification also reports when a hash was made with a different cost
+factor than BCRYPT_ROUNDS, returning a replacement hash so the caller can
+store it: changing the setting migrates users as they log in.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.exceptions import ServiceBusyException
+from app.core.security import pwd_context
+
+T = TypeVar("T")
+
+
+class CredentialVerifier:
+    def __init__(
+        self,
+        context: CryptContext,
+        workers: int = 4,
+        queue_size: int = 64,
+        queue_timeout_seconds: float = 0.5
+    ):
+        self.context = context
+        self.workers = workers
+        self.queue_timeout_seconds = queue_timeout_seconds
+        # bcrypt releases the GIL, so threads hash in parallel
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _run(self, fn: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(timeout=self.queue_timeout_seconds):
+            raise ServiceBusyException(detail="Too many logins in progress, please retry.")
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password. On success, also returns a new hash when the stored
+        one was made with another cost factor (None otherwise).
+        """
+        return self._run(self.context.verify_and_update, password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        return self._run(self.context.hash, password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+credential_verifier = CredentialVerifier(
+    pwd_context,
+    workers=settings.BCRYPT_WORKERS,
+    queue_size=settings.BCRYPT_QUEUE_SIZE,
+    queue_timeout_seconds=settings.BCRYPT_QUEUE_TIMEOUT_SECONDS
+)
@@ -20,4 +20,10 @@ class UserNotFoundException(NotFoundException):
 class ConnectionNotFoundException(NotFoundException):
     """Raised when a family connection is not found in the database."""
     def __init__(self, detail: str = "Connection not found."):
-        super().__init__(detail)
\ No newline at end of file
+        super().__init__(detail)
+
+class ServiceBusyException(DetailException):
+    """Raised when a bounded worker pool is saturated. Answered with 503 and Retry-After."""
+    def __init__(self, detail: str = "Service is busy, please retry.", retry_after: int = 1):
+        super().__init__(detail)
+        self.retry_after = retry_after
\ No newline at end of file
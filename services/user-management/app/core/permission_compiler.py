@@ -0,0 +1,174 @@
+"""
+Compiled permission sets.
+
+Each permission owns a fixed bit position (permissions.bit_index, assigned
+once and never reused) and each role stores the OR of its permissions' bits
+(roles.permission_mask, hex encoded) with a version stamp that moves on every
+recompilation. A user's effective permissions are then the OR of their roles'
+masks, and an authorization check is a single bit test, instead of walking
+roles -> permissions on every login.
+
+Roles are recompiled individually when their permissions change
+(crud_rbac.create_role / update_role). Roles never compiled (mask NULL, e.g.
+right after the migration) are compiled at startup by compile_pending, or on
+first use.
+"""
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.db import models
+
+# Serializes bit assignment across workers (pg_advisory_xact_lock key)
+BIT_ASSIGNMENT_LOCK_KEY = 7303020044
+# An unknown name or bit reloads the catalog at most this often
+REFRESH_INTERVAL_SECONDS = 30
+# Distinct masks (role combinations) whose names are kept
+NAMES_CACHE_SIZE = 4096
+
+
+def encode_mask(mask: int) -> str:
+    return format(mask, "x")
+
+
+def decode_mask(value: Optional[str]) -> int:
+    return int(value, 16) if value else 0
+
+
+def has_permission(mask: int, bit: Optional[int]) -> bool:
+    return bit is not None and (mask >> bit) & 1 == 1
+
+
+class PermissionCatalog(NamedTuple):
+    bits: Dict[str, int]  # name -> bit position
+    names: Tuple[Optional[str], ...]  # bit position -> name
+
+    def names_of(self, mask: int) -> Set[str]:
+        names = set()
+        while mask:
+            lowest = mask & -mask
+            bit = lowest.bit_length() - 1
+            if bit < len(self.names) and self.names[bit] is not None:
+                names.add(self.names[bit])
+            mask ^= lowest
+        return names
+
+    def mask_of(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            if name in self.bits:
+                mask |= 1 << self.bits[name]
+        return mask
+
+
+class PermissionCompiler:
+    """Keeps the permission catalog in memory and compiles role masks."""
+
+    def __init__(self):
+        self._catalog: Optional[PermissionCatalog] = None
+        self._loaded_at = 0.0
+        self._names: Dict[int, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    def catalog(self, db: Session) -> PermissionCatalog:
+        """The cached catalog, loaded (and missing bits assigned) on first use."""
+        catalog = self._catalog
+        if catalog is None:
+            catalog = self.refresh(db)
+        return catalog
+
+    def refresh(self, db: Session) -> PermissionCatalog:
+        """Reload the catalog, e.g. after another worker added a permission."""
+        if db.scalar(select(func.count()).where(models.Permission.bit_index.is_(None))):
+            self.assign_bits(db)
+            db.commit()
+        rows = db.execute(select(models.Permission.name, models.Permission.bit_index)).all()
+        names = [None] * (max((bit for _, bit in rows), default=-1) + 1)
+        for name, bit in rows:
+            names[bit] = name
+        catalog = PermissionCatalog(bits={name: bit for name, bit in rows}, names=tuple(names))
+        with self._lock:
+            self._catalog = catalog
+            self._loaded_at = time.monotonic()
+            self._names = {}
+        return catalog
+
+    def _may_refresh(self) -> bool:
+        return time.monotonic() - self._loaded_at >= REFRESH_INTERVAL_SECONDS
+
+    def assign_bits(self, db: Session) -> int:
+        """Give every permission without a bit the next free positions. The caller commits."""
+        db.execute(select(func.pg_advisory_xact_lock(BIT_ASSIGNMENT_LOCK_KEY)))
+        unassigned = (
+            db.query(models.Permission)
+            .filter(models.Permission.bit_index.is_(None))
+            .order_by(models.Permission.name)
+            .all()
+        )
+        next_bit = (db.scalar(select(func.max(models.Permission.bit_index))) or -1) + 1
+        for offset, permission in enumerate(unassigned):
+            permission.bit_index = next_bit + offset
+        db.flush()
+        return len(unassigned)
+
+    def bit(self, db: Session, name: str) -> Optional[int]:
+        """Bit of a permission name, or None when no such permission exists."""
+        bit = self.catalog(db).bits.get(name)
+        if bit is None and self._may_refresh():
+            bit = self.refresh(db).bits.get(name)
+        return bit
+
+    def names(self, db: Session, mask: int) -> FrozenSet[str]:
+        """Permission names in a mask, memoized per mask: users share role combinations."""
+        names = self._names.get(mask)
+        if names is None:
+            catalog = self.catalog(db)
+            if mask.bit_length() > len(catalog.names) and self._may_refresh():
+                catalog = self.refresh(db)
+            names = frozenset(catalog.names_of(mask))
+            if len(self._names) >= NAMES_CACHE_SIZE:
+                self._names = {}
+            self._names[mask] = names
+        return names
+
+    def compile_roles(self, db: Session, roles: Iterable[models.Role]) -> None:
+        """Recompute the masks of the given roles only. The caller commits."""
+        roles = list(roles)
+        if any(p.bit_index is None for role in roles for p in role.permissions):
+            self.assign_bits(db)
+            self._catalog = None
+        for role in roles:
+            mask = 0
+            for permission in role.permissions:
+                mask |= 1 << permission.bit_index
+            role.permission_mask = encode_mask(mask)
+            role.permissions_version = (role.permissions_version or 0) + 1
+
+    def compile_pending(self, db: Session) -> int:
+        """Compile every role that has no mask yet."""
+        roles = (
+            db.query(models.Role)
+            .options(selectinload(models.Role.permissions))
+            .filter(models.Role.permission_mask.is_(None))
+            .all()
+        )
+        if roles:
+            self.compile_roles(db, roles)
+            db.commit()
+        return len(roles)
+
+    def mask_of(self, db: Session, roles: Iterable[models.Role]) -> int:
+        """Effective permissions of a user holding these roles."""
+        mask = 0
+        for role in roles:
+            if role.permission_mask is None:
+                self.compile_roles(db, [role])
+                db.commit()
+            mask |= decode_mask(role.permission_mask)
+        return mask
+
+
+permission_compiler = PermissionCompiler()
@@ -0,0 +1,169 @@
+"""
+In-process cache of the users behind access tokens.
+
+Resolving a request's user used to cost a query by email every time. The
+cache keeps a small snapshot per token subject (id, organization, active
+flag and the organization's role version) for a short TTL, so only a miss
+goes to the database.
+
+Entries are dropped when the user is updated, and every entry of an
+organization goes stale when one of its roles changes (the role version
+moves on). With PRINCIPAL_CACHE_REDIS_URL set, invalidations are also
+published on a Redis channel and applied by every other worker process.
+Other per-user caches (e.g. the profile cache) can follow the same
+invalidations through on_invalidate.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "user-management:principal-invalidations"
+
+
+class UserSnapshot(NamedTuple):
+    id: uuid.UUID
+    email: str
+    organization_id: uuid.UUID
+    is_active: bool
+    role_version: int
+
+
+class PrincipalCache:
+    """Bounded LRU of user snapshots with a per-entry TTL. Thread safe."""
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 60, redis_url: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[str, tuple[float, UserSnapshot]]" = OrderedDict()
+        self._role_versions: Dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener: Optional[threading.Thread] = None
+        self._hooks: List[Callable[[Optional[Iterable[str]]], None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def role_version(self, organization_id: uuid.UUID) -> int:
+        return self._role_versions.get(organization_id, 0)
+
+    def get(self, subject: str) -> Optional[UserSnapshot]:
+        """The cached snapshot, or None when missing, expired or behind on roles."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None:
+                expires_at, snapshot = entry
+                if expires_at > now and snapshot.role_version == self.role_version(snapshot.organization_id):
+                    self._entries.move_to_end(subject)
+                    self.hits += 1
+                    return snapshot
+                del self._entries[subject]
+            self.misses += 1
+            return None
+
+    def snapshot(self, user) -> UserSnapshot:
+        """Snapshot of a User row, stamped with its organization's current role version."""
+        return UserSnapshot(
+            id=user.id,
+            email=user.email,
+            organization_id=user.organization_id,
+            is_active=user.is_active,
+            role_version=self.role_version(user.organization_id)
+        )
+
+    def put(self, subject: str, snapshot: UserSnapshot) -> None:
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, *subjects: str) -> None:
+        """Drop users whose row changed, here and in every other worker."""
+        self._drop_users(subjects)
+        self._publish({"users": list(subjects)})
+
+    def invalidate_roles(self, organization_id: uuid.UUID) -> None:
+        """Expire every user of an organization after one of its roles changed."""
+        self._bump_roles(organization_id)
+        self._publish({"organization_id": str(organization_id)})
+
+    def on_invalidate(self, callback: Callable[[Optional[Iterable[str]]], None]) -> None:
+        """Call back with the subjects dropped here or by another worker (None: everything)."""
+        self._hooks.append(callback)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._role_versions.clear()
+        for hook in self._hooks:
+            hook(None)
+
+    def _drop_users(self, subjects) -> None:
+        with self._lock:
+            for subject in subjects:
+                self._entries.pop(subject, None)
+        for hook in self._hooks:
+            hook(subjects)
+
+    def _bump_roles(self, organization_id: uuid.UUID) -> None:
+        with self._lock:
+            self._role_versions[organization_id] = self.role_version(organization_id) + 1
+
+    def _apply(self, message: dict) -> None:
+        if message.get("users"):
+            self._drop_users(message["users"])
+        if message.get("organization_id"):
+            self._bump_roles(uuid.UUID(message["organization_id"]))
+
+    def _publish(self, message: dict) -> None:
+        if not self.redis_url:
+            return
+        try:
+            self._connect_redis().publish(INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            # Other workers fall back to the TTL
+            logger.error(f"Error publishing principal invalidation: {e}")
+
+    def _connect_redis(self):
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def start_listener(self) -> None:
+        """Apply invalidations published by other workers, from a daemon thread."""
+        if not self.redis_url or (self._listener is not None and self._listener.is_alive()):
+            return
+        self._listener = threading.Thread(target=self._listen, name="principal-cache-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._connect_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                for message in pubsub.listen():
+                    self._apply(json.loads(message["data"]))
+            except Exception as e:
+                # Whatever was published while disconnected is lost; start clean
+                logger.error(f"Principal invalidation listener failed, clearing cache: {e}")
+                self.clear()
+                time.sleep(1)
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    redis_url=settings.PRINCIPAL_CACHE_REDIS_URL
+)
@@ -0,0 +1,240 @@
+"""
+Refresh token store.
+
+Refresh tokens are stored and looked up by their sha256 digest (unique index
+on refresh_tokens.token_digest) rather than by the raw token string, so the
+database never holds a usable token and the index stays a fixed 64 chars wide.
+
+Revoked token ids (JTIs) are checked against an in-process Bloom filter first.
+A negative answer is definitive for everything the filter was built from, so
+only the rare positive (a revoked token, or a false positive at
+REVOKED_TOKEN_BLOOM_ERROR_RATE) costs a query. The filter is rebuilt from the
+database every REVOKED_TOKEN_BLOOM_REBUILD_SECONDS in a background thread to
+pick up revocations made by other workers; with TOKEN_STORE_REDIS_URL set
+those are also visible right away through the Redis mirror, which keeps
+`revoked:<jti>` and `refresh:<digest>` keys with a TTL ending when the token
+expires. Either way a revoked token's row is deleted, so it can no longer be
+redeemed even before the filter catches up.
+
+Expired rows are removed in batches by the purge task in
+app/tasks/token_tasks.py.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional
+
+from jose import JWTError, jwt
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import crud_token
+
+logger = logging.getLogger(__name__)
+
+REFRESH_PREFIX = "refresh:"
+REVOKED_PREFIX = "revoked:"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def token_expiry(token: str) -> datetime:
+    """Expiry of a refresh token, from its (already verified) exp claim."""
+    return datetime.fromtimestamp(jwt.get_unverified_claims(token)["exp"], tz=timezone.utc)
+
+
+class RefreshTokenStore:
+    """Issues, checks, rotates and revokes refresh tokens. Thread safe."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        rebuild_seconds: float = 300,
+        redis_url: Optional[str] = None
+    ):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_seconds = rebuild_seconds
+        self.redis_url = redis_url
+        self._bloom: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._rebuilding = False
+        # JTIs revoked here while a rebuild is running, replayed into the new filter
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._redis = None
+        self.bloom_hits = 0
+        self.bloom_misses = 0
+
+    def issue(self, db: Session, *, user_id: uuid.UUID, token: str):
+        """Store a newly created refresh token. Commits."""
+        expires_at = token_expiry(token)
+        record = crud_token.create_refresh_token(db, user_id=user_id, token=token, expires_at=expires_at)
+        self._mirror(REFRESH_PREFIX + record.token_digest, str(user_id), expires_at)
+        return record
+
+    def owner(self, db: Session, token: str) -> Optional[uuid.UUID]:
+        """Id of the user a live refresh token belongs to, or None when unknown or expired."""
+        key = REFRESH_PREFIX + crud_token.token_digest(token)
+        cached = self._redis_call("get", key)
+        if cached is not None:
+            return uuid.UUID(cached.decode())
+        record = crud_token.get_refresh_token(db, token=token)
+        if record is None:
+            return None
+        self._mirror(key, str(record.user_id), record.expires_at.replace(tzinfo=timezone.utc))
+        return record.user_id
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        bloom = self._bloom
+        if bloom is None:
+            bloom = self.rebuild_bloom(db)
+        elif time.monotonic() - self._built_at >= self.rebuild_seconds:
+            self._rebuild_in_background()
+        if jti in bloom:
+            self.bloom_hits += 1
+            return crud_token.is_token_revoked(db, token_jti=jti)
+        self.bloom_misses += 1
+        # Revoked by another worker since the last rebuild
+        return bool(self._redis_call("exists", REVOKED_PREFIX + jti))
+
+    def revoke(self, db: Session, token: str) -> None:
+        """
+        Blacklist a refresh token's JTI and delete the token. Commits. Tokens
+        that are expired or not ours are only deleted: they cannot be redeemed
+        anyway, and forged ones must not grow the blacklist.
+        """
+        try:
+            claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            claims = {}
+        jti = claims.get("jti")
+        if jti:
+            expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+        if jti and not crud_token.is_token_revoked(db, token_jti=jti):
+            crud_token.add_token_to_blacklist(db, token_jti=jti, expires_at=expires_at)
+        crud_token.delete_refresh_token(db, token=token)
+        if jti:
+            with self._lock:
+                if self._bloom is not None:
+                    self._bloom.add(jti)
+                if self._rebuilding:
+                    self._pending.append(jti)
+            self._mirror(REVOKED_PREFIX + jti, "1", expires_at)
+        self._redis_call("delete", REFRESH_PREFIX + crud_token.token_digest(token))
+
+    def rotate(self, db: Session, *, user_id: uuid.UUID, old_token: str, new_token: str):
+        """Replace a redeemed refresh token with a new one. Commits."""
+        crud_token.delete_refresh_token(db, token=old_token)
+        self._redis_call("delete", REFRESH_PREFIX + crud_token.token_digest(old_token))
+        return self.issue(db, user_id=user_id, token=new_token)
+
+    def rebuild_bloom(self, db: Session) -> BloomFilter:
+        """Rebuild the filter from the unexpired blacklist and swap it in."""
+        with self._lock:
+            self._rebuilding = True
+            self._pending = []
+        try:
+            jtis = crud_token.get_revoked_jtis(db)
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            bloom.update(jtis)
+            with self._lock:
+                bloom.update(self._pending)
+                self._bloom = bloom
+                self._built_at = time.monotonic()
+            return bloom
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = []
+
+    def _rebuild_in_background(self) -> None:
+        if self.session_factory is None:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name="revoked-token-bloom", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        db = self.session_factory()
+        try:
+            self.rebuild_bloom(db)
+        except Exception as e:
+            # Keep serving from the current filter; the next check retries
+            logger.error(f"Error rebuilding revoked token filter: {e}")
+            with self._lock:
+                self._built_at = time.monotonic()
+        finally:
+            db.close()
+
+    def _mirror(self, key: str, value: str, expires_at: datetime) -> None:
+        ttl = int((expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl > 0:
+            self._redis_call("set", key, value, ex=ttl)
+
+    def _redis_call(self, command: str, *args, **kwargs):
+        if not self.redis_url:
+            return None
+        try:
+            if self._redis is None:
+                import redis
+
+                self._redis = redis.Redis.from_url(self.redis_url)
+            return getattr(self._redis, command)(*args, **kwargs)
+        except Exception as e:
+            # The database stays authoritative
+            logger.error(f"Error calling Redis token mirror ({command}): {e}")
+            return None
+
+
+def _session_factory() -> Session:
+    from app.db.session import SessionLocal
+
+    return SessionLocal()
+
+
+token_store = RefreshTokenStore(
+    session_factory=_session_factory,
+    capacity=settings.REVOKED_TOKEN_BLOOM_CAPACITY,
+    error_rate=settings.REVOKED_TOKEN_BLOOM_ERROR_RATE,
+    rebuild_seconds=settings.REVOKED_TOKEN_BLOOM_REBUILD_SECONDS,
+    redis_url=settings.TOKEN_STORE_REDIS_URL
+)
@@ -2,6 +2,7 @@ import uuid
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core.consent_cache import DENIED, ConsentDecision, consent_cache
 from app.db import models
 from app.api.v1.schemas import consent as consent_schema
 
@@ -16,6 +17,7 @@ def create_consent(db: Session, *, patient_id: uuid.UUID, consent_in: consent_sc
     )
     db.add(db_consent)
     db.commit()
+    consent_cache.invalidate(db_consent.data_fiduciary_id, patient_id)
     db.refresh(db_consent)
     return db_consent
 
@@ -30,5 +32,30 @@ def revoke_consent(db: Session, consent: models.ConsentRecord) -> models.Consent
     consent.withdrawn_at = datetime.utcnow()
     db.add(consent)
     db.commit()
+    consent_cache.invalidate(consent.data_fiduciary_id, consent.patient_id)
     db.refresh(consent)
-    return consent
\ No newline at end of file
+    return consent
+
+def find_active_consent(
+    db: Session, *, patient_id: uuid.UUID, fiduciary_id: uuid.UUID, data_category: str
+) -> models.ConsentRecord | None:
+    """The granted, unexpired consent covering data_category that lasts longest, if any."""
+    return db.query(models.ConsentRecord).filter(
+        models.ConsentRecord.patient_id == patient_id,
+        models.ConsentRecord.data_fiduciary_id == fiduciary_id,
+        models.ConsentRecord.status == models.ConsentStatus.GRANTED,
+        models.ConsentRecord.expires_at > datetime.utcnow(),
+        models.ConsentRecord.data_categories.any(data_category)
+    ).order_by(models.ConsentRecord.expires_at.desc()).first()
+
+def get_consent_decision(
+    db: Session, *, patient_id: uuid.UUID, fiduciary_id: uuid.UUID, data_category: str
+) -> ConsentDecision:
+    """Whether fiduciary_id may access the patient's data_category, through the consent cache."""
+    def lookup() -> ConsentDecision:
+        consent = find_active_consent(
+            db, patient_id=patient_id, fiduciary_id=fiduciary_id, data_category=data_category
+        )
+        return ConsentDecision(consent.id, consent.expires_at) if consent else DENIED
+
+    return consent_cache.decide(fiduciary_id, patient_id, data_category, lookup)
\ No newline at end of file
@@ -1,6 +1,9 @@
+import base64
 import uuid
+from sqlalchemy import Select, select, tuple_
 from sqlalchemy.orm import Session
-from datetime import date
+from datetime import date, datetime
+from typing import NamedTuple
 
 from app.db import models
 
@@ -43,46 +46,115 @@ def update_document_status(db: Session, *, doc: models.MedicalDocument, status:
     db.refresh(doc)
     return doc
 
-def get_documents_for_patient(db: Session, *, patient_id: uuid.UUID) -> list[models.MedicalDocument]:
-    """Get a list of all documents for a specific patient."""
-    return db.query(models.MedicalDocument).filter(models.MedicalDocument.patient_id == patient_id).all()
+# Lists select plain columns (no ORM objects); s3_key and the source ids stay out of list payloads
+_documents = models.MedicalDocument.__table__
+LIST_COLUMNS = (
+    _documents.c.id,
+    _documents.c.file_name,
+    _documents.c.content_type,
+    _documents.c.document_category,
+    _documents.c.status,
+    _documents.c.created_at,
+)
 
-def get_documents_for_patient(
-    db: Session, 
-    *, 
+class DocumentPage(NamedTuple):
+    items: list
+    next_cursor: str | None
+
+def encode_document_cursor(created_at: datetime, doc_id: uuid.UUID) -> str:
+    """Opaque cursor for the position just after a listed document."""
+    raw = f"{created_at.isoformat()}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_document_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Inverse of encode_document_cursor. Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, doc_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(doc_id)
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+
+def documents_page_query(
+    *,
     patient_id: uuid.UUID,
+    limit: int,
+    cursor: str | None = None,
     search: str | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
-    # You can also add the hierarchical filters here
     source_org_id: uuid.UUID | None = None,
     source_practitioner_id: uuid.UUID | None = None,
     category: models.DocumentCategory | None = None
-) -> list[models.MedicalDocument]:
+) -> Select:
     """
-    Get a list of all documents for a specific patient, with optional filters.
+    The list columns of a patient's documents after cursor, newest first, with
+    one row more than limit to tell whether another page follows.
     """
-    query = db.query(models.MedicalDocument).filter(models.MedicalDocument.patient_id == patient_id)
+    doc = _documents.c
+    query = select(*LIST_COLUMNS).where(doc.patient_id == patient_id)
 
     if search:
-        query = query.filter(models.MedicalDocument.file_name.ilike(f"%{search}%"))
-    
+        # Served by the trigram index; wildcards typed by the user match literally
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(doc.file_name.ilike(f"%{escaped}%", escape="\\"))
+
     if start_date:
-        query = query.filter(models.MedicalDocument.created_at >= start_date)
-        
+        query = query.where(doc.created_at >= start_date)
+
     if end_date:
-        query = query.filter(models.MedicalDocument.created_at <= end_date)
+        query = query.where(doc.created_at <= end_date)
 
     if source_org_id:
-        query = query.filter(models.MedicalDocument.source_organization_id == source_org_id)
-        
+        query = query.where(doc.source_organization_id == source_org_id)
+
     if source_practitioner_id:
-        query = query.filter(models.MedicalDocument.source_practitioner_id == source_practitioner_id)
+        query = query.where(doc.source_practitioner_id == source_practitioner_id)
 
     if category:
-        query = query.filter(models.MedicalDocument.document_category == category)
+        query = query.where(doc.document_category == category)
+
+    if cursor:
+        created_at, doc_id = decode_document_cursor(cursor)
+        # A row comparison, so the (patient_id, created_at DESC, id DESC) index is seeked, not scanned
+        query = query.where(tuple_(doc.created_at, doc.id) < tuple_(created_at, doc_id))
+
+    return query.order_by(doc.created_at.desc(), doc.id.desc()).limit(limit + 1)
+
+def get_documents_for_patient(
+    db: Session,
+    *,
+    patient_id: uuid.UUID,
+    limit: int = 50,
+    cursor: str | None = None,
+    search: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    source_org_id: uuid.UUID | None = None,
+    source_practitioner_id: uuid.UUID | None = None,
+    category: models.DocumentCategory | None = None
+) -> DocumentPage:
+    """
+    One page of a patient's documents, newest first, with optional filters.
+    Pass next_cursor back to get the following page; it is None on the last one.
+    """
+    rows = db.execute(documents_page_query(
+        patient_id=patient_id,
+        limit=limit,
+        cursor=cursor,
+        search=search,
+        start_date=start_date,
+        end_date=end_date,
+        source_org_id=source_org_id,
+        source_practitioner_id=source_practitioner_id,
+        category=category
+    )).all()
 
-    return query.order_by(models.MedicalDocument.created_at.desc()).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_document_cursor(rows[-1].created_at, rows[-1].id)
+    return DocumentPage(rows, next_cursor)
 
 def get_unique_document_sources(db: Session, *, patient_id: uuid.UUID) -> list:
     """Gets a unique list of source organizations and practitioners for a patient's documents."""
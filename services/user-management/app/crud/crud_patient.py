@@ -2,6 +2,7 @@ import uuid
 from sqlalchemy.orm import Session
 
 from app.db import models
+from app.core.principal_cache import principal_cache
 from app.api.v1.schemas import patient as patient_schema
 from typing import Dict, Any
 
@@ -60,5 +61,6 @@ def update_patient(db: Session, user: models.User, updates: Dict[str, Any]) -> m
         setattr(user, key, value)
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.email)
     db.refresh(user)
     return user
\ No newline at end of file
@@ -5,6 +5,8 @@ from typing import List
 from app.db import models
 from app.api.v1.schemas import rbac as rbac_schema
 from app.core.exceptions import DetailException
+from app.core.principal_cache import principal_cache
+from app.core.permission_compiler import permission_compiler
 
 def get_all_permissions(db: Session) -> list[models.Permission]:
     return db.query(models.Permission).order_by(models.Permission.name).all()
@@ -23,6 +25,7 @@ def create_role(db: Session, role_in: rbac_schema.RoleCreate, org_id: uuid.UUID)
     if role_in.permission_ids:
         permissions = db.query(models.Permission).filter(models.Permission.id.in_(role_in.permission_ids)).all()
         db_role.permissions.extend(permissions)
+    permission_compiler.compile_roles(db, [db_role])
     db.add(db_role)
     db.commit()
     db.refresh(db_role)
@@ -34,8 +37,10 @@ def update_role(db: Session, role: models.Role, role_in: rbac_schema.RoleUpdate)
     if role_in.permission_ids is not None:
         permissions = db.query(models.Permission).filter(models.Permission.id.in_(role_in.permission_ids)).all()
         role.permissions = permissions
+        permission_compiler.compile_roles(db, [role])
     db.add(role)
     db.commit()
+    principal_cache.invalidate_roles(role.organization_id)
     db.refresh(role)
     return role
     
@@ -46,13 +51,16 @@ def assign_roles_to_user(db: Session, user: models.User, role_ids: List[uuid.UUI
     user.roles = roles
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.email)
     db.refresh(user)
     return user
 
 def delete_role(db: Session, role: models.Role):
     """Deletes a role from the database."""
+    organization_id = role.organization_id
     db.delete(role)
     db.commit()
+    principal_cache.invalidate_roles(organization_id)
     return True
 
 
@@ -1,33 +1,75 @@
+import hashlib
+from typing import List, Optional
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 from app.db.models import RevokedRefreshToken, RefreshToken
 
+def token_digest(token: str) -> str:
+    """sha256 hex digest under which a refresh token is stored and looked up."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _utc_naive(value: datetime) -> datetime:
+    # The expires_at columns are naive and hold UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 def add_token_to_blacklist(db: Session, *, token_jti: str, expires_at: datetime) -> RevokedRefreshToken:
-    db_token = RevokedRefreshToken(token_jti=token_jti, expires_at=expires_at)
+    db_token = RevokedRefreshToken(token_jti=token_jti, expires_at=_utc_naive(expires_at))
     db.add(db_token)
     return db_token
 
 def is_token_revoked(db: Session, *, token_jti: str) -> bool:
-    token = db.query(RevokedRefreshToken).filter(RevokedRefreshToken.token_jti == token_jti).first()
+    token = db.query(RevokedRefreshToken.id).filter(RevokedRefreshToken.token_jti == token_jti).first()
     return token is not None
 
+def get_revoked_jtis(db: Session) -> List[str]:
+    """JTIs of every revoked token that has not expired yet."""
+    return db.scalars(
+        select(RevokedRefreshToken.token_jti).where(RevokedRefreshToken.expires_at > utcnow())
+    ).all()
+
 def create_refresh_token(db: Session, *, user_id: str, token: str, expires_at: datetime) -> RefreshToken:
-    """Create a new refresh token in the database."""
+    """Create a new refresh token in the database. Only its digest is stored."""
     db_token = RefreshToken(
         user_id=user_id,
-        token=token,
-        expires_at=expires_at
+        token_digest=token_digest(token),
+        expires_at=_utc_naive(expires_at)
     )
     db.add(db_token)
     db.commit()
     db.refresh(db_token)
     return db_token
 
-def get_refresh_token(db: Session, *, token: str) -> RefreshToken:
-    """Get a refresh token from the database."""
-    return db.query(RefreshToken).filter(RefreshToken.token == token).first()
+def get_refresh_token(db: Session, *, token: str) -> Optional[RefreshToken]:
+    """Get an unexpired refresh token from the database."""
+    return db.query(RefreshToken).filter(
+        RefreshToken.token_digest == token_digest(token),
+        RefreshToken.expires_at > utcnow()
+    ).first()
 
 def delete_refresh_token(db: Session, *, token: str) -> None:
     """Delete a refresh token from the database."""
-    db.query(RefreshToken).filter(RefreshToken.token == token).delete()
-    db.commit()
\ No newline at end of file
+    db.query(RefreshToken).filter(RefreshToken.token_digest == token_digest(token)).delete()
+    db.commit()
+
+def purge_expired_tokens(db: Session, *, batch_size: int = 10000) -> int:
+    """
+    Delete expired refresh tokens and blacklist entries in batches of batch_size,
+    committing after each batch so no long transaction holds locks. Returns the
+    number of rows deleted.
+    """
+    deleted = 0
+    for model in (RefreshToken, RevokedRefreshToken):
+        while True:
+            expired = select(model.id).where(model.expires_at <= utcnow()).limit(batch_size).scalar_subquery()
+            count = db.execute(delete(model).where(model.id.in_(expired))).rowcount
+            db.commit()
+            deleted += count
+            if count < batch_size:
+                break
+    return deleted
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import Dict, Any
 import uuid
 from datetime import datetime, timedelta
@@ -7,6 +7,8 @@ from app.db import models
 from app.api.v1.schemas import user as user_schema
 from app.core.security import hash_password, generate_secure_token
 from app.core.exceptions import UserNotFoundException, DetailException
+from app.core.principal_cache import principal_cache
+from app.core.credentials import credential_verifier
 from app.crud import crud_rbac
 
 def get_user_by_id(db: Session, user_id: uuid.UUID) -> models.User | None:
@@ -19,6 +21,15 @@ def get_user_by_email(db: Session, email: str, raise_exception: bool = False) ->
         raise UserNotFoundException()
     return user
 
+def get_user_with_permissions(db: Session, email: str) -> models.User | None:
+    """User with roles loaded up front; the roles carry their compiled permission masks."""
+    return (
+        db.query(models.User)
+        .options(selectinload(models.User.roles))
+        .filter(models.User.email == email)
+        .first()
+    )
+
 def get_user_by_abha_id(db: Session, abha_id: str, raise_exception: bool = False) -> models.User | None:
     # ... (no changes)
     user = db.query(models.User).filter(models.User.abha_id == abha_id).first()
@@ -145,10 +156,12 @@ def update_user(db: Session, *, user: models.User, updates: Dict[str, Any]) -> m
                 patient.primary_phone = updates.pop("patient_phone")
     
     # Update regular user fields
+    previous_email = user.email
     for key, value in updates.items():
         setattr(user, key, value)
     
     db.commit()
+    principal_cache.invalidate_user(previous_email, user.email)
     db.refresh(user)
     return user
 
@@ -172,6 +185,7 @@ def update_user_profile_photo(db: Session, *, user: models.User, photo_url: str,
     
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.email)
     db.refresh(user)
     return user
 
@@ -201,14 +215,20 @@ def get_user_by_password_reset_token(db: Session, *, token: str) -> models.User
     """Get a user by their password reset token."""
     return db.query(models.User).filter(models.User.password_reset_token == token).first()
 def authenticate(db: Session, *, email: str, password: str) -> models.User | None:
-    """Authenticate a user by email and password."""
-    from app.core.security import verify_password
-    
-    user = get_user_by_email(db, email=email)
+    """
+    Authenticate a user by email and password.
+    The password is checked on the bcrypt pool. A hash made with an outdated
+    cost factor is replaced on success.
+    """
+    user = get_user_with_permissions(db, email=email)
     if not user:
         return None
     
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = credential_verifier.verify(password, user.hashed_password)
+    if not valid:
         return None
     
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
     return user
\ No newline at end of file
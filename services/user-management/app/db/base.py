@@ -1,4 +1,9 @@
 from sqlalchemy.orm import declarative_base
 
 # This Base will be used by all of our models
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# Placeholder schema for per-organization tables. Connections translate it
+# to the organization's schema, or to None (resolved through search_path).
+TENANT_SCHEMA = "tenant"
+SEARCH_PATH_TRANSLATE_MAP = {TENANT_SCHEMA: None}
@@ -4,7 +4,7 @@ import logging
 import uuid
 
 from app.core.config import settings
-from app.db.base import Base
+from app.db.base import Base, SEARCH_PATH_TRANSLATE_MAP
 from app.db.session import engine
 
 # Import all models
@@ -37,7 +37,10 @@ def create_database_if_not_exists():
     
     try:
         # Connect to our app database to create tables
-        app_engine = create_engine(settings.DATABASE_URL)
+        app_engine = create_engine(
+            settings.DATABASE_URL,
+            execution_options={"schema_translate_map": SEARCH_PATH_TRANSLATE_MAP}
+        )
         
         with app_engine.connect() as conn:
             # Create uuid-ossp extension
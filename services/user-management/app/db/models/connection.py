@@ -2,7 +2,7 @@ import uuid
 from sqlalchemy import (Column, String, DateTime, ForeignKey, func, Enum as SQLEnum)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from ..base import Base
+from ..base import Base, TENANT_SCHEMA
 import enum
 
 class ConnectionStatus(str, enum.Enum):
@@ -12,6 +12,7 @@ class ConnectionStatus(str, enum.Enum):
 
 class FamilyConnection(Base):
     __tablename__ = 'family_connections'
+    __table_args__ = {'schema': TENANT_SCHEMA}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -25,4 +26,4 @@ class FamilyConnection(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
     requester = relationship("User", foreign_keys=[requester_id])
-    approver = relationship("User", foreign_keys=[approver_id])
\ No newline at end of file
+    approver = relationship("User", foreign_keys=[approver_id])
\ No newline at end of file
@@ -3,7 +3,7 @@ import enum
 from sqlalchemy import (Column, String, DateTime, ForeignKey, func, Enum as SQLEnum, JSON, Boolean)
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
-from ..base import Base
+from ..base import Base, TENANT_SCHEMA
 
 class ConsentStatus(str, enum.Enum):
     GRANTED = "GRANTED"
@@ -12,6 +12,7 @@ class ConsentStatus(str, enum.Enum):
 
 class ConsentRecord(Base):
     __tablename__ = 'consent_records'
+    __table_args__ = {'schema': TENANT_SCHEMA}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -39,9 +40,10 @@ class ConsentRecord(Base):
 
 class DataSharingLog(Base):
     __tablename__ = 'data_sharing_logs'
+    __table_args__ = {'schema': TENANT_SCHEMA}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    consent_record_id = Column(UUID(as_uuid=True), ForeignKey('consent_records.id'), nullable=False)
+    consent_record_id = Column(UUID(as_uuid=True), ForeignKey(f'{TENANT_SCHEMA}.consent_records.id'), nullable=False)
     
     # The user who accessed the data
     data_consumer_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
@@ -50,4 +52,4 @@ class DataSharingLog(Base):
 
     data_accessed = Column(ARRAY(String), nullable=False)
     accessed_at = Column(DateTime, server_default=func.now(), nullable=False)
-    purpose_fulfilled = Column(Boolean, default=False)
\ No newline at end of file
+    purpose_fulfilled = Column(Boolean, default=False)
\ No newline at end of file
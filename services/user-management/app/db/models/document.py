@@ -1,9 +1,9 @@
 import uuid
 import enum
-from sqlalchemy import (Column, String, DateTime, ForeignKey, func, Enum as SQLEnum)
+from sqlalchemy import (DDL, Column, String, DateTime, ForeignKey, Index, event, func, Enum as SQLEnum)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from ..base import Base
+from ..base import Base, TENANT_SCHEMA
 
 class DocumentStatus(str, enum.Enum):
     PENDING_UPLOAD = "PENDING_UPLOAD"
@@ -24,7 +24,7 @@ class MedicalDocument(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
-    patient_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False, index=True)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     uploader_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     
     # --- HIERARCHICAL METADATA COLUMNS ---
@@ -41,8 +41,26 @@ class MedicalDocument(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    __table_args__ = (
+        # Document listing (crud_document.get_documents_for_patient): one patient's
+        # documents newest first, keyset-paginated on (created_at, id)
+        Index('ix_medical_documents_patient_created', patient_id, created_at.desc(), id.desc()),
+        # Substring search on file names (ILIKE '%...%')
+        Index(
+            'ix_medical_documents_file_name_trgm', file_name,
+            postgresql_using='gin', postgresql_ops={'file_name': 'gin_trgm_ops'}
+        ),
+        {'schema': TENANT_SCHEMA},
+    )
+
     # --- Relationships ---
     patient = relationship("User", foreign_keys=[patient_id], backref="medical_documents")
     uploader = relationship("User", foreign_keys=[uploader_id])
     source_organization = relationship("Organization", foreign_keys=[source_organization_id])
-    source_practitioner = relationship("User", foreign_keys=[source_practitioner_id])
\ No newline at end of file
+    source_practitioner = relationship("User", foreign_keys=[source_practitioner_id])
+
+# The trigram index needs pg_trgm (migrations create it in document_listing_indexes)
+event.listen(
+    MedicalDocument.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import (Column, String, ForeignKey, Table, Text, TIMESTAMP)
+from sqlalchemy import (Column, String, ForeignKey, Table, Text, TIMESTAMP, Integer)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -27,6 +27,8 @@ class Permission(Base):
     # e.g., "patient:read", "document:create", "billing:read"
     name = Column(String, unique=True, nullable=False, index=True)
     description = Column(String)
+    # Position in compiled permission masks; assigned once, never reused
+    bit_index = Column(Integer, unique=True, nullable=True)
 
 class Role(Base):
     __tablename__ = 'roles'
@@ -34,6 +36,9 @@ class Role(Base):
     name = Column(String, nullable=False, index=True)
     description = Column(Text, nullable=True)
     organization_id = Column(UUID(as_uuid=True), ForeignKey('organizations.id'), nullable=False)
+    # Hex encoded OR of the permissions' bits (see app/core/permission_compiler.py)
+    permission_mask = Column(String, nullable=True)
+    permissions_version = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
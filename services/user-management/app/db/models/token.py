@@ -9,11 +9,14 @@ class RevokedRefreshToken(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     # 'jti' is the standard "JWT ID" claim, used to uniquely identify a token.
     token_jti = Column(String, nullable=False, unique=True, index=True)
-    expires_at = Column(DateTime, nullable=False)
-class RefreshToken(Base):
-    __tablename__ = 'refresh_tokens'
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
-    token = Column(String, nullable=False, unique=True, index=True)
-    expires_at = Column(DateTime, nullable=False)
\ No newline at end of file
+    # Indexed for the purge job (app/tasks/token_tasks.py)
+    expires_at = Column(DateTime, nullable=False, index=True)
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    # Legacy raw token; new rows only store its sha256 digest
+    token = Column(String, nullable=True)
+    token_digest = Column(String(64), nullable=False, unique=True, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
\ No newline at end of file
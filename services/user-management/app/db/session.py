@@ -1,12 +1,19 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.base import SEARCH_PATH_TRANSLATE_MAP
+from app.db.tenancy import TenantRouter
 
 # Create the SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True # Checks for connections at the start of each checkout
+    pool_pre_ping=True, # Checks for connections at the start of each checkout
+    # Tenant tables resolve through search_path unless a connection is routed
+    execution_options={"schema_translate_map": SEARCH_PATH_TRANSLATE_MAP}
 )
 
 # Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Hands out connections routed to an organization's schema
+tenant_router = TenantRouter(engine, mode=settings.TENANT_ROUTING_MODE)
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Routes database connections to an organization's schema.
+
+Two strategies, picked by TENANT_ROUTING_MODE:
+
+* "search_path" - the organization schema is put on the connection's
+  search_path. Pooled connections remember the schema they were last set
+  to, so the SET only runs when a request lands on a connection that was
+  serving another organization.
+* "translate" - tenant tables (declared with the TENANT_SCHEMA placeholder)
+  are qualified with the organization schema at compile time through
+  schema_translate_map, so no SET is issued at all. Shared tables stay
+  unqualified and resolve to public.
+"""
+import uuid
+from functools import lru_cache
+from typing import Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.base import TENANT_SCHEMA
+
+# Key in the pooled DBAPI connection's info dict holding its current schema
+SEARCH_PATH_KEY = "tenant_search_path"
+# Execution option marking connections checked out by the router
+ROUTED_OPTION = "tenant_routed"
+
+ROUTING_MODES = ("search_path", "translate")
+
+
+def tenant_schema_name(organization_id: Union[str, uuid.UUID]) -> str:
+    """Schema holding an organization's tables, e.g. org_<32 hex digits>."""
+    return f"org_{uuid.UUID(str(organization_id)).hex}"
+
+
+@lru_cache(maxsize=4096)
+def tenant_translate_map(schema: str) -> dict:
+    """schema_translate_map sending tenant tables to the given schema."""
+    return {TENANT_SCHEMA: schema}
+
+
+def set_search_path(connection: Connection, schema: Optional[str]) -> bool:
+    """
+    Point the connection at a tenant schema (None restores the server default).
+    Returns False without a round trip when the connection is already there.
+
+    The SET is committed straight away: a transaction-scoped setting would be
+    undone by the rollback the pool issues on check-in, and the cached value
+    would no longer match the server.
+    """
+    if connection.info.get(SEARCH_PATH_KEY) == schema:
+        return False
+
+    if schema is None:
+        connection.exec_driver_sql("RESET search_path")
+    else:
+        connection.exec_driver_sql(f"SET search_path TO {schema}, public")
+    connection.commit()
+
+    if schema is None:
+        connection.info.pop(SEARCH_PATH_KEY, None)
+    else:
+        connection.info[SEARCH_PATH_KEY] = schema
+    return True
+
+
+class TenantRouter:
+    """
+    Hands out connections routed to one organization's schema.
+
+    Connections come from the application engine's pool. A listener on the
+    engine resets the search_path of any connection that is checked out
+    without going through the router (public sessions, background jobs)
+    but was last routed to a tenant, so tenant routing never leaks.
+    """
+
+    def __init__(self, engine: Engine, mode: str = "search_path"):
+        if mode not in ROUTING_MODES:
+            raise ValueError(f"Unknown tenant routing mode '{mode}', expected one of {ROUTING_MODES}")
+        self.mode = mode
+        self.engine = engine
+        self._routed_engine = engine.execution_options(**{ROUTED_OPTION: True})
+
+        if not event.contains(engine, "engine_connect", _reset_unrouted):
+            event.listen(engine, "engine_connect", _reset_unrouted)
+
+    def connect(self, organization_id: Union[str, uuid.UUID]) -> Connection:
+        """A new connection routed to the organization; the caller closes it."""
+        schema = tenant_schema_name(organization_id)
+        connection = self._routed_engine.connect()
+        try:
+            if self.mode == "translate":
+                return connection.execution_options(schema_translate_map=tenant_translate_map(schema))
+            set_search_path(connection, schema)
+            return connection
+        except Exception:
+            connection.close()
+            raise
+
+
+def _reset_unrouted(connection: Connection) -> None:
+    if connection.get_execution_options().get(ROUTED_OPTION):
+        return
+    if connection.info.get(SEARCH_PATH_KEY) is not None:
+        set_search_path(connection, None)
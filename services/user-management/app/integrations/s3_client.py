@@ -2,11 +2,14 @@ import boto3
 import os
 import base64
 import io
+import threading
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from fastapi import HTTPException
 import uuid
 from app.core.config import settings
-from app.utils.file_compressor import file_compressor
+from app.integrations.s3_uploads import StreamingUpload, known_prefixes
+from app.utils.file_compressor import IMAGE_EXTENSIONS, file_compressor
 
 class S3Client:
     def __init__(self):
@@ -141,11 +144,8 @@ class S3Client:
         """Create a user folder in the main bucket"""
         user_folder = f"users/{sanitized_name}_{user_id}/"
         try:
-            # Create an empty object to represent the folder
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=user_folder
-            )
+            # Create an empty object to represent the folder (once per process)
+            known_prefixes.ensure(self.s3_client, self.bucket_name, user_folder)
             return f"{self.bucket_name}/{user_folder}"
         except Exception as e:
             raise HTTPException(
@@ -187,9 +187,11 @@ class S3Client:
     def upload_file_object(self, file_object, user_bucket, file_type, filename):
         """Upload a file object to S3 and return the URL"""
         try:
-            # Compress file based on type
-            print(f"Compressing file: {filename}")
-            file_object = file_compressor.compress_file_by_type(file_object, filename)
+            # Compress file based on type (images later, in deferred mode)
+            defer = self._defer_image_compression() and filename.lower().split('.')[-1] in IMAGE_EXTENSIONS
+            if not defer:
+                print(f"Compressing file: {filename}")
+                file_object = file_compressor.compress_file_by_type(file_object, filename)
             
             # Extract user folder path from user_bucket
             user_folder = ""
@@ -205,6 +207,8 @@ class S3Client:
                 self.bucket_name, 
                 file_key
             )
+            if defer:
+                self._schedule_compression(file_key)
             
             # Generate public URL for images
             url = f"/files/public/{file_key}"
@@ -222,12 +226,16 @@ class S3Client:
             print(f"User bucket: {user_bucket}")
             print(f"File type: {file_type}")
             
-            # Compress image before upload
-            print("Compressing image...")
-            compressed_base64 = file_compressor.compress_image(
-                base64_data, 
-                max_size_kb=500  # 500KB max
-            )
+            # Compress image before upload (after it, in deferred mode)
+            defer = self._defer_image_compression()
+            if defer:
+                compressed_base64 = base64_data
+            else:
+                print("Compressing image...")
+                compressed_base64 = file_compressor.compress_image(
+                    base64_data, 
+                    max_size_kb=500  # 500KB max
+                )
             
             # Remove data URL prefix if present
             if "," in compressed_base64:
@@ -257,6 +265,8 @@ class S3Client:
                 ExtraArgs={'ContentType': f'image/{extension}'}
             )
             print(f"Successfully uploaded to S3: {file_key}")
+            if defer:
+                self._schedule_compression(file_key)
             
             # Verify the file exists
             try:
@@ -275,6 +285,43 @@ class S3Client:
                 detail=f"Failed to upload base64 image to S3: {str(e)}"
             )
     
+    def _defer_image_compression(self):
+        return settings.IMAGE_COMPRESSION_MODE == "deferred"
+
+    def _schedule_compression(self, file_key):
+        """Have the worker compress a just-stored original in place (app.tasks.image_tasks)"""
+        from app.tasks.image_tasks import compress_stored_image
+
+        try:
+            compress_stored_image.delay(file_key)
+        except Exception as e:
+            # The original stays usable, just larger
+            print(f"WARNING: Could not schedule compression of {file_key}: {e}")
+
+    def streaming_upload(self, key_factory, content_type=None):
+        """Start a StreamingUpload into the main bucket (see app/integrations/s3_uploads.py)"""
+        return StreamingUpload(
+            self.s3_client,
+            self.bucket_name,
+            key_factory,
+            content_type=content_type,
+            part_size=settings.S3_UPLOAD_PART_SIZE_MB * 1024 * 1024
+        )
+
+    def ensure_prefix(self, prefix):
+        """Create the folder marker for a key prefix unless this process already has"""
+        known_prefixes.ensure(self.s3_client, self.bucket_name, prefix)
+
+    def get_object_bytes(self, file_key):
+        """Read a stored object into memory"""
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_key)
+        return response['Body'].read()
+
+    def put_object_bytes(self, file_key, data, content_type=None):
+        """Replace a stored object"""
+        extra = {'ContentType': content_type} if content_type else {}
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=file_key, Body=data, **extra)
+
     def generate_presigned_url(self, file_key, expiration=3600):
         """Generate a presigned URL for secure file access"""
         try:
@@ -293,5 +340,26 @@ class S3Client:
                 detail=f"Failed to generate presigned URL: {str(e)}"
             )
 
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+def shared_s3_client(region_name=None):
+    """
+    A boto3 S3 client per region for the whole process, created on first use.
+    Clients are thread safe and keep a connection pool, so routes reuse this
+    one instead of building a client (and new connections) per request.
+    """
+    region_name = region_name or settings.AWS_REGION
+    with _shared_clients_lock:
+        client = _shared_clients.get(region_name)
+        if client is None:
+            client = boto3.client(
+                's3',
+                region_name=region_name,
+                config=Config(max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS)
+            )
+            _shared_clients[region_name] = client
+        return client
+
 # Create a singleton instance
 s3_client = S3Client()
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+Streaming uploads into the platform bucket.
+
+/files/upload used to copy every upload to local disk, "create a bucket" for
+the user (a folder marker object named after them, written and saved on the
+user row in the middle of the request) and only then upload the local copy
+to S3. Here:
+
+* every file goes into the one configured bucket under a per-user key
+  prefix, users/<user id>/<file type>/, derived from the id alone;
+* MultipartStream parses the request body as it arrives and hands the bytes
+  of the file part straight to a StreamingUpload, which holds at most one S3
+  part in memory: a body that fits in one part is stored with a single PUT,
+  larger ones become an S3 multipart upload (aborted if the request fails);
+* KnownPrefixes remembers which buckets and prefixes this process has
+  already checked or created, so that costs one call per prefix instead of
+  one per upload.
+
+The key of a multipart upload is fixed when its first part is sent, so for
+large files only the form fields sent before the file are used for it.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 rejects smaller parts (except the last)
+MAX_FIELD_SIZE = 64 * 1024
+
+
+def user_prefix(user_id) -> str:
+    return f"users/{user_id}/"
+
+
+class KnownPrefixes:
+    """Bounded LRU of (bucket, prefix) pairs known to exist. Thread safe."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, entry: Tuple[str, str]) -> bool:
+        with self._lock:
+            if entry in self._entries:
+                self._entries.move_to_end(entry)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, entry: Tuple[str, str]) -> None:
+        with self._lock:
+            self._entries[entry] = None
+            self._entries.move_to_end(entry)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, bucket: str) -> None:
+        """Forget a bucket and its prefixes, e.g. after a NoSuchBucket error."""
+        with self._lock:
+            for entry in [e for e in self._entries if e[0] == bucket]:
+                del self._entries[entry]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def ensure(self, client, bucket: str, prefix: str = "") -> None:
+        """
+        Make sure the bucket exists (head_bucket) and, for a prefix, that its
+        folder marker does (an idempotent empty PUT), unless already known.
+        """
+        if (bucket, "") not in self:
+            client.head_bucket(Bucket=bucket)
+            self.add((bucket, ""))
+        if prefix and (bucket, prefix) not in self:
+            client.put_object(Bucket=bucket, Key=prefix)
+            self.add((bucket, prefix))
+
+
+class StreamingUpload:
+    """
+    Writes one S3 object from chunks without knowing its size up front.
+
+    write() only buffers; flush() (blocking, run it off the event loop) sends
+    the full parts once ready is set, and complete() stores the rest. The key
+    comes from key_factory, called when the first request to S3 is made.
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        key_factory: Callable[[], str],
+        content_type: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024
+    ):
+        self.client = client
+        self.bucket = bucket
+        self.key_factory = key_factory
+        self.content_type = content_type
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.key: Optional[str] = None
+        self.upload_id: Optional[str] = None
+        self.size = 0
+        self._parts: List[Dict] = []
+        self._buffer = bytearray()
+
+    @property
+    def ready(self) -> bool:
+        return len(self._buffer) >= self.part_size
+
+    @property
+    def parts(self) -> int:
+        return len(self._parts)
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        self.size += len(data)
+
+    def flush(self) -> None:
+        while len(self._buffer) >= self.part_size:
+            if self.upload_id is None:
+                response = self.client.create_multipart_upload(
+                    Bucket=self.bucket, Key=self._resolve_key(), **self._extra_args()
+                )
+                self.upload_id = response["UploadId"]
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._upload_part(part)
+
+    def complete(self, transform: Optional[Callable[[bytes], bytes]] = None) -> str:
+        """
+        Store what is left and return the key. transform (e.g. compression)
+        can only apply to bodies that never left the buffer; it returns the
+        bytes to store.
+        """
+        if self.upload_id is None:
+            body = bytes(self._buffer)
+            if transform is not None:
+                body = transform(body)
+            self.client.put_object(Bucket=self.bucket, Key=self._resolve_key(), Body=body, **self._extra_args())
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self._parts}
+            )
+            self.upload_id = None
+        self._buffer = bytearray()
+        return self.key
+
+    def abort(self) -> None:
+        """Drop a started multipart upload so its parts are not billed."""
+        if self.upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            self.upload_id = None
+        self._buffer = bytearray()
+
+    def _resolve_key(self) -> str:
+        if self.key is None:
+            self.key = self.key_factory()
+        return self.key
+
+    def _extra_args(self) -> Dict:
+        return {"ContentType": self.content_type} if self.content_type else {}
+
+    def _upload_part(self, data: bytes) -> None:
+        number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=data
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": number})
+
+
+class MultipartStream:
+    """
+    Incremental multipart/form-data parser for a body with one file part.
+
+    feed() returns the file bytes found in each chunk instead of spooling
+    them; plain fields are collected in .fields. Raises ValueError for a
+    malformed body, an oversized field or a second file.
+    """
+
+    def __init__(self, content_type: str, file_field: str = "file", max_field_size: int = MAX_FIELD_SIZE):
+        _, params = parse_options_header(content_type or "")
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise ValueError("Expected a multipart/form-data body")
+        self.file_field = file_field
+        self.max_field_size = max_field_size
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.file_content_type: Optional[str] = None
+        self.file_complete = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._name: Optional[str] = None
+        self._in_file = False
+        self._data = bytearray()
+        self._file_data: List[bytes] = []
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    @property
+    def file_started(self) -> bool:
+        return self.filename is not None
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        self._parser.write(chunk)
+        data, self._file_data = self._file_data, []
+        return data
+
+    def finish(self) -> None:
+        self._parser.finalize()
+        if not self.file_complete:
+            raise ValueError(f"No complete '{self.file_field}' file in the upload")
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._name = None
+        self._in_file = False
+        self._data = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise ValueError('The Content-Disposition header field "name" must be provided')
+        self._name = options[b"name"].decode("utf-8", "replace")
+        if b"filename" in options:
+            if self._name != self.file_field or self.filename is not None:
+                raise ValueError(f"Only one file, in the '{self.file_field}' field, is accepted")
+            self._in_file = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            content_type = self._headers.get(b"content-type")
+            self.file_content_type = content_type.decode("latin-1") if content_type else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._file_data.append(data[start:end])
+            return
+        self._data += data[start:end]
+        if len(self._data) > self.max_field_size:
+            raise ValueError(f"Form field '{self._name}' is too large")
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self.file_complete = True
+        else:
+            self.fields[self._name] = self._data.decode("utf-8", "replace")
+
+
+known_prefixes = KnownPrefixes(maxsize=settings.S3_PREFIX_CACHE_SIZE)
@@ -5,9 +5,14 @@ from sqlalchemy.exc import IntegrityError
 import logging
 
 from app.core.config import settings
-from app.core.exceptions import DetailException, NotFoundException
+from app.core.exceptions import DetailException, NotFoundException, ServiceBusyException
 from app.db.init_db import create_database_if_not_exists
 from app.core.startup import ensure_s3_bucket_exists
+from app.core.principal_cache import principal_cache
+from app.core.consent_cache import consent_cache
+from app.services.access_log_writer import access_log_writer
+from app.core.permission_compiler import permission_compiler
+from app.db.session import SessionLocal
 
 # --- Main App Instance ---
 app = FastAPI(
@@ -42,6 +47,15 @@ async def not_found_exception_handler(request: Request, exc: NotFoundException):
         content={"detail": exc.detail},
     )
 
+@app.exception_handler(ServiceBusyException)
+async def service_busy_exception_handler(request: Request, exc: ServiceBusyException):
+    """Sheds load when a bounded pool (e.g. password hashing) is saturated."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 @app.exception_handler(DetailException)
 async def detail_exception_handler(request: Request, exc: DetailException):
     """Handles all other custom exceptions that provide a detail message."""
@@ -74,14 +88,30 @@ app.include_router(files.router, prefix="/v1/files", tags=["Files"])  # Addition
 @app.on_event("startup")
 def startup_event():
     """Run startup tasks"""
+    # Apply principal and consent invalidations published by other workers
+    principal_cache.start_listener()
+    consent_cache.start_listener()
     try:
         # Initialize database and create required tables
         create_database_if_not_exists()
         logging.info("Database initialization completed")
         
+        # Build permission masks for roles that have none yet
+        db = SessionLocal()
+        try:
+            compiled = permission_compiler.compile_pending(db)
+            logging.info(f"Compiled permission masks for {compiled} roles")
+        finally:
+            db.close()
+        
         # Ensure S3 bucket exists
         ensure_s3_bucket_exists()
         logging.info("S3 bucket initialization completed")
     except Exception as e:
         logging.error(f"Error during startup: {str(e)}")
-        # Don't fail startup if this fails, just log the error
\ No newline at end of file
+        # Don't fail startup if this fails, just log the error
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Write data sharing logs still queued"""
+    access_log_writer.close()
\ No newline at end of file
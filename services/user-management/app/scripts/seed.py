@@ -5,6 +5,7 @@ from sqlalchemy import text
 from app.db.session import SessionLocal
 from app.db import models
 from app.core.config import settings
+from app.core.permission_compiler import permission_compiler
 from app.scripts.ensure_patients_org import PATIENTS_ORG_UUID
 
 # --- DEFINE ALL SYSTEM PERMISSIONS HERE ---
@@ -43,6 +44,8 @@ async def seed_permissions(db: Session):
             db_permission = models.Permission(name=name, description=desc)
             db.add(db_permission)
             print(f"  - Created permission: {name}")
+    db.flush()
+    permission_compiler.assign_bits(db)
     db.commit()
     print("Permissions seeding complete.")
 
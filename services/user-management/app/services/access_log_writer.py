@@ -0,0 +1,199 @@
+"""
+Batched writer for data sharing logs.
+
+Opening a document shared under consent used to insert its DataSharingLog
+row and commit inside the request. Rows are now queued with the time of
+access and a background thread inserts them in batches, one multi-row
+INSERT per ACCESS_LOG_BATCH_SIZE rows or every ACCESS_LOG_FLUSH_SECONDS.
+
+When the queue is full a row is written in the caller's thread, and the
+app flushes the queue on shutdown (close()). A failed batch is written
+again row by row: rows the database rejects (integrity or data errors)
+are dead-lettered, and when the database itself fails the remaining rows
+are kept and retried on their own before the next batch. Dead-lettered
+rows are logged in full on the "app.services.access_log_writer.dead_letter"
+logger, including the oldest retry rows once more than
+ACCESS_LOG_QUEUE_SIZE are waiting, so no row is dropped without a trace.
+"""
+import json
+import logging
+import queue
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+logger = logging.getLogger(__name__)
+dead_letter_logger = logging.getLogger(f"{__name__}.dead_letter")
+
+# Errors caused by the row itself; retrying it can never succeed
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class AccessLogWriter:
+    """Queues DataSharingLog rows and inserts them in batches from a daemon thread."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: int = 500,
+        flush_seconds: float = 1.0,
+        max_queue: int = 10000
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=max_queue)
+        self._retry: List[Dict] = []
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dead_lettered = 0
+
+    def log(
+        self,
+        *,
+        consent_id: uuid.UUID,
+        patient_id: uuid.UUID,
+        consumer_id: uuid.UUID,
+        data_accessed: List[str]
+    ) -> None:
+        row = {
+            "id": uuid.uuid4(),
+            "consent_record_id": consent_id,
+            "patient_id": patient_id,
+            "data_consumer_id": consumer_id,
+            "data_accessed": data_accessed,
+            "accessed_at": datetime.utcnow(),
+            "purpose_fulfilled": False,
+        }
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            logger.warning("Access log queue full, writing in the request")
+            self._write([row])
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of rows written."""
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        written = 0
+        for start in range(0, len(rows), self.batch_size):
+            written += self._write(rows[start:start + self.batch_size])
+        if not rows and self._retry:
+            written += self._write([])
+        return written
+
+    def close(self) -> None:
+        """Stop the background thread and write what is left."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        # Woken early by log() once a full batch is queued
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def _write(self, rows: List[Dict]) -> int:
+        with self._write_lock:
+            retry, self._retry = self._retry, []
+            # Rows kept from a failed batch go on their own, ahead of new ones
+            written = sum(self._write_batch(batch) for batch in (retry, rows) if batch)
+            self.written += written
+            return written
+
+    def _write_batch(self, rows: List[Dict]) -> int:
+        try:
+            self._insert(rows)
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Error writing {len(rows)} access log rows, writing them one by one: {e}")
+
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                self._insert([row])
+                written += 1
+            except ROW_ERRORS as e:
+                self._dead_letter(row, e)
+            except Exception as e:
+                # The database failed, not the row: keep the rest for the next flush
+                self._defer(rows[index:], e)
+                break
+        return written
+
+    def _insert(self, rows: List[Dict]) -> None:
+        db = self._session()
+        try:
+            db.execute(insert(models.DataSharingLog.__table__), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _defer(self, rows: List[Dict], error: Exception) -> None:
+        logger.error(f"Error writing {len(rows)} access log rows, will retry: {error}")
+        self._retry.extend(rows)
+        overflow = len(self._retry) - self.max_queue
+        if overflow > 0:
+            logger.error(
+                f"Access log retry backlog is over {self.max_queue} rows, "
+                f"dead-lettering the {overflow} oldest"
+            )
+            for row in self._retry[:overflow]:
+                self._dead_letter(row, error)
+            del self._retry[:overflow]
+
+    def _dead_letter(self, row: Dict, error: Exception) -> None:
+        self.dead_lettered += 1
+        dead_letter_logger.error(f"Access log row not written ({error}): {json.dumps(row, default=str)}")
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from app.db.session import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+
+access_log_writer = AccessLogWriter(
+    batch_size=settings.ACCESS_LOG_BATCH_SIZE,
+    flush_seconds=settings.ACCESS_LOG_FLUSH_SECONDS,
+    max_queue=settings.ACCESS_LOG_QUEUE_SIZE
+)
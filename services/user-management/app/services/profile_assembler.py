@@ -0,0 +1,299 @@
+"""
+Profile assembler.
+
+/profile/me, /me/tabs and /me/profile-tabs used to each query the user, the
+patient data and the insurances separately, and /me presigned the photo URL on
+every call. The assembler loads everything a profile page shows in one query
+(the user with roles, insurances and addresses joined), presigns the photo once,
+and keeps the resulting snapshot per user for PROFILE_CACHE_TTL_SECONDS. The
+three routes only project that snapshot.
+
+Entries are dropped by the profile write endpoints and whenever the principal
+cache drops the user (crud_user.update_user, and other workers through its
+Redis channel). Role changes make them stale through the organization's role
+version, as for principals.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.principal_cache import PrincipalCache, UserSnapshot, principal_cache
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+PERSONAL_FIELDS = (
+    "first_name", "last_name", "display_name", "date_of_birth",
+    "gender", "blood_group", "emergency_contact", "aadhar_id"
+)
+ADDRESS_FIELDS = ("street", "city", "state", "zip_code", "country", "address_type")
+INSURANCE_FIELDS = (
+    "provider_name", "policy_number", "scheme_name", "insurance_category",
+    "group_number", "plan_type", "effective_date", "expiration_date",
+    "copay_amount", "deductible_amount", "policy_holder_name", "relationship_to_policy_holder"
+)
+
+
+class ProfileSnapshot(NamedTuple):
+    id: uuid.UUID
+    email: str
+    organization_id: Optional[uuid.UUID]
+    mfa_enabled: bool
+    roles: Tuple[str, ...]
+    personal: Dict[str, Any]
+    address: Dict[str, Any]
+    phone: Optional[str]
+    photo_key: Optional[str]
+    photo_url: Optional[str]  # presigned when photo_key is an S3 key
+    insurances: Tuple[Dict[str, Any], ...]
+    profile_data: Optional[Dict[str, Any]]
+    role_version: int
+
+
+def _personal_info(user: models.User) -> Dict[str, Any]:
+    # Older rows keep these in a personal_info document; the columns win otherwise
+    personal = dict(getattr(user, "personal_info", None) or {})
+    columns = {
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "date_of_birth": user.date_of_birth.isoformat() if user.date_of_birth else None,
+        "gender": user.gender,
+        "emergency_contact": user.emergency_contact,
+    }
+    for field, value in columns.items():
+        if value is not None:
+            personal.setdefault(field, value)
+    return personal
+
+
+def _address(user: models.User, personal: Dict[str, Any]) -> Dict[str, Any]:
+    if personal.get("address"):
+        return dict(personal["address"])
+    addresses = sorted(user.addresses, key=lambda address: not address.is_primary)
+    if not addresses:
+        return {}
+    address = addresses[0]
+    return {
+        "street": address.address_line,
+        "city": address.city.name if address.city else None,
+        "state": address.state.name if address.state else None,
+        "zip_code": address.pin_code,
+        "country": address.country.name if address.country else None,
+        "address_type": address.address_type,
+    }
+
+
+def _insurance(insurance: models.PatientInsurance) -> Dict[str, Any]:
+    info = {"id": str(insurance.id)}
+    for field in INSURANCE_FIELDS:
+        info[field] = getattr(insurance, field)
+    info["is_active"] = insurance.is_active
+    info["document_url"] = insurance.document_url
+    return info
+
+
+def photo_s3_key(photo: Optional[str]) -> Optional[str]:
+    """The S3 key of a stored photo reference, or None when it is already a full URL."""
+    if not photo or photo.startswith(("http://", "https://")):
+        return None
+    return photo.replace("/files/public/", "") if photo.startswith("/files/public/") else photo
+
+
+def render_tabs(profile: ProfileSnapshot, include_inactive_insurance: bool = False) -> list:
+    """The four profile tabs, as on the registration page."""
+    personal, address = profile.personal, profile.address
+    if include_inactive_insurance:
+        insurances = [dict(insurance) for insurance in profile.insurances]
+    else:
+        insurances = [
+            {k: v for k, v in insurance.items() if k not in ("is_active", "document_url")}
+            for insurance in profile.insurances if insurance["is_active"]
+        ]
+    return [
+        {
+            "id": "personal",
+            "title": "Personal Information",
+            "fields": {field: personal.get(field, "") for field in PERSONAL_FIELDS}
+        },
+        {
+            "id": "address",
+            "title": "Address Information",
+            "fields": {field: address.get(field, "") for field in ADDRESS_FIELDS}
+        },
+        {
+            "id": "account",
+            "title": "Account Settings",
+            "fields": {
+                "email": profile.email,
+                "phone": profile.phone,
+                "enable_mfa": profile.mfa_enabled
+            }
+        },
+        {
+            "id": "insurance",
+            "title": "Insurance Information",
+            "fields": {
+                "has_insurance": len(insurances) > 0,
+                "insurance": insurances
+            }
+        }
+    ]
+
+
+def render_profile(profile: ProfileSnapshot) -> Dict[str, Any]:
+    """GET /profile/me: the tabs plus the flat fields older clients read."""
+    insurances = [dict(insurance) for insurance in profile.insurances]
+    return {
+        "title": "My Profile",
+        "id": str(profile.id),
+        "email": profile.email,
+        "primary_phone": profile.phone,
+        "profile_photo_url": profile.photo_url,
+        "organization_id": str(profile.organization_id) if profile.organization_id else None,
+        "mfa_enabled": profile.mfa_enabled,
+        "roles": list(profile.roles),
+
+        "tabs": render_tabs(profile, include_inactive_insurance=True),
+
+        # For backward compatibility
+        "personal_info": dict(profile.personal),
+        "address": dict(profile.address),
+        "account_settings": {
+            "mfa_enabled": profile.mfa_enabled,
+            "email": profile.email,
+            "primary_phone": profile.phone
+        },
+        "insurance_info": insurances,
+        "has_insurance": len(insurances) > 0,
+        "profile_data": profile.profile_data
+    }
+
+
+def render_profile_tabs(profile: ProfileSnapshot) -> Dict[str, Any]:
+    """GET /profile/me/tabs and /me/profile-tabs."""
+    return {
+        "title": "My Profile",
+        "tabs": render_tabs(profile),
+        "profile_photo_url": profile.photo_key
+    }
+
+
+class ProfileAssembler:
+    """Loads profile snapshots in one query and caches them per user. Thread safe."""
+
+    def __init__(
+        self,
+        presign: Callable[[str], str],
+        principals: PrincipalCache,
+        maxsize: int = 10000,
+        ttl_seconds: float = 300
+    ):
+        self.presign = presign
+        self.principals = principals
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, ProfileSnapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        principals.on_invalidate(self._drop)
+
+    def get(self, db: Session, principal: UserSnapshot) -> Optional[ProfileSnapshot]:
+        """The current user's profile, from the cache or one query. None if the user is gone."""
+        role_version = self.principals.role_version(principal.organization_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(principal.email)
+            if entry is not None:
+                expires_at, profile = entry
+                if expires_at > now and profile.role_version == role_version:
+                    self._entries.move_to_end(principal.email)
+                    self.hits += 1
+                    return profile
+                del self._entries[principal.email]
+            self.misses += 1
+        profile = self.load(db, principal.id, role_version)
+        if profile is not None:
+            with self._lock:
+                self._entries[principal.email] = (time.monotonic() + self.ttl_seconds, profile)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return profile
+
+    def load(self, db: Session, user_id: uuid.UUID, role_version: int = 0) -> Optional[ProfileSnapshot]:
+        """Build a snapshot from a single query, bypassing the cache."""
+        statement = (
+            select(models.User)
+            .options(
+                joinedload(models.User.roles),
+                joinedload(models.User.insurances),
+                joinedload(models.User.addresses).joinedload(models.Address.city),
+                joinedload(models.User.addresses).joinedload(models.Address.state),
+                joinedload(models.User.addresses).joinedload(models.Address.country),
+            )
+            .where(models.User.id == user_id)
+        )
+        user = db.execute(statement).unique().scalar_one_or_none()
+        if user is None:
+            return None
+
+        personal = _personal_info(user)
+        photo_key = getattr(user, "profile_photo_url", None) or user.profile_pic
+        return ProfileSnapshot(
+            id=user.id,
+            email=user.email,
+            organization_id=user.organization_id,
+            mfa_enabled=user.mfa_enabled,
+            roles=tuple(role.name for role in user.roles),
+            personal=personal,
+            address=_address(user, personal),
+            phone=user.primary_contact,
+            photo_key=photo_key,
+            photo_url=self._photo_url(photo_key),
+            insurances=tuple(_insurance(insurance) for insurance in user.insurances),
+            profile_data=getattr(user, "profile_data", None),
+            role_version=role_version
+        )
+
+    def invalidate(self, *subjects: str) -> None:
+        """Drop users whose profile changed, here and (through the principal cache) in other workers."""
+        self.principals.invalidate_user(*subjects)
+
+    def _drop(self, subjects: Optional[Iterable[str]]) -> None:
+        with self._lock:
+            if subjects is None:
+                self._entries.clear()
+                return
+            for subject in subjects:
+                self._entries.pop(subject, None)
+
+    def _photo_url(self, photo_key: Optional[str]) -> Optional[str]:
+        s3_key = photo_s3_key(photo_key)
+        if s3_key is None:
+            return photo_key
+        try:
+            return self.presign(s3_key)
+        except Exception as e:
+            logger.error(f"Error generating presigned URL for profile photo: {e}")
+            return photo_key
+
+
+def _presign(s3_key: str) -> str:
+    from app.integrations.s3_client import s3_client
+
+    return s3_client.generate_presigned_url(s3_key, expiration=settings.PROFILE_PHOTO_URL_EXPIRE_SECONDS)
+
+
+profile_assembler = ProfileAssembler(
+    presign=_presign,
+    principals=principal_cache,
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    ttl_seconds=settings.PROFILE_CACHE_TTL_SECONDS
+)
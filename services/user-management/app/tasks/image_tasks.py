@@ -0,0 +1,17 @@
+from app.core.celery_app import celery_app
+from app.integrations.s3_client import s3_client
+from app.utils.image_pipeline import recompress_stored_bytes
+
+@celery_app.task
+def compress_stored_image(file_key: str, max_size_kb: int = 500):
+    """
+    Compresses an image stored as uploaded (IMAGE_COMPRESSION_MODE = "deferred")
+    and replaces it under the same key, so URLs already handed out stay valid.
+    The image keeps its format (a .png stays a PNG) so the key still matches.
+    """
+    original = s3_client.get_object_bytes(file_key)
+    result, content_type = recompress_stored_bytes(original, max_size_kb=max_size_kb)
+    if len(result.data) >= len(original):
+        return f"{file_key} kept as uploaded ({len(original)} bytes)"
+    s3_client.put_object_bytes(file_key, result.data, content_type=content_type)
+    return f"{file_key} compressed {len(original)} -> {len(result.data)} bytes as {content_type}"
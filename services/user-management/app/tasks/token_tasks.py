@@ -0,0 +1,17 @@
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.crud import crud_token
+from app.db.session import SessionLocal
+
+@celery_app.task
+def purge_expired_tokens():
+    """
+    Deletes expired refresh tokens and blacklist entries, in batches of
+    TOKEN_PURGE_BATCH_SIZE rows. Scheduled hourly (see celery_app.beat_schedule).
+    """
+    db = SessionLocal()
+    try:
+        deleted = crud_token.purge_expired_tokens(db, batch_size=settings.TOKEN_PURGE_BATCH_SIZE)
+    finally:
+        db.close()
+    return f"Purged {deleted} expired tokens"
@@ -1,8 +1,10 @@
-from PIL import Image
 import io
 import base64
 import zipfile
 import gzip
+from app.utils.image_pipeline import image_pipeline
+
+IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif']
 
 class FileCompressor:
     @staticmethod
@@ -15,37 +17,12 @@ class FileCompressor:
                 header = "data:image/jpeg;base64"
             
             image_bytes = base64.b64decode(base64_data)
-            original_size_kb = len(image_bytes) / 1024
-            print(f"Original image: {original_size_kb:.1f}KB")
-            
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            elif image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            if image.width > 800:
-                ratio = 800 / image.width
-                new_height = int(image.height * ratio)
-                image = image.resize((800, new_height), Image.Resampling.LANCZOS)
-            
-            for quality in [85, 75, 60, 45, 30]:
-                output_buffer = io.BytesIO()
-                image.save(output_buffer, format='JPEG', quality=quality, optimize=True)
-                compressed_bytes = output_buffer.getvalue()
-                compressed_size_kb = len(compressed_bytes) / 1024
-                
-                if compressed_size_kb <= max_size_kb or quality == 30:
-                    compressed_base64 = base64.b64encode(compressed_bytes).decode('utf-8')
-                    print(f"Compressed to: {compressed_size_kb:.1f}KB")
-                    return f"{header},{compressed_base64}"
             
-            return f"{header},{base64_data}"
+            # Decode, resize and search the quality once, in the compression pool
+            result = image_pipeline.compress(image_bytes, max_size_kb=max_size_kb)
+            compressed_base64 = base64.b64encode(result.data).decode('utf-8')
+            print(f"Compressed image: {result.original_size / 1024:.1f}KB -> {len(result.data) / 1024:.1f}KB")
+            return f"{header},{compressed_base64}"
         except Exception as e:
             print(f"Image compression error: {str(e)}")
             return f"data:image/jpeg;base64,{base64_data}" if "," not in base64_data else base64_data
@@ -79,19 +56,16 @@ class FileCompressor:
         """Compress file based on extension"""
         ext = filename.lower().split('.')[-1]
         
-        if ext in ['jpg', 'jpeg', 'png', 'gif']:
-            # For images, convert to base64 first
+        if ext in IMAGE_EXTENSIONS:
             file_obj.seek(0)
             content = file_obj.read()
-            b64_data = base64.b64encode(content).decode('utf-8')
-            compressed_b64 = FileCompressor.compress_image(f"data:image/{ext};base64,{b64_data}")
-            
-            if "," in compressed_b64:
-                compressed_content = base64.b64decode(compressed_b64.split(",", 1)[1])
-            else:
-                compressed_content = base64.b64decode(compressed_b64)
-            
-            return io.BytesIO(compressed_content)
+            try:
+                result = image_pipeline.compress(content, max_size_kb=500)
+                print(f"Compressed image: {result.original_size / 1024:.1f}KB -> {len(result.data) / 1024:.1f}KB")
+                return io.BytesIO(result.data)
+            except Exception as e:
+                print(f"Image compression error: {str(e)}")
+                return io.BytesIO(content)
             
         elif ext in ['txt', 'csv', 'json', 'xml', 'html', 'css', 'js']:
             return FileCompressor.compress_text_file(file_obj, filename)
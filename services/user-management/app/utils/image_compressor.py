@@ -1,9 +1,9 @@
-from PIL import Image
 import io
 import base64
 import PyPDF2
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
+from app.utils.image_pipeline import image_pipeline
 
 class ImageCompressor:
     @staticmethod
@@ -29,50 +29,14 @@ class ImageCompressor:
             
             # Decode base64 to bytes
             image_bytes = base64.b64decode(base64_data)
-            original_size_kb = len(image_bytes) / 1024
-            
-            print(f"Original image size: {original_size_kb:.1f}KB")
-            
-            # Open image with PIL
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to RGB if necessary (for JPEG compatibility)
-            if image.mode in ('RGBA', 'LA', 'P'):
-                # Create white background for transparent images
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            elif image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Resize if too large
-            if image.width > max_width:
-                ratio = max_width / image.width
-                new_height = int(image.height * ratio)
-                image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
-                print(f"Resized to: {image.width}x{image.height}")
-            
-            # Compress with different quality levels until size is acceptable
-            for attempt_quality in [quality, 75, 60, 45, 30]:
-                output_buffer = io.BytesIO()
-                image.save(output_buffer, format='JPEG', quality=attempt_quality, optimize=True)
-                compressed_bytes = output_buffer.getvalue()
-                compressed_size_kb = len(compressed_bytes) / 1024
-                
-                print(f"Quality {attempt_quality}: {compressed_size_kb:.1f}KB")
-                
-                if compressed_size_kb <= max_size_kb or attempt_quality == 30:
-                    # Encode back to base64
-                    compressed_base64 = base64.b64encode(compressed_bytes).decode('utf-8')
-                    
-                    print(f"Final compressed size: {compressed_size_kb:.1f}KB (reduction: {((original_size_kb - compressed_size_kb) / original_size_kb * 100):.1f}%)")
-                    
-                    return f"{header},{compressed_base64}"
-            
-            # Fallback - return original if compression fails
-            return f"{header},{base64_data}"
+            
+            # Decode, resize and search the quality once, in the compression pool
+            result = image_pipeline.compress(image_bytes, max_size_kb=max_size_kb, max_width=max_width)
+            compressed_base64 = base64.b64encode(result.data).decode('utf-8')
+            
+            print(f"Compressed image: {result.original_size / 1024:.1f}KB -> {len(result.data) / 1024:.1f}KB at quality {result.quality}")
+            
+            return f"{header},{compressed_base64}"
             
         except Exception as e:
             print(f"Image compression error: {str(e)}")
@@ -97,46 +61,12 @@ class ImageCompressor:
             # Read file content
             file_obj.seek(0)
             image_bytes = file_obj.read()
-            original_size_kb = len(image_bytes) / 1024
-            
-            print(f"Original file size: {original_size_kb:.1f}KB")
-            
-            # Open image with PIL
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to RGB if necessary
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            elif image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Resize if too large
-            if image.width > max_width:
-                ratio = max_width / image.width
-                new_height = int(image.height * ratio)
-                image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
-                print(f"Resized to: {image.width}x{image.height}")
-            
-            # Compress with different quality levels
-            for attempt_quality in [quality, 75, 60, 45, 30]:
-                output_buffer = io.BytesIO()
-                image.save(output_buffer, format='JPEG', quality=attempt_quality, optimize=True)
-                compressed_size_kb = len(output_buffer.getvalue()) / 1024
-                
-                print(f"Quality {attempt_quality}: {compressed_size_kb:.1f}KB")
-                
-                if compressed_size_kb <= max_size_kb or attempt_quality == 30:
-                    output_buffer.seek(0)
-                    print(f"Final compressed size: {compressed_size_kb:.1f}KB")
-                    return output_buffer
-            
-            # Fallback
-            file_obj.seek(0)
-            return file_obj
+            
+            # Decode, resize and search the quality once, in the compression pool
+            result = image_pipeline.compress(image_bytes, max_size_kb=max_size_kb, max_width=max_width)
+            
+            print(f"Compressed file: {result.original_size / 1024:.1f}KB -> {len(result.data) / 1024:.1f}KB at quality {result.quality}")
+            return io.BytesIO(result.data)
             
         except Exception as e:
             print(f"File compression error: {str(e)}")
@@ -0,0 +1,203 @@
+"""
+Image compression pipeline.
+
+Uploaded images used to be decoded, resized and then re-encoded at qualities
+85, 75, 60, 45 and 30 in turn inside the request handler until one fit the
+size target: up to five full optimized encodes per upload. Here:
+
+* the image is decoded once, and JPEGs are decoded straight at a reduced
+  scale with draft() when they are wider than needed (the DCT scaling is far
+  cheaper than decoding full size and resizing);
+* the first encode is at the top quality, which is all most uploads need;
+  otherwise the quality is searched against the size target (a bisection
+  that interpolates between the sizes bracketing the target) using cheaper
+  unoptimized encodes, and only the chosen quality is encoded with
+  optimize=True (never larger than the probe, so it still fits);
+* ImagePipeline runs that work in a process pool so it does not hold the GIL
+  of the API worker; compress() waits for the result, so async handlers call
+  it (and the S3 uploads that use it) through run_in_threadpool;
+* with IMAGE_COMPRESSION_MODE = "deferred" uploads store the original and
+  app.tasks.image_tasks compresses the stored object in place afterwards,
+  keeping its format so the key and content type already handed out still
+  describe it (recompress_stored_bytes).
+"""
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_QUALITY = 85
+MIN_QUALITY = 30
+# The search stops once the feasible range is this narrow...
+QUALITY_STEP = 5
+# ...or a fitting encode uses this much of the size budget
+FILL_RATIO = 0.9
+MAX_PROBES = 6
+
+
+class CompressedImage(NamedTuple):
+    data: bytes
+    # None when the image was kept in a format without a quality setting
+    quality: Optional[int]
+    width: int
+    height: int
+    original_size: int
+    encodes: int
+
+
+def _decode(data: bytes, max_width: int) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    if image.format == "JPEG" and image.width > max_width:
+        # Decode at the smallest 1/2, 1/4 or 1/8 scale still at least max_width wide
+        image.draft("RGB", (max_width, max(1, image.height * max_width // image.width)))
+
+    # Convert to RGB if necessary (for JPEG compatibility)
+    if image.mode in ("RGBA", "LA", "P"):
+        # Create white background for transparent images
+        if image.mode == "P":
+            image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1] if image.mode in ("RGBA", "LA") else None)
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    if image.width > max_width:
+        height = max(1, int(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+    return image
+
+
+def _encode(image: Image.Image, quality: int, optimize: bool) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=optimize)
+    return buffer.getvalue()
+
+
+def _search_quality(image: Image.Image, limit: int, min_quality: int, max_quality: int, max_size: int):
+    """
+    Highest quality whose unoptimized encode fits limit, given that max_quality
+    encodes to max_size > limit. Keeps a bracket (fits, too big) and probes
+    where the size is interpolated to cross the limit, stopping once a fit uses
+    most of the budget or the bracket is QUALITY_STEP wide. Returns (quality, probes).
+    """
+    high, high_size = max_quality, max_size
+    low = low_size = None
+    quality = max(min_quality, max_quality - 2 * QUALITY_STEP)
+    probes = 0
+    while True:
+        size = len(_encode(image, quality, optimize=False))
+        probes += 1
+        if size <= limit:
+            low, low_size = quality, size
+        else:
+            high, high_size = quality, size
+        if low is None:
+            if quality <= min_quality:
+                return min_quality, probes
+            # Nothing fits yet: halve the distance to the minimum
+            quality = max(min_quality, (min_quality + quality) // 2)
+            continue
+        if high - low <= QUALITY_STEP or low_size >= limit * FILL_RATIO or probes >= MAX_PROBES:
+            return low, probes
+        estimate = low + (high - low) * (limit - low_size) / max(high_size - low_size, 1)
+        quality = min(max(int(estimate), low + 1), high - 1)
+
+
+def compress_image_bytes(
+    data: bytes,
+    max_size_kb: int = 500,
+    max_width: int = 800,
+    max_quality: int = MAX_QUALITY,
+    min_quality: int = MIN_QUALITY
+) -> CompressedImage:
+    """
+    JPEG at the highest quality found to fit max_size_kb, at most max_width
+    wide. Falls back to min_quality when nothing fits.
+    """
+    image = _decode(data, max_width)
+    limit = max_size_kb * 1024
+
+    encoded = _encode(image, max_quality, optimize=True)
+    if len(encoded) <= limit:
+        return CompressedImage(encoded, max_quality, image.width, image.height, len(data), 1)
+
+    quality, probes = _search_quality(image, limit, min_quality, max_quality, len(encoded))
+    encoded = _encode(image, quality, optimize=True)
+    return CompressedImage(encoded, quality, image.width, image.height, len(data), probes + 2)
+
+
+def recompress_stored_bytes(data: bytes, max_size_kb: int = 500, max_width: int = 800) -> Tuple[CompressedImage, str]:
+    """
+    Compression for an object that is already stored under its upload key:
+    JPEGs go through compress_image_bytes, other formats are only downscaled
+    and saved optimized in their own format. Returns the result and its
+    content type; formats Pillow cannot write come back unchanged.
+    """
+    image = Image.open(io.BytesIO(data))
+    source_format = image.format
+    content_type = Image.MIME.get(source_format, "application/octet-stream")
+    if source_format == "JPEG":
+        return compress_image_bytes(data, max_size_kb, max_width), content_type
+    if source_format not in Image.SAVE or getattr(image, "is_animated", False):
+        return CompressedImage(data, None, image.width, image.height, len(data), 0), content_type
+
+    if image.width > max_width:
+        height = max(1, int(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format=source_format, optimize=True)
+    return CompressedImage(buffer.getvalue(), None, image.width, image.height, len(data), 1), content_type
+
+
+class ImagePipeline:
+    """Runs compress_image_bytes in a pool of worker processes (in-process when workers is 0)."""
+
+    def __init__(self, workers: int = 2, timeout_seconds: float = 30):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def compress(self, data: bytes, max_size_kb: int = 500, max_width: int = 800) -> CompressedImage:
+        if self.workers <= 0:
+            return compress_image_bytes(data, max_size_kb, max_width)
+        try:
+            future = self._executor().submit(compress_image_bytes, data, max_size_kb, max_width)
+            return future.result(timeout=self.timeout_seconds)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            logger.error("Image compression pool broke, compressing in process")
+            with self._lock:
+                self._pool = None
+            return compress_image_bytes(data, max_size_kb, max_width)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded API worker is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+image_pipeline = ImagePipeline(
+    workers=settings.IMAGE_COMPRESSION_WORKERS,
+    timeout_seconds=settings.IMAGE_COMPRESSION_TIMEOUT_SECONDS
+)
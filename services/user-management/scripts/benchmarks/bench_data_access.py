@@ -0,0 +1,179 @@
+"""
+Benchmark shared-document access: requests per second of the access check
+
+Usage:
+    python scripts/benchmarks/bench_data_access.py --documents 50 --requests 5000 --concurrency 8
+
+Needs the database at DATABASE_URL; S3 is not called (presigning is local,
+dummy credentials are set if none are configured). Creates a patient with
+--documents lab reports and a doctor holding consent for them, then serves
+--requests accesses by the doctor (round-robin over the documents) from
+--concurrency threads, each with its own session, two ways:
+
+* the previous path: consent query, DataSharingLog insert and commit, and a
+  new boto3 client to presign the URL on every request;
+* the current path: cached consent decision, log row queued on the batched
+  writer, shared S3 client.
+
+Reports requests per second and p50/p99 latency; the current row also counts
+the time to flush the log rows still queued at the end.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+import boto3
+
+from app.core.config import settings
+from app.core.consent_cache import consent_cache
+from app.crud import crud_consent
+from app.db import models
+from app.db.session import SessionLocal, engine
+from app.integrations.s3_client import shared_s3_client
+from app.services.access_log_writer import access_log_writer
+
+
+def create_fixtures(count):
+    db = SessionLocal()
+    try:
+        org = models.Organization(name=f"bench-{uuid.uuid4().hex[:8]}")
+        db.add(org)
+        db.flush()
+        patient, doctor = [
+            models.User(
+                email=f"bench-{uuid.uuid4().hex}@example.com",
+                hashed_password="x",
+                first_name="Bench",
+                last_name=name,
+                primary_contact="9999999999",
+                organization_id=org.id
+            )
+            for name in ("Patient", "Doctor")
+        ]
+        db.add_all([patient, doctor])
+        db.flush()
+        documents = [
+            models.MedicalDocument(
+                patient_id=patient.id,
+                uploader_id=patient.id,
+                file_name=f"lab-report-{i}.pdf",
+                content_type="application/pdf",
+                s3_key=f"bench/{patient.id}/{uuid.uuid4()}.pdf",
+                status=models.DocumentStatus.UPLOAD_COMPLETE,
+                document_category=models.DocumentCategory.LAB_REPORT
+            )
+            for i in range(count)
+        ]
+        db.add_all(documents)
+        db.add(models.ConsentRecord(
+            patient_id=patient.id,
+            data_fiduciary_id=doctor.id,
+            purpose="Benchmark",
+            data_categories=[models.DocumentCategory.LAB_REPORT.value],
+            expires_at=datetime.utcnow() + timedelta(days=1),
+            status=models.ConsentStatus.GRANTED
+        ))
+        db.commit()
+        return org.id, patient.id, doctor.id, [(doc.id, doc.patient_id, doc.s3_key) for doc in documents]
+    finally:
+        db.close()
+
+
+def drop_fixtures(org_id, patient_id, doctor_id):
+    db = SessionLocal()
+    try:
+        db.query(models.DataSharingLog).filter(models.DataSharingLog.patient_id == patient_id).delete(synchronize_session=False)
+        db.query(models.ConsentRecord).filter(models.ConsentRecord.patient_id == patient_id).delete(synchronize_session=False)
+        db.query(models.MedicalDocument).filter(models.MedicalDocument.patient_id == patient_id).delete(synchronize_session=False)
+        db.query(models.User).filter(models.User.id.in_([patient_id, doctor_id])).delete(synchronize_session=False)
+        db.query(models.Organization).filter(models.Organization.id == org_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def previous_access(db, doctor_id, document):
+    doc_id, patient_id, s3_key = document
+    consent = crud_consent.find_active_consent(
+        db, patient_id=patient_id, fiduciary_id=doctor_id, data_category=models.DocumentCategory.LAB_REPORT.value
+    )
+    db.add(models.DataSharingLog(
+        consent_record_id=consent.id, patient_id=patient_id, data_consumer_id=doctor_id, data_accessed=[s3_key]
+    ))
+    db.commit()
+    client = boto3.client("s3", region_name=settings.AWS_REGION)
+    return client.generate_presigned_url(
+        "get_object", Params={"Bucket": settings.AWS_S3_BUCKET_NAME, "Key": s3_key}, ExpiresIn=300
+    )
+
+
+def current_access(db, doctor_id, document):
+    doc_id, patient_id, s3_key = document
+    decision = crud_consent.get_consent_decision(
+        db, patient_id=patient_id, fiduciary_id=doctor_id, data_category=models.DocumentCategory.LAB_REPORT.value
+    )
+    access_log_writer.log(
+        consent_id=decision.consent_id, patient_id=patient_id, consumer_id=doctor_id, data_accessed=[s3_key]
+    )
+    return shared_s3_client().generate_presigned_url(
+        "get_object", Params={"Bucket": settings.AWS_S3_BUCKET_NAME, "Key": s3_key}, ExpiresIn=300
+    )
+
+
+def measure(label, args, doctor_id, documents, access, finish=None):
+    def worker(indexes):
+        db = SessionLocal()
+        latencies = []
+        try:
+            for i in indexes:
+                started = time.perf_counter()
+                access(db, doctor_id, documents[i % len(documents)])
+                latencies.append(time.perf_counter() - started)
+        finally:
+            db.close()
+        return latencies
+
+    shards = [range(n, args.requests, args.concurrency) for n in range(args.concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = sorted(l for shard in pool.map(worker, shards) for l in shard)
+    if finish is not None:
+        finish()
+    elapsed = time.perf_counter() - started
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    print(f"{label:<16} {args.requests / elapsed:8.1f} requests/s   p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+
+def run(args):
+    org_id, patient_id, doctor_id, documents = create_fixtures(args.documents)
+    try:
+        print(f"{args.requests} accesses to {args.documents} documents from {args.concurrency} threads")
+        measure("previous path", args, doctor_id, documents, previous_access)
+        consent_cache.clear()
+        measure("current path", args, doctor_id, documents, current_access, finish=access_log_writer.close)
+        print(f"consent cache hits {consent_cache.hits}, misses {consent_cache.misses}; "
+              f"{access_log_writer.written} log rows written in batches")
+    finally:
+        drop_fixtures(org_id, patient_id, doctor_id)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    run(parser.parse_args())
@@ -0,0 +1,155 @@
+"""
+Benchmark patient document listing: first-page and deep-page latency
+
+Usage:
+    python scripts/benchmarks/bench_documents.py --documents 50000 --page-size 50 --depth 40000 --repeat 50
+
+Needs the database at DATABASE_URL, migrated to document_listing_indexes.
+Creates one patient in a throwaway organization with --documents documents
+(one every minute back from now, file names like "lab-report-01234.pdf"),
+then times, --repeat times each:
+
+* the previous listing: every document of the patient as ORM objects (.all());
+* OFFSET pagination, first page and the page at --depth;
+* the keyset listing (get_documents_for_patient), first page and the page at
+  --depth, reached with the cursor of the row just before it;
+* a file name search through the keyset listing (trigram index).
+
+Reports p50/p99 latency and rows returned per call.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import insert, select
+
+from app.crud import crud_document
+from app.db import models
+from app.db.session import SessionLocal, engine
+
+BATCH = 5000
+
+
+def create_patient(count):
+    db = SessionLocal()
+    try:
+        org = models.Organization(name=f"bench-{uuid.uuid4().hex[:8]}")
+        db.add(org)
+        db.flush()
+        patient = models.User(
+            email=f"bench-{uuid.uuid4().hex}@example.com",
+            hashed_password="x",
+            first_name="Bench",
+            last_name="Patient",
+            primary_contact="9999999999",
+            organization_id=org.id
+        )
+        db.add(patient)
+        db.flush()
+        now = datetime.utcnow()
+        categories = list(models.DocumentCategory)
+        for start in range(0, count, BATCH):
+            db.execute(insert(models.MedicalDocument.__table__), [
+                {
+                    "id": uuid.uuid4(),
+                    "patient_id": patient.id,
+                    "uploader_id": patient.id,
+                    "file_name": f"{categories[i % len(categories)].value.lower().replace('_', '-')}-{i:05d}.pdf",
+                    "content_type": "application/pdf",
+                    "s3_key": f"bench/{patient.id}/{uuid.uuid4()}.pdf",
+                    "status": models.DocumentStatus.UPLOAD_COMPLETE,
+                    "document_category": categories[i % len(categories)],
+                    "created_at": now - timedelta(minutes=i),
+                    "updated_at": now - timedelta(minutes=i),
+                }
+                for i in range(start, min(start + BATCH, count))
+            ])
+        db.commit()
+        return org.id, patient.id
+    finally:
+        db.close()
+
+
+def drop_patient(org_id, patient_id):
+    db = SessionLocal()
+    try:
+        db.query(models.MedicalDocument).filter(models.MedicalDocument.patient_id == patient_id).delete(synchronize_session=False)
+        db.query(models.User).filter(models.User.id == patient_id).delete(synchronize_session=False)
+        db.query(models.Organization).filter(models.Organization.id == org_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def offset_page(db, patient_id, offset, limit):
+    documents = models.MedicalDocument.__table__
+    return db.execute(
+        select(*crud_document.LIST_COLUMNS)
+        .where(documents.c.patient_id == patient_id)
+        .order_by(documents.c.created_at.desc(), documents.c.id.desc())
+        .offset(offset)
+        .limit(limit)
+    ).all()
+
+
+def measure(label, repeat, read):
+    latencies = []
+    rows = 0
+    db = SessionLocal()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(read(db))
+            latencies.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    print(f"{label:<30} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms   {rows:6d} rows")
+
+
+def run(args):
+    org_id, patient_id = create_patient(args.documents)
+    limit = args.page_size
+    try:
+        db = SessionLocal()
+        before = offset_page(db, patient_id, args.depth - 1, 1)[0]
+        db.close()
+        deep_cursor = crud_document.encode_document_cursor(before.created_at, before.id)
+        print(f"{args.documents} documents, page size {limit}, deep page at row {args.depth}")
+
+        measure("previous: all documents", max(args.repeat // 10, 1), lambda db: (
+            db.query(models.MedicalDocument)
+            .filter(models.MedicalDocument.patient_id == patient_id)
+            .order_by(models.MedicalDocument.created_at.desc())
+            .all()
+        ))
+        measure("offset, first page", args.repeat, lambda db: offset_page(db, patient_id, 0, limit))
+        measure("offset, deep page", args.repeat, lambda db: offset_page(db, patient_id, args.depth, limit))
+        measure("keyset, first page", args.repeat, lambda db: crud_document.get_documents_for_patient(
+            db, patient_id=patient_id, limit=limit).items)
+        measure("keyset, deep page", args.repeat, lambda db: crud_document.get_documents_for_patient(
+            db, patient_id=patient_id, limit=limit, cursor=deep_cursor).items)
+        measure(f"keyset, search '{args.search}'", args.repeat, lambda db: crud_document.get_documents_for_patient(
+            db, patient_id=patient_id, limit=limit, search=args.search).items)
+    finally:
+        drop_patient(org_id, patient_id)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=40000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--search", default="report-012")
+    run(parser.parse_args())
@@ -0,0 +1,126 @@
+"""
+Benchmark upload image compression: images per second and CPU time per upload
+
+Usage:
+    python scripts/benchmarks/bench_images.py --fixtures path/to/photos --rounds 3 --workers 4
+
+Pure CPU, no database or S3 needed. Compresses every image in --fixtures
+(JPEG/PNG files; without it a synthetic set is generated: phone-camera and
+full-HD JPEGs and a transparent PNG screenshot) --rounds times with:
+
+* the previous code path: full decode, LANCZOS resize, then optimized encodes
+  at 85, 75, 60, 45, 30 until one fits;
+* compress_image_bytes in process (draft decode, quality search);
+* ImagePipeline with --workers processes, submitting --workers uploads at a
+  time as concurrent requests would.
+
+Reports images per second, CPU milliseconds per upload (the in-process runs;
+the pool's CPU is spent in its workers) and the average output size and
+number of encodes.
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from PIL import Image
+
+from app.utils.image_pipeline import ImagePipeline, compress_image_bytes
+
+
+def synthetic_fixtures(seed):
+    rng = random.Random(seed)
+    fixtures = []
+    for width, height, fmt, mode in ((4032, 3024, "JPEG", "RGB"), (1920, 1080, "JPEG", "RGB"), (1280, 800, "PNG", "RGBA")):
+        # Smooth gradients plus noise, roughly as hard to compress as a photo
+        base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        noise = Image.frombytes("RGB", (256, 256), bytes(rng.getrandbits(8) for _ in range(256 * 256 * 3)))
+        image = Image.blend(base, noise.resize((width, height)), 0.35).convert(mode)
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, **({"quality": 95} if fmt == "JPEG" else {}))
+        fixtures.append((f"{width}x{height}.{fmt.lower()}", buffer.getvalue()))
+    return fixtures
+
+
+def load_fixtures(directory):
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    return [(path.name, path.read_bytes()) for path in paths]
+
+
+def legacy_compress(data, max_size_kb=500, max_width=800):
+    image = Image.open(io.BytesIO(data))
+    if image.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        if image.mode == "P":
+            image = image.convert("RGBA")
+        background.paste(image, mask=image.split()[-1] if image.mode == "RGBA" else None)
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    if image.width > max_width:
+        image = image.resize((max_width, int(image.height * max_width / image.width)), Image.Resampling.LANCZOS)
+    for encodes, quality in enumerate([85, 75, 60, 45, 30], start=1):
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        if len(buffer.getvalue()) <= max_size_kb * 1024 or quality == 30:
+            return buffer.getvalue(), encodes
+
+
+def report(label, count, wall, cpu, sizes, encodes):
+    cpu_text = f"{cpu / count * 1000:8.1f} ms CPU/upload" if cpu is not None else " " * 22
+    print(
+        f"{label:<26} {count / wall:8.1f} images/s   {cpu_text}   "
+        f"avg {sum(sizes) / len(sizes) / 1024:6.1f} KB   {sum(encodes) / len(encodes):4.1f} encodes"
+    )
+
+
+def run(args):
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures(args.seed)
+    work = [data for _ in range(args.rounds) for _, data in fixtures]
+    print(f"{len(fixtures)} fixtures x {args.rounds} rounds, target {args.max_size_kb} KB, width {args.max_width}")
+
+    sizes, encodes = [], []
+    wall, cpu = time.perf_counter(), time.process_time()
+    for data in work:
+        output, count = legacy_compress(data, args.max_size_kb, args.max_width)
+        sizes.append(len(output))
+        encodes.append(count)
+    report("previous quality loop", len(work), time.perf_counter() - wall, time.process_time() - cpu, sizes, encodes)
+
+    sizes, encodes = [], []
+    wall, cpu = time.perf_counter(), time.process_time()
+    for data in work:
+        result = compress_image_bytes(data, args.max_size_kb, args.max_width)
+        sizes.append(len(result.data))
+        encodes.append(result.encodes)
+    report("pipeline, in process", len(work), time.perf_counter() - wall, time.process_time() - cpu, sizes, encodes)
+
+    pipeline = ImagePipeline(workers=args.workers)
+    # Start the workers outside the timed section
+    pipeline.compress(work[0], args.max_size_kb, args.max_width)
+    with ThreadPoolExecutor(max_workers=args.workers) as requests:
+        wall = time.perf_counter()
+        results = list(requests.map(lambda data: pipeline.compress(data, args.max_size_kb, args.max_width), work))
+        elapsed = time.perf_counter() - wall
+    pipeline.shutdown()
+    report(
+        f"pipeline, {args.workers} processes", len(work), elapsed, None,
+        [len(r.data) for r in results], [r.encodes for r in results]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=None, help="Directory of JPEG/PNG files (default: synthetic set)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-size-kb", type=int, default=500)
+    parser.add_argument("--max-width", type=int, default=800)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
@@ -0,0 +1,135 @@
+"""
+Login load test
+
+Usage:
+    python scripts/benchmarks/bench_login.py --url http://localhost:8000 --logins 2000 --concurrency 64
+
+Needs a running service (--url) and its database at DATABASE_URL. Inserts
+--users users in a throwaway organization, all holding one role with up to
+--permissions of the seeded permissions, then fires --logins POST
+/api/v1/auth/login requests from --concurrency threads at once, the way a
+shift change does. Reports logins per second, p50/p99 latency and how many
+requests were shed with 503 by the bounded bcrypt pool.
+
+Passwords are stored with --hash-rounds; when that differs from the
+service's BCRYPT_ROUNDS the first login of each user also rehashes it.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from passlib.context import CryptContext
+
+from app.db import models
+from app.db.session import SessionLocal, engine
+
+PASSWORD = "bench-password-123"
+
+
+def create_users(count, permissions, hash_rounds):
+    hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=hash_rounds).hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        org = models.Organization(name=f"bench-{uuid.uuid4().hex[:8]}")
+        db.add(org)
+        db.flush()
+        role = models.Role(name="Bench Staff", description="Login benchmark", organization_id=org.id)
+        role.permissions = db.query(models.Permission).limit(permissions).all()
+        users = [
+            models.User(
+                email=f"bench-{uuid.uuid4().hex}@example.com",
+                hashed_password=hashed,
+                organization_id=org.id,
+                roles=[role]
+            )
+            for _ in range(count)
+        ]
+        db.add_all(users)
+        db.commit()
+        return org.id, [user.email for user in users]
+    finally:
+        db.close()
+
+
+def drop_users(org_id):
+    db = SessionLocal()
+    try:
+        users = db.query(models.User).filter(models.User.organization_id == org_id).all()
+        user_ids = [user.id for user in users]
+        db.query(models.RefreshToken).filter(models.RefreshToken.user_id.in_(user_ids)).delete(synchronize_session=False)
+        for user in users:
+            user.roles = []
+        db.flush()
+        db.query(models.User).filter(models.User.organization_id == org_id).delete(synchronize_session=False)
+        for role in db.query(models.Role).filter(models.Role.organization_id == org_id).all():
+            db.delete(role)
+        db.query(models.Organization).filter(models.Organization.id == org_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def login(url, email):
+    body = json.dumps({"email": email, "password": PASSWORD}).encode()
+    request = urllib.request.Request(
+        f"{url}/api/v1/auth/login", data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            status = response.status
+            response.read()
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    org_id, emails = create_users(args.users, args.permissions, args.hash_rounds)
+    work = [rng.choice(emails) for _ in range(args.logins)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(lambda email: login(args.url, email), work))
+            elapsed = time.perf_counter() - started
+    finally:
+        drop_users(org_id)
+        engine.dispose()
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(latency for status, latency in results if status == 200)
+    if not latencies:
+        print(f"no successful logins: {dict(statuses)}")
+        return
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    print(
+        f"{statuses[200] / elapsed:.1f} logins/s   p50 {p50:.0f} ms   p99 {p99:.0f} ms   "
+        f"shed (503) {statuses[503]}   other {sum(statuses.values()) - statuses[200] - statuses[503]}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--permissions", type=int, default=20)
+    parser.add_argument("--hash-rounds", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
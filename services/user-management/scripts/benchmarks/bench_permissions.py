@@ -0,0 +1,97 @@
+"""
+Benchmark authorization checks and login-time permission resolution
+
+Usage:
+    python scripts/benchmarks/bench_permissions.py --permissions 64 --roles 2 --checks 200000
+
+Pure CPU, no database needed. Builds a catalog of --permissions permissions,
+--role-pool roles of --per-role permissions each and users holding up to
+--roles of those roles, then times:
+
+* authorization: the old check (the token's permission list turned into a
+  set, then a name lookup) against the compiled one (hex mask decoded, then
+  a bit test), reported as checks per second;
+* token issuance: walking roles -> permissions for the names (as login did)
+  against OR-ing the roles' compiled masks and mapping the bits to names.
+
+The database side of login (no roles -> permissions query any more) is
+covered by bench_login.py.
+"""
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from app.core.permission_compiler import (
+    PermissionCatalog, PermissionCompiler, decode_mask, encode_mask, has_permission
+)
+
+
+def build(args, rng):
+    names = [f"resource{i // 4}:action{i % 4}" for i in range(args.permissions)]
+    catalog = PermissionCatalog(bits={name: bit for bit, name in enumerate(names)}, names=tuple(names))
+    permissions = [SimpleNamespace(name=name, bit_index=bit) for bit, name in enumerate(names)]
+    compiler = PermissionCompiler()
+    # The catalog normally comes from the database on first use
+    compiler._catalog = catalog
+    pool = [
+        SimpleNamespace(permissions=rng.sample(permissions, args.per_role), permission_mask=None, permissions_version=0)
+        for _ in range(args.role_pool)
+    ]
+    compiler.compile_roles(db=None, roles=pool)
+    users = [rng.sample(pool, rng.randint(1, args.roles)) for _ in range(args.users)]
+    return names, catalog, compiler, users
+
+
+def rate(label, count, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {count / elapsed:>12,.0f}/s   {elapsed / count * 1e6:8.2f} us each")
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    names, catalog, compiler, users = build(args, rng)
+
+    tokens = []
+    for roles in users:
+        mask = compiler.mask_of(db=None, roles=roles)
+        tokens.append((list(catalog.names_of(mask)), encode_mask(mask)))
+    checks = [(rng.choice(tokens), rng.choice(names)) for _ in range(args.checks)]
+    required = [(token, catalog.bits[name]) for token, name in checks]
+
+    def set_checks():
+        for (perms, _), name in checks:
+            name in set(perms)
+
+    def mask_checks():
+        for (_, pmask), bit in required:
+            has_permission(decode_mask(pmask), bit)
+
+    rate("authorization, name set", len(checks), set_checks)
+    rate("authorization, compiled mask", len(checks), mask_checks)
+
+    def traverse():
+        for roles in users:
+            {perm.name for role in roles for perm in role.permissions}
+
+    def compiled():
+        for roles in users:
+            compiler.names(None, compiler.mask_of(db=None, roles=roles))
+
+    rate("token claims, roles -> permissions", len(users), traverse)
+    rate("token claims, OR of role masks", len(users), compiled)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--permissions", type=int, default=64)
+    parser.add_argument("--roles", type=int, default=2)
+    parser.add_argument("--per-role", type=int, default=12)
+    parser.add_argument("--role-pool", type=int, default=30)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--checks", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
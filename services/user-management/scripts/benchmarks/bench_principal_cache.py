@@ -0,0 +1,118 @@
+"""
+Benchmark /users/me throughput with and without the principal cache
+
+Usage:
+    python scripts/benchmarks/bench_principal_cache.py --requests 5000 --users 200
+
+Runs against DATABASE_URL (a disposable Postgres database with the schema
+created). Inserts --users users in a throwaway organization, mints an access
+token for each and calls GET /api/v1/users/me through the ASGI app for
+random users, first with the principal cache disabled (every request looks
+the user up by email, as get_current_user_from_db used to) and then with it
+enabled. Reports requests per second, latency percentiles and the number of
+SQL statements per request.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token, hash_password
+from app.db import models
+from app.db.session import SessionLocal, engine
+from app.main import app
+
+
+def create_users(count):
+    db = SessionLocal()
+    try:
+        org = models.Organization(name=f"bench-{uuid.uuid4().hex[:8]}")
+        db.add(org)
+        db.flush()
+        hashed = hash_password("bench-password")
+        users = [
+            models.User(email=f"bench-{uuid.uuid4().hex}@example.com", hashed_password=hashed, organization_id=org.id)
+            for _ in range(count)
+        ]
+        db.add_all(users)
+        db.commit()
+        tokens = [
+            create_access_token(subject=user.email, claims={"role": "PATIENT", "org_id": str(org.id), "perms": []})
+            for user in users
+        ]
+        return org.id, tokens
+    finally:
+        db.close()
+
+
+def drop_users(org_id):
+    db = SessionLocal()
+    try:
+        db.query(models.User).filter(models.User.organization_id == org_id).delete()
+        db.query(models.Organization).filter(models.Organization.id == org_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_mode(name, client, work, statements):
+    latencies = []
+    statements.clear()
+    started = time.perf_counter()
+    for token in work:
+        request_started = time.perf_counter()
+        response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+        latencies.append(time.perf_counter() - request_started)
+        assert response.status_code == 200, response.text
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{name:<10} {len(work) / elapsed:>8.0f} req/s   p50 {p50:6.2f} ms   p99 {p99:6.2f} ms   "
+        f"{len(statements) / len(work):.2f} statements/request"
+    )
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    org_id, tokens = create_users(args.users)
+    work = [rng.choice(tokens) for _ in range(args.requests)]
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a, **kw: statements.append(1))
+    ttl_seconds = principal_cache.ttl_seconds
+
+    try:
+        # Not entered as a context manager, so the startup tasks do not run
+        client = TestClient(app)
+        principal_cache.ttl_seconds = 0
+        run_mode("uncached", client, work, statements)
+
+        principal_cache.ttl_seconds = ttl_seconds
+        principal_cache.clear()
+        principal_cache.hits = principal_cache.misses = 0
+        run_mode("cached", client, work, statements)
+        print(f"cache hits {principal_cache.hits}, misses {principal_cache.misses}")
+    finally:
+        drop_users(org_id)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
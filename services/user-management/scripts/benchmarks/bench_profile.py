@@ -0,0 +1,155 @@
+"""
+Benchmark the profile read endpoints: queries per request and latency
+
+Usage:
+    python scripts/benchmarks/bench_profile.py --users 200 --insurances 3 --requests 5000
+
+Needs the database at DATABASE_URL. Creates --users users in a throwaway
+organization, each with two roles, --insurances insurance policies and a
+primary address, then serves --requests profile reads (round-robin over the
+users and over /me, /me/tabs and /me/profile-tabs) three ways:
+
+* per-route lazy loading: the user row, then roles, insurances and addresses
+  as each route touches them (how the routes loaded data before);
+* the assembler's single joined query, no cache;
+* the assembler with its per-user cache, as the routes run now.
+
+Photo presigning is stubbed out so only the database side is measured.
+Reports SQL statements per request (counted on the engine) and p50/p99 latency.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import event
+
+from app.core.principal_cache import PrincipalCache, UserSnapshot
+from app.db import models
+from app.db.session import SessionLocal, engine
+from app.services.profile_assembler import ProfileAssembler, render_profile, render_profile_tabs
+
+RENDERERS = (render_profile, render_profile_tabs, render_profile_tabs)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def create_users(count, insurances):
+    db = SessionLocal()
+    try:
+        org = models.Organization(name=f"bench-{uuid.uuid4().hex[:8]}")
+        db.add(org)
+        db.flush()
+        roles = [
+            models.Role(name=name, description="Profile benchmark", organization_id=org.id)
+            for name in ("Bench Patient", "Bench Member")
+        ]
+        city = db.query(models.City).first()
+        users = []
+        for i in range(count):
+            user = models.User(
+                email=f"bench-{uuid.uuid4().hex}@example.com",
+                hashed_password="x",
+                first_name="Bench",
+                last_name=f"User {i}",
+                primary_contact="9999999999",
+                organization_id=org.id,
+                roles=list(roles)
+            )
+            user.insurances = [
+                models.PatientInsurance(policy_number=f"BENCH-{i}-{n}", provider_name="Bench Health")
+                for n in range(insurances)
+            ]
+            if city is not None:
+                user.addresses = [models.Address(
+                    address_line="1 Bench Street", city_id=city.id, state_id=city.state_id,
+                    country_id=city.state.country_id, is_primary=True
+                )]
+            users.append(user)
+        db.add_all(users)
+        db.commit()
+        return org.id, [(user.id, user.email) for user in users]
+    finally:
+        db.close()
+
+
+def drop_users(org_id):
+    db = SessionLocal()
+    try:
+        users = db.query(models.User).filter(models.User.organization_id == org_id).all()
+        for user in users:
+            user.roles = []
+            db.delete(user)
+        db.flush()
+        for role in db.query(models.Role).filter(models.Role.organization_id == org_id).all():
+            db.delete(role)
+        db.query(models.Organization).filter(models.Organization.id == org_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def lazy_read(db, user_id):
+    # What each route did: its own user lookup, then lazy loads per relationship
+    user = db.get(models.User, user_id)
+    [role.name for role in user.roles]
+    [insurance.policy_number for insurance in user.insurances]
+    [address.city for address in user.addresses]
+
+
+def measure(label, users, requests, counter, read):
+    latencies = []
+    counter.count = 0
+    for i in range(requests):
+        user_id, email = users[i % len(users)]
+        db = SessionLocal()
+        started = time.perf_counter()
+        read(db, user_id, email, RENDERERS[i % len(RENDERERS)])
+        latencies.append(time.perf_counter() - started)
+        db.close()
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    print(f"{label:<28} {counter.count / requests:6.2f} queries/request   p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+
+def run(args):
+    org_id, users = create_users(args.users, args.insurances)
+    counter = QueryCounter()
+    principals = PrincipalCache()
+    assembler = ProfileAssembler(presign=lambda key: key, principals=principals)
+
+    def principal(user_id, email):
+        return UserSnapshot(id=user_id, email=email, organization_id=org_id, is_active=True, role_version=0)
+
+    try:
+        measure("per-route lazy loading", users, args.requests, counter,
+                lambda db, user_id, email, render: lazy_read(db, user_id))
+        measure("assembler, single query", users, args.requests, counter,
+                lambda db, user_id, email, render: render(assembler.load(db, user_id)))
+        measure("assembler, cached", users, args.requests, counter,
+                lambda db, user_id, email, render: render(assembler.get(db, principal(user_id, email))))
+        print(f"cache hits {assembler.hits}, misses {assembler.misses}")
+    finally:
+        drop_users(org_id)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--insurances", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=5000)
+    run(parser.parse_args())
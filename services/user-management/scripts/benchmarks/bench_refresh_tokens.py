@@ -0,0 +1,150 @@
+"""
+Benchmark refresh token redemption against a large token table
+
+Usage:
+    python scripts/benchmarks/bench_refresh_tokens.py --tokens 10000000 --revoked 100000 --refreshes 20000
+
+Needs the database at DATABASE_URL, migrated to head. Bulk inserts --tokens
+refresh tokens (digests only, via generate_series, so 10M rows take a few
+minutes rather than hours) and --revoked blacklisted JTIs, a tenth of each
+already expired, then mints --users real refresh tokens and redeems them
+--refreshes times in a row, each refresh doing what POST
+/api/v1/auth/refresh-token does with the token store:
+
+* revocation check: the Bloom filter, then the blacklist only on a positive,
+  timed against querying the blacklist on every check (as before);
+* ownership lookup by sha256 digest on the unique index;
+* rotation: delete the redeemed token, insert the new one.
+
+Then runs the batched purge and reports how many expired rows it removed and
+how long that took. All rows written are removed at the end.
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from jose import jwt
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.security import create_refresh_token
+from app.core.token_store import RefreshTokenStore
+from app.crud import crud_token
+from app.db.session import SessionLocal, engine
+
+# Marks the bulk rows so they can be dropped afterwards
+BULK_USER_ID = uuid.UUID("00000000-0000-0000-0000-0000000b0045")
+BATCH = 1_000_000
+
+
+def jti_of(token):
+    return jwt.get_unverified_claims(token)["jti"]
+
+
+def seed(db, tokens, revoked):
+    for start in range(0, tokens, BATCH):
+        db.execute(
+            text(
+                "INSERT INTO refresh_tokens (id, user_id, token_digest, expires_at) "
+                "SELECT gen_random_uuid(), :user_id, encode(sha256(convert_to(:run || i::text, 'UTF8')), 'hex'), "
+                "CASE WHEN i % 10 = 0 THEN now() - interval '1 day' ELSE now() + interval '15 days' END "
+                "FROM generate_series(:start, :stop) AS i"
+            ),
+            {"user_id": BULK_USER_ID, "run": uuid.uuid4().hex, "start": start, "stop": min(start + BATCH, tokens) - 1}
+        )
+        db.commit()
+        print(f"  {min(start + BATCH, tokens):,} tokens", flush=True)
+    db.execute(
+        text(
+            "INSERT INTO revoked_refresh_tokens (id, token_jti, expires_at) "
+            "SELECT gen_random_uuid(), 'bench-' || gen_random_uuid()::text, "
+            "CASE WHEN i % 10 = 0 THEN now() - interval '1 day' ELSE now() + interval '15 days' END "
+            "FROM generate_series(1, :count) AS i"
+        ),
+        {"count": revoked}
+    )
+    db.commit()
+    db.execute(text("ANALYZE refresh_tokens"))
+    db.execute(text("ANALYZE revoked_refresh_tokens"))
+    db.commit()
+
+
+def cleanup(db, user_ids):
+    db.execute(text("DELETE FROM refresh_tokens WHERE user_id = ANY(:ids)"), {"ids": [BULK_USER_ID, *user_ids]})
+    db.execute(text("DELETE FROM revoked_refresh_tokens WHERE token_jti LIKE 'bench-%'"))
+    db.commit()
+
+
+def redeem(db, store, tokens, refreshes, check_revoked):
+    """Redeem the given tokens round-robin; returns refreshes per second and the latest tokens."""
+    tokens = dict(tokens)
+    users = list(tokens)
+    started = time.perf_counter()
+    for i in range(refreshes):
+        user_id = users[i % len(users)]
+        token = tokens[user_id]
+        if check_revoked(db, token):
+            raise RuntimeError("live token reported revoked")
+        if store.owner(db, token) != user_id:
+            raise RuntimeError("token not found")
+        new_token = create_refresh_token(subject=f"{user_id}@bench")
+        store.rotate(db, user_id=user_id, old_token=token, new_token=new_token)
+        tokens[user_id] = new_token
+    return refreshes / (time.perf_counter() - started), tokens
+
+
+def run(args):
+    db = SessionLocal()
+    store = RefreshTokenStore(capacity=settings.REVOKED_TOKEN_BLOOM_CAPACITY, redis_url=args.redis_url)
+    user_ids = [uuid.uuid4() for _ in range(args.users)]
+    try:
+        print(f"seeding {args.tokens:,} tokens and {args.revoked:,} revoked JTIs")
+        started = time.perf_counter()
+        seed(db, args.tokens, args.revoked)
+        print(f"seeded in {time.perf_counter() - started:.0f} s")
+
+        tokens = {}
+        for user_id in user_ids:
+            token = create_refresh_token(subject=f"{user_id}@bench")
+            store.issue(db, user_id=user_id, token=token)
+            tokens[user_id] = token
+
+        started = time.perf_counter()
+        store.rebuild_bloom(db)
+        print(f"bloom filter built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        def bloom_check(db, token):
+            return store.is_revoked(db, jti_of(token))
+
+        def query_check(db, token):
+            return crud_token.is_token_revoked(db, token_jti=jti_of(token))
+
+        rate, tokens = redeem(db, store, tokens, args.refreshes, query_check)
+        print(f"refresh, blacklist queried      {rate:10,.0f}/s")
+        rate, tokens = redeem(db, store, tokens, args.refreshes, bloom_check)
+        print(f"refresh, bloom filter first     {rate:10,.0f}/s   "
+              f"(filter positives {store.bloom_hits}, negatives {store.bloom_misses})")
+
+        started = time.perf_counter()
+        deleted = crud_token.purge_expired_tokens(db, batch_size=args.purge_batch)
+        print(f"purged {deleted:,} expired rows in {time.perf_counter() - started:.1f} s")
+    finally:
+        cleanup(db, user_ids)
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10_000_000)
+    parser.add_argument("--revoked", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--refreshes", type=int, default=20000)
+    parser.add_argument("--purge-batch", type=int, default=settings.TOKEN_PURGE_BATCH_SIZE)
+    parser.add_argument("--redis-url", default=None, help="Mirror tokens in Redis, as TOKEN_STORE_REDIS_URL does")
+    run(parser.parse_args())
@@ -0,0 +1,143 @@
+"""
+Benchmark tenant-routed request throughput
+
+Usage:
+    python scripts/benchmarks/bench_tenant_routing.py --tenants 500 --requests 20000 --workers 16
+
+Runs against DATABASE_URL (a disposable Postgres database). Creates --tenants
+org_<id> schemas holding a small tenant table, then replays --requests
+requests from --workers threads (FastAPI runs the sync get_db dependency in
+its threadpool the same way). Each request checks out a connection, routes
+it to a tenant, reads one row through a Session and returns the connection.
+Routing is done three ways:
+
+* legacy       - SET search_path on every request, as get_db used to
+* search_path  - TenantRouter skipping the SET when the pooled connection
+                 already points at the tenant
+* translate    - TenantRouter qualifying tenant tables via schema_translate_map
+
+--hot-share of the requests go to --hot-tenants tenants, the rest are spread
+over all of them. Reports requests per second and latency percentiles.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SEARCH_PATH_TRANSLATE_MAP, TENANT_SCHEMA
+from app.db.tenancy import TenantRouter, tenant_schema_name, tenant_translate_map
+
+bench_items = Table(
+    "bench_tenant_items", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("note", String(64), nullable=False),
+    schema=TENANT_SCHEMA
+)
+
+
+def make_engine(pool_size):
+    return create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=0,
+        execution_options={"schema_translate_map": SEARCH_PATH_TRANSLATE_MAP}
+    )
+
+
+def create_tenants(engine, org_ids):
+    for org_id in org_ids:
+        schema = tenant_schema_name(org_id)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+            conn = conn.execution_options(schema_translate_map=tenant_translate_map(schema))
+            bench_items.create(conn, checkfirst=True)
+            conn.execute(bench_items.insert(), [{"id": i, "note": f"{schema}-{i}"} for i in range(1, 11)])
+
+
+def drop_tenants(engine, org_ids):
+    with engine.begin() as conn:
+        for org_id in org_ids:
+            conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {tenant_schema_name(org_id)} CASCADE")
+
+
+def legacy_connect(engine, org_id):
+    connection = engine.connect()
+    connection.exec_driver_sql(f"SET search_path TO {tenant_schema_name(org_id)}, public")
+    return connection
+
+
+def request(connect, org_id, row_id):
+    started = time.perf_counter()
+    with connect(org_id) as connection:
+        db = Session(bind=connection)
+        try:
+            db.execute(select(bench_items.c.note).where(bench_items.c.id == row_id)).scalar_one()
+        finally:
+            db.close()
+    return time.perf_counter() - started
+
+
+def run_mode(name, connect, work, workers):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        latencies = list(pool.map(lambda item: request(connect, *item), work))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<12} {len(work) / elapsed:>9.0f} req/s   p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    engine = make_engine(args.pool_size)
+    org_ids = [uuid.uuid4() for _ in range(args.tenants)]
+
+    started = time.perf_counter()
+    create_tenants(engine, org_ids)
+    print(f"created {len(org_ids)} tenant schemas in {time.perf_counter() - started:.1f}s")
+
+    hot = rng.sample(org_ids, min(args.hot_tenants, len(org_ids)))
+    work = [
+        (rng.choice(hot) if rng.random() < args.hot_share else rng.choice(org_ids), rng.randint(1, 10))
+        for _ in range(args.requests)
+    ]
+
+    try:
+        modes = [("legacy", lambda org_id: legacy_connect(engine, org_id))]
+        for mode in ("search_path", "translate"):
+            modes.append((mode, TenantRouter(engine, mode=mode).connect))
+
+        for name, connect in modes:
+            # Every mode starts from a cold pool
+            engine.dispose()
+            run_mode(name, connect, work, args.workers)
+    finally:
+        engine.dispose()
+        drop_tenants(engine, org_ids)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=16)
+    parser.add_argument("--hot-tenants", type=int, default=20)
+    parser.add_argument("--hot-share", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
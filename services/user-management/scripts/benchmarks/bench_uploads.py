@@ -0,0 +1,171 @@
+"""
+Benchmark the /files/upload storage path: latency and disk I/O per upload
+
+Usage:
+    pip install "moto[s3]"
+    python scripts/benchmarks/bench_uploads.py --uploads 200 --size-kb 300 --large-mb 20 --users 20
+
+S3 is moto's in-process mock, so no AWS account is needed. Builds a
+multipart/form-data body per upload (--size-kb each, plus a --large-mb one
+every 20th upload, spread over --users users) and stores it two ways:
+
+* the previous path: spool the parsed file to a local copy under a temporary
+  UPLOAD_DIR, write the user's folder marker (create_user_bucket), then
+  upload_fileobj the local copy;
+* the streamed path: MultipartStream feeding a StreamingUpload in 64 KB
+  request chunks, with the user prefix checked through KnownPrefixes.
+
+No compression either way (.bin files), so only storage is compared. Reports
+p50/p99 latency, S3 calls and bytes written/read through the file system per
+upload (from /proc/self/io; moto keeps large objects in spooled temporary
+files, which shows up equally in both rows).
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import boto3
+try:
+    from moto import mock_aws as mock_s3  # moto >= 5
+except ImportError:
+    from moto import mock_s3
+
+from app.integrations.s3_uploads import KnownPrefixes, MultipartStream, StreamingUpload, user_prefix
+
+BUCKET = "bench-uploads"
+CHUNK = 64 * 1024
+BOUNDARY = "benchboundary"
+
+
+def form_body(file_type, user_id, size):
+    head = (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file_type"\r\n\r\n{file_type}\r\n'
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="user_id"\r\n\r\n{user_id}\r\n'
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="scan.bin"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    return head + os.urandom(size) + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def chunks(body):
+    for start in range(0, len(body), CHUNK):
+        yield body[start:start + CHUNK]
+
+
+def disk_io():
+    try:
+        with open("/proc/self/io") as stats:
+            values = dict(line.split(": ") for line in stats.read().splitlines())
+        return int(values["wchar"]), int(values["rchar"])
+    except OSError:
+        return 0, 0
+
+
+class CallCounter:
+    def __init__(self, client):
+        self.count = 0
+        client.meta.events.register("before-call.s3.*", self._count)
+
+    def _count(self, **kwargs):
+        self.count += 1
+
+
+def previous_path(client, body, upload_dir):
+    # The parsed file was spooled (as UploadFile does) and then copied to UPLOAD_DIR
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    form = MultipartStream(f"multipart/form-data; boundary={BOUNDARY}")
+    for chunk in chunks(body):
+        for data in form.feed(chunk):
+            spooled.write(data)
+    form.finish()
+    spooled.seek(0)
+    user_id, file_type = form.fields["user_id"], form.fields["file_type"]
+    path = os.path.join(upload_dir, file_type, f"{uuid.uuid4()}_{form.filename}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as local:
+        shutil.copyfileobj(spooled, local)
+    spooled.close()
+
+    folder = f"users/bench_{user_id}/"
+    client.put_object(Bucket=BUCKET, Key=folder)
+    with open(path, "rb") as local:
+        client.upload_fileobj(local, BUCKET, f"{folder}{file_type}/{uuid.uuid4()}-{form.filename}")
+
+
+def streamed_path(client, body, prefixes):
+    form = MultipartStream(f"multipart/form-data; boundary={BOUNDARY}")
+
+    def key():
+        prefix = user_prefix(form.fields["user_id"])
+        prefixes.ensure(client, BUCKET, prefix)
+        return f"{prefix}{form.fields['file_type']}/{uuid.uuid4()}-{form.filename}"
+
+    upload = None
+    for chunk in chunks(body):
+        data = form.feed(chunk)
+        if upload is None and form.file_started:
+            upload = StreamingUpload(client, BUCKET, key, content_type=form.file_content_type)
+        for piece in data:
+            upload.write(piece)
+        if upload is not None and upload.ready:
+            upload.flush()
+    form.finish()
+    upload.complete()
+
+
+def measure(label, bodies, counter, store):
+    latencies = []
+    counter.count = 0
+    written, read = disk_io()
+    for body in bodies:
+        started = time.perf_counter()
+        store(body)
+        latencies.append(time.perf_counter() - started)
+    wchar, rchar = disk_io()
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    print(
+        f"{label:<16} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   {counter.count / len(bodies):5.2f} S3 calls/upload   "
+        f"disk {(wchar - written) / len(bodies) / 1024:8.1f} KB written, {(rchar - read) / len(bodies) / 1024:8.1f} KB read /upload"
+    )
+
+
+@mock_s3
+def run(args):
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    counter = CallCounter(client)
+    users = [str(uuid.uuid4()) for _ in range(args.users)]
+    bodies = [
+        form_body("medical_record", users[i % len(users)], args.large_mb * 1024 * 1024 if i % 20 == 19 else args.size_kb * 1024)
+        for i in range(args.uploads)
+    ]
+    print(f"{args.uploads} uploads of {args.size_kb} KB (every 20th {args.large_mb} MB) over {args.users} users")
+
+    upload_dir = tempfile.mkdtemp(prefix="bench-uploads-")
+    try:
+        measure("previous path", bodies, counter, lambda body: previous_path(client, body, upload_dir))
+    finally:
+        shutil.rmtree(upload_dir)
+    prefixes = KnownPrefixes()
+    measure("streamed", bodies, counter, lambda body: streamed_path(client, body, prefixes))
+    print(f"prefix cache hits {prefixes.hits}, misses {prefixes.misses}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=300)
+    parser.add_argument("--large-mb", type=int, default=20)
+    parser.add_argument("--users", type=int, default=20)
+    run(parser.parse_args())
@@ -63,4 +63,27 @@ def test_confirm_upload(client: TestClient, db_session: Session, s3_mock):
     
     # 3. Verify status in DB
     db_doc = db_session.query(models.MedicalDocument).filter(models.MedicalDocument.id == document_id).first()
-    assert db_doc.status == models.DocumentStatus.UPLOAD_COMPLETE
\ No newline at end of file
+    assert db_doc.status == models.DocumentStatus.UPLOAD_COMPLETE
+
+def test_get_my_documents(client: TestClient, db_session: Session, s3_mock):
+    """
+    Test listing the logged-in patient's documents, which resolves the caller from the token.
+    """
+    headers = get_admin_auth_headers(client)
+    user = db_session.query(models.User).filter(models.User.email.contains("admin_")).first()
+    user.patient_profile.s3_data_prefix = f"patient-data/{user.id}"
+    db_session.commit()
+    
+    gen_response = client.post(
+        f"{settings.API_V1_STR}/documents/generate-upload-url", 
+        headers=headers, 
+        json={"file_name": "report.pdf", "content_type": "application/pdf", "document_category": "LAB_REPORT"}
+    )
+    document_id = gen_response.json()["document_id"]
+    
+    response = client.get(f"{settings.API_V1_STR}/documents", headers=headers, params={"limit": 10})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [document_id]
+    assert data["next_cursor"] is None
@@ -8,14 +8,17 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.main import app
-from app.db.base import Base
+from app.db.base import Base, SEARCH_PATH_TRANSLATE_MAP
 from app.core.config import settings
 from app.api.v1.deps import get_db, get_public_db
 from app.scripts.seed import seed_permissions
 from app.api.v1.routers.connections import get_aadhaar_client
 
 # This engine is created once and points to our test database
-test_engine = create_engine(settings.TEST_DATABASE_URL)
+test_engine = create_engine(
+    settings.TEST_DATABASE_URL,
+    execution_options={"schema_translate_map": SEARCH_PATH_TRANSLATE_MAP}
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
 @pytest.fixture(scope="session", autouse=True)
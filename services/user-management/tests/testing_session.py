@@ -4,10 +4,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.base import SEARCH_PATH_TRANSLATE_MAP
 
 # Use the same test database URL
 TEST_DATABASE_URL = f"{settings.DATABASE_URL}_test"
 
 # Create a SYNCHRONOUS engine
-engine_test = create_engine(TEST_DATABASE_URL)
+engine_test = create_engine(
+    TEST_DATABASE_URL,
+    execution_options={"schema_translate_map": SEARCH_PATH_TRANSLATE_MAP}
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine_test)
\ No newline at end of file
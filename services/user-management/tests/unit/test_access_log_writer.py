@@ -0,0 +1,107 @@
+import logging
+import uuid
+from sqlalchemy.exc import IntegrityError
+from app.services.access_log_writer import AccessLogWriter
+
+class FakeSession:
+    """Records the rows of each INSERT; fails while failing is set or a row has a bad consent."""
+    batches = []
+    failing = False
+    bad_consents = set()
+
+    def execute(self, statement, rows):
+        if FakeSession.failing:
+            raise RuntimeError("database unavailable")
+        if any(row["consent_record_id"] in FakeSession.bad_consents for row in rows):
+            raise IntegrityError("INSERT INTO data_sharing_logs", {}, Exception("foreign key violation"))
+        FakeSession.batches.append(list(rows))
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+def make_writer(batch_size=3):
+    FakeSession.batches = []
+    FakeSession.failing = False
+    FakeSession.bad_consents = set()
+    # A long flush interval keeps the background thread out of the way until a batch fills
+    return AccessLogWriter(session_factory=FakeSession, batch_size=batch_size, flush_seconds=60)
+
+def log(writer, count):
+    for _ in range(count):
+        writer.log(consent_id=uuid.uuid4(), patient_id=uuid.uuid4(), consumer_id=uuid.uuid4(), data_accessed=["key"])
+
+def test_rows_are_written_in_batches():
+    """
+    Tests that queued rows go out in INSERTs of at most batch_size rows.
+    """
+    writer = make_writer(batch_size=3)
+    log(writer, 7)
+    writer.close()
+
+    assert sum(len(batch) for batch in FakeSession.batches) == 7
+    assert max(len(batch) for batch in FakeSession.batches) == 3
+
+def test_failed_batch_is_retried():
+    """
+    Tests that rows of a failed INSERT are kept and written with the next batch.
+    """
+    writer = make_writer()
+    log(writer, 2)
+    FakeSession.failing = True
+    assert writer.flush() == 0
+
+    FakeSession.failing = False
+    log(writer, 1)
+    assert writer.flush() == 3
+
+def test_bad_row_is_dead_lettered(caplog):
+    """
+    Tests that a row the database rejects is logged and dropped while the rest of its batch is written.
+    """
+    writer = make_writer(batch_size=10)
+    bad_consent = uuid.uuid4()
+    FakeSession.bad_consents = {bad_consent}
+    log(writer, 2)
+    writer.log(consent_id=bad_consent, patient_id=uuid.uuid4(), consumer_id=uuid.uuid4(), data_accessed=["key"])
+
+    with caplog.at_level(logging.ERROR, logger="app.services.access_log_writer.dead_letter"):
+        assert writer.flush() == 2
+
+    assert writer.dead_lettered == 1
+    assert str(bad_consent) in caplog.text
+    log(writer, 1)
+    assert writer.flush() == 1
+
+def test_retry_backlog_overflow_is_dead_lettered():
+    """
+    Tests that rows kept for retry beyond max_queue are dead-lettered oldest first, not silently dropped.
+    """
+    writer = AccessLogWriter(session_factory=FakeSession, batch_size=10, flush_seconds=60, max_queue=2)
+    FakeSession.batches = []
+    FakeSession.failing = True
+    log(writer, 2)
+    assert writer.flush() == 0
+    log(writer, 2)
+    assert writer.flush() == 0
+    assert writer.dead_lettered == 2
+
+    FakeSession.failing = False
+    assert writer.flush() == 2
+
+def test_full_queue_writes_in_caller():
+    """
+    Tests that a row is written straight away when the queue is full, and close() writes the rest.
+    """
+    writer = AccessLogWriter(session_factory=FakeSession, batch_size=10, flush_seconds=60, max_queue=1)
+    FakeSession.batches = []
+    log(writer, 2)
+    assert len(FakeSession.batches) == 1
+
+    writer.close()
+    assert sum(len(batch) for batch in FakeSession.batches) == 2
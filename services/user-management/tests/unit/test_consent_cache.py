@@ -0,0 +1,74 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+from app.core.consent_cache import DENIED, ConsentCache, ConsentDecision
+
+GRANTEE_ID, PATIENT_ID = uuid.uuid4(), uuid.uuid4()
+
+def counting_lookup(decision):
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        return decision
+    return lookup, calls
+
+def test_decision_is_cached_per_scope():
+    """
+    Tests that a grant is looked up once per data category.
+    """
+    cache = ConsentCache()
+    granted = ConsentDecision(uuid.uuid4(), datetime.utcnow() + timedelta(days=1))
+    lookup, calls = counting_lookup(granted)
+
+    assert cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup) == granted
+    assert cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup) == granted
+    cache.decide(GRANTEE_ID, PATIENT_ID, "PRESCRIPTION", lookup)
+
+    assert len(calls) == 2
+
+def test_grant_is_not_cached_past_consent_expiry():
+    """
+    Tests that a decision stops being served once its consent expires, even within the TTL.
+    """
+    cache = ConsentCache(ttl_seconds=60)
+    lookup, calls = counting_lookup(ConsentDecision(uuid.uuid4(), datetime.utcnow() + timedelta(seconds=0.05)))
+
+    cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup)
+    time.sleep(0.1)
+    cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup)
+
+    assert len(calls) == 2
+
+def test_create_or_revoke_invalidates_pair():
+    """
+    Tests that invalidating a pair drops every cached category, including denials.
+    """
+    cache = ConsentCache()
+    lookup, calls = counting_lookup(DENIED)
+
+    assert not cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup).granted
+    cache.decide(uuid.uuid4(), PATIENT_ID, "LAB_REPORT", lookup)
+    cache.invalidate(GRANTEE_ID, PATIENT_ID)
+
+    assert cache.get(GRANTEE_ID, PATIENT_ID, "LAB_REPORT") is None
+    assert len(calls) == 2
+
+def test_revoke_during_lookup_is_not_overwritten():
+    """
+    Tests that a decision looked up before a revoke is not cached after it.
+    """
+    cache = ConsentCache()
+    granted = ConsentDecision(uuid.uuid4(), datetime.utcnow() + timedelta(days=1))
+
+    def lookup_then_revoke():
+        cache.invalidate(GRANTEE_ID, PATIENT_ID)
+        return granted
+
+    assert cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup_then_revoke) == granted
+    assert cache.get(GRANTEE_ID, PATIENT_ID, "LAB_REPORT") is None
+
+    lookup, calls = counting_lookup(DENIED)
+    cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup)
+    cache.decide(GRANTEE_ID, PATIENT_ID, "LAB_REPORT", lookup)
+    assert len(calls) == 1
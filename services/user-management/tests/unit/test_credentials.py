@@ -0,0 +1,57 @@
+import threading
+import pytest
+from passlib.context import CryptContext
+from app.core.credentials import CredentialVerifier
+from app.core.exceptions import ServiceBusyException
+
+def make_verifier(rounds: int, **kwargs) -> CredentialVerifier:
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+    return CredentialVerifier(context, **kwargs)
+
+def test_verify_password():
+    """
+    Tests that the pool accepts the right password and rejects a wrong one.
+    """
+    verifier = make_verifier(4)
+    hashed = verifier.hash("a-valid-password-123")
+
+    assert verifier.verify("a-valid-password-123", hashed) == (True, None)
+    assert verifier.verify("not-the-password", hashed) == (False, None)
+
+def test_rehash_when_cost_factor_changes():
+    """
+    Tests that a hash made with the old cost factor is replaced after a successful login.
+    """
+    old_hash = make_verifier(4).hash("a-valid-password-123")
+    verifier = make_verifier(5)
+
+    valid, new_hash = verifier.verify("a-valid-password-123", old_hash)
+
+    assert valid is True
+    assert new_hash is not None and new_hash.startswith("$2b$05$")
+    assert verifier.verify("a-valid-password-123", new_hash) == (True, None)
+    # A wrong password never yields a replacement hash
+    assert verifier.verify("not-the-password", old_hash) == (False, None)
+
+def test_saturated_pool_sheds_load():
+    """
+    Tests that requests beyond the workers and the queue are refused instead of waiting.
+    """
+    verifier = make_verifier(4, workers=1, queue_size=0, queue_timeout_seconds=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+
+    holder = threading.Thread(target=verifier._run, args=(block,))
+    holder.start()
+    started.wait()
+    try:
+        with pytest.raises(ServiceBusyException):
+            verifier.hash("a-valid-password-123")
+    finally:
+        release.set()
+        holder.join()
+
+    assert verifier.hash("a-valid-password-123").startswith("$2b$04$")
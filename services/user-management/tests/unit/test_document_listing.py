@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import NamedTuple
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.crud.crud_document import (
+    decode_document_cursor, documents_page_query, encode_document_cursor, get_documents_for_patient
+)
+
+PATIENT_ID = uuid.uuid4()
+
+class Row(NamedTuple):
+    id: uuid.UUID
+    created_at: datetime
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+class FakeSession:
+    """Returns the given rows for any statement, like db.execute(...).all() would."""
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, statement):
+        return FakeResult(self.rows)
+
+def compile_sql(query):
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+def test_cursor_round_trip():
+    """
+    Tests that a cursor decodes to the position it was made from and junk is rejected.
+    """
+    created_at, doc_id = datetime(2025, 3, 1, 12, 30, 5, 123456), uuid.uuid4()
+
+    assert decode_document_cursor(encode_document_cursor(created_at, doc_id)) == (created_at, doc_id)
+    with pytest.raises(ValueError):
+        decode_document_cursor("not-a-cursor")
+
+def test_page_query_seeks_and_projects():
+    """
+    Tests that a cursor becomes a row comparison on (created_at, id) and only list columns are selected.
+    """
+    cursor = encode_document_cursor(datetime(2025, 3, 1), uuid.uuid4())
+    sql = compile_sql(documents_page_query(patient_id=PATIENT_ID, limit=20, cursor=cursor))
+
+    assert "(tenant.medical_documents.created_at, tenant.medical_documents.id) < (" in sql
+    assert "ORDER BY tenant.medical_documents.created_at DESC, tenant.medical_documents.id DESC" in sql
+    assert "LIMIT 21" in sql
+    assert "s3_key" not in sql.split("FROM")[0]
+
+def test_search_wildcards_match_literally():
+    """
+    Tests that % and _ typed in a search are escaped in the ILIKE pattern.
+    """
+    compiled = documents_page_query(patient_id=PATIENT_ID, limit=20, search="50%_off").compile(dialect=postgresql.dialect())
+
+    assert "ESCAPE" in str(compiled)
+    assert "%50\\%\\_off%" in compiled.params.values()
+
+def test_page_is_trimmed_with_next_cursor():
+    """
+    Tests that the extra row is dropped and the cursor points after the last returned row.
+    """
+    now = datetime(2025, 3, 1)
+    rows = [Row(uuid.uuid4(), now - timedelta(minutes=i)) for i in range(4)]
+
+    page = get_documents_for_patient(FakeSession(rows), patient_id=PATIENT_ID, limit=3)
+    assert page.items == rows[:3]
+    assert decode_document_cursor(page.next_cursor) == (rows[2].created_at, rows[2].id)
+
+    last = get_documents_for_patient(FakeSession(rows[:2]), patient_id=PATIENT_ID, limit=3)
+    assert last.next_cursor is None
@@ -0,0 +1,87 @@
+import io
+import random
+from PIL import Image
+from app.utils.image_pipeline import MIN_QUALITY, ImagePipeline, compress_image_bytes, recompress_stored_bytes
+
+def make_image(width, height, mode="RGB", fmt="JPEG", noise=True):
+    """A photo-like test image; noise keeps it from compressing to nothing."""
+    rng = random.Random(width * height)
+    image = Image.new(mode, (width, height), (120, 160, 200, 255)[:len(mode)])
+    if noise:
+        pixels = bytes(rng.getrandbits(8) for _ in range(width * height * 3))
+        image = Image.blend(image.convert("RGB"), Image.frombytes("RGB", (width, height), pixels), 0.6)
+        image = image.convert(mode)
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **({"quality": 95} if fmt == "JPEG" else {}))
+    return buffer.getvalue()
+
+def test_small_image_takes_one_encode():
+    """
+    Tests that an image already under the target is encoded once, at the top quality.
+    """
+    result = compress_image_bytes(make_image(400, 300, noise=False), max_size_kb=500)
+
+    assert result.encodes == 1
+    assert result.quality == 85
+    assert (result.width, result.height) == (400, 300)
+
+def test_large_jpeg_is_downscaled_and_fits():
+    """
+    Tests that wide JPEGs come out at max_width and within the size target.
+    """
+    result = compress_image_bytes(make_image(2400, 1800), max_size_kb=120, max_width=800)
+
+    assert result.width == 800
+    assert result.height == 600
+    assert len(result.data) <= 120 * 1024
+    assert Image.open(io.BytesIO(result.data)).format == "JPEG"
+
+def test_quality_search_picks_highest_fitting_quality():
+    """
+    Tests that the searched quality fits and that a few steps higher would not.
+    """
+    data = make_image(800, 600)
+    result = compress_image_bytes(data, max_size_kb=100)
+
+    assert len(result.data) <= 100 * 1024
+    assert MIN_QUALITY <= result.quality < 85
+    higher = compress_image_bytes(data, max_size_kb=100, max_quality=min(result.quality + 6, 85), min_quality=result.quality + 6)
+    assert len(higher.data) > 100 * 1024
+
+def test_unreachable_target_falls_back_to_min_quality():
+    """
+    Tests that the minimum quality is used when no quality meets the target.
+    """
+    result = compress_image_bytes(make_image(800, 600), max_size_kb=1)
+
+    assert result.quality == MIN_QUALITY
+
+def test_transparent_png_is_flattened():
+    """
+    Tests that transparent images become RGB JPEGs.
+    """
+    result = ImagePipeline(workers=0).compress(make_image(300, 200, mode="RGBA", fmt="PNG"))
+
+    assert Image.open(io.BytesIO(result.data)).mode == "RGB"
+
+def test_stored_png_keeps_its_format():
+    """
+    Tests that deferred compression of a PNG stays a PNG, so its .png key still fits.
+    """
+    result, content_type = recompress_stored_bytes(make_image(1600, 1200, mode="RGBA", fmt="PNG"), max_width=800)
+
+    stored = Image.open(io.BytesIO(result.data))
+    assert content_type == "image/png"
+    assert stored.format == "PNG"
+    assert stored.mode == "RGBA"
+    assert (result.width, result.height) == (800, 600)
+
+def test_stored_jpeg_is_searched_for_quality():
+    """
+    Tests that deferred compression of a JPEG goes through the quality search.
+    """
+    result, content_type = recompress_stored_bytes(make_image(2400, 1800), max_size_kb=120)
+
+    assert content_type == "image/jpeg"
+    assert len(result.data) <= 120 * 1024
+    assert result.quality is not None
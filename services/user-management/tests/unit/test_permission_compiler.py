@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+from app.core.permission_compiler import (
+    PermissionCatalog, PermissionCompiler, decode_mask, encode_mask, has_permission
+)
+
+def make_catalog(*names):
+    return PermissionCatalog(bits={name: bit for bit, name in enumerate(names)}, names=tuple(names))
+
+def make_role(*permissions, mask=None):
+    return SimpleNamespace(permissions=list(permissions), permission_mask=mask, permissions_version=0)
+
+def test_mask_encoding_round_trip():
+    """
+    Tests that masks survive the hex encoding used in tokens and the roles table.
+    """
+    mask = (1 << 70) | (1 << 3) | 1
+
+    assert decode_mask(encode_mask(mask)) == mask
+    assert decode_mask(None) == 0
+    assert encode_mask(0) == "0"
+
+def test_catalog_names_and_masks():
+    """
+    Tests that a mask maps back to exactly the permission names it was built from.
+    """
+    catalog = make_catalog("document:create", "document:read_own", "role:update")
+    mask = catalog.mask_of({"document:create", "role:update", "unknown:permission"})
+
+    assert mask == 0b101
+    assert catalog.names_of(mask) == {"document:create", "role:update"}
+    # Bits the catalog does not know yet are ignored
+    assert catalog.names_of(mask | 1 << 10) == {"document:create", "role:update"}
+
+def test_has_permission():
+    """
+    Tests the bit check used by authorization, including unknown permissions.
+    """
+    assert has_permission(0b100, 2) is True
+    assert has_permission(0b100, 1) is False
+    assert has_permission(0b100, None) is False
+
+def test_compile_roles_sets_mask_and_version():
+    """
+    Tests that compiling a role stores the OR of its permissions and moves the version stamp.
+    """
+    compiler = PermissionCompiler()
+    read, write = SimpleNamespace(bit_index=0), SimpleNamespace(bit_index=5)
+    role = make_role(read, write)
+
+    compiler.compile_roles(db=None, roles=[role])
+    assert decode_mask(role.permission_mask) == 0b100001
+    assert role.permissions_version == 1
+
+    role.permissions = [write]
+    compiler.compile_roles(db=None, roles=[role])
+    assert decode_mask(role.permission_mask) == 0b100000
+    assert role.permissions_version == 2
+
+def test_user_mask_is_or_of_role_masks():
+    """
+    Tests that a user's effective permissions are the union of their compiled roles.
+    """
+    compiler = PermissionCompiler()
+    roles = [make_role(mask=encode_mask(0b0011)), make_role(mask=encode_mask(0b1010))]
+
+    assert compiler.mask_of(db=None, roles=roles) == 0b1011
+    assert compiler.mask_of(db=None, roles=[]) == 0
@@ -0,0 +1,93 @@
+import uuid
+from types import SimpleNamespace
+from app.core.principal_cache import PrincipalCache
+
+def make_user(organization_id=None, is_active=True):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        email=f"{uuid.uuid4().hex[:8]}@example.com",
+        organization_id=organization_id or uuid.uuid4(),
+        is_active=is_active
+    )
+
+def cache_user(cache, user):
+    cache.put(user.email, cache.snapshot(user))
+
+def test_principal_cache_hit_and_miss():
+    """
+    Tests that a cached snapshot is returned until the user is invalidated.
+    """
+    cache = PrincipalCache()
+    user = make_user()
+
+    assert cache.get(user.email) is None
+    cache_user(cache, user)
+    snapshot = cache.get(user.email)
+
+    assert snapshot.id == user.id
+    assert snapshot.organization_id == user.organization_id
+    assert snapshot.is_active is True
+
+    cache.invalidate_user(user.email)
+    assert cache.get(user.email) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_principal_cache_ttl_expiry():
+    """
+    Tests that entries older than the TTL count as misses.
+    """
+    cache = PrincipalCache(ttl_seconds=0)
+    user = make_user()
+    cache_user(cache, user)
+
+    assert cache.get(user.email) is None
+
+def test_principal_cache_is_bounded():
+    """
+    Tests that the least recently used subject is evicted first.
+    """
+    cache = PrincipalCache(maxsize=2)
+    first, second, third = make_user(), make_user(), make_user()
+    cache_user(cache, first)
+    cache_user(cache, second)
+    cache.get(first.email)
+    cache_user(cache, third)
+
+    assert cache.get(second.email) is None
+    assert cache.get(first.email) is not None
+    assert cache.get(third.email) is not None
+
+def test_role_change_expires_only_that_organization():
+    """
+    Tests that a role mutation invalidates every user of its organization and nobody else.
+    """
+    cache = PrincipalCache()
+    org_id = uuid.uuid4()
+    colleague, teammate, outsider = make_user(org_id), make_user(org_id), make_user()
+    for user in (colleague, teammate, outsider):
+        cache_user(cache, user)
+
+    cache.invalidate_roles(org_id)
+
+    assert cache.get(colleague.email) is None
+    assert cache.get(teammate.email) is None
+    assert cache.get(outsider.email) is not None
+
+    # Snapshots taken after the change carry the new role version
+    cache_user(cache, colleague)
+    assert cache.get(colleague.email).role_version == 1
+
+def test_published_invalidations_are_applied():
+    """
+    Tests that invalidations received from another worker update the local cache.
+    """
+    cache = PrincipalCache()
+    user = make_user()
+    cache_user(cache, user)
+
+    cache._apply({"users": [user.email]})
+    assert cache.get(user.email) is None
+
+    cache_user(cache, user)
+    cache._apply({"organization_id": str(user.organization_id)})
+    assert cache.get(user.email) is None
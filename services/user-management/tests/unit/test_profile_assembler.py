@@ -0,0 +1,92 @@
+import uuid
+from app.core.principal_cache import PrincipalCache, UserSnapshot
+from app.services.profile_assembler import (
+    ProfileAssembler, ProfileSnapshot, photo_s3_key, render_profile, render_profile_tabs
+)
+
+ORG_ID = uuid.uuid4()
+
+def make_profile(role_version=0):
+    return ProfileSnapshot(
+        id=uuid.uuid4(),
+        email="patient@example.com",
+        organization_id=ORG_ID,
+        mfa_enabled=False,
+        roles=("PATIENT",),
+        personal={"first_name": "Asha", "last_name": "Rao"},
+        address={"city": "Pune"},
+        phone="9999999999",
+        photo_key="users/1/profile_photo/a.jpg",
+        photo_url="https://signed.example/a.jpg",
+        insurances=(
+            {"id": "1", "policy_number": "P-1", "is_active": True, "document_url": None},
+            {"id": "2", "policy_number": "P-2", "is_active": False, "document_url": "doc"},
+        ),
+        profile_data=None,
+        role_version=role_version
+    )
+
+def make_assembler():
+    principals = PrincipalCache()
+    assembler = ProfileAssembler(presign=lambda key: f"signed:{key}", principals=principals)
+    loads = []
+
+    def load(db, user_id, role_version=0):
+        loads.append(user_id)
+        return make_profile(role_version)
+
+    assembler.load = load
+    principal = UserSnapshot(uuid.uuid4(), "patient@example.com", ORG_ID, True, 0)
+    return assembler, principals, principal, loads
+
+def test_routes_render_from_one_snapshot():
+    """
+    Tests that /me and the tab routes agree, /me keeping inactive insurance and the presigned photo.
+    """
+    profile = make_profile()
+    full, tabs = render_profile(profile), render_profile_tabs(profile)
+
+    assert [tab["id"] for tab in tabs["tabs"]] == ["personal", "address", "account", "insurance"]
+    assert full["tabs"][0] == tabs["tabs"][0]
+    assert tabs["tabs"][1]["fields"]["city"] == "Pune"
+    assert tabs["tabs"][2]["fields"]["phone"] == "9999999999"
+    assert [i["policy_number"] for i in tabs["tabs"][3]["fields"]["insurance"]] == ["P-1"]
+    assert len(full["insurance_info"]) == 2
+    assert full["profile_photo_url"] == "https://signed.example/a.jpg"
+    assert tabs["profile_photo_url"] == "users/1/profile_photo/a.jpg"
+
+def test_photo_s3_key():
+    """
+    Tests that stored photo references map to S3 keys and full URLs are left alone.
+    """
+    assert photo_s3_key("/files/public/users/1/a.jpg") == "users/1/a.jpg"
+    assert photo_s3_key("https://cdn.example/a.jpg") is None
+    assert photo_s3_key(None) is None
+
+def test_snapshot_is_cached_until_invalidated():
+    """
+    Tests that the profile is loaded once, and again after a write drops it.
+    """
+    assembler, principals, principal, loads = make_assembler()
+
+    assembler.get(None, principal)
+    assembler.get(None, principal)
+    assert len(loads) == 1
+
+    # Profile writes go through the principal cache (crud_user.update_user)
+    principals.invalidate_user("patient@example.com")
+    assembler.get(None, principal)
+    assert len(loads) == 2
+
+def test_role_change_makes_snapshot_stale():
+    """
+    Tests that a role change in the user's organization reloads the roles shown on the profile.
+    """
+    assembler, principals, principal, loads = make_assembler()
+
+    assembler.get(None, principal)
+    principals.invalidate_roles(ORG_ID)
+    profile = assembler.get(None, principal)
+
+    assert len(loads) == 2
+    assert profile.role_version == 1
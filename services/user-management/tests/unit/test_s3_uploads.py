@@ -0,0 +1,118 @@
+import pytest
+from app.integrations.s3_uploads import MIN_PART_SIZE, KnownPrefixes, MultipartStream, StreamingUpload
+
+class FakeS3:
+    """Records the S3 calls a StreamingUpload or KnownPrefixes makes."""
+    def __init__(self):
+        self.calls = []
+        self.parts = []
+
+    def __getattr__(self, name):
+        def call(**kwargs):
+            self.calls.append(name)
+            if name == "upload_part":
+                self.parts.append(kwargs["Body"])
+                return {"ETag": f"etag-{kwargs['PartNumber']}"}
+            if name == "create_multipart_upload":
+                return {"UploadId": "upload-1"}
+            return {}
+        return call
+
+def form_body(fields, filename, content, boundary="XyZ"):
+    body = b""
+    for name, value in fields:
+        body += f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+    body += (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: image/png\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return f"multipart/form-data; boundary={boundary}", body
+
+def test_small_body_is_one_put():
+    """
+    Tests that a body smaller than a part is stored with a single PUT and can be transformed.
+    """
+    s3 = FakeS3()
+    upload = StreamingUpload(s3, "bucket", lambda: "users/1/other/a.png")
+    upload.write(b"abc")
+    upload.flush()
+
+    assert upload.complete(transform=lambda body: body.upper()) == "users/1/other/a.png"
+    assert s3.calls == ["put_object"]
+    assert upload.size == 3
+
+def test_large_body_streams_in_parts():
+    """
+    Tests that full parts are sent as they fill and the remainder completes the multipart upload.
+    """
+    s3 = FakeS3()
+    upload = StreamingUpload(s3, "bucket", lambda: "key", part_size=MIN_PART_SIZE)
+    for _ in range(11):
+        upload.write(b"x" * (MIN_PART_SIZE // 4))
+        if upload.ready:
+            upload.flush()
+    upload.complete()
+
+    assert s3.calls == ["create_multipart_upload", "upload_part", "upload_part", "upload_part", "complete_multipart_upload"]
+    assert [len(part) for part in s3.parts] == [MIN_PART_SIZE, MIN_PART_SIZE, MIN_PART_SIZE * 3 // 4]
+    assert upload.parts == 3
+
+def test_abort_drops_started_upload():
+    """
+    Tests that aborting a started multipart upload calls abort_multipart_upload.
+    """
+    s3 = FakeS3()
+    upload = StreamingUpload(s3, "bucket", lambda: "key", part_size=MIN_PART_SIZE)
+    upload.write(b"x" * MIN_PART_SIZE)
+    upload.flush()
+    upload.abort()
+
+    assert s3.calls[-1] == "abort_multipart_upload"
+    assert upload.upload_id is None
+
+def test_known_prefixes_check_once():
+    """
+    Tests that the bucket and a prefix are checked once, and that the LRU evicts the least recent entry.
+    """
+    s3 = FakeS3()
+    prefixes = KnownPrefixes(maxsize=2)
+    prefixes.ensure(s3, "bucket", "users/1/")
+    prefixes.ensure(s3, "bucket", "users/1/")
+    assert s3.calls == ["head_bucket", "put_object"]
+
+    # Every ensure touches the bucket entry, so users/1/ is now the oldest
+    prefixes.ensure(s3, "bucket", "users/2/")
+    assert ("bucket", "users/1/") not in prefixes
+    assert ("bucket", "") in prefixes
+
+def test_multipart_stream_yields_file_bytes():
+    """
+    Tests that fields are collected and the file's bytes come out whatever the chunk boundaries.
+    """
+    content = bytes(range(256)) * 40
+    content_type, body = form_body([("file_type", "profile_photo")], "photo.png", content)
+    form = MultipartStream(content_type)
+    received = b""
+    for i in range(0, len(body), 97):
+        received += b"".join(form.feed(body[i:i + 97]))
+    form.finish()
+
+    assert received == content
+    assert form.fields == {"file_type": "profile_photo"}
+    assert (form.filename, form.file_content_type) == ("photo.png", "image/png")
+
+def test_multipart_stream_rejects_bad_bodies():
+    """
+    Tests that a missing boundary, a missing file and an oversized field raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        MultipartStream("application/json")
+
+    form = MultipartStream("multipart/form-data; boundary=XyZ")
+    form.feed(b'--XyZ\r\nContent-Disposition: form-data; name="file_type"\r\n\r\nother\r\n--XyZ--\r\n')
+    with pytest.raises(ValueError):
+        form.finish()
+
+    content_type, body = form_body([("user_id", "x" * 100)], "a.png", b"")
+    with pytest.raises(ValueError):
+        MultipartStream(content_type, max_field_size=10).feed(body)
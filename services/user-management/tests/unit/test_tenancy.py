@@ -0,0 +1,72 @@
+import uuid
+import pytest
+from app.db.base import TENANT_SCHEMA
+from app.db.tenancy import SEARCH_PATH_KEY, TenantRouter, set_search_path, tenant_schema_name, tenant_translate_map
+
+class FakeConnection:
+    """Records the statements a router would send to Postgres."""
+    def __init__(self):
+        self.info = {}
+        self.statements = []
+        self.commits = 0
+
+    def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+
+    def commit(self):
+        self.commits += 1
+
+def test_tenant_schema_name():
+    """
+    Tests that dashed and undashed organization ids map to the same schema.
+    """
+    org_id = uuid.uuid4()
+
+    assert tenant_schema_name(org_id) == f"org_{org_id.hex}"
+    assert tenant_schema_name(str(org_id)) == tenant_schema_name(org_id.hex)
+
+def test_set_search_path_skips_matching_schema():
+    """
+    Tests that SET is only sent when the connection serves another organization.
+    """
+    connection = FakeConnection()
+    first, second = tenant_schema_name(uuid.uuid4()), tenant_schema_name(uuid.uuid4())
+
+    assert set_search_path(connection, first) is True
+    assert set_search_path(connection, first) is False
+    assert set_search_path(connection, second) is True
+
+    assert connection.statements == [
+        f"SET search_path TO {first}, public",
+        f"SET search_path TO {second}, public",
+    ]
+    assert connection.commits == 2
+    assert connection.info[SEARCH_PATH_KEY] == second
+
+def test_set_search_path_reset():
+    """
+    Tests that routing back to the default resets the connection once.
+    """
+    connection = FakeConnection()
+    set_search_path(connection, tenant_schema_name(uuid.uuid4()))
+
+    assert set_search_path(connection, None) is True
+    assert set_search_path(connection, None) is False
+    assert connection.statements[-1] == "RESET search_path"
+    assert SEARCH_PATH_KEY not in connection.info
+
+def test_tenant_translate_map():
+    """
+    Tests that the translate map only qualifies tenant tables and is reused per schema.
+    """
+    schema = tenant_schema_name(uuid.uuid4())
+
+    assert tenant_translate_map(schema) == {TENANT_SCHEMA: schema}
+    assert tenant_translate_map(schema) is tenant_translate_map(schema)
+
+def test_router_rejects_unknown_mode():
+    """
+    Tests that a misconfigured routing mode fails at startup.
+    """
+    with pytest.raises(ValueError):
+        TenantRouter(engine=None, mode="schema")
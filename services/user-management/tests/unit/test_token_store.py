@@ -0,0 +1,46 @@
+import hashlib
+import uuid
+from app.core.token_store import BloomFilter, RefreshTokenStore
+from app.crud.crud_token import token_digest
+
+def test_token_digest_is_sha256_hex():
+    """
+    Tests that tokens are stored under the same digest the migration backfills.
+    """
+    digest = token_digest("header.payload.signature")
+
+    assert digest == hashlib.sha256(b"header.payload.signature").hexdigest()
+    assert len(digest) == 64
+
+def test_bloom_filter_has_no_false_negatives():
+    """
+    Tests that every added JTI is reported as present.
+    """
+    jtis = [str(uuid.uuid4()) for _ in range(5000)]
+    bloom = BloomFilter(capacity=5000, error_rate=0.001)
+    bloom.update(jtis)
+
+    assert all(jti in bloom for jti in jtis)
+    assert bloom.count == 5000
+
+def test_bloom_filter_false_positive_rate():
+    """
+    Tests that unknown JTIs are rejected at roughly the configured error rate.
+    """
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    bloom.update(str(uuid.uuid4()) for _ in range(10000))
+
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(20000))
+    assert false_positives / 20000 < 0.03
+
+def test_bloom_negative_skips_the_database():
+    """
+    Tests that a JTI missing from the filter is answered without touching the session.
+    """
+    store = RefreshTokenStore(capacity=100)
+    store._bloom = BloomFilter(capacity=100)
+    store._built_at = float("inf")
+
+    # A session would be needed to check a filter positive
+    assert store.is_revoked(db=None, jti=str(uuid.uuid4())) is False
+    assert store.bloom_misses == 1
@@ -0,0 +1,3 @@
+"""
+Code shared by the e-health platform services
+"""
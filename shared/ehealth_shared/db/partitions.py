@@ -0,0 +1,251 @@
+"""
+Monthly range partition management for append-only tables
+
+Shared by the services that partition their audit logs; each one binds a
+manager to its own table and settings (app.db.partitions).
+"""
+
+from sqlalchemy import DDL, Table, event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from typing import Dict, List, NamedTuple, Optional
+from datetime import date, timedelta
+from pathlib import Path
+import gzip
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+_BOUND_RE = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})[^']*'\) TO \('(\d{4}-\d{2}-\d{2})[^']*'\)")
+_KEY_RE = re.compile(r'RANGE \(("?\w+"?)\)')
+
+
+class PartitionInfo(NamedTuple):
+    """One attached monthly partition; ``end`` is exclusive."""
+    name: str
+    start: date
+    end: date
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def parse_partition_bound(expression: str) -> Optional[tuple]:
+    """Parse ``pg_get_expr(relpartbound)``; None for the default partition."""
+    match = _BOUND_RE.search(expression)
+    if not match:
+        return None
+    return date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))
+
+
+def create_default_partition(table: Table) -> None:
+    """Attach a DEFAULT partition whenever ``table`` is built by create_all.
+
+    Schemas created from the models (tests, seed scripts) would otherwise
+    reject every insert until ensure_partitions first runs; rows landing in
+    the default are moved out when their month's partition is created.
+    """
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS {table.name}_default PARTITION OF {table.name} DEFAULT"
+        ).execute_if(dialect="postgresql")
+    )
+
+
+class MonthlyPartitionManager:
+    """Keeps a table range-partitioned by month on a timestamp column.
+
+    ``ensure_partitions`` pre-creates the current month and the next
+    ``premake_months`` so inserts never fall into the default partition,
+    and ``archive_expired`` detaches partitions that are wholly older than
+    the retention window, writes them to gzipped CSV and drops them.
+    Queries that filter on the partition column are pruned by the planner
+    to the months they touch.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        retention_days: int,
+        premake_months: int = 3,
+        archive_dir: str = "archive"
+    ):
+        self.table = table
+        self.retention_days = retention_days
+        self.premake_months = premake_months
+        self.archive_dir = Path(archive_dir)
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.table}_p{month:%Y_%m}"
+
+    @property
+    def default_partition_name(self) -> str:
+        return f"{self.table}_default"
+
+    def create_partition_sql(self, month: date) -> str:
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.partition_name(month)} "
+            f"PARTITION OF {self.table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+
+    async def is_partitioned(self, conn: AsyncConnection) -> bool:
+        result = await conn.execute(
+            text("SELECT relkind = 'p' FROM pg_class WHERE relname = :table"),
+            {"table": self.table}
+        )
+        return bool(result.scalar())
+
+    async def list_partitions(self, conn: AsyncConnection) -> List[PartitionInfo]:
+        """Attached monthly partitions, oldest first."""
+        result = await conn.execute(
+            text(
+                "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+                "FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": self.table}
+        )
+        partitions = []
+        for name, expression in result.all():
+            bounds = parse_partition_bound(expression)
+            if bounds:
+                partitions.append(PartitionInfo(name, *bounds))
+        return sorted(partitions, key=lambda p: p.start)
+
+    def months_to_create(self, existing: List[PartitionInfo], today: date) -> List[date]:
+        """Months from the current one through the pre-create horizon that lack a partition."""
+        covered = {p.start for p in existing}
+        current = month_start(today)
+        months = [add_months(current, i) for i in range(self.premake_months + 1)]
+        return [month for month in months if month not in covered]
+
+    def expired(self, partitions: List[PartitionInfo], today: date) -> List[PartitionInfo]:
+        """Partitions whose every row is older than the retention window."""
+        cutoff = today - timedelta(days=self.retention_days)
+        return [p for p in partitions if p.end <= cutoff]
+
+    async def partition_column(self, conn: AsyncConnection) -> str:
+        """The column the table is range-partitioned on, quoted as Postgres prints it."""
+        result = await conn.execute(
+            text("SELECT pg_get_partkeydef(oid) FROM pg_class WHERE relname = :table"),
+            {"table": self.table}
+        )
+        return _KEY_RE.search(result.scalar()).group(1)
+
+    async def default_has_rows(self, conn: AsyncConnection, column: str, month: date) -> bool:
+        """Whether rows for month were routed to the default partition."""
+        result = await conn.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": self.default_partition_name}
+        )
+        if not result.scalar():
+            return False
+        result = await conn.execute(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {self.default_partition_name} "
+                f"WHERE {column} >= :start AND {column} < :end)"
+            ),
+            {"start": month, "end": add_months(month, 1)}
+        )
+        return bool(result.scalar())
+
+    async def create_partition_from_default(self, conn: AsyncConnection, column: str, month: date) -> None:
+        """Create a month partition whose rows already sit in the default partition.
+
+        Postgres refuses to create a partition while the default holds rows
+        in its range, so the default is detached, the month created, its
+        rows moved over and the default re-attached. Runs in the caller's
+        transaction; the detach locks the table until it commits.
+        """
+        default = self.default_partition_name
+        in_month = f"{column} >= :start AND {column} < :end"
+        bounds = {"start": month, "end": add_months(month, 1)}
+        await conn.execute(text(f"ALTER TABLE {self.table} DETACH PARTITION {default}"))
+        await conn.execute(text(self.create_partition_sql(month)))
+        moved = await conn.execute(
+            text(f"INSERT INTO {self.partition_name(month)} SELECT * FROM {default} WHERE {in_month}"), bounds
+        )
+        await conn.execute(text(f"DELETE FROM {default} WHERE {in_month}"), bounds)
+        await conn.execute(text(f"ALTER TABLE {self.table} ATTACH PARTITION {default} DEFAULT"))
+        logger.warning(f"Moved {moved.rowcount} rows from {default} into {self.partition_name(month)}")
+
+    async def ensure_partitions(self, conn: AsyncConnection, today: Optional[date] = None) -> List[str]:
+        """Create missing partitions for the current and upcoming months."""
+        if not await self.is_partitioned(conn):
+            logger.warning(f"Table {self.table} is not partitioned; run the partitioning migration")
+            return []
+
+        today = today or date.today()
+        column = await self.partition_column(conn)
+        created = []
+        for month in self.months_to_create(await self.list_partitions(conn), today):
+            if await self.default_has_rows(conn, column, month):
+                await self.create_partition_from_default(conn, column, month)
+            else:
+                await conn.execute(text(self.create_partition_sql(month)))
+            created.append(self.partition_name(month))
+
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self.default_partition_name} PARTITION OF {self.table} DEFAULT"
+        ))
+        if created:
+            logger.info(f"Created partitions {', '.join(created)}")
+        return created
+
+    async def archive_partition(self, conn: AsyncConnection, partition: PartitionInfo) -> Path:
+        """Detach a partition, write it to gzipped CSV and drop it.
+
+        Runs inside the caller's transaction, so a failed export leaves the
+        partition attached.
+        """
+        target_dir = self.archive_dir / self.table
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / f"{partition.name}.csv.gz"
+        partial = target.with_suffix(".gz.partial")
+
+        await conn.execute(text(f"ALTER TABLE {self.table} DETACH PARTITION {partition.name}"))
+
+        raw = await conn.get_raw_connection()
+        with open(partial, "wb") as file:
+            with gzip.GzipFile(fileobj=file, mode="wb") as output:
+                await raw.driver_connection.copy_from_table(
+                    partition.name, output=output, format="csv", header=True
+                )
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(partial, target)
+
+        await conn.execute(text(f"DROP TABLE {partition.name}"))
+        logger.info(f"Archived partition {partition.name} to {target}")
+        return target
+
+    async def archive_expired(self, engine: AsyncEngine, today: Optional[date] = None) -> List[Path]:
+        """Archive every expired partition, one transaction per partition."""
+        today = today or date.today()
+        async with engine.connect() as conn:
+            expired = self.expired(await self.list_partitions(conn), today)
+
+        archived = []
+        for partition in expired:
+            async with engine.begin() as conn:
+                archived.append(await self.archive_partition(conn, partition))
+        return archived
+
+    async def rotate(self, engine: AsyncEngine, today: Optional[date] = None) -> Dict[str, list]:
+        """Pre-create upcoming partitions, then archive expired ones."""
+        async with engine.begin() as conn:
+            created = await self.ensure_partitions(conn, today)
+        archived = await self.archive_expired(engine, today)
+        return {"created": created, "archived": [str(path) for path in archived]}
+